@@ -0,0 +1,75 @@
+"""
+CLI command for "local cache-stats" command
+"""
+
+import logging
+import click
+
+from samcli.cli.main import pass_context, common_options as cli_framework_options
+from samcli.commands.local.cli_common.options import get_default_layer_cache_dir, get_default_code_cache_dir
+from samcli.local.layers.layer_cache_index import LayerCacheIndex
+from samcli.local.lambdafn.archive_cache import ArchiveCache
+
+
+LOG = logging.getLogger(__name__)
+
+HELP_TEXT = """
+You can use this command to see how much disk space the local caches of SAM CLI use.\n
+\b
+The layer cache holds the Layers downloaded for your functions. The code cache holds the
+zip/jar archives of your functions, decompressed.
+$ sam local cache-stats
+"""
+
+
+@click.command("cache-stats", help=HELP_TEXT, short_help="Shows the size of the local layer and code caches.")
+@click.option('--layer-cache-basedir',
+              type=click.Path(exists=False, file_okay=False),
+              envvar="SAM_LAYER_CACHE_BASEDIR",
+              help="Specifies the location basedir where the Layers your template uses are downloaded to.",
+              default=get_default_layer_cache_dir())
+@click.option('--code-cache-basedir',
+              type=click.Path(exists=False, file_okay=False),
+              envvar="SAM_CODE_CACHE_BASEDIR",
+              help="Specifies the location basedir where the zip/jar archives of your functions are kept decompressed.",
+              default=get_default_code_cache_dir())
+@click.option('--code-cache-max-size',
+              type=int,
+              envvar="SAM_CODE_CACHE_MAX_SIZE",
+              help="Maximum total size in MB of the archives kept decompressed in the code cache (default: {})."
+                   .format(ArchiveCache.DEFAULT_MAX_SIZE_MB),
+              default=ArchiveCache.DEFAULT_MAX_SIZE_MB)
+@cli_framework_options
+@pass_context
+def cli(ctx, layer_cache_basedir, code_cache_basedir, code_cache_max_size):
+
+    # All logic must be implemented in the ``do_cli`` method. This helps with easy unit testing
+
+    do_cli(ctx, layer_cache_basedir, code_cache_basedir, code_cache_max_size)  # pragma: no cover
+
+
+def do_cli(ctx, layer_cache_basedir, code_cache_basedir, code_cache_max_size):  # pylint: disable=unused-argument
+    """
+    Implementation of the ``cli`` method, just separated out for unit testing purposes
+    """
+
+    LOG.debug("local cache-stats command is called")
+
+    _echo_stats("Layer cache", layer_cache_basedir, LayerCacheIndex(layer_cache_basedir).stats())
+    _echo_stats("Code cache", code_cache_basedir,
+                ArchiveCache(code_cache_basedir, max_size_mb=code_cache_max_size).stats())
+
+
+def _echo_stats(name, cache_dir, stats):
+    click.echo("{}: {}".format(name, cache_dir))
+    click.echo("  Entries: {}".format(stats["entries"]))
+
+    if stats.get("incomplete"):
+        click.echo("  Incomplete entries: {} (deleted by the first download after they are an hour old)"
+                   .format(stats["incomplete"]))
+
+    size_mb = stats["size"] / (1024.0 * 1024)
+    if stats["max_size"] is None:
+        click.echo("  Size: {:.1f} MB".format(size_mb))
+    else:
+        click.echo("  Size: {:.1f} MB of {:.1f} MB".format(size_mb, stats["max_size"] / (1024.0 * 1024)))
@@ -5,6 +5,8 @@ Reads CLI arguments and performs necessary preparation to be able to run the fun
 import errno
 import json
 import os
+import logging
+import platform
 
 import docker
 import requests
@@ -12,13 +14,21 @@ import requests
 import samcli.lib.utils.osutils as osutils
 from samcli.commands.local.lib.local_lambda import LocalLambdaRunner
 from samcli.commands.local.lib.debug_context import DebugContext
-from samcli.local.lambdafn.runtime import LambdaRuntime
+from samcli.local.lambdafn.runtime import LambdaRuntime, WarmLambdaRuntime
+from samcli.local.lambdafn.archive_cache import ArchiveCache
+from samcli.local.lambdafn.concurrency import ConcurrencyLimiter
 from samcli.local.docker.lambda_image import LambdaImage
 from samcli.local.docker.manager import ContainerManager
+from samcli.local.docker.client import get_docker_client, configure_docker_client, DEFAULT_MAX_POOL_SIZE
+from samcli.local.docker.utils import get_network_gateway
+from samcli.local.runtime_api.local_runtime_api_service import LocalRuntimeApiService
 from samcli.commands._utils.template import get_template_data
 from samcli.local.layers.layer_downloader import LayerDownloader
+from .options import get_default_code_cache_dir
 from .user_exceptions import InvokeContextException, DebugContextException
+from ..lib.sam_base_provider import SamBaseProvider
 from ..lib.sam_function_provider import SamFunctionProvider
+from ..lib.template_cache import TemplateCache
 
 # This is an attempt to do a controlled import. pathlib is in the
 # Python standard library starting at 3.4. This will import pathlib2,
@@ -28,6 +38,8 @@ try:
 except ImportError:
     from pathlib2 import Path
 
+LOG = logging.getLogger(__name__)
+
 
 class InvokeContext(object):
     """
@@ -59,7 +71,17 @@ class InvokeContext(object):
                  parameter_overrides=None,
                  layer_cache_basedir=None,
                  force_image_build=None,
-                 aws_region=None):
+                 aws_region=None,
+                 warm_containers=None,
+                 warm_container_ttl=None,
+                 max_warm_containers=None,
+                 prewarm_containers=None,
+                 code_cache_basedir=None,
+                 code_cache_max_size=None,
+                 max_concurrent_invokes=None,
+                 max_queued_invokes=None,
+                 template_cache_dir=None,
+                 max_parallel_invokes=None):
         """
         Initialize the context
 
@@ -96,6 +118,33 @@ class InvokeContext(object):
             Whether or not to force build the image
         aws_region str
             AWS region to use
+        warm_containers bool
+            Keep containers running after an invoke and reuse them for later invokes
+        warm_container_ttl int
+            Number of seconds a warm container can stay idle before it is deleted
+        max_warm_containers int
+            Maximum number of warm containers that can be running at the same time
+        prewarm_containers int
+            Number of idle warm containers to start for every function when entering the context. Implies
+            ``warm_containers``
+        code_cache_basedir str
+            Directory that code archives are decompressed into and kept for later invokes. Defaults to the
+            ``code-pkg`` directory in the application directory
+        code_cache_max_size int
+            Maximum total size in megabytes of the archives kept decompressed in the code cache. 0 to decompress
+            archives for every invoke instead. Defaults to the default size of the cache
+        max_concurrent_invokes int
+            Maximum number of invokes running at the same time, across all functions. Functions are also limited by
+            their ReservedConcurrentExecutions
+        max_queued_invokes int
+            Maximum number of invokes waiting for a limit. Invokes above this are throttled
+        template_cache_dir str
+            Directory to keep processed templates in, so later commands don't process the same template again. They
+            are only kept in memory if not given
+        max_parallel_invokes int
+            Number of invokes that can be made at the same time, like the number of workers of a service. Every
+            running invoke holds a connection to Docker, so this sizes the pool of connections to Docker. The pool
+            keeps its default size if not given
         """
         self._template_file = template_file
         self._function_identifier = function_identifier
@@ -111,6 +160,16 @@ class InvokeContext(object):
         self._layer_cache_basedir = layer_cache_basedir
         self._force_image_build = force_image_build
         self._aws_region = aws_region
+        self._warm_containers = warm_containers or bool(prewarm_containers)
+        self._warm_container_ttl = warm_container_ttl
+        self._max_warm_containers = max_warm_containers
+        self._prewarm_containers = prewarm_containers
+        self._code_cache_basedir = code_cache_basedir or get_default_code_cache_dir()
+        self._code_cache_max_size = code_cache_max_size
+        self._max_concurrent_invokes = max_concurrent_invokes
+        self._max_queued_invokes = max_queued_invokes
+        self._template_cache_dir = template_cache_dir
+        self._max_parallel_invokes = max_parallel_invokes
 
         self._template_dict = None
         self._function_provider = None
@@ -118,6 +177,11 @@ class InvokeContext(object):
         self._log_file_handle = None
         self._debug_context = None
         self._layers_downloader = None
+        self._container_manager = None
+        self._runtime_api = None
+        self._concurrency_limiter = None
+        self._local_lambda_runner = None
+        self._previous_template_cache = None
 
     def __enter__(self):
         """
@@ -126,30 +190,78 @@ class InvokeContext(object):
         :returns InvokeContext: Returns this object
         """
 
-        # Grab template from file and create a provider
-        self._template_dict = self._get_template_data(self._template_file)
-        self._function_provider = SamFunctionProvider(self._template_dict, self.parameter_overrides)
+        if self._template_cache_dir:
+            # Providers share the template cache. The previous one is restored when exiting, so the cache directory
+            # doesn't apply to later contexts
+            self._previous_template_cache = SamBaseProvider.template_cache
+            SamBaseProvider.template_cache = TemplateCache(cache_dir=self._template_cache_dir)
+
+        try:
+            # Grab template from file and create a provider
+            self._template_dict = self._get_template_data(self._template_file)
+            self._function_provider = SamFunctionProvider(self._template_dict, self.parameter_overrides)
+
+            self._env_vars_value = self._get_env_vars_value(self._env_vars_file)
+            self._log_file_handle = self._setup_log_file(self._log_file)
 
-        self._env_vars_value = self._get_env_vars_value(self._env_vars_file)
-        self._log_file_handle = self._setup_log_file(self._log_file)
+            self._debug_context = self._get_debug_context(self._debug_port,
+                                                          self._debug_args,
+                                                          self._debugger_path)
 
-        self._debug_context = self._get_debug_context(self._debug_port,
-                                                      self._debug_args,
-                                                      self._debugger_path)
+            if self._max_parallel_invokes:
+                # Before anything uses the shared Docker client, so it is created with the pool size
+                configure_docker_client(max_pool_size=self._get_docker_pool_size())
 
-        self._check_docker_connectivity()
+            self._check_docker_connectivity()
+
+            # One runner serves every invoke of this context, so state built for a runtime, like pre-warmed
+            # containers, is kept for the invokes that follow
+            self._local_lambda_runner = self._create_local_lambda_runner()
+
+            if self._prewarm_containers:
+                self._local_lambda_runner.prewarm(self._prewarm_containers)
+        except BaseException:
+            # __exit__ is not called when __enter__ fails
+            self._restore_template_cache()
+            raise
 
         return self
 
     def __exit__(self, *args):
         """
-        Cleanup any necessary opened files
+        Cleanup any necessary opened files and running containers
         """
 
+        self._local_lambda_runner = None
+
+        if self._container_manager:
+            self._container_manager.shutdown()
+            self._container_manager = None
+
+        if self._runtime_api:
+            self._runtime_api.stop()
+            self._runtime_api = None
+
+        if self._concurrency_limiter:
+            stats = self._concurrency_limiter.stats()
+            if stats["waited"] or stats["throttled"]:
+                LOG.info("%d invoke(s) waited for a concurrency limit, for %.3f seconds on average and %.3f seconds "
+                         "at most. %d invoke(s) were throttled. Up to %d invoke(s) were waiting at the same time",
+                         stats["waited"], stats["average_wait_time"], stats["max_wait_time"], stats["throttled"],
+                         stats["max_queue_depth"])
+            self._concurrency_limiter = None
+
         if self._log_file_handle:
             self._log_file_handle.close()
             self._log_file_handle = None
 
+        self._restore_template_cache()
+
+    def _restore_template_cache(self):
+        if self._previous_template_cache is not None:
+            SamBaseProvider.template_cache = self._previous_template_cache
+            self._previous_template_cache = None
+
     @property
     def function_name(self):
         """
@@ -179,26 +291,121 @@ class InvokeContext(object):
     @property
     def local_lambda_runner(self):
         """
-        Returns an instance of the runner capable of running Lambda functions locally
+        Returns the runner capable of running Lambda functions locally. The same runner is returned for the life of
+        this context
 
         :return samcli.commands.local.lib.local_lambda.LocalLambdaRunner: Runner configured to run Lambda functions
             locally
         """
+        return self._local_lambda_runner
 
-        container_manager = ContainerManager(docker_network_id=self._docker_network,
-                                             skip_pull_image=self._skip_pull_image)
+    def _create_local_lambda_runner(self):
+        """
+        Creates the runner, with the runtime, image builder and caches it uses to run Lambda functions locally
 
-        layer_downloader = LayerDownloader(self._layer_cache_basedir, self.get_cwd())
+        :return samcli.commands.local.lib.local_lambda.LocalLambdaRunner: Runner configured to run Lambda functions
+            locally
+        """
+
+        # Container manager tracks warm containers in one place, so they can be cleaned up when exiting this context
+        if not self._container_manager:
+            self._container_manager = ContainerManager(docker_network_id=self._docker_network,
+                                                       skip_pull_image=self._skip_pull_image,
+                                                       max_warm_containers=self._max_warm_containers,
+                                                       warm_container_ttl=self._warm_container_ttl)
+
+        layer_downloader = LayerDownloader(self._layer_cache_basedir,
+                                           self.get_cwd(),
+                                           max_concurrent_downloads=LayerDownloader.DEFAULT_MAX_CONCURRENT_DOWNLOADS)
         image_builder = LambdaImage(layer_downloader,
                                     self._skip_pull_image,
                                     self._force_image_build)
 
-        lambda_runtime = LambdaRuntime(container_manager, image_builder)
+        archive_cache = None
+        if self._code_cache_max_size is None:
+            archive_cache = ArchiveCache(self._code_cache_basedir)
+        elif self._code_cache_max_size > 0:
+            archive_cache = ArchiveCache(self._code_cache_basedir, max_size_mb=self._code_cache_max_size)
+
+        if self._warm_containers:
+            lambda_runtime = WarmLambdaRuntime(self._container_manager,
+                                               image_builder,
+                                               runtime_api=self._get_runtime_api(),
+                                               archive_cache=archive_cache)
+        else:
+            lambda_runtime = LambdaRuntime(self._container_manager, image_builder, archive_cache=archive_cache)
+
         return LocalLambdaRunner(local_runtime=lambda_runtime,
                                  function_provider=self._function_provider,
                                  cwd=self.get_cwd(),
                                  env_vars_values=self._env_vars_value,
-                                 debug_context=self._debug_context)
+                                 debug_context=self._debug_context,
+                                 concurrency_limiter=self._get_concurrency_limiter())
+
+    def _get_concurrency_limiter(self):
+        """
+        Creates the limiter shared by all runners, from the global limit and the ReservedConcurrentExecutions of the
+        functions
+
+        :return samcli.local.lambdafn.concurrency.ConcurrencyLimiter: The limiter. None, if nothing is limited
+        """
+        if self._concurrency_limiter:
+            return self._concurrency_limiter
+
+        function_concurrency = {}
+        for function in self._function_provider.get_all():
+            if isinstance(function.reserved_concurrency, int):
+                function_concurrency[function.name] = function.reserved_concurrency
+
+        if self._max_concurrent_invokes is None and not function_concurrency:
+            return None
+
+        max_queued = self._max_queued_invokes
+        if max_queued is None:
+            max_queued = ConcurrencyLimiter.DEFAULT_MAX_QUEUED_INVOKES
+
+        self._concurrency_limiter = ConcurrencyLimiter(max_concurrency=self._max_concurrent_invokes,
+                                                       function_concurrency=function_concurrency,
+                                                       max_queued=max_queued)
+        return self._concurrency_limiter
+
+    def _get_runtime_api(self):
+        """
+        Starts the Runtime API that warm containers with a persistent runtime loop take events from. The service must
+        listen on an address that containers can reach:
+            - On the host network, containers share the loopback interface of the host
+            - Docker Desktop (Mac and Windows) forwards ``host.docker.internal`` to the loopback interface of the host
+            - On Linux, the gateway of the Docker network is an address of the host
+
+        :return LocalRuntimeApiService: Running Runtime API service. None, if there is no address containers can reach
+        """
+        if self._runtime_api:
+            return self._runtime_api
+
+        container_host = None
+        if self._docker_network == "host":
+            host = "127.0.0.1"
+        elif platform.system() != "Linux":
+            host = "127.0.0.1"
+            container_host = "host.docker.internal"
+        else:
+            try:
+                host = get_network_gateway(self._container_manager.docker_client, self._docker_network or "bridge")
+            except docker.errors.NotFound:
+                # Containers can't be started on a network that doesn't exist, and the invoke will say so
+                LOG.debug("Docker network %s was not found", self._docker_network, exc_info=True)
+                host = None
+
+        if not host:
+            LOG.debug("Could not find an address for containers to reach the Runtime API. Runtimes will be started on "
+                      "every invoke")
+            return None
+
+        self._runtime_api = LocalRuntimeApiService(host, container_host=container_host)
+        self._runtime_api.create()
+        self._runtime_api.start()
+
+        return self._runtime_api
 
     @property
     def stdout(self):
@@ -233,6 +440,32 @@ class InvokeContext(object):
         """
         return self._template_dict
 
+    @property
+    def template_file(self):
+        """
+        Returns the path to the template
+
+        :return string: Path to the template
+        """
+        return self._template_file
+
+    def reload_template(self):
+        """
+        Reads the template again, after it changed, and creates a provider for the functions in it. The runner keeps
+        the provider it was created with, until it is replaced with the one returned here.
+
+        :return samcli.commands.local.lib.sam_function_provider.SamFunctionProvider: Provider of the functions in the
+            template
+        :raises InvokeContextException: If the template could not be read
+        """
+        template_dict = self._get_template_data(self._template_file)
+        function_provider = SamFunctionProvider(template_dict, self.parameter_overrides)
+
+        self._template_dict = template_dict
+        self._function_provider = function_provider
+
+        return function_provider
+
     def get_cwd(self):
         """
         Get the working directory. This is usually relative to the directory that contains the template. If a Docker
@@ -349,6 +582,19 @@ class InvokeContext(object):
 
         return DebugContext(debug_port=debug_port, debug_args=debug_args, debugger_path=debugger_path)
 
+    def _get_docker_pool_size(self):
+        """
+        Number of connections to Docker to keep open for reuse. Invokes waiting for a concurrency limit don't hold a
+        connection, so only the invokes that can run at the same time need one.
+
+        :return int: Size of the pool of connections to Docker
+        """
+        running_invokes = self._max_parallel_invokes
+        if self._max_concurrent_invokes is not None:
+            running_invokes = min(running_invokes, self._max_concurrent_invokes)
+
+        return max(DEFAULT_MAX_POOL_SIZE, running_invokes)
+
     @staticmethod
     def _check_docker_connectivity(docker_client=None):
         """
@@ -359,7 +605,7 @@ class InvokeContext(object):
         :raises InvokeContextException: If Docker is not available
         """
 
-        docker_client = docker_client or docker.from_env()
+        docker_client = docker_client or get_docker_client()
 
         try:
             docker_client.ping()
@@ -4,6 +4,7 @@ Common CLI options for invoke command
 
 import click
 from samcli.commands._utils.options import template_click_option, docker_click_options, parameter_override_click_option
+from samcli.local.lambdafn.archive_cache import ArchiveCache
 
 try:
     from pathlib import Path
@@ -36,6 +37,20 @@ def get_default_layer_cache_dir():
     return str(layer_cache_dir)
 
 
+def get_default_code_cache_dir():
+    """
+    Default the directory that code archives are decompressed into
+
+    Returns
+    -------
+    str
+        String representing the code cache directory
+    """
+    code_cache_dir = get_application_dir().joinpath('code-pkg')
+
+    return str(code_cache_dir)
+
+
 def service_common_options(port):
     def construct_options(f):
         """
@@ -59,7 +74,43 @@ def service_common_options(port):
                          help="Local hostname or IP address to bind to (default: '127.0.0.1')"),
             click.option("--port", "-p",
                          default=port,
-                         help="Local port number to listen on (default: '{}')".format(str(port)))
+                         help="Local port number to listen on (default: '{}')".format(str(port))),
+            click.option("--warm-containers",
+                         is_flag=True,
+                         default=False,
+                         help="Keep function containers running after an invoke and reuse them for later invokes "
+                              "of the same function. Invokes that reuse a container start much faster."),
+            click.option("--warm-container-ttl",
+                         type=int,
+                         default=300,
+                         help="Number of seconds a warm container can stay idle before it is deleted "
+                              "(default: 300)"),
+            click.option("--max-warm-containers",
+                         type=int,
+                         help="Maximum number of warm containers that can be running at the same time. Once this "
+                              "limit is reached, idle containers of other functions are deleted to make room, or "
+                              "the invoke waits for a container to be released."),
+            click.option("--prewarm-containers",
+                         type=int,
+                         default=0,
+                         help="Number of idle warm containers to start for every function before the server starts "
+                              "listening. Implies --warm-containers (default: 0)"),
+            click.option("--max-workers",
+                         type=int,
+                         help="Number of requests the server handles at the same time (default: 32). Ignored when "
+                              "debugging, since requests are then handled one at a time."),
+            click.option("--max-queued-requests",
+                         type=int,
+                         help="Number of requests that can wait for the server to handle them (default: 1024). "
+                              "Requests above this are rejected with '429 Too Many Requests'."),
+            click.option("--max-concurrent-invokes",
+                         type=int,
+                         help="Maximum number of functions running at the same time. Functions are also limited by "
+                              "their ReservedConcurrentExecutions. Invokes above the limits wait for their turn."),
+            click.option("--max-queued-invokes",
+                         type=int,
+                         help="Maximum number of invokes waiting for a concurrency limit (default: 100). Invokes "
+                              "above this are throttled like Lambda throttles them.")
         ]
 
         # Reverse the list to maintain ordering of options in help text printed with --help
@@ -113,6 +164,27 @@ def invoke_common_options(f):
                      help="Specifies the location basedir where the Layers your template uses will be downloaded to.",
                      default=get_default_layer_cache_dir()),
 
+        click.option('--template-cache-dir',
+                     type=click.Path(exists=False, file_okay=False),
+                     envvar="SAM_TEMPLATE_CACHE_DIR",
+                     help="Specifies a directory to keep processed templates in, so later commands using the same "
+                          "template and parameters don't process it again."),
+
+        click.option('--code-cache-basedir',
+                     type=click.Path(exists=False, file_okay=False),
+                     envvar="SAM_CODE_CACHE_BASEDIR",
+                     help="Specifies the location basedir where the zip/jar archives of your functions are kept "
+                          "decompressed, so they are not decompressed again on every invoke.",
+                     default=get_default_code_cache_dir()),
+
+        click.option('--code-cache-max-size',
+                     type=int,
+                     envvar="SAM_CODE_CACHE_MAX_SIZE",
+                     help="Maximum total size in MB of the archives kept decompressed in the code cache (default: {}). "
+                          "Set to 0 to decompress archives for every invoke instead."
+                          .format(ArchiveCache.DEFAULT_MAX_SIZE_MB),
+                     default=ArchiveCache.DEFAULT_MAX_SIZE_MB),
+
     ] + docker_click_options() + [
 
         click.option('--force-image-build',
@@ -54,6 +54,13 @@ class ResourceNotFound(UserException):
     pass
 
 
+class InvalidLayerContent(UserException):
+    """
+    The content downloaded for a LayerVersion does not match its CodeSha256
+    """
+    pass
+
+
 class InvalidLayerVersionArn(UserException):
     """
     The LayerVersion Arn given in the template is Invalid
@@ -2,14 +2,17 @@
 CLI command for "local invoke" command
 """
 
+import os
 import logging
 import click
 
+import samcli.lib.utils.osutils as osutils
 from samcli.cli.main import pass_context, common_options as cli_framework_options, aws_creds_options
 from samcli.commands.local.cli_common.options import invoke_common_options
 from samcli.commands.exceptions import UserException
 from samcli.commands.local.lib.exceptions import InvalidLayerReference
 from samcli.commands.local.cli_common.invoke_context import InvokeContext
+from samcli.commands.local.lib.batch_invoke import BatchInvoke
 from samcli.local.lambdafn.exceptions import FunctionNotFound
 from samcli.commands.validate.lib.exceptions import InvalidSamDocumentException
 from samcli.commands.local.lib.exceptions import OverridesNotWellDefinedError
@@ -29,6 +32,10 @@ $ sam local invoke "HelloWorldFunction" -e event.json\n
 \b
 Invoking a Lambda function using input from stdin
 $ echo '{"message": "Hey, are you there?" }' | sam local invoke "HelloWorldFunction" \n
+\b
+Invoking a Lambda function once for every event in a JSON Lines file, or every JSON file in a directory, reusing
+warm containers. One JSON line with the response and duration of each invoke is written to stdout
+$ sam local invoke "HelloWorldFunction" --batch events.jsonl --batch-workers 4\n
 """
 STDIN_FILE_NAME = "-"
 
@@ -40,25 +47,37 @@ STDIN_FILE_NAME = "-"
               help="JSON file containing event data passed to the Lambda function during invoke. If this option "
                    "is not specified, we will default to reading JSON from stdin")
 @click.option("--no-event", is_flag=True, default=False, help="Invoke Function with an empty event")
+@click.option("--batch",
+              type=click.Path(),
+              help="JSON Lines file with one event per line, or directory of JSON event files. The function is "
+                   "invoked once for every event, in warm containers, and one JSON line with the outcome of each "
+                   "invoke is written to stdout. Use '-' to read events from stdin.")
+@click.option("--batch-workers",
+              type=int,
+              default=BatchInvoke.DEFAULT_WORKERS,
+              help="Number of events of the batch invoked at the same time, each in its own warm container "
+                   "(default: 1).")
 @invoke_common_options
 @cli_framework_options
 @aws_creds_options
 @click.argument('function_identifier', required=False)
 @pass_context  # pylint: disable=R0914
-def cli(ctx, function_identifier, template, event, no_event, env_vars, debug_port, debug_args, debugger_path,
-        docker_volume_basedir, docker_network, log_file, layer_cache_basedir, skip_pull_image, force_image_build,
-        parameter_overrides):
+def cli(ctx, function_identifier, template, event, no_event, batch, batch_workers, env_vars, debug_port, debug_args,
+        debugger_path, docker_volume_basedir, docker_network, log_file, layer_cache_basedir, template_cache_dir,
+        code_cache_basedir, code_cache_max_size, skip_pull_image, force_image_build, parameter_overrides):
 
     # All logic must be implemented in the ``do_cli`` method. This helps with easy unit testing
 
-    do_cli(ctx, function_identifier, template, event, no_event, env_vars, debug_port, debug_args, debugger_path,
-           docker_volume_basedir, docker_network, log_file, layer_cache_basedir, skip_pull_image, force_image_build,
+    do_cli(ctx, function_identifier, template, event, no_event, batch, batch_workers, env_vars, debug_port,
+           debug_args, debugger_path, docker_volume_basedir, docker_network, log_file, layer_cache_basedir,
+           template_cache_dir, code_cache_basedir, code_cache_max_size, skip_pull_image, force_image_build,
            parameter_overrides)  # pragma: no cover
 
 
-def do_cli(ctx, function_identifier, template, event, no_event, env_vars, debug_port,  # pylint: disable=R0914
-           debug_args, debugger_path, docker_volume_basedir, docker_network, log_file, layer_cache_basedir,
-           skip_pull_image, force_image_build, parameter_overrides):
+def do_cli(ctx, function_identifier, template, event, no_event, batch, batch_workers,  # pylint: disable=R0914
+           env_vars, debug_port, debug_args, debugger_path, docker_volume_basedir, docker_network, log_file,
+           layer_cache_basedir, template_cache_dir, code_cache_basedir, code_cache_max_size, skip_pull_image,
+           force_image_build, parameter_overrides):
     """
     Implementation of the ``cli`` method, just separated out for unit testing purposes
     """
@@ -69,7 +88,15 @@ def do_cli(ctx, function_identifier, template, event, no_event, env_vars, debug_
         # Do not know what the user wants. no_event and event both passed in.
         raise UserException("no_event and event cannot be used together. Please provide only one.")
 
-    if no_event:
+    if batch and (no_event or event != STDIN_FILE_NAME):
+        raise UserException("batch cannot be used together with event or no_event. Please provide only one.")
+
+    if batch_workers < 1:
+        raise UserException("batch_workers must be at least 1.")
+
+    if batch:
+        event_data = None
+    elif no_event:
         event_data = "{}"
     else:
         event_data = _get_event(event)
@@ -89,14 +116,24 @@ def do_cli(ctx, function_identifier, template, event, no_event, env_vars, debug_
                            debugger_path=debugger_path,
                            parameter_overrides=parameter_overrides,
                            layer_cache_basedir=layer_cache_basedir,
+                           template_cache_dir=template_cache_dir,
+                           code_cache_basedir=code_cache_basedir,
+                           code_cache_max_size=code_cache_max_size,
                            force_image_build=force_image_build,
-                           aws_region=ctx.region) as context:
-
-            # Invoke the function
-            context.local_lambda_runner.invoke(context.function_name,
-                                               event=event_data,
-                                               stdout=context.stdout,
-                                               stderr=context.stderr)
+                           aws_region=ctx.region,
+                           # Events of a batch reuse the containers of the events before them
+                           warm_containers=bool(batch),
+                           max_warm_containers=batch_workers if batch else None,
+                           max_parallel_invokes=batch_workers if batch else None) as context:
+
+            if batch:
+                _invoke_batch(context, batch, batch_workers)
+            else:
+                # Invoke the function
+                context.local_lambda_runner.invoke(context.function_name,
+                                                   event=event_data,
+                                                   stdout=context.stdout,
+                                                   stderr=context.stderr)
 
     except FunctionNotFound:
         raise UserException("Function {} not found in template".format(function_identifier))
@@ -125,3 +162,53 @@ def _get_event(event_file_name):
     # accidentally closing a standard stream
     with click.open_file(event_file_name, 'r') as fp:
         return fp.read()
+
+
+def _invoke_batch(context, batch, batch_workers):
+    """
+    Invokes the function once for every event of the batch, and writes the outcome of each invoke to stdout
+
+    :param samcli.commands.local.cli_common.invoke_context.InvokeContext context: Context to invoke the function in
+    :param string batch: Path to a JSON Lines file or a directory of JSON files, or '-' for stdin
+    :param int batch_workers: Number of events invoked at the same time
+    """
+
+    batch_invoke = BatchInvoke(context.local_lambda_runner,
+                               context.function_name,
+                               workers=batch_workers,
+                               stderr=context.stderr,
+                               is_debugging=context.local_lambda_runner.is_debugging())
+
+    counts = batch_invoke.run(_get_batch_events(batch), osutils.stdout())
+
+    LOG.info("Invoked %s %d time(s): %s",
+             context.function_name,
+             sum(counts.values()),
+             ", ".join("{} {}".format(count, status) for status, count in counts.items()))
+
+
+def _get_batch_events(batch):
+    """
+    Reads the events of the batch, one at a time. Events of a directory are read from its JSON files, in the order of
+    their names, and are identified by the name of their file. Events of a JSON Lines file are identified by their
+    line number.
+
+    :param string batch: Path to a JSON Lines file or a directory of JSON files, or '-' for stdin
+    :return: Generator of (event id, event data) tuples
+    """
+
+    if batch != STDIN_FILE_NAME and os.path.isdir(batch):
+        for file_name in sorted(os.listdir(batch)):
+            path = os.path.join(batch, file_name)
+            if file_name.endswith(".json") and os.path.isfile(path):
+                with click.open_file(path, 'r') as fp:
+                    yield file_name, fp.read()
+        return
+
+    if batch == STDIN_FILE_NAME:
+        LOG.info("Reading batch of invoke payloads from stdin, one per line")
+
+    with click.open_file(batch, 'r') as fp:
+        for line_number, line in enumerate(fp, 1):
+            if line.strip():
+                yield line_number, line.strip()
@@ -0,0 +1,150 @@
+"""
+Invokes a Lambda function once for every event in a batch
+"""
+
+import time
+import logging
+from collections import OrderedDict, deque
+
+from concurrent.futures import ThreadPoolExecutor
+
+from samcli.lib.utils import json_codec
+from samcli.local.services.base_local_service import LambdaOutputStream, LambdaOutputParser
+from samcli.local.lambdafn.exceptions import FunctionNotFound
+
+LOG = logging.getLogger(__name__)
+
+
+class BatchInvoke(object):
+    """
+    Invokes a Lambda function with each event of a batch, a few events at a time, and writes one JSON line with the
+    outcome of each invoke. Lines are written in the order of the events, as soon as the invoke and the invokes of the
+    events before it complete, so the output of two runs over the same events can be compared line by line.
+
+    When debugging, the events are invoked one at a time on the calling thread instead. The debugger can only be
+    attached to one container at a time, and the runtime only handles Ctrl+C of debugging sessions on the main thread.
+    """
+
+    DEFAULT_WORKERS = 1
+
+    SUCCESS = "success"
+    FUNCTION_ERROR = "function_error"
+    INVOKE_ERROR = "invoke_error"
+    INVALID_EVENT = "invalid_event"
+
+    def __init__(self, lambda_runner, function_name, workers=DEFAULT_WORKERS, stderr=None, is_debugging=False):
+        """
+        Initialize the batch
+
+        :param samcli.commands.local.lib.local_lambda.LocalLambdaRunner lambda_runner: Runner capable of invoking the
+            function
+        :param string function_name: Name of the function to invoke
+        :param int workers: Optional. Number of invokes run at the same time. Defaults to 1
+        :param io.BaseIO stderr: Optional. Stream to write the logs of the function to
+        :param bool is_debugging: Optional. Are we debugging the invokes? Defaults to False
+        """
+
+        self.lambda_runner = lambda_runner
+        self.function_name = function_name
+        self.workers = workers
+        self.stderr = stderr
+        self.is_debugging = is_debugging
+
+    def run(self, events, output):
+        """
+        Invokes the function with every event, and writes the outcome of each invoke to the output as a JSON line with
+        the id of the event, its status, the duration of the invoke in milliseconds, and the response of the function
+        or the error that failed the invoke
+
+        :param events: Iterable of (event id, event data) tuples. The events are only read as fast as the function
+            is invoked
+        :param io.BaseIO output: Binary stream to write the outcome of the invokes to
+        :return dict: Number of invokes for each status
+        :raises FunctionNotFound: When the function is not found
+        """
+
+        counts = OrderedDict((status, 0) for status in (self.SUCCESS,
+                                                        self.FUNCTION_ERROR,
+                                                        self.INVOKE_ERROR,
+                                                        self.INVALID_EVENT))
+
+        def write(result):
+            counts[result["status"]] += 1
+
+            output.write(json_codec.dumps(result).encode("utf-8") + b"\n")
+            output.flush()
+
+        if self.is_debugging:
+            for event_id, event_data in events:
+                write(self._invoke(event_id, event_data))
+
+            return counts
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+
+            for event_id, event_data in events:
+                pending.append(executor.submit(self._invoke, event_id, event_data))
+
+                # Reads ahead only enough events to keep the workers busy while the oldest result is waited for
+                if len(pending) > self.workers:
+                    write(pending.popleft().result())
+
+            while pending:
+                write(pending.popleft().result())
+
+        return counts
+
+    def _invoke(self, event_id, event_data):
+        """
+        Invokes the function with one event
+
+        :return OrderedDict: Outcome of the invoke
+        """
+
+        result = OrderedDict([("event", event_id)])
+
+        try:
+            json_codec.loads(event_data)
+        except ValueError as ex:
+            result["status"] = self.INVALID_EVENT
+            result["error"] = "Event is not valid JSON: {}".format(ex)
+            return result
+
+        stdout_stream = LambdaOutputStream(log_stream=self.stderr)
+        start = time.time()
+
+        try:
+            self.lambda_runner.invoke(self.function_name, event_data, stdout=stdout_stream, stderr=self.stderr)
+        except FunctionNotFound:
+            # Fails the whole batch
+            raise
+        except Exception as ex:  # pylint: disable=broad-except
+            # Any other error, like the container failing to start, only fails this invoke
+            LOG.debug("Invoke with event '%s' failed", event_id, exc_info=True)
+            result["status"] = self.INVOKE_ERROR
+            result["duration_ms"] = self._elapsed_ms(start)
+            result["error"] = str(ex)
+            return result
+
+        duration_ms = self._elapsed_ms(start)
+
+        lambda_response = stdout_stream.get_lambda_response()
+
+        # Parses the response once, both to write it as JSON and to check if it is an error
+        try:
+            lambda_response = json_codec.loads(lambda_response)
+        except ValueError:
+            is_lambda_user_error_response = False
+        else:
+            is_lambda_user_error_response = LambdaOutputParser.is_lambda_error(lambda_response)
+
+        result["status"] = self.FUNCTION_ERROR if is_lambda_user_error_response else self.SUCCESS
+        result["duration_ms"] = duration_ms
+        result["response"] = lambda_response
+
+        return result
+
+    @staticmethod
+    def _elapsed_ms(start):
+        return round((time.time() - start) * 1000, 3)
@@ -5,6 +5,7 @@ Connects the CLI with Local API Gateway service.
 import os
 import logging
 
+from samcli.lib.utils.file_watcher import FileWatcher
 from samcli.local.apigw.local_apigw_service import LocalApigwService, Route
 from samcli.commands.local.lib.sam_api_provider import SamApiProvider
 from samcli.commands.local.lib.exceptions import NoApisDefined
@@ -22,7 +23,10 @@ class LocalApiService(object):
                  lambda_invoke_context,
                  port,
                  host,
-                 static_dir):
+                 static_dir,
+                 max_workers=None,
+                 max_queued_requests=None,
+                 watch_template=False):
         """
         Initialize the local API service.
 
@@ -31,12 +35,20 @@ class LocalApiService(object):
         :param int port: Port to listen on
         :param string host: Local hostname or IP address to bind to
         :param string static_dir: Optional, directory from which static files will be mounted
+        :param int max_workers: Optional, number of requests served at the same time
+        :param int max_queued_requests: Optional, number of requests that can wait to be served
+        :param bool watch_template: Optional, reload the routes and functions of the service when the template
+            changes
         """
 
         self.port = port
         self.host = host
         self.static_dir = static_dir
+        self.max_workers = max_workers
+        self.max_queued_requests = max_queued_requests
+        self.watch_template = watch_template
 
+        self.lambda_invoke_context = lambda_invoke_context
         self.cwd = lambda_invoke_context.get_cwd()
         self.api_provider = SamApiProvider(lambda_invoke_context.template,
                                            parameter_overrides=lambda_invoke_context.parameter_overrides,
@@ -69,18 +81,102 @@ class LocalApiService(object):
                                     static_dir=static_dir_path,
                                     port=self.port,
                                     host=self.host,
-                                    stderr=self.stderr_stream)
+                                    stderr=self.stderr_stream,
+                                    max_workers=self.max_workers,
+                                    max_queued_requests=self.max_queued_requests)
 
         service.create()
 
         # Print out the list of routes that will be mounted
         self._print_routes(self.api_provider, self.host, self.port)
+
+        if not self.watch_template:
+            LOG.info("You can now browse to the above endpoints to invoke your functions. "
+                     "You do not need to restart/reload SAM CLI while working on your functions "
+                     "changes will be reflected instantly/automatically. You only need to restart "
+                     "SAM CLI if you update your AWS SAM template")
+            service.run()
+            return
+
         LOG.info("You can now browse to the above endpoints to invoke your functions. "
-                 "You do not need to restart/reload SAM CLI while working on your functions "
-                 "changes will be reflected instantly/automatically. You only need to restart "
-                 "SAM CLI if you update your AWS SAM template")
+                 "You do not need to restart/reload SAM CLI while working on your functions or "
+                 "your AWS SAM template, changes will be reflected instantly/automatically")
+
+        watcher = FileWatcher(self.lambda_invoke_context.template_file, lambda: self._reload_template(service))
+        watcher.start()
+        try:
+            service.run()
+        finally:
+            watcher.stop()
+
+    def _reload_template(self, service):
+        """
+        Reads the template again, after it changed, and swaps the functions and routes that changed into the running
+        service. Functions that did not change keep their configuration, so their warm containers are reused. If the
+        template is not valid, the service keeps serving the previous template.
+
+        :param samcli.local.apigw.local_apigw_service.LocalApigwService service: Running service
+        """
+        LOG.info("Template changed, reloading %s", self.lambda_invoke_context.template_file)
+
+        try:
+            function_provider = self.lambda_invoke_context.reload_template()
+            api_provider = SamApiProvider(self.lambda_invoke_context.template,
+                                          parameter_overrides=self.lambda_invoke_context.parameter_overrides,
+                                          cwd=self.cwd)
+            routing_list = self._make_routing_list(api_provider)
+        except Exception as ex:  # pylint: disable=broad-except
+            # Templates are often not valid while they are being edited
+            LOG.warning("Could not reload the template, still serving the previous template: %s", ex)
+            return
+
+        if not routing_list:
+            LOG.warning("No APIs available in the template, still serving the previous template")
+            return
+
+        changed_functions = self._changed_functions(self.lambda_runner.provider, function_provider)
+        # Functions are swapped before the routes, so new routes find their function
+        self.lambda_runner.provider = function_provider
+
+        previous_routes = self._route_configs(self.api_provider)
+        new_routes = self._route_configs(api_provider)
+        self.api_provider = api_provider
+
+        if new_routes != previous_routes:
+            service.update_routes(routing_list)
+            self._print_routes(api_provider, self.host, self.port)
+
+        LOG.info("Reloaded the template: %d route(s) added, %d route(s) removed, function(s) changed: %s",
+                 len(new_routes - previous_routes),
+                 len(previous_routes - new_routes),
+                 ", ".join(changed_functions) or "none")
+
+    @staticmethod
+    def _route_configs(api_provider):
+        """
+        Returns the configuration of each API in the provider, that can be compared with the APIs of another provider
+
+        :param samcli.commands.local.lib.provider.ApiProvider api_provider: API Provider
+        :return set(tuple): Path, method, function name and binary media types of each API
+        """
+        return set((api.path, api.method, api.function_name, tuple(api.binary_media_types or []))
+                   for api in api_provider.get_all())
+
+    @staticmethod
+    def _changed_functions(previous_provider, new_provider):
+        """
+        Returns the names of the functions that were added, removed or changed
+
+        :param samcli.commands.local.lib.provider.FunctionProvider previous_provider: Provider of the previous
+            functions
+        :param samcli.commands.local.lib.provider.FunctionProvider new_provider: Provider of the new functions
+        :return list(string): Sorted names of the functions
+        """
+        previous_functions = {function.name: function for function in previous_provider.get_all()}
+        new_functions = {function.name: function for function in new_provider.get_all()}
 
-        service.run()
+        return sorted(name for name in set(previous_functions) | set(new_functions)
+                      if previous_functions.get(name) != new_functions.get(name))
 
     @staticmethod
     def _make_routing_list(api_provider):
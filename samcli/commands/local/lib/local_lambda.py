@@ -4,6 +4,9 @@ Implementation of Local Lambda runner
 
 import os
 import logging
+from contextlib import contextmanager
+from concurrent.futures import Future
+
 import boto3
 
 from samcli.lib.utils.codeuri import resolve_code_path
@@ -27,7 +30,8 @@ class LocalLambdaRunner(object):
                  function_provider,
                  cwd,
                  env_vars_values=None,
-                 debug_context=None):
+                 debug_context=None,
+                 concurrency_limiter=None):
         """
         Initializes the class
 
@@ -38,6 +42,8 @@ class LocalLambdaRunner(object):
         :param dict env_vars_values: Optional. Dictionary containing values of environment variables
         :param integer debug_port: Optional. Port to bind the debugger to
         :param string debug_args: Optional. Additional arguments passed to the debugger
+        :param samcli.local.lambdafn.concurrency.ConcurrencyLimiter concurrency_limiter: Optional. Limits the number
+            of invokes running at the same time
         """
 
         self.local_runtime = local_runtime
@@ -45,34 +51,103 @@ class LocalLambdaRunner(object):
         self.cwd = cwd
         self.env_vars_values = env_vars_values or {}
         self.debug_context = debug_context
+        self.concurrency_limiter = concurrency_limiter
 
     def invoke(self, function_name, event, stdout=None, stderr=None):
         """
         Find the Lambda function with given name and invoke it. Pass the given event to the function and return
         response through the given streams.
 
-        This function will block until either the function completes or times out.
+        This function will block until either the function completes or times out. When too many invokes are running,
+        it first waits for its turn.
 
         :param string function_name: Name of the Lambda function to invoke
         :param string event: Event data passed to the function. Must be a valid JSON String.
         :param io.BaseIO stdout: Stream to write the output of the Lambda function to.
         :param io.BaseIO stderr: Stream to write the Lambda runtime logs to.
         :raises FunctionNotfound: When we cannot find a function with the given name
+        :raises ConcurrencyLimitExceeded: When the invoke is throttled
         """
 
-        # Generate the correct configuration based on given inputs
-        function = self.provider.get(function_name)
+        config = self._get_function_config(function_name)
 
-        if not function:
-            raise FunctionNotFound("Unable to find a Function with name '%s'", function_name)
+        with self._concurrency_limit(config.name):
+            # Invoke the function
+            self.local_runtime.invoke(config, event, debug_context=self.debug_context, stdout=stdout, stderr=stderr)
 
-        LOG.debug("Found one Lambda function with name '%s'", function_name)
+    def invoke_async(self, function_name, event, stdout=None, stderr=None):
+        """
+        Find the Lambda function with given name and invoke it without blocking. Pass the given event to the function
+        and return response through the given streams.
 
-        LOG.info("Invoking %s (%s)", function.handler, function.runtime)
-        config = self._get_invoke_config(function)
+        The returned future completes when the function completes or times out. On Python 3, it can be awaited from a
+        coroutine with ``asyncio.wrap_future``. Functions running in warm containers with a persistent runtime loop
+        don't hold a thread while they run, so many invokes can be in flight at the same time.
+
+        :param string function_name: Name of the Lambda function to invoke
+        :param string event: Event data passed to the function. Must be a valid JSON String.
+        :param io.BaseIO stdout: Stream to write the output of the Lambda function to.
+        :param io.BaseIO stderr: Stream to write the Lambda runtime logs to.
+        :return concurrent.futures.Future: Future with a result of None, or the exception that failed the invoke
+        :raises FunctionNotfound: When we cannot find a function with the given name
+        :raises ConcurrencyLimitExceeded: When the invoke is throttled
+        """
+
+        config = self._get_function_config(function_name)
+
+        if not self.concurrency_limiter:
+            return self.local_runtime.invoke_async(config,
+                                                   event,
+                                                   debug_context=self.debug_context,
+                                                   stdout=stdout,
+                                                   stderr=stderr)
+
+        future = Future()
+
+        def on_done(invoke_future):
+            self.concurrency_limiter.release(config.name)
+
+            if invoke_future.exception() is not None:
+                future.set_exception(invoke_future.exception())
+            else:
+                future.set_result(invoke_future.result())
+
+        def invoke():
+            try:
+                invoke_future = self.local_runtime.invoke_async(config,
+                                                                event,
+                                                                debug_context=self.debug_context,
+                                                                stdout=stdout,
+                                                                stderr=stderr)
+            except Exception as ex:  # pylint: disable=broad-except
+                self.concurrency_limiter.release(config.name)
+                future.set_exception(ex)
+                return
+
+            invoke_future.add_done_callback(on_done)
+
+        # Invokes when it is this invoke's turn, without blocking until then
+        future.set_running_or_notify_cancel()
+        self.concurrency_limiter.acquire_async(config.name, invoke)
+        return future
+
+    def prewarm(self, count):
+        """
+        Starts idle containers for every function so the first invokes don't have to wait for a container to start.
+        The local runtime must support warm containers.
+
+        This function will block until all the containers are started.
+
+        :param int count: Number of containers to start for every function
+        """
+        if self.is_debugging():
+            LOG.debug("Containers are not pre-warmed when debugging")
+            return
+
+        configs = [self._get_invoke_config(function) for function in self.provider.get_all()]
 
-        # Invoke the function
-        self.local_runtime.invoke(config, event, debug_context=self.debug_context, stdout=stdout, stderr=stderr)
+        LOG.info("Starting %d container(s) for each of %d function(s)", count, len(configs))
+        self.local_runtime.prewarm(configs, count)
 
     def is_debugging(self):
         """
@@ -86,6 +161,41 @@ class LocalLambdaRunner(object):
         """
         return bool(self.debug_context)
 
+    @contextmanager
+    def _concurrency_limit(self, function_name):
+        """
+        Context manager that waits until the function is allowed to run, when a concurrency limiter is set
+
+        :param string function_name: Name of the Lambda function
+        :raises ConcurrencyLimitExceeded: When the invoke is throttled
+        """
+        if not self.concurrency_limiter:
+            yield
+            return
+
+        with self.concurrency_limiter.limit(function_name):
+            yield
+
+    def _get_function_config(self, function_name):
+        """
+        Finds the Lambda function with the given name and returns its invoke configuration
+
+        :param string function_name: Name of the Lambda function
+        :return samcli.local.lambdafn.config.FunctionConfig: Function configuration to pass to Lambda runtime
+        :raises FunctionNotfound: When we cannot find a function with the given name
+        """
+
+        # Generate the correct configuration based on given inputs
+        function = self.provider.get(function_name)
+
+        if not function:
+            raise FunctionNotFound("Unable to find a Function with name '%s'", function_name)
+
+        LOG.debug("Found one Lambda function with name '%s'", function_name)
+
+        LOG.info("Invoking %s (%s)", function.handler, function.runtime)
+        return self._get_invoke_config(function)
+
     def _get_invoke_config(self, function):
         """
         Returns invoke configuration to pass to Lambda Runtime to invoke the given function
@@ -17,7 +17,11 @@ class LocalLambdaService(object):
     def __init__(self,
                  lambda_invoke_context,
                  port,
-                 host):
+                 host,
+                 max_workers=None,
+                 max_queued_requests=None,
+                 event_workers=None,
+                 event_retries=None):
         """
         Initialize the Local Lambda Invoke service.
 
@@ -25,10 +29,18 @@ class LocalLambdaService(object):
             that can help with Lambda invocation
         :param int port: Port to listen on
         :param string host: Local hostname or IP address to bind to
+        :param int max_workers: Optional, number of requests served at the same time
+        :param int max_queued_requests: Optional, number of requests that can wait to be served
+        :param int event_workers: Optional, number of asynchronous ("Event") invokes run at the same time
+        :param int event_retries: Optional, number of times a failed asynchronous invoke is retried
         """
 
         self.port = port
         self.host = host
+        self.max_workers = max_workers
+        self.max_queued_requests = max_queued_requests
+        self.event_workers = event_workers
+        self.event_retries = event_retries
         self.lambda_runner = lambda_invoke_context.local_lambda_runner
         self.stderr_stream = lambda_invoke_context.stderr
 
@@ -48,7 +60,11 @@ class LocalLambdaService(object):
         service = LocalLambdaInvokeService(lambda_runner=self.lambda_runner,
                                            port=self.port,
                                            host=self.host,
-                                           stderr=self.stderr_stream)
+                                           stderr=self.stderr_stream,
+                                           max_workers=self.max_workers,
+                                           max_queued_requests=self.max_queued_requests,
+                                           event_workers=self.event_workers,
+                                           event_retries=self.event_retries)
 
         service.create()
 
@@ -38,8 +38,13 @@ Function = namedtuple("Function", [
     "rolearn",
 
     # List of Layers
-    "layers"
+    "layers",
+
+    # Maximum number of concurrent invokes of the function (ReservedConcurrentExecutions). None, for no limit
+    "reserved_concurrency"
 ])
+Function.__new__.__defaults__ = (None,  # reserved_concurrency is optional and defaults to no limit
+                                 )
 
 
 class LayerVersion(object):
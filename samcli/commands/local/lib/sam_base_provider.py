@@ -8,6 +8,8 @@ from samcli.lib.samlib.wrapper import SamTranslatorWrapper
 from samtranslator.intrinsics.resolver import IntrinsicsResolver
 from samtranslator.intrinsics.actions import RefAction
 
+from .template_cache import TemplateCache
+
 
 LOG = logging.getLogger(__name__)
 
@@ -35,6 +37,10 @@ class SamBaseProvider(object):
     # Only Ref is supported when resolving template parameters
     _SUPPORTED_INTRINSICS = [RefAction]
 
+    # Shared by all providers, so a template is processed once even though several providers are created from it.
+    # Commands can replace it with a cache that also persists processed templates to disk
+    template_cache = TemplateCache()
+
     @staticmethod
     def get_template(template_dict, parameter_overrides=None):
         """
@@ -55,7 +61,28 @@ class SamBaseProvider(object):
             Processed SAM template
         """
 
-        template_dict = template_dict or {}
+        return SamBaseProvider.template_cache.get(template_dict or {}, parameter_overrides,
+                                                  SamBaseProvider._process_template)
+
+    @staticmethod
+    def _process_template(template_dict, parameter_overrides):
+        """
+        Runs the SAM plugins on a copy of the template and substitutes parameter values in it
+
+        Parameters
+        ----------
+        template_dict : dict
+            unprocessed SAM template dictionary
+
+        parameter_overrides: dict
+            Optional dictionary of values for template parameters
+
+        Returns
+        -------
+        dict
+            Processed SAM template
+        """
+
         if template_dict:
             template_dict = SamTranslatorWrapper(template_dict).run_plugins()
 
@@ -131,7 +131,8 @@ class SamFunctionProvider(FunctionProvider):
             codeuri=codeuri,
             environment=resource_properties.get("Environment"),
             rolearn=resource_properties.get("Role"),
-            layers=layers
+            layers=layers,
+            reserved_concurrency=resource_properties.get("ReservedConcurrentExecutions")
         )
 
     @staticmethod
@@ -188,7 +189,8 @@ class SamFunctionProvider(FunctionProvider):
             codeuri=codeuri,
             environment=resource_properties.get("Environment"),
             rolearn=resource_properties.get("Role"),
-            layers=layers
+            layers=layers,
+            reserved_concurrency=resource_properties.get("ReservedConcurrentExecutions")
         )
 
     @staticmethod
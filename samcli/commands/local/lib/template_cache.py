@@ -0,0 +1,173 @@
+"""
+Cache of SAM templates that were processed by the SAM plugins and had their parameters resolved
+"""
+
+import os
+import copy
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+import samtranslator
+
+import samcli
+from samcli.lib.utils.single_flight import SingleFlight
+
+LOG = logging.getLogger(__name__)
+
+
+class TemplateCache(object):
+    """
+    Caches processed templates by the SHA256 digest of the template, the parameter values and the versions of the SAM
+    CLI and the SAM Translator, so the same template is processed once even when several providers are created from
+    it. Processed templates are kept in memory, and also written to a directory when one is given, so later runs of
+    the CLI don't process the template again.
+
+    Callers get their own copy of the processed template, which they can modify.
+
+    This is thread-safe.
+    """
+
+    DEFAULT_MAX_ENTRIES = 8
+
+    def __init__(self, cache_dir=None, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Parameters
+        ----------
+        cache_dir str
+            Optional. Directory to write processed templates to, and read them from. It is created if it does not
+            exist. Processed templates are only kept in memory if not given
+        max_entries int
+            Optional. Number of processed templates kept in memory. Defaults to 8
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        # Processed templates by key. Ordered from the least to the most recently used
+        self._entries = OrderedDict()
+        self._processing = SingleFlight()
+
+    def get(self, template_dict, parameter_overrides, process):
+        """
+        Returns the processed template, processing it only if it is not in the cache
+
+        Parameters
+        ----------
+        template_dict dict
+            Unprocessed SAM template dictionary
+        parameter_overrides dict
+            Values for template parameters
+        process
+            Function that processes the template. It is called with the template dictionary and the parameter
+            values, and must not modify the template dictionary
+
+        Returns
+        -------
+        dict
+            Copy of the processed template
+        """
+        key = self._key(template_dict, parameter_overrides)
+
+        processed = self._get_entry(key)
+        if processed is None:
+            processed = self._processing.do(key, self._load_or_process, key, template_dict, parameter_overrides,
+                                            process)
+
+        return copy.deepcopy(processed)
+
+    def _get_entry(self, key):
+        with self._lock:
+            processed = self._entries.get(key)
+            if processed is not None:
+                # Most recently used
+                del self._entries[key]
+                self._entries[key] = processed
+            return processed
+
+    def _add_entry(self, key, processed):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = processed
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load_or_process(self, key, template_dict, parameter_overrides, process):
+        # Another caller may have processed the template while this one was waiting
+        processed = self._get_entry(key)
+        if processed is not None:
+            return processed
+
+        processed = self._read(key)
+        if processed is None:
+            LOG.debug("Processing template, it is not in the template cache")
+            processed = process(template_dict, parameter_overrides)
+            self._write(key, processed)
+
+        self._add_entry(key, processed)
+        return processed
+
+    def _read(self, key):
+        if not self.cache_dir:
+            return None
+
+        path = os.path.join(self.cache_dir, key + ".json")
+        try:
+            with open(path, "r") as fp:
+                processed = json.load(fp)
+        except (IOError, OSError):
+            return None
+        except ValueError:
+            LOG.debug("Ignoring template cache file %s that is not valid", path)
+            return None
+
+        LOG.debug("Read processed template from %s", path)
+        return processed
+
+    def _write(self, key, processed):
+        if not self.cache_dir:
+            return
+
+        try:
+            data = json.dumps(processed)
+        except (TypeError, ValueError):
+            # YAML templates can contain values, like dates, that can't be written as JSON
+            LOG.debug("Processed template can not be written to the template cache", exc_info=True)
+            return
+
+        temp_path = None
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+
+            # Written to a temporary file and then renamed, so other processes never read a partial file
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-", suffix=".json")
+            with os.fdopen(fd, "w") as fp:
+                fp.write(data)
+            os.rename(temp_path, os.path.join(self.cache_dir, key + ".json"))
+            temp_path = None
+        except (IOError, OSError):
+            LOG.debug("Failed to write processed template to %s", self.cache_dir, exc_info=True)
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def _key(template_dict, parameter_overrides):
+        """
+        Key of the processed template. Processed templates depend on the template, the parameter values and the code
+        that processes them
+
+        Returns
+        -------
+        str
+            Hex digest identifying the processed template
+        """
+        data = json.dumps([template_dict, parameter_overrides or {}, samcli.__version__, samtranslator.__version__],
+                          sort_keys=True, default=str)
+
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
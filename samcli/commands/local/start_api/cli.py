@@ -14,6 +14,7 @@ from samcli.commands.local.lib.local_api_service import LocalApiService
 from samcli.commands.validate.lib.exceptions import InvalidSamDocumentException
 from samcli.commands.local.lib.exceptions import OverridesNotWellDefinedError
 from samcli.local.docker.lambda_container import DebuggingNotSupported
+from samcli.local.services.http_server import PooledWSGIServer
 
 LOG = logging.getLogger(__name__)
 
@@ -39,27 +40,37 @@ and point SAM to the directory or file containing build artifacts.
               default="public",
               help="Any static assets (e.g. CSS/Javascript/HTML) files located in this directory "
                    "will be presented at /")
+@click.option("--watch-template",
+              is_flag=True,
+              help="Watch the AWS SAM template for changes, and reload the APIs and functions that changed without "
+                   "restarting. Functions that did not change keep their warm containers.")
 @invoke_common_options
 @cli_framework_options
 @aws_creds_options  # pylint: disable=R0914
 @pass_context
 def cli(ctx,
         # start-api Specific Options
-        host, port, static_dir,
+        host, port, warm_containers, warm_container_ttl, max_warm_containers, prewarm_containers, max_workers,
+        max_queued_requests, max_concurrent_invokes, max_queued_invokes, static_dir, watch_template,
 
         # Common Options for Lambda Invoke
         template, env_vars, debug_port, debug_args, debugger_path, docker_volume_basedir,
-        docker_network, log_file, layer_cache_basedir, skip_pull_image, force_image_build, parameter_overrides):
+        docker_network, log_file, layer_cache_basedir, template_cache_dir, code_cache_basedir, code_cache_max_size,
+        skip_pull_image, force_image_build, parameter_overrides):
     # All logic must be implemented in the ``do_cli`` method. This helps with easy unit testing
 
-    do_cli(ctx, host, port, static_dir, template, env_vars, debug_port, debug_args, debugger_path,
-           docker_volume_basedir, docker_network, log_file, layer_cache_basedir, skip_pull_image, force_image_build,
-           parameter_overrides)  # pragma: no cover
+    do_cli(ctx, host, port, warm_containers, warm_container_ttl, max_warm_containers, prewarm_containers, max_workers,
+           max_queued_requests, max_concurrent_invokes, max_queued_invokes, static_dir, watch_template, template,
+           env_vars, debug_port, debug_args, debugger_path, docker_volume_basedir, docker_network, log_file,
+           layer_cache_basedir, template_cache_dir, code_cache_basedir, code_cache_max_size, skip_pull_image,
+           force_image_build, parameter_overrides)  # pragma: no cover
 
 
-def do_cli(ctx, host, port, static_dir, template, env_vars, debug_port, debug_args,  # pylint: disable=R0914
-           debugger_path, docker_volume_basedir, docker_network, log_file, layer_cache_basedir, skip_pull_image,
-           force_image_build, parameter_overrides):
+def do_cli(ctx, host, port, warm_containers, warm_container_ttl, max_warm_containers,  # pylint: disable=R0914
+           prewarm_containers, max_workers, max_queued_requests, max_concurrent_invokes, max_queued_invokes,
+           static_dir, watch_template, template, env_vars, debug_port, debug_args, debugger_path,
+           docker_volume_basedir, docker_network, log_file, layer_cache_basedir, template_cache_dir,
+           code_cache_basedir, code_cache_max_size, skip_pull_image, force_image_build, parameter_overrides):
     """
     Implementation of the ``cli`` method, just separated out for unit testing purposes
     """
@@ -82,13 +93,26 @@ def do_cli(ctx, host, port, static_dir, template, env_vars, debug_port, debug_ar
                            debugger_path=debugger_path,
                            parameter_overrides=parameter_overrides,
                            layer_cache_basedir=layer_cache_basedir,
+                           template_cache_dir=template_cache_dir,
+                           code_cache_basedir=code_cache_basedir,
+                           code_cache_max_size=code_cache_max_size,
                            force_image_build=force_image_build,
-                           aws_region=ctx.region) as invoke_context:
+                           aws_region=ctx.region,
+                           warm_containers=warm_containers,
+                           warm_container_ttl=warm_container_ttl,
+                           max_warm_containers=max_warm_containers,
+                           prewarm_containers=prewarm_containers,
+                           max_concurrent_invokes=max_concurrent_invokes,
+                           max_queued_invokes=max_queued_invokes,
+                           max_parallel_invokes=max_workers or PooledWSGIServer.DEFAULT_MAX_WORKERS) as invoke_context:
 
             service = LocalApiService(lambda_invoke_context=invoke_context,
                                       port=port,
                                       host=host,
-                                      static_dir=static_dir)
+                                      static_dir=static_dir,
+                                      max_workers=max_workers,
+                                      max_queued_requests=max_queued_requests,
+                                      watch_template=watch_template)
             service.start()
 
     except NoApisDefined:
@@ -14,6 +14,8 @@ from samcli.commands.local.lib.local_lambda_service import LocalLambdaService
 from samcli.commands.validate.lib.exceptions import InvalidSamDocumentException
 from samcli.commands.local.lib.exceptions import OverridesNotWellDefinedError
 from samcli.local.docker.lambda_container import DebuggingNotSupported
+from samcli.local.lambda_service.event_invoke_queue import EventInvokeQueue
+from samcli.local.services.http_server import PooledWSGIServer
 
 
 LOG = logging.getLogger(__name__)
@@ -47,6 +49,10 @@ Here is a Python example:
                                                 read_timeout=0,
                                                 retries={'max_attempts': 0}))
     self.lambda_client.invoke(FunctionName="HelloWorldFunction")
+\n
+\b
+Invokes with InvocationType 'Event' are queued and return right away, like asynchronous invokes in AWS Lambda.
+They are run in the background and retried when they fail.
 """
 
 
@@ -54,34 +60,50 @@ Here is a Python example:
                help=HELP_TEXT,
                short_help="Starts a local endpoint you can use to invoke your local Lambda functions.")
 @service_common_options(3001)
+@click.option("--event-workers",
+              type=int,
+              help="Number of asynchronous invokes (InvocationType 'Event') run at the same time (default: 4).")
+@click.option("--event-retries",
+              type=int,
+              help="Number of times an asynchronous invoke that fails is retried, with a growing delay between "
+                   "retries (default: 2).")
 @invoke_common_options
 @cli_framework_options
 @aws_creds_options
 @pass_context
 def cli(ctx,  # pylint: disable=R0914
         # start-lambda Specific Options
-        host, port,
+        host, port, warm_containers, warm_container_ttl, max_warm_containers, prewarm_containers, max_workers,
+        max_queued_requests, max_concurrent_invokes, max_queued_invokes, event_workers, event_retries,
 
         # Common Options for Lambda Invoke
         template, env_vars, debug_port, debug_args, debugger_path, docker_volume_basedir,
-        docker_network, log_file, layer_cache_basedir, skip_pull_image, force_image_build,
-        parameter_overrides):  # pylint: disable=R0914
+        docker_network, log_file, layer_cache_basedir, template_cache_dir, code_cache_basedir, code_cache_max_size,
+        skip_pull_image, force_image_build, parameter_overrides):  # pylint: disable=R0914
     # All logic must be implemented in the ``do_cli`` method. This helps with easy unit testing
 
-    do_cli(ctx, host, port, template, env_vars, debug_port, debug_args, debugger_path, docker_volume_basedir,
-           docker_network, log_file, layer_cache_basedir, skip_pull_image, force_image_build,
-           parameter_overrides)  # pragma: no cover
+    do_cli(ctx, host, port, warm_containers, warm_container_ttl, max_warm_containers, prewarm_containers, max_workers,
+           max_queued_requests, max_concurrent_invokes, max_queued_invokes, event_workers, event_retries, template,
+           env_vars, debug_port, debug_args, debugger_path, docker_volume_basedir, docker_network, log_file,
+           layer_cache_basedir, template_cache_dir, code_cache_basedir, code_cache_max_size, skip_pull_image,
+           force_image_build, parameter_overrides)  # pragma: no cover
 
 
-def do_cli(ctx, host, port, template, env_vars, debug_port, debug_args,  # pylint: disable=R0914
-           debugger_path, docker_volume_basedir, docker_network, log_file, layer_cache_basedir, skip_pull_image,
-           force_image_build, parameter_overrides):
+def do_cli(ctx, host, port, warm_containers, warm_container_ttl, max_warm_containers,  # pylint: disable=R0914
+           prewarm_containers, max_workers, max_queued_requests, max_concurrent_invokes, max_queued_invokes,
+           event_workers, event_retries, template, env_vars, debug_port, debug_args, debugger_path,
+           docker_volume_basedir, docker_network, log_file, layer_cache_basedir, template_cache_dir,
+           code_cache_basedir, code_cache_max_size, skip_pull_image, force_image_build, parameter_overrides):
     """
     Implementation of the ``cli`` method, just separated out for unit testing purposes
     """
 
     LOG.debug("local start_lambda command is called")
 
+    # Requests and Event invokes are served by separate workers
+    max_parallel_invokes = (max_workers or PooledWSGIServer.DEFAULT_MAX_WORKERS) + \
+        (event_workers or EventInvokeQueue.DEFAULT_WORKERS)
+
     # Pass all inputs to setup necessary context to invoke function locally.
     # Handler exception raised by the processor for invalid args and print errors
 
@@ -98,12 +120,26 @@ def do_cli(ctx, host, port, template, env_vars, debug_port, debug_args,  # pylin
                            debugger_path=debugger_path,
                            parameter_overrides=parameter_overrides,
                            layer_cache_basedir=layer_cache_basedir,
+                           template_cache_dir=template_cache_dir,
+                           code_cache_basedir=code_cache_basedir,
+                           code_cache_max_size=code_cache_max_size,
                            force_image_build=force_image_build,
-                           aws_region=ctx.region) as invoke_context:
+                           aws_region=ctx.region,
+                           warm_containers=warm_containers,
+                           warm_container_ttl=warm_container_ttl,
+                           max_warm_containers=max_warm_containers,
+                           prewarm_containers=prewarm_containers,
+                           max_concurrent_invokes=max_concurrent_invokes,
+                           max_queued_invokes=max_queued_invokes,
+                           max_parallel_invokes=max_parallel_invokes) as invoke_context:
 
             service = LocalLambdaService(lambda_invoke_context=invoke_context,
                                          port=port,
-                                         host=host)
+                                         host=host,
+                                         max_workers=max_workers,
+                                         max_queued_requests=max_queued_requests,
+                                         event_workers=event_workers,
+                                         event_retries=event_retries)
             service.start()
 
     except (InvalidSamDocumentException,
@@ -0,0 +1,112 @@
+"""
+Watches a file for changes to its content
+"""
+
+import os
+import logging
+import threading
+
+from samcli.lib.utils.hash import file_checksum
+
+LOG = logging.getLogger(__name__)
+
+
+class FileWatcher(object):
+    """
+    Calls a function when the content of a file changes. The file is polled on a background thread. Its checksum is
+    only calculated when its modification time or size changed, and the function is only called when the checksum
+    changed, so saving the file without changes doesn't call it.
+    """
+
+    DEFAULT_INTERVAL = 1
+
+    def __init__(self, path, on_change, interval=DEFAULT_INTERVAL):
+        """
+        Parameters
+        ----------
+        path str
+            Path to the file to watch
+        on_change
+            Function that is called, without arguments, after the content of the file changed. It is called on the
+            thread of the watcher, so the file is not polled while it runs
+        interval float
+            Optional. Number of seconds between polls of the file. Defaults to 1
+        """
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+
+        self._stat = None
+        self._checksum = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts watching the file. Changes made to the file before this is called are not reported
+        """
+        self._stat = self._get_stat()
+        self._checksum = self._get_checksum()
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run)
+        # Daemon thread, so the watcher doesn't prevent the process from exiting
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops watching the file. A change that is being reported is still reported
+        """
+        self._stopped.set()
+
+    def check(self):
+        """
+        Checks the file for changes once, and calls the function if its content changed
+
+        Returns
+        -------
+        bool
+            True, if the content of the file changed
+        """
+        stat = self._get_stat()
+        if stat == self._stat:
+            return False
+        self._stat = stat
+
+        checksum = self._get_checksum()
+        if checksum == self._checksum:
+            return False
+        self._checksum = checksum
+
+        if checksum is None:
+            # Editors often replace the file with a new one. The new file is reported once it exists
+            LOG.debug("%s was removed", self.path)
+            return False
+
+        LOG.debug("%s changed", self.path)
+
+        try:
+            self.on_change()
+        except Exception:  # pylint: disable=broad-except
+            LOG.warning("Failed to handle a change to %s", self.path, exc_info=True)
+
+        return True
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def _get_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+
+        return stat.st_mtime, stat.st_size
+
+    def _get_checksum(self):
+        try:
+            return file_checksum(self.path)
+        except (IOError, OSError):
+            return None
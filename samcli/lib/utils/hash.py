@@ -0,0 +1,79 @@
+"""
+Hash calculation utilities for files and directories
+"""
+
+import os
+import hashlib
+
+_BLOCK_SIZE = 1024 * 1024
+
+
+def file_checksum(file_name):
+    """
+    Calculates the SHA256 digest of the content of a file
+
+    Parameters
+    ----------
+    file_name str
+        Path to the file
+
+    Returns
+    -------
+    str
+        Hex digest of the content
+    """
+    sha256 = hashlib.sha256()
+    with open(file_name, "rb") as file_handle:
+        for block in iter(lambda: file_handle.read(_BLOCK_SIZE), b""):
+            sha256.update(block)
+
+    return sha256.hexdigest()
+
+
+def dir_checksum(directory, file_checksums=None):
+    """
+    Calculates a digest of a file tree: the relative path, executable bit and content of every file, and the target
+    of every symbolic link within the directory. The digest only changes when the content of the tree changes, no
+    matter when or where the tree was copied.
+
+    Parameters
+    ----------
+    directory str
+        Path to the directory
+    file_checksums dict
+        Optional. Digests of files computed earlier, keyed by the path, size and modification time of the file. Files
+        that did not change since are not read again. New digests are added to it
+
+    Returns
+    -------
+    str
+        Hex digest of the tree
+    """
+    if file_checksums is None:
+        file_checksums = {}
+
+    sha256 = hashlib.sha256()
+
+    for root, dirs, files in os.walk(directory):
+        # Walk in a stable order, so the digest does not depend on the order the file system lists entries in
+        dirs.sort()
+
+        for name in sorted(files + [d for d in dirs if os.path.islink(os.path.join(root, d))]):
+            path = os.path.join(root, name)
+            relative_path = os.path.relpath(path, directory).replace(os.path.sep, "/")
+
+            if os.path.islink(path):
+                entry = "link:{}:{}".format(relative_path, os.readlink(path))
+            else:
+                stat = os.stat(path)
+                key = (path, stat.st_size, stat.st_mtime)
+                if key not in file_checksums:
+                    file_checksums[key] = file_checksum(path)
+
+                is_executable = bool(stat.st_mode & 0o111)
+                entry = "file:{}:{}:{}".format(relative_path, is_executable, file_checksums[key])
+
+            sha256.update(entry.encode("utf-8"))
+            sha256.update(b"\0")
+
+    return sha256.hexdigest()
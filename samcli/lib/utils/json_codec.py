@@ -0,0 +1,128 @@
+"""
+JSON encoding and decoding of the events and responses of local invokes. An accelerated JSON library is used when one
+is installed, and the json module of the standard library otherwise.
+"""
+
+import json
+import logging
+from collections import OrderedDict
+
+LOG = logging.getLogger(__name__)
+
+
+def _orjson_codec():
+    import orjson  # pylint: disable=import-error
+
+    def dumps(obj):
+        # orjson encodes to bytes
+        return orjson.dumps(obj).decode('utf-8')
+
+    return orjson.loads, dumps
+
+
+def _ujson_codec():
+    import ujson  # pylint: disable=import-error
+
+    def dumps(obj):
+        # Escapes the same characters as the json module
+        return ujson.dumps(obj, escape_forward_slashes=False)
+
+    return ujson.loads, dumps
+
+
+def _json_codec():
+    return json.loads, json.dumps
+
+
+# Factories of the codecs by name, in order of preference. A factory returns the ``loads`` and ``dumps`` functions of
+# the codec, and raises ImportError if the library of the codec is not installed. Each ``loads`` raises a ValueError
+# for data that is not valid JSON, and each ``dumps`` returns a string.
+CODECS = OrderedDict([
+    ("orjson", _orjson_codec),
+    ("ujson", _ujson_codec),
+    ("json", _json_codec),
+])
+
+_loads = json.loads
+_dumps = json.dumps
+
+
+def use_codec(name=None):
+    """
+    Sets the codec used by ``loads`` and ``dumps``
+
+    Parameters
+    ----------
+    name str
+        Optional. Name of the codec in ``CODECS``. Defaults to the first codec whose library is installed
+
+    Returns
+    -------
+    str
+        Name of the codec that is used
+
+    Raises
+    ------
+    KeyError
+        When there is no codec with the name
+    ImportError
+        When the library of the codec is not installed
+    """
+    global _loads, _dumps  # pylint: disable=global-statement
+
+    if name is not None:
+        _loads, _dumps = CODECS[name]()
+        return name
+
+    for codec_name, codec in CODECS.items():
+        try:
+            _loads, _dumps = codec()
+        except ImportError:
+            continue
+
+        LOG.debug("Using %s to encode and decode JSON", codec_name)
+        return codec_name
+
+    # Not reached, since the json module is always installed
+    raise ImportError("No JSON library is installed")
+
+
+def loads(data):
+    """
+    Decodes a JSON document
+
+    Parameters
+    ----------
+    data str or bytes
+        UTF-8 encoded JSON document
+
+    Returns
+    -------
+    Decoded object
+
+    Raises
+    ------
+    ValueError
+        When the data is not valid JSON
+    """
+    return _loads(data)
+
+
+def dumps(obj):
+    """
+    Encodes an object as a JSON document
+
+    Parameters
+    ----------
+    obj
+        Object made of dicts, lists, strings, numbers, booleans and None
+
+    Returns
+    -------
+    str
+        JSON document
+    """
+    return _dumps(obj)
+
+
+use_codec()
@@ -40,6 +40,31 @@ def mkdir_temp(mode=0o755):
             shutil.rmtree(temp_dir)
 
 
+def dir_size(path):
+    """
+    Total size of the files within the directory and its sub-directories. Symbolic links are not followed.
+
+    Parameters
+    ----------
+    path : str
+        Path to the directory
+
+    Returns
+    -------
+    int
+        Size in bytes
+    """
+
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            if not os.path.islink(file_path):
+                size += os.path.getsize(file_path)
+
+    return size
+
+
 def stdout():
     """
     Returns the stdout as a byte stream in a Py2/PY3 compatible manner
@@ -0,0 +1,97 @@
+"""
+Runs functions after a delay, on one background thread
+"""
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+
+LOG = logging.getLogger(__name__)
+
+
+class ScheduledCall(object):
+    """
+    A function scheduled to run later. Cancel it to prevent it from running.
+    """
+
+    def __init__(self, due, func, args):
+        self.due = due
+        self.func = func
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Prevents the function from running, if it did not run yet
+        """
+        self.cancelled = True
+
+
+class Scheduler(object):
+    """
+    Runs functions after a delay. Unlike ``threading.Timer``, which starts a thread for every function, every function
+    runs on the same background thread, so they must return quickly. The thread is started on first use.
+
+    This is thread-safe.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._calls = []
+        # Breaks ties between calls that are due at the same time, so the calls themselves are never compared
+        self._sequence = itertools.count()
+        self._thread = None
+
+    def call_later(self, delay, func, *args):
+        """
+        Runs ``func(*args)`` after the given delay
+
+        Parameters
+        ----------
+        delay float
+            Number of seconds to wait before running the function
+        func
+            Function to run
+        args
+            Positional arguments passed to the function
+
+        Returns
+        -------
+        ScheduledCall
+            The scheduled call, which can be cancelled
+        """
+        call = ScheduledCall(time.time() + delay, func, args)
+
+        with self._condition:
+            heapq.heappush(self._calls, (call.due, next(self._sequence), call))
+            self._start_thread()
+            self._condition.notify()
+
+        return call
+
+    def _start_thread(self):
+        if self._thread:
+            return
+
+        self._thread = threading.Thread(target=self._run)
+        # Daemon thread, so pending calls don't prevent the process from exiting
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._calls or self._calls[0][0] > time.time():
+                    self._condition.wait(self._calls[0][0] - time.time() if self._calls else None)
+
+                _, _, call = heapq.heappop(self._calls)
+
+            if call.cancelled:
+                continue
+
+            try:
+                call.func(*call.args)
+            except Exception:  # pylint: disable=broad-except
+                LOG.debug("Scheduled call failed", exc_info=True)
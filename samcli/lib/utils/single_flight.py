@@ -0,0 +1,92 @@
+"""
+Collapses concurrent calls that do the same work into one
+"""
+
+import threading
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Runs a function at most once at a time for each key. Callers that ask for a key while a call for it is in progress
+    wait for that call and get its result, or its exception, instead of running the function again. Once the call
+    completes, the next caller with the same key runs the function again.
+
+    This is thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Runs ``func(*args, **kwargs)``, unless a call with the same key is already in progress, in which case this waits
+        for that call to complete.
+
+        Parameters
+        ----------
+        key
+            Identifies the work done by the function. Must be hashable
+        func
+            Function to run
+        args
+            Positional arguments passed to the function
+        kwargs
+            Keyword arguments passed to the function
+
+        Returns
+        -------
+        Value returned by the function
+
+        Raises
+        ------
+        Exception raised by the function
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def is_running(self, key):
+        """
+        Is a call with the given key in progress?
+
+        Parameters
+        ----------
+        key
+            Key of the call
+
+        Returns
+        -------
+        bool
+            True, if a call is in progress
+        """
+        with self._lock:
+            return key in self._calls
@@ -3,9 +3,18 @@ Tarball Archive utility
 """
 
 import tarfile
+import threading
 from tempfile import TemporaryFile
 from contextlib import contextmanager
 
+from six.moves import queue
+
+# Size of the chunks a streamed tarball is produced in
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Number of chunks buffered while the consumer of a streamed tarball is busy
+_STREAM_BUFFERED_CHUNKS = 8
+
 
 @contextmanager
 def create_tarball(tar_paths):
@@ -35,3 +44,102 @@ def create_tarball(tar_paths):
         yield tarballfile
     finally:
         tarballfile.close()
+
+
+@contextmanager
+def stream_tarball(tar_paths, compress=False):
+    """
+    Context Manager that produces the tarball of the Docker Context while it is consumed, instead of writing it to a
+    file first. The tarball is written by a background thread, at most a few chunks ahead of the consumer.
+
+    Parameters
+    ----------
+    tar_paths dict(str, str)
+        Key representing a full path to the file or directory and the Value representing the path within the tarball
+    compress bool
+        Optional. Compress the tarball with gzip. Defaults to False
+
+    Yields
+    ------
+        Generator of the chunks (bytes) of the tarball. Raises the error of the background thread, if any
+    """
+    writer = _ChunkWriter()
+
+    def write_tarball():
+        try:
+            with tarfile.open(fileobj=writer, mode='w|gz' if compress else 'w|') as archive:
+                for path_on_system, path_in_tarball in tar_paths.items():
+                    archive.add(path_on_system, arcname=path_in_tarball)
+            writer.flush()
+            writer.finish()
+        except Exception as ex:  # pylint: disable=broad-except
+            writer.finish(ex)
+
+    thread = threading.Thread(target=write_tarball)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        yield writer.chunks()
+    finally:
+        # Unblock the background thread if the consumer stopped early
+        writer.close()
+        thread.join()
+
+
+class _ChunkWriter(object):
+    """
+    File object that hands what is written to it to a consumer in chunks, through a bounded queue
+    """
+
+    _END = object()
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=_STREAM_BUFFERED_CHUNKS)
+        self._buffer = bytearray()
+        self._closed = threading.Event()
+
+    def write(self, data):
+        self._buffer.extend(data)
+        while len(self._buffer) >= STREAM_CHUNK_SIZE:
+            self._put(bytes(self._buffer[:STREAM_CHUNK_SIZE]))
+            del self._buffer[:STREAM_CHUNK_SIZE]
+
+    def flush(self):
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            del self._buffer[:]
+
+    def finish(self, error=None):
+        """
+        Signals the consumer that the tarball is complete, or failed with the given error
+        """
+        try:
+            self._put((self._END, error))
+        except IOError:
+            pass
+
+    def close(self):
+        """
+        Stops accepting writes. Called once the consumer is done
+        """
+        self._closed.set()
+
+    def chunks(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, tuple) and item[0] is self._END:
+                if item[1] is not None:
+                    raise item[1]
+                return
+            yield item
+
+    def _put(self, item):
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+        raise IOError("Consumer of the tarball stopped reading")
@@ -1,14 +1,14 @@
 """API Gateway Local Service"""
-import io
-import json
 import logging
 import base64
 
 from flask import Flask, request
+from werkzeug.routing import Map
 
-from samcli.local.services.base_local_service import BaseLocalService, LambdaOutputParser, CaseInsensitiveDict
-from samcli.local.lambdafn.exceptions import FunctionNotFound
-from samcli.local.events.api_event import ContextIdentity, RequestContext, ApiGatewayLambdaEvent
+from samcli.lib.utils import json_codec
+from samcli.local.services.base_local_service import BaseLocalService, LambdaOutputStream, CaseInsensitiveDict
+from samcli.local.lambdafn.exceptions import FunctionNotFound, ConcurrencyLimitExceeded
+from samcli.local.events.api_event import ApiGatewayLambdaEventSkeleton
 from .service_error_responses import ServiceErrorResponses
 from .path_converter import PathConverter
 
@@ -36,7 +36,8 @@ class LocalApigwService(BaseLocalService):
     _DEFAULT_PORT = 3000
     _DEFAULT_HOST = '127.0.0.1'
 
-    def __init__(self, routing_list, lambda_runner, static_dir=None, port=None, host=None, stderr=None):
+    def __init__(self, routing_list, lambda_runner, static_dir=None, port=None, host=None, stderr=None,
+                 max_workers=None, max_queued_requests=None):
         """
         Creates an ApiGatewayService
 
@@ -50,12 +51,19 @@ class LocalApigwService(BaseLocalService):
         :param str host: Optional. host to start the service on
           Defaults to '127.0.0.1
         :param io.BaseIO stderr: Optional stream where the stderr from Docker container should be written to
+        :param int max_workers: Optional. Number of requests served at the same time
+        :param int max_queued_requests: Optional. Number of requests that can wait to be served
         """
-        super(LocalApigwService, self).__init__(lambda_runner.is_debugging(), port=port, host=host)
+        super(LocalApigwService, self).__init__(lambda_runner.is_debugging(), port=port, host=host,
+                                                max_workers=max_workers, max_queued_requests=max_queued_requests)
         self.routing_list = routing_list
         self.lambda_runner = lambda_runner
         self.static_dir = static_dir
+        # Built once in ``create``, so requests find their route with a single dictionary lookup. Routes are keyed by
+        # Flask endpoint and method
         self._dict_of_routes = {}
+        # Skeletons of the events of the routes, by API Gateway path of the route
+        self._event_skeletons = {}
         self.stderr = stderr
 
     def create(self):
@@ -68,12 +76,10 @@ class LocalApigwService(BaseLocalService):
                           static_folder=self.static_dir  # Serve static files from this directory
                           )
 
+        self._dict_of_routes, self._event_skeletons = self._index_routes(self.routing_list)
+
         for api_gateway_route in self.routing_list:
             path = PathConverter.convert_path_to_flask(api_gateway_route.path)
-            for route_key in self._generate_route_keys(api_gateway_route.methods,
-                                                       path):
-                self._dict_of_routes[route_key] = api_gateway_route
-
             self._app.add_url_rule(path,
                                    endpoint=path,
                                    view_func=self._request_handler,
@@ -82,6 +88,75 @@ class LocalApigwService(BaseLocalService):
 
         self._construct_error_handling()
 
+    def update_routes(self, routing_list):
+        """
+        Replaces the routes of the service, while it is running. The URL map of the Flask app is rebuilt with the
+        new routes and replaced in one assignment, so every request is matched against either the previous routes
+        or the new ones. Skeletons of the events of the routes whose path did not change are kept.
+
+        :param list(Route) routing_list: Routes of the service
+        """
+        dict_of_routes, event_skeletons = self._index_routes(routing_list)
+
+        url_map = Map()
+        url_map.host_matching = self._app.url_map.host_matching
+
+        # Rules that are not routes, like the rule of the static files, are kept
+        for rule in self._app.url_map.iter_rules():
+            if self._app.view_functions.get(rule.endpoint) != self._request_handler:
+                unbound_rule = rule.empty()
+                unbound_rule.provide_automatic_options = getattr(rule, "provide_automatic_options", False)
+                url_map.add(unbound_rule)
+
+        for api_gateway_route in routing_list:
+            path = PathConverter.convert_path_to_flask(api_gateway_route.path)
+            rule = self._app.url_rule_class(path, endpoint=path, methods=api_gateway_route.methods)
+            rule.provide_automatic_options = False
+            url_map.add(rule)
+            self._app.view_functions[path] = self._request_handler
+
+        # Sorts the rules now, instead of on the first request
+        url_map.update()
+
+        # Requests that were matched against the previous URL map must still find their route, until the new URL map
+        # is in place
+        previous_routes = dict(self._dict_of_routes)
+        previous_routes.update(dict_of_routes)
+        previous_skeletons = dict(self._event_skeletons)
+        previous_skeletons.update(event_skeletons)
+        self._dict_of_routes = previous_routes
+        self._event_skeletons = previous_skeletons
+
+        self._app.url_map = url_map
+
+        self._dict_of_routes = dict_of_routes
+        self._event_skeletons = event_skeletons
+        self.routing_list = routing_list
+
+    def _index_routes(self, routing_list):
+        """
+        Indexes the routes by Flask endpoint and method, and creates the skeletons of the events of the routes
+
+        :param list(Route) routing_list: Routes of the service
+        :return: Tuple of the routes by endpoint and method, and the event skeletons by API Gateway path
+        """
+        dict_of_routes = {}
+        event_skeletons = {}
+
+        for api_gateway_route in routing_list:
+            path = PathConverter.convert_path_to_flask(api_gateway_route.path)
+            for route_key in self._generate_route_keys(api_gateway_route.methods,
+                                                       path):
+                dict_of_routes[route_key] = api_gateway_route
+
+            # Skeletons only depend on the path, so the skeletons of the current routes can be reused
+            event_skeleton = self._event_skeletons.get(api_gateway_route.path)
+            if event_skeleton is None:
+                event_skeleton = ApiGatewayLambdaEventSkeleton(api_gateway_route.path, stage="prod")
+            event_skeletons[api_gateway_route.path] = event_skeleton
+
+        return dict_of_routes, event_skeletons
+
     def _generate_route_keys(self, methods, path):
         """
         Generates the key to the _dict_of_routes based on the list of methods
@@ -89,14 +164,14 @@ class LocalApigwService(BaseLocalService):
 
         :param list(str) methods: List of HTTP Methods
         :param str path: Path off the base url
-        :return: str of Path:Method
+        :return: tuple of Path and Method
         """
         for method in methods:
             yield self._route_key(method, path)
 
     @staticmethod
     def _route_key(method, path):
-        return '{}:{}'.format(path, method)
+        return path, method
 
     def _construct_error_handling(self):
         """
@@ -130,22 +205,23 @@ class LocalApigwService(BaseLocalService):
         route = self._get_current_route(request)
 
         try:
-            event = self._construct_event(request, self.port, route.binary_types)
+            event = self._construct_event(request, self.port, route.binary_types,
+                                          event_skeleton=self._event_skeletons.get(route.path))
         except UnicodeDecodeError:
             return ServiceErrorResponses.lambda_failure_response()
 
-        stdout_stream = io.BytesIO()
+        # Log statements of the function are written to stderr as they arrive
+        stdout_stream = LambdaOutputStream(log_stream=self.stderr)
 
         try:
             self.lambda_runner.invoke(route.function_name, event, stdout=stdout_stream, stderr=self.stderr)
         except FunctionNotFound:
             return ServiceErrorResponses.lambda_not_found_response()
+        except ConcurrencyLimitExceeded:
+            return ServiceErrorResponses.lambda_throttled_response()
 
-        lambda_response, lambda_logs, _ = LambdaOutputParser.get_lambda_output(stdout_stream)
-
-        if self.stderr and lambda_logs:
-            # Write the logs to stderr if available.
-            self.stderr.write(lambda_logs)
+        # Errors of the function are not checked here, so the response is only parsed by _parse_lambda_output
+        lambda_response = stdout_stream.get_lambda_response()
 
         try:
             (status_code, headers, body) = self._parse_lambda_output(lambda_response,
@@ -188,7 +264,7 @@ class LocalApigwService(BaseLocalService):
         :param str lambda_output: Output from Lambda Invoke
         :return: Tuple(int, dict, str, bool)
         """
-        json_output = json.loads(lambda_output)
+        json_output = json_codec.loads(lambda_output)
 
         if not isinstance(json_output, dict):
             raise TypeError("Lambda returned %{s} instead of dict", type(json_output))
@@ -240,17 +316,20 @@ class LocalApigwService(BaseLocalService):
         return best_match_mimetype and is_best_match_in_binary_types and is_base_64_encoded
 
     @staticmethod
-    def _construct_event(flask_request, port, binary_types):
+    def _construct_event(flask_request, port, binary_types, event_skeleton=None):
         """
         Helper method that constructs the Event to be passed to Lambda
 
         :param request flask_request: Flask Request
+        :param ApiGatewayLambdaEventSkeleton event_skeleton: Optional. Skeleton of the events of the route. Defaults
+            to a skeleton for the API Gateway path converted from the endpoint of the request
         :return: String representing the event
         """
 
-        identity = ContextIdentity(source_ip=flask_request.remote_addr)
+        if event_skeleton is None:
+            event_skeleton = ApiGatewayLambdaEventSkeleton(
+                PathConverter.convert_path_to_api_gateway(flask_request.endpoint), stage="prod")
 
-        endpoint = PathConverter.convert_path_to_api_gateway(flask_request.endpoint)
         method = flask_request.method
 
         request_data = flask_request.get_data()
@@ -267,12 +346,6 @@ class LocalApigwService(BaseLocalService):
             # Flask does not parse/decode the request data. We should do it ourselves
             request_data = request_data.decode('utf-8')
 
-        context = RequestContext(resource_path=endpoint,
-                                 http_method=method,
-                                 stage="prod",
-                                 identity=identity,
-                                 path=endpoint)
-
         event_headers = dict(flask_request.headers)
         event_headers["X-Forwarded-Proto"] = flask_request.scheme
         event_headers["X-Forwarded-Port"] = str(port)
@@ -282,17 +355,15 @@ class LocalApigwService(BaseLocalService):
         # with APIGW
         query_string_dict = LocalApigwService._query_string_params(flask_request)
 
-        event = ApiGatewayLambdaEvent(http_method=method,
-                                      body=request_data,
-                                      resource=endpoint,
-                                      request_context=context,
-                                      query_string_params=query_string_dict,
-                                      headers=event_headers,
-                                      path_parameters=flask_request.view_args,
-                                      path=flask_request.path,
-                                      is_base_64_encoded=is_base_64)
-
-        event_str = json.dumps(event.to_dict())
+        # Only the fields of the request are serialized here, the rest of the event is already serialized
+        event_str = event_skeleton.to_json(http_method=method,
+                                           body=request_data,
+                                           query_string_params=query_string_dict,
+                                           headers=event_headers,
+                                           path_parameters=flask_request.view_args,
+                                           path=flask_request.path,
+                                           is_base_64_encoded=is_base_64,
+                                           source_ip=flask_request.remote_addr)
         LOG.debug("Constructed String representation of Event to invoke Lambda. Event: %s", event_str)
         return event_str
 
@@ -8,9 +8,11 @@ class ServiceErrorResponses(object):
     _NO_LAMBDA_INTEGRATION = {"message": "No function defined for resource method"}
     _MISSING_AUTHENTICATION = {"message": "Missing Authentication Token"}
     _LAMBDA_FAILURE = {"message": "Internal server error"}
+    _TOO_MANY_REQUESTS = {"message": "Too Many Requests"}
 
     HTTP_STATUS_CODE_502 = 502
     HTTP_STATUS_CODE_403 = 403
+    HTTP_STATUS_CODE_429 = 429
 
     @staticmethod
     def lambda_failure_response(*args):
@@ -32,6 +34,16 @@ class ServiceErrorResponses(object):
         response_data = jsonify(ServiceErrorResponses._NO_LAMBDA_INTEGRATION)
         return make_response(response_data, ServiceErrorResponses.HTTP_STATUS_CODE_502)
 
+    @staticmethod
+    def lambda_throttled_response(*args):
+        """
+        Constructs a Flask Response for when the Lambda function was throttled
+
+        :return: a Flask Response
+        """
+        response_data = jsonify(ServiceErrorResponses._TOO_MANY_REQUESTS)
+        return make_response(response_data, ServiceErrorResponses.HTTP_STATUS_CODE_429)
+
     @staticmethod
     def route_not_found(*args):
         """
@@ -2,13 +2,25 @@
 Wrapper to Docker Attach API
 """
 
+import errno
 import struct
 import logging
 from socket import timeout
-from docker.utils.socket import read, read_exactly, SocketError
+from docker.utils.socket import read, SocketError
 
 LOG = logging.getLogger(__name__)
 
+# Size of the blocks the stream is read in
+_READ_SIZE = 64 * 1024
+
+# Header is 8 bytes long, where the first byte is the stream type and last four bytes (bigendian) is size of the
+# payload
+#
+#   header := [8]byte{STREAM_TYPE, 0, 0, 0, SIZE1, SIZE2, SIZE3, SIZE4}
+_HEADER_SIZE = 8
+
+_RECOVERABLE_ERRORS = (errno.EINTR, errno.EDEADLK, errno.EWOULDBLOCK)
+
 
 def attach(docker_client, container, stdout=True, stderr=True, logs=False):
     """
@@ -66,6 +78,30 @@ def attach(docker_client, container, stdout=True, stderr=True, logs=False):
     return _read_socket(socket)
 
 
+def attach_exec(docker_client, exec_id):
+    """
+    Starts an exec instance created with ``docker_client.api.exec_create`` and demuxes stdout and stderr data from the
+    single data stream that Docker API returns. The stream uses the same framing as the Attach API.
+
+    Parameters
+    ----------
+    docker_client : docker.Client
+        Docker client used to talk to Docker daemon
+
+    exec_id : str
+        ID of the exec instance to start
+
+    Returns
+    -------
+    Iterator
+        Iterator that yields a tuple of the frame type and frame data. See ``_read_socket`` for details.
+    """
+
+    socket = docker_client.api.exec_start(exec_id, socket=True)
+
+    return _read_socket(socket)
+
+
 def _read_socket(socket):
     """
     The stdout and stderr data from the container multiplexed into one stream of response from the Docker API.
@@ -80,6 +116,10 @@ def _read_socket(socket):
         Stdout => Frame Type = 1
         Stderr => Frame Type = 2
 
+    The stream is read in large blocks into one reusable buffer, so a single read can return many frames. Payloads of
+    consecutive frames of the same type in a block are joined and yielded together, so a function that logs many
+    small lines doesn't cost a read and a write for each one of them. Payloads that are larger than a block are
+    yielded as they arrive.
 
     Parameters
     ----------
@@ -94,88 +134,105 @@ def _read_socket(socket):
         Data in the stream
     """
 
+    block = bytearray(_READ_SIZE)
+    view = memoryview(block)
+
+    # Number of bytes at the start of the block that were read but not parsed yet. This is always part of a header
+    filled = 0
+    # Type of the frame being read, and number of bytes of its payload that are still to be read
+    frame_type = None
+    remaining = 0
+
     # Keep reading the stream until the stream terminates
     while True:
 
         try:
-
-            payload_type, payload_size = _read_header(socket)
-            if payload_size < 0:
-                # Something is wrong with the data stream. Payload size can't be less than zero
-                break
-
-            for data in _read_payload(socket, payload_size):
-                yield payload_type, data
-
+            size = _read_into(socket, view[filled:])
         except timeout:
             # Timeouts are normal during debug sessions and long running tasks
             LOG.debug("Ignoring docker socket timeout")
-
+            continue
         except SocketError:
-            # There isn't enough data in the stream. Probably the socket terminated
             break
 
+        if size is None:
+            # This is just a transient state where we didn't get any data
+            continue
 
-def _read_payload(socket, payload_size):
-    """
-    From the given socket, reads and yields payload of the given size. With sockets, we don't receive all data at
-    once. Therefore this method will yield each time we read some data from the socket until the payload_size has
-    reached or socket has no more data.
+        if size == 0:
+            # Socket does not have any more data. We are done here even if we haven't read full payload
+            break
 
-    Parameters
-    ----------
-    socket
-        Socket to read from
+        end = filled + size
+        position = 0
 
-    payload_size : int
-        Size of the payload to read. Exactly these many bytes are read from the socket before stopping the yield.
+        # Payloads of consecutive frames of the same type
+        run_type = None
+        run = []
 
-    Yields
-    -------
-    int
-        Type of the stream (1 => stdout, 2 => stderr)
-    str
-        Data in the stream
-    """
+        while position < end:
+            if remaining == 0:
+                if end - position < _HEADER_SIZE:
+                    # Rest of the header is in the next block
+                    break
 
-    remaining = payload_size
-    while remaining > 0:
+                # >BxxxL is the struct notation to unpack data in correct header format in big-endian
+                frame_type, remaining = struct.unpack_from(">BxxxL", block, position)
+                position += _HEADER_SIZE
+                continue
 
-        # Try and read as much as possible
-        data = read(socket, remaining)
-        if data is None:
-            # ``read`` will terminate with an empty string. This is just a transient state where we didn't get any data
-            continue
+            if frame_type != run_type and run:
+                yield run_type, b"".join(run)
+                run = []
 
-        if len(data) == 0:  # pylint: disable=C1801
-            # Empty string. Socket does not have any more data. We are done here even if we haven't read full payload
-            break
+            length = min(remaining, end - position)
+            run_type = frame_type
+            run.append(view[position:position + length].tobytes())
 
-        remaining -= len(data)
-        yield data
+            position += length
+            remaining -= length
 
+        if run:
+            yield run_type, b"".join(run)
+
+        # Keep the partial header for the next block
+        filled = end - position
+        block[:filled] = block[position:end]
 
-def _read_header(socket):
-    """
-    Reads the header from socket stream to determine the size of next frame to read. Header is 8 bytes long, where
-    the first byte is the stream type and last four bytes (bigendian) is size of the payload
 
-        header := [8]byte{STREAM_TYPE, 0, 0, 0, SIZE1, SIZE2, SIZE3, SIZE4}
+def _read_into(socket, view):
+    """
+    Reads at most as many bytes as fit in the view, from the given socket, into the view
 
     Parameters
     ----------
     socket
-        Socket to read the responses from
+        Socket to read from
+
+    view : memoryview
+        Where to read the data into
 
     Returns
     -------
     int
-        Type of the frame
-    int
-        Size of the payload
+        Number of bytes read. 0, when the socket has no more data. None, when no data could be read right now
     """
 
-    data = read_exactly(socket, 8)
+    try:
+        if hasattr(socket, "recv_into"):
+            return socket.recv_into(view)
+
+        if hasattr(socket, "readinto"):
+            return socket.readinto(view)
 
-    # >BxxxL is the struct notation to unpack data in correct header format in big-endian
-    return struct.unpack('>BxxxL', data)
+        # Sockets that can't read into a buffer
+        data = read(socket, len(view))
+        if data is None:
+            return None
+        view[:len(data)] = data
+        return len(data)
+
+    except EnvironmentError as ex:
+        if ex.errno not in _RECOVERABLE_ERRORS:
+            raise
+        return None
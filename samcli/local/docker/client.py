@@ -0,0 +1,75 @@
+"""
+Docker client shared by everything that talks to Docker in this process
+"""
+
+import logging
+import threading
+
+import docker
+
+LOG = logging.getLogger(__name__)
+
+# Maximum number of connections to the Docker daemon that are kept open for reuse
+DEFAULT_MAX_POOL_SIZE = 10
+
+_lock = threading.Lock()
+_client = None
+_settings = {
+    "max_pool_size": DEFAULT_MAX_POOL_SIZE,
+    "keep_alive": True
+}
+
+
+def configure_docker_client(max_pool_size=DEFAULT_MAX_POOL_SIZE, keep_alive=True):
+    """
+    Configures the shared Docker client. Clients returned by ``get_docker_client`` after this call use the new
+    configuration. Clients returned earlier keep working with the configuration they were created with.
+
+    Parameters
+    ----------
+    max_pool_size int
+        Optional. Maximum number of connections to the Docker daemon that are kept open for reuse. Requests made while
+        all connections are in use open a new connection that is closed afterwards. Defaults to 10
+    keep_alive bool
+        Optional. Keep connections open after a request completes so later requests can reuse them. Defaults to True
+    """
+    global _client  # pylint: disable=global-statement
+
+    with _lock:
+        _settings["max_pool_size"] = max_pool_size
+        _settings["keep_alive"] = keep_alive
+        _client = None
+
+
+def get_docker_client():
+    """
+    Returns the Docker client shared by the whole process, creating it the first time. The client is configured from
+    the environment, the same way as the Docker CLI. It is thread-safe and keeps a pool of connections to the Docker
+    daemon, so use this instead of creating new clients.
+
+    Returns
+    -------
+    docker.DockerClient
+        Shared Docker client
+    """
+    global _client  # pylint: disable=global-statement
+
+    with _lock:
+        if _client is None:
+            _client = _create_client(_settings["max_pool_size"], _settings["keep_alive"])
+
+        return _client
+
+
+def _create_client(max_pool_size, keep_alive):
+    try:
+        client = docker.from_env(max_pool_size=max_pool_size)
+    except TypeError:
+        # Older versions of the Docker SDK don't support configuring the size of the pool
+        LOG.debug("Docker SDK does not support configuring the connection pool size. Using its default pool size")
+        client = docker.from_env()
+
+    if not keep_alive:
+        client.api.headers["Connection"] = "close"
+
+    return client
@@ -8,7 +8,8 @@ import tempfile
 
 import docker
 
-from samcli.local.docker.attach_api import attach
+from samcli.local.docker.attach_api import attach, attach_exec
+from samcli.local.docker.client import get_docker_client
 from .utils import to_posix_path
 
 LOG = logging.getLogger(__name__)
@@ -66,8 +67,8 @@ class Container(object):
         self._container_opts = container_opts
         self._additional_volumes = additional_volumes
 
-        # Use the given Docker client or create new one
-        self.docker_client = docker_client or docker.from_env()
+        # Use the given Docker client or the shared one
+        self.docker_client = docker_client or get_docker_client()
 
         # Runtime properties of the container. They won't have value until container is created or started
         self.id = None
@@ -205,6 +206,33 @@ class Container(object):
 
         self._write_container_output(logs_itr, stdout=stdout, stderr=stderr)
 
+    def execute(self, cmd, env_vars=None, stdout=None, stderr=None):
+        """
+        Runs the given command inside this running container and blocks until the command completes. Output of the
+        command is written to the given streams.
+
+        :param list cmd: Command to run
+        :param dict env_vars: Optional. Dict of environment variables to set for this command only
+        :param io.BaseIO stdout: Optional. Stream that receives stdout of the command
+        :param io.BaseIO stderr: Optional. Stream that receives stderr of the command
+        :raise RuntimeError: If the container does not exist
+        """
+
+        if not self.is_created():
+            raise RuntimeError("Container does not exist. Cannot run a command in this container")
+
+        LOG.debug("Running %s in container %s", cmd, self.id)
+        exec_id = self.docker_client.api.exec_create(self.id,
+                                                     cmd,
+                                                     stdout=True,
+                                                     stderr=True,
+                                                     environment=env_vars)
+
+        # Always read through the whole stream, even when output is not requested. The command runs until the
+        # stream ends.
+        output_itr = attach_exec(self.docker_client, exec_id)
+        self._write_container_output(output_itr, stdout=stdout, stderr=stderr)
+
     def copy(self, from_container_path, to_host_path):
 
         if not self.is_created():
@@ -282,6 +310,16 @@ class Container(object):
         """
         return self._image
 
+    @property
+    def pool_key(self):
+        """
+        Key that identifies containers which are interchangeable with this one. A warm container can be reused in place
+        of any other container with the same key.
+
+        :return tuple: Key of this container
+        """
+        return self._image, self._working_dir, self._host_dir, self._memory_limit_mb
+
     def is_created(self):
         """
         Checks if a container exists?
@@ -289,3 +327,19 @@ class Container(object):
         :return bool: True if the container was created
         """
         return self.id is not None
+
+    def is_running(self):
+        """
+        Checks if the container exists and is running
+
+        :return bool: True if the container is running
+        """
+        if not self.is_created():
+            return False
+
+        try:
+            real_container = self.docker_client.containers.get(self.id)
+        except docker.errors.NotFound:
+            return False
+
+        return real_container.status == "running"
@@ -0,0 +1,253 @@
+"""
+Keeps track of warm containers that can be reused across invocations
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+LOG = logging.getLogger(__name__)
+
+
+class ContainerPool(object):
+    """
+    Thread-safe pool of warm containers. Each container in the pool is identified by a key (see
+    ``samcli.local.docker.container.Container.pool_key``) and is either busy serving a request or idle waiting to be
+    reused by the next request with the same key.
+
+    The pool enforces a cap on the total number of live containers and deletes containers that were idle for longer
+    than the configured timeout. Containers are never created by the pool. Instead, callers reserve a slot with
+    ``acquire``, create the container themselves and then hand it over to the pool with ``add``.
+    """
+
+    def __init__(self, max_containers=None, idle_timeout=None):
+        """
+        Initialize the pool
+
+        Parameters
+        ----------
+        max_containers int
+            Optional. Maximum number of live (busy + idle) containers. Defaults to no limit
+        idle_timeout int
+            Optional. Number of seconds a container can stay idle before it is deleted. Defaults to no timeout
+        """
+        self.max_containers = max_containers
+        self.idle_timeout = idle_timeout
+
+        # Idle containers, ordered from the least to the most recently used. Value is the time it became idle.
+        self._idle = OrderedDict()
+        self._busy = set()
+
+        # Number of slots reserved by callers that are in the middle of creating a new container
+        self._pending = 0
+
+        self._condition = threading.Condition()
+        self._reaper = None
+        self._closed = threading.Event()
+
+    def acquire(self, key):
+        """
+        Returns an idle container with the given key and marks it busy. If there isn't one, a slot is reserved for the
+        caller to create a new container and None is returned. Caller must then either ``add`` the new container or
+        ``cancel`` the reservation.
+
+        If the pool is at capacity, the least recently used idle container is evicted to make room. If every container
+        is busy, this method blocks until one is released.
+
+        Parameters
+        ----------
+        key
+            Pool key of the container
+
+        Returns
+        -------
+        samcli.local.docker.container.Container
+            Idle container with a matching key. None, if the caller should create a new container
+        """
+        evicted = None
+
+        with self._condition:
+            while True:
+                container = self._pop_idle(key)
+                if container:
+                    self._busy.add(container)
+                    return container
+
+                if not self._is_full():
+                    break
+
+                if self._idle:
+                    evicted, _ = self._idle.popitem(last=False)
+                    break
+
+                LOG.debug("All %d warm containers are busy. Waiting for one to be released", self.max_containers)
+                self._condition.wait()
+
+            self._pending += 1
+
+        if evicted:
+            LOG.debug("Evicting least recently used warm container %s to make room", evicted.id)
+            evicted.delete()
+
+        return None
+
+    def reserve(self):
+        """
+        Reserves a slot for a new container without looking for an idle one. Unlike ``acquire``, this does not evict
+        or wait when the pool is at capacity. Caller must then either ``add`` the new container or ``cancel`` the
+        reservation.
+
+        Returns
+        -------
+        bool
+            True if a slot was reserved. False if the pool is at capacity
+        """
+        with self._condition:
+            if self._is_full():
+                return False
+
+            self._pending += 1
+            return True
+
+    def add(self, container):
+        """
+        Adds a newly started container to the pool as busy, using up the slot reserved by ``acquire``
+
+        Parameters
+        ----------
+        container samcli.local.docker.container.Container
+            Container to add
+        """
+        with self._condition:
+            self._pending -= 1
+            self._busy.add(container)
+
+        self._start_reaper()
+
+    def cancel(self):
+        """
+        Gives up the slot reserved by ``acquire``. Use this when the container could not be created.
+        """
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify()
+
+    def release(self, container):
+        """
+        Marks a busy container as idle so it can be reused.
+
+        Parameters
+        ----------
+        container samcli.local.docker.container.Container
+            Container to release
+
+        Returns
+        -------
+        bool
+            True if the container was in use by the pool. False if it is not tracked by the pool
+        """
+        with self._condition:
+            if container not in self._busy:
+                return False
+
+            self._busy.remove(container)
+            self._idle[container] = time.time()
+            self._condition.notify()
+            return True
+
+    def remove(self, container):
+        """
+        Stops tracking the given container. This does *not* delete the container.
+
+        Parameters
+        ----------
+        container samcli.local.docker.container.Container
+            Container to remove
+        """
+        with self._condition:
+            self._busy.discard(container)
+            self._idle.pop(container, None)
+            self._condition.notify()
+
+    def evict_expired(self):
+        """
+        Deletes containers that have been idle longer than the idle timeout
+
+        Returns
+        -------
+        list(samcli.local.docker.container.Container)
+            List of the evicted containers
+        """
+        if not self.idle_timeout:
+            return []
+
+        expiry = time.time() - self.idle_timeout
+        with self._condition:
+            expired = [container for container, idle_since in self._idle.items() if idle_since <= expiry]
+            for container in expired:
+                del self._idle[container]
+            self._condition.notify_all()
+
+        for container in expired:
+            LOG.debug("Warm container %s was idle for more than %s seconds. Deleting it", container.id,
+                      self.idle_timeout)
+            container.delete()
+
+        return expired
+
+    def drain(self):
+        """
+        Stops the idle timeout checks and deletes every container in the pool, busy or not.
+        """
+        self._closed.set()
+
+        with self._condition:
+            containers = list(self._idle) + list(self._busy)
+            self._idle.clear()
+            self._busy.clear()
+            self._condition.notify_all()
+
+        for container in containers:
+            container.delete()
+
+    def _pop_idle(self, key):
+        """
+        Removes and returns the most recently used idle container with the given key, if any. Must be called with the
+        lock held.
+        """
+        for container in reversed(self._idle):
+            if container.pool_key == key:
+                del self._idle[container]
+                return container
+
+        return None
+
+    def _is_full(self):
+        """
+        Must be called with the lock held
+        """
+        if not self.max_containers:
+            return False
+
+        return len(self._idle) + len(self._busy) + self._pending >= self.max_containers
+
+    def _start_reaper(self):
+        """
+        Starts the background thread that evicts expired containers, if it is not already running
+        """
+        with self._condition:
+            if not self.idle_timeout or self._reaper:
+                return
+
+            self._reaper = threading.Thread(target=self._reap)
+            # Daemon thread, so this doesn't prevent the process from exiting
+            self._reaper.daemon = True
+            self._reaper.start()
+
+    def _reap(self):
+        # Check often enough that a container is not kept around much longer than its idle timeout
+        interval = min(self.idle_timeout, 10)
+
+        while not self._closed.wait(interval):
+            self.evict_expired()
@@ -1,7 +1,10 @@
 """
 Represents Lambda runtime containers.
 """
+import json
+import uuid
 import logging
+import threading
 
 from .container import Container
 from .lambda_image import Runtime
@@ -27,6 +30,23 @@ class LambdaContainer(Container):
     # This is the dictionary that represents where the debugger_path arg is mounted in docker to as readonly.
     _DEBUGGER_VOLUME_MOUNT = {"bind": _DEBUGGER_VOLUME_MOUNT_PATH, "mode": "ro"}
 
+    # Warm containers are kept running with this entry point. Every invocation then runs the runtime's own entry point
+    # within the container through ``docker exec``
+    _WARM_ENTRYPOINT = ["/bin/sh", "-c", "sleep infinity"]
+
+    # Containers with a persistent runtime loop run the function's bootstrap directly. The bootstrap pulls events from
+    # the Runtime API in a loop. Lambda looks for the bootstrap in the function code first and then in the layers.
+    _RUNTIME_API_ENTRYPOINT = ["/bin/sh", "-c",
+                               "if [ -x /var/task/bootstrap ]; then exec /var/task/bootstrap; fi; exec /opt/bootstrap"]
+
+    # Runtimes whose bootstrap speaks the Runtime API. Other runtimes read a single event from the
+    # AWS_LAMBDA_EVENT_BODY environment variable and exit.
+    RUNTIME_API_RUNTIMES = {Runtime.provided.value}
+
+    # Environment variables that are set anew on every invoke of a warm container, and hence don't tie the container
+    # to one function
+    _PER_INVOKE_ENV_VARS = {"AWS_LAMBDA_EVENT_BODY"}
+
     def __init__(self,  # pylint: disable=R0914
                  runtime,
                  handler,
@@ -35,7 +55,9 @@ class LambdaContainer(Container):
                  image_builder,
                  memory_mb=128,
                  env_vars=None,
-                 debug_options=None):
+                 debug_options=None,
+                 warm=False,
+                 runtime_api=None):
         """
         Initializes the class
 
@@ -58,11 +80,26 @@ class LambdaContainer(Container):
             Optional. Dictionary containing environment variables passed to container
         debug_options DebugContext
             Optional. Contains container debugging info (port, debugger path)
+        warm bool
+            Optional. Keep the container running so it can be invoked several times with ``invoke``. Defaults to False
+            ie. the function runs once when the container is started.
+        runtime_api samcli.local.runtime_api.local_runtime_api_service.LocalRuntimeApiService
+            Optional. Run the function's bootstrap in a persistent loop that takes events from this Runtime API with
+            ``process_event``. Only supported for runtimes in ``RUNTIME_API_RUNTIMES``
         """
 
         if not Runtime.has_value(runtime):
             raise ValueError("Unsupported Lambda runtime {}".format(runtime))
 
+        if warm and debug_options:
+            raise ValueError("Warm containers cannot be debugged")
+
+        if runtime_api and debug_options:
+            raise ValueError("Containers with a persistent runtime loop cannot be debugged")
+
+        if runtime_api and runtime not in self.RUNTIME_API_RUNTIMES:
+            raise ValueError("Persistent runtime loop is not supported for {}".format(runtime))
+
         image = LambdaContainer._get_image(image_builder, runtime, layers)
         ports = LambdaContainer._get_exposed_ports(debug_options)
         entry = LambdaContainer._get_entry_point(runtime, debug_options)
@@ -70,6 +107,26 @@ class LambdaContainer(Container):
         additional_volumes = LambdaContainer._get_additional_volumes(debug_options)
         cmd = [handler]
 
+        if warm:
+            entry = self._WARM_ENTRYPOINT
+
+        # Environment variables of the function, without the ones that identify this particular container or invoke
+        function_env_vars = {name: value for name, value in (env_vars or {}).items()
+                             if name not in self._PER_INVOKE_ENV_VARS}
+        runtime_api_channel = None
+
+        if runtime_api:
+            entry = self._RUNTIME_API_ENTRYPOINT
+            runtime_api_channel = str(uuid.uuid4())
+            runtime_api.open_channel(runtime_api_channel)
+
+            env_vars = dict(env_vars or {})
+            env_vars.update({
+                "AWS_LAMBDA_RUNTIME_API": runtime_api.get_address(runtime_api_channel),
+                "LAMBDA_TASK_ROOT": self._WORKING_DIR,
+                "_HANDLER": handler
+            })
+
         super(LambdaContainer, self).__init__(image,
                                               cmd,
                                               self._WORKING_DIR,
@@ -81,6 +138,154 @@ class LambdaContainer(Container):
                                               container_opts=additional_options,
                                               additional_volumes=additional_volumes)
 
+        self._runtime = runtime
+        self._layers = layers
+        self._warm = warm
+        self._runtime_entry_point = None
+
+        self._handler = handler
+        self._function_env_vars = function_env_vars
+        self._runtime_api = runtime_api
+        self._runtime_api_channel = runtime_api_channel
+        self._log_writer = _SwitchableWriter()
+        self._log_thread = None
+
+    @property
+    def pool_key(self):
+        """
+        Warm containers are interchangeable when they use the same runtime, image, code directory, layers, memory,
+        handler and environment variables. Containers are created with the handler and environment variables of one
+        function, and every invoke runs that handler with those variables, so containers of functions that only
+        differ in them can't be shared. Environment variables that are set on every invoke are not part of the key.
+
+        :return tuple: Key of this container
+        """
+        return (self._runtime,
+                self._image,
+                self._host_dir,
+                tuple(layer.name for layer in self._layers),
+                self._memory_limit_mb,
+                self._handler,
+                tuple(sorted(self._function_env_vars.items())))
+
+    def invoke(self, env_vars=None, stdout=None, stderr=None):
+        """
+        Runs the Lambda function once inside this warm container and blocks until the function completes.
+
+        :param dict env_vars: Optional. Environment variables for this invocation, including the event
+        :param io.BaseIO stdout: Optional. Stream that receives stdout of the function
+        :param io.BaseIO stderr: Optional. Stream that receives stderr of the function
+        :raise RuntimeError: If this is not a warm container
+        """
+        if not self._warm:
+            raise RuntimeError("Only warm containers can be invoked. This container runs the function when started")
+
+        self.execute(self._get_runtime_entry_point() + self._cmd, env_vars=env_vars, stdout=stdout, stderr=stderr)
+
+    def process_event(self, event, function_arn, timeout, stdout=None, stderr=None):
+        """
+        Hands the event to the runtime loop of this container and blocks until the function completes. Response of the
+        function is written to ``stdout``. Everything the function logs while processing the event is written to
+        ``stderr``.
+
+        Function timeouts are not enforced here. Stop the container to abort the invocation.
+
+        :param str event: Event to pass to the function
+        :param str function_arn: ARN of the function being invoked
+        :param int timeout: Timeout of the function in seconds
+        :param io.BaseIO stdout: Optional. Stream that receives the response of the function
+        :param io.BaseIO stderr: Optional. Stream that receives the logs of the function
+        :raise RuntimeError: If this container does not run a persistent runtime loop
+        """
+        done = threading.Event()
+        self.submit_event(event, function_arn, timeout, stdout=stdout, stderr=stderr,
+                          callback=lambda invocation: done.set())
+
+        # NOTE: BLOCKING CALL
+        # Returns when the runtime posts a result, or when the container is stopped
+        done.wait()
+
+    def submit_event(self, event, function_arn, timeout, stdout=None, stderr=None, callback=None):
+        """
+        Hands the event to the runtime loop of this container and returns immediately, without waiting for the function
+        to complete. When the function completes, its response is written to ``stdout`` and then ``callback`` is
+        called with the invocation, on the thread that completed it. Everything the function logs until then is
+        written to ``stderr``.
+
+        Function timeouts are not enforced here. Stop the container to abort the invocation.
+
+        :param str event: Event to pass to the function
+        :param str function_arn: ARN of the function being invoked
+        :param int timeout: Timeout of the function in seconds
+        :param io.BaseIO stdout: Optional. Stream that receives the response of the function
+        :param io.BaseIO stderr: Optional. Stream that receives the logs of the function
+        :param callback: Optional. Function called with the ``RuntimeApiInvocation`` once it is done
+        :return samcli.local.runtime_api.local_runtime_api_service.RuntimeApiInvocation: The submitted invocation
+        :raise RuntimeError: If this container does not run a persistent runtime loop
+        """
+        if not self._runtime_api:
+            raise RuntimeError("Container does not run a persistent runtime loop. Cannot send events to it")
+
+        self._log_writer.stream = stderr
+        self._start_log_thread()
+
+        def on_done(invocation):
+            self._log_writer.stream = None
+
+            if stdout:
+                if invocation.error is not None:
+                    stdout.write(json.dumps(invocation.error).encode("utf-8"))
+                else:
+                    stdout.write(invocation.response)
+
+            if callback:
+                callback(invocation)
+
+        try:
+            invocation = self._runtime_api.submit(self._runtime_api_channel, event, function_arn, timeout)
+        except Exception:
+            self._log_writer.stream = None
+            raise
+
+        invocation.add_done_callback(on_done)
+        return invocation
+
+    def delete(self):
+        """
+        Removes the container and fails every event that was sent to it but not processed yet
+        """
+        if self._runtime_api:
+            self._runtime_api.close_channel(self._runtime_api_channel)
+
+        super(LambdaContainer, self).delete()
+
+    def _start_log_thread(self):
+        """
+        Containers with a persistent runtime loop produce output across invocations. Forward the output to the stream
+        of whichever invocation is in progress.
+        """
+        if self._log_thread:
+            return
+
+        self._log_thread = threading.Thread(target=self.wait_for_logs,
+                                            kwargs={"stdout": self._log_writer, "stderr": self._log_writer})
+        # Daemon thread, so this doesn't prevent the process from exiting
+        self._log_thread.daemon = True
+        self._log_thread.start()
+
+    def _get_runtime_entry_point(self):
+        """
+        Entry point of the runtime as configured in the image. Warm containers override the entry point when they are
+        created, so it has to be read from the image.
+
+        :return list: Entry point of the runtime
+        """
+        if self._runtime_entry_point is None:
+            image_config = self.docker_client.images.get(self._image).attrs.get("Config") or {}
+            self._runtime_entry_point = image_config.get("Entrypoint") or []
+
+        return self._runtime_entry_point
+
     @staticmethod
     def _get_exposed_ports(debug_options):
         """
@@ -293,5 +498,19 @@ class LambdaContainer(Container):
                 Runtime.nodejs610.value, Runtime.nodejs810.value, Runtime.python27.value, Runtime.python36.value}
 
 
+class _SwitchableWriter(object):
+    """
+    Writes to the stream that is currently set, and drops the data when there is no stream
+    """
+
+    def __init__(self):
+        self.stream = None
+
+    def write(self, data):
+        stream = self.stream
+        if stream:
+            stream.write(data)
+
+
 class DebuggingNotSupported(Exception):
     pass
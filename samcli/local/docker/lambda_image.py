@@ -9,7 +9,10 @@ import hashlib
 import docker
 
 from samcli.commands.local.cli_common.user_exceptions import ImageBuildException
-from samcli.lib.utils.tar import create_tarball
+from samcli.lib.utils.tar import stream_tarball
+from samcli.lib.utils.hash import dir_checksum
+from samcli.lib.utils.single_flight import SingleFlight
+from samcli.local.docker.client import get_docker_client
 
 try:
     from pathlib import Path
@@ -51,7 +54,11 @@ class LambdaImage(object):
     _DOCKER_LAMBDA_REPO_NAME = "lambci/lambda"
     _SAM_CLI_REPO_NAME = "samcli/lambda"
 
-    def __init__(self, layer_downloader, skip_pull_image, force_image_build, docker_client=None):
+    # Ids of base images, kept for the life of the process so Docker is not asked for them again on every invoke
+    _base_image_ids = {}
+
+    def __init__(self, layer_downloader, skip_pull_image, force_image_build, docker_client=None,
+                 compress_build_context=False):
         """
 
         Parameters
@@ -64,11 +71,22 @@ class LambdaImage(object):
             True to download the layer and rebuild the image even if it exists already on the system
         docker_client docker.DockerClient
             Optional docker client object
+        compress_build_context bool
+            Optional. Compress the build context sent to Docker with gzip. Only worth it when the Docker daemon is
+            remote, because a local daemon spends more time decompressing than it saves. Defaults to False
         """
         self.layer_downloader = layer_downloader
+        self.compress_build_context = compress_build_context
         self.skip_pull_image = skip_pull_image
         self.force_image_build = force_image_build
-        self.docker_client = docker_client or docker.from_env()
+        self.docker_client = docker_client or get_docker_client()
+
+        # Digests of the files of layers defined in the template, so unchanged files are not read again on every build
+        self._file_checksums = {}
+
+        # Concurrent builds and pulls of the same image wait for one build or pull instead of running in parallel
+        self._builds = SingleFlight()
+        self._pulls = SingleFlight()
 
     def build(self, runtime, layers):
         """
@@ -95,9 +113,28 @@ class LambdaImage(object):
 
         downloaded_layers = self.layer_downloader.download_all(layers, self.force_image_build)
 
-        docker_image_version = self._generate_docker_image_version(downloaded_layers, runtime)
+        docker_image_version = self._generate_docker_image_version(downloaded_layers,
+                                                                   runtime,
+                                                                   self._get_image_id(base_image))
         image_tag = "{}:{}".format(self._SAM_CLI_REPO_NAME, docker_image_version)
 
+        self._builds.do(image_tag, self._build_image_if_needed, base_image, image_tag, downloaded_layers)
+
+        return image_tag
+
+    def _build_image_if_needed(self, base_image, image_tag, layers):
+        """
+        Builds the image, unless it is already on the system
+
+        Parameters
+        ----------
+        base_image str
+            Base Image to use for the new image
+        image_tag str
+            Docker tag (REPOSITORY:TAG) of the image
+        layers list(samcli.commands.local.lib.provider.Layer)
+            List of Layers to be use to mount in the image
+        """
         image_not_found = False
 
         try:
@@ -106,16 +143,54 @@ class LambdaImage(object):
             LOG.info("Image was not found.")
             image_not_found = True
 
-        if self.force_image_build or \
-                image_not_found or \
-                any(layer.is_defined_within_template for layer in downloaded_layers):
+        # Tag changes with the content of the layers and the base image, so an existing image is always up to date
+        if self.force_image_build or image_not_found:
             LOG.info("Building image...")
-            self._build_image(base_image, image_tag, downloaded_layers)
+            self._build_image(base_image, image_tag, layers)
 
-        return image_tag
+    def _get_image_id(self, image):
+        """
+        Gets the Id of the image, which is the digest of its content. Pulls the image if it is not on the system.
+        The Id is looked up once per process, and not remembered if the image could not be found or pulled.
 
-    @staticmethod
-    def _generate_docker_image_version(layers, runtime):
+        Parameters
+        ----------
+        image str
+            Image (REPOSITORY:TAG)
+
+        Returns
+        -------
+        str
+            Id of the image. None, if the image is not on the system and can't be pulled
+        """
+        image_id = self._base_image_ids.get(image)
+        if image_id:
+            return image_id
+
+        try:
+            image_id = self.docker_client.images.get(image).id
+        except docker.errors.ImageNotFound:
+            if self.skip_pull_image:
+                LOG.debug("Image %s was not found and will not be pulled", image)
+                return None
+
+            image_id = self._pulls.do(image, self._pull_image_id, image)
+
+        if image_id:
+            self._base_image_ids[image] = image_id
+
+        return image_id
+
+    def _pull_image_id(self, image):
+        repository, tag = image.rsplit(":", 1)
+        LOG.info("Pulling image %s", image)
+        try:
+            return self.docker_client.images.pull(repository, tag=tag).id
+        except docker.errors.APIError:
+            LOG.debug("Failed to pull image %s", image, exc_info=True)
+            return None
+
+    def _generate_docker_image_version(self, layers, runtime, base_image_id=None):
         """
         Generate the Docker TAG that will be used to create the image
 
@@ -127,6 +202,9 @@ class LambdaImage(object):
         runtime str
             Runtime of the image to create
 
+        base_image_id str
+            Optional. Id of the base image, which changes when the base image is updated
+
         Returns
         -------
         str
@@ -138,8 +216,19 @@ class LambdaImage(object):
         # specified in the template. This will allow reuse of the runtime and layers across different
         # functions that are defined. If two functions use the same runtime with the same layers (in the
         # same order), SAM CLI will only produce one image and use this image across both functions for invoke.
-        return runtime + '-' + hashlib.sha256(
-            "-".join([layer.name for layer in layers]).encode('utf-8')).hexdigest()[0:25]
+        # Layer versions downloaded from AWS never change, so their name identifies their content. Layers defined in
+        # the template are identified by a digest of their files, so an image is only rebuilt when they change.
+        layer_versions = []
+        for layer in layers:
+            if layer.is_defined_within_template:
+                layer_versions.append(layer.name + '@' + dir_checksum(layer.codeuri, self._file_checksums))
+            else:
+                layer_versions.append(layer.name)
+
+        if base_image_id:
+            layer_versions.append(base_image_id)
+
+        return runtime + '-' + hashlib.sha256("-".join(layer_versions).encode('utf-8')).hexdigest()[0:25]
 
     def _build_image(self, base_image, docker_tag, layers):
         """
@@ -177,12 +266,13 @@ class LambdaImage(object):
             for layer in layers:
                 tar_paths[layer.codeuri] = '/' + layer.name
 
-            with create_tarball(tar_paths) as tarballfile:
+            # Stream the context to Docker while it is produced, instead of writing it to a file first
+            with stream_tarball(tar_paths, compress=self.compress_build_context) as tarball_chunks:
                 try:
-                    self.docker_client.images.build(fileobj=tarballfile,
+                    self.docker_client.images.build(fileobj=tarball_chunks,
                                                     custom_context=True,
                                                     rm=True,
-                                                    encoding='gzip',
+                                                    encoding='gzip' if self.compress_build_context else None,
                                                     tag=docker_tag,
                                                     pull=not self.skip_pull_image)
                 except (docker.errors.BuildError, docker.errors.APIError):
@@ -2,11 +2,18 @@
 Provides classes that interface with Docker to create, execute and manage containers.
 """
 
+import time
 import logging
 import sys
+import threading
+from multiprocessing.pool import ThreadPool
 
 import docker
 
+from samcli.lib.utils.single_flight import SingleFlight
+from samcli.local.docker.client import get_docker_client
+from samcli.local.docker.container_pool import ContainerPool
+
 LOG = logging.getLogger(__name__)
 
 
@@ -17,21 +24,43 @@ class ContainerManager(object):
     serve requests faster. It is also thread-safe.
     """
 
+    # Number of containers started at the same time when pre-warming
+    PREWARM_PARALLELISM = 8
+
+    # Number of seconds after which an image that was verified is checked again, in the background
+    IMAGE_REFRESH_INTERVAL = 300
+
     def __init__(self,
                  docker_network_id=None,
                  docker_client=None,
-                 skip_pull_image=False):
+                 skip_pull_image=False,
+                 max_warm_containers=None,
+                 warm_container_ttl=None,
+                 image_refresh_interval=IMAGE_REFRESH_INTERVAL):
         """
         Instantiate the container manager
 
         :param docker_network_id: Optional Docker network to run this container in.
         :param docker_client: Optional docker client object
         :param bool skip_pull_image: Should we pull new Docker container image?
+        :param int max_warm_containers: Optional. Maximum number of warm containers that can be alive at a time
+        :param int warm_container_ttl: Optional. Number of seconds a warm container can stay idle before it is deleted
+        :param int image_refresh_interval: Optional. Images are verified to be present, and pulled if necessary, once.
+            They are verified again in the background when they are used after this many seconds. Set to None to never
+            verify an image again.
         """
 
         self.skip_pull_image = skip_pull_image
         self.docker_network_id = docker_network_id
-        self.docker_client = docker_client or docker.from_env()
+        self.docker_client = docker_client or get_docker_client()
+        self._warm_containers = ContainerPool(max_containers=max_warm_containers,
+                                              idle_timeout=warm_container_ttl)
+
+        self.image_refresh_interval = image_refresh_interval
+        # Time at which each image was last verified to be present and, unless asked to skip pulling, up to date
+        self._verified_images = {}
+        self._verified_images_lock = threading.Lock()
+        self._image_pulls = SingleFlight()
 
     def run(self, container, input_data=None, warm=False):
         """
@@ -40,14 +69,132 @@ class ContainerManager(object):
         :param samcli.local.docker.container.Container container: Container to create and run
         :param input_data: Optional. Input data sent to the container through container's stdin.
         :param bool warm: Indicates if an existing container can be reused. Defaults False ie. a new container will
-            be created for every request.
+            be created for every request. Warm containers must be handed back with ``release`` when done.
+        :return samcli.local.docker.container.Container: Container that is running. When ``warm`` is set, this could
+            be a previously started container with the same ``pool_key`` instead of the given one
+        :raises DockerImagePullFailedException: If the Docker image was not available in the server
+        """
+
+        if not warm:
+            self._start(container, input_data)
+            return container
+
+        while True:
+            warm_container = self._warm_containers.acquire(container.pool_key)
+            if not warm_container:
+                # No idle container to reuse. A slot was reserved for us to start a new one
+                break
+
+            if warm_container.is_running():
+                LOG.debug("Reusing warm container %s", warm_container.id)
+                return warm_container
+
+            # Container died while it was idle (ex: killed outside of SAM CLI). Clean it up and look for another
+            LOG.debug("Warm container %s is not running anymore", warm_container.id)
+            self.stop(warm_container)
+
+        try:
+            self._start(container, input_data)
+        except BaseException:
+            self._warm_containers.cancel()
+            raise
+
+        self._warm_containers.add(container)
+        return container
+
+    def prewarm(self, containers, parallelism=None):
+        """
+        Starts the given containers in parallel and keeps them idle as warm containers, ready to be returned by ``run``.
+        Each distinct image is pulled once before any container starts. Containers that don't fit within the maximum
+        number of warm containers are not started.
+
+        :param list(samcli.local.docker.container.Container) containers: Containers to start
+        :param int parallelism: Optional. Maximum number of containers to start at the same time. Defaults to
+            ``PREWARM_PARALLELISM``
+        :return int: Number of containers that were started
         :raises DockerImagePullFailedException: If the Docker image was not available in the server
         """
+        if not containers:
+            return 0
 
-        if warm:
-            raise ValueError("The facility to invoke warm container does not exist")
+        for image_name in sorted(set(container.image for container in containers)):
+            self._pull_image_if_needed(image_name)
 
-        image_name = container.image
+        pool = ThreadPool(min(parallelism or self.PREWARM_PARALLELISM, len(containers)))
+        try:
+            started = pool.map(self._prewarm_container, containers)
+        finally:
+            pool.close()
+            pool.join()
+
+        return sum(started)
+
+    def _prewarm_container(self, container):
+        if not self._warm_containers.reserve():
+            LOG.debug("Maximum number of warm containers are running. Not pre-warming any more")
+            return False
+
+        try:
+            self._create_and_start(container, None)
+        except BaseException:
+            self._warm_containers.cancel()
+            raise
+
+        self._warm_containers.add(container)
+        self._warm_containers.release(container)
+        return True
+
+    def _start(self, container, input_data):
+        """
+        Pulls the image if necessary, then creates and starts the given container
+        """
+        self._pull_image_if_needed(container.image)
+        self._create_and_start(container, input_data)
+
+    def _pull_image_if_needed(self, image_name):
+        """
+        Makes sure the image is available. Images are verified once and remembered for the lifetime of this manager.
+        Once the refresh interval passes, the image is used right away and verified again in the background.
+        Concurrent verifications of the same image are collapsed into one.
+        """
+        with self._verified_images_lock:
+            verified_at = self._verified_images.get(image_name)
+
+        if verified_at is None:
+            self._image_pulls.do(image_name, self._verify_image, image_name)
+
+        elif self._is_stale(verified_at) and not self._image_pulls.is_running(image_name):
+            LOG.debug("Verifying image %s again in the background", image_name)
+            thread = threading.Thread(target=self._refresh_image, args=(image_name,))
+            # Daemon thread, so this doesn't prevent the process from exiting
+            thread.daemon = True
+            thread.start()
+
+    def _refresh_image(self, image_name):
+        try:
+            self._image_pulls.do(image_name, self._verify_image, image_name)
+        except Exception as ex:  # pylint: disable=broad-except
+            # The image that was verified earlier is still used. Try again when the image is used next time.
+            LOG.debug("Failed to verify image %s in the background: %s", image_name, ex)
+
+    def _is_stale(self, verified_at):
+        return self.image_refresh_interval is not None and time.time() - verified_at >= self.image_refresh_interval
+
+    def _forget_image(self, image_name):
+        with self._verified_images_lock:
+            self._verified_images.pop(image_name, None)
+
+    def _verify_image(self, image_name):
+        """
+        Pulls the image unless it is built locally, or it is available and we are asked to skip pulling images
+        """
+
+        with self._verified_images_lock:
+            verified_at = self._verified_images.get(image_name)
+
+        if verified_at is not None and not self._is_stale(verified_at):
+            # Someone else verified the image while we were waiting
+            return
 
         is_image_local = self.has_image(image_name)
 
@@ -66,22 +213,53 @@ class ContainerManager(object):
                 LOG.info(
                     "Failed to download a new %s image. Invoking with the already downloaded image.", image_name)
 
+        with self._verified_images_lock:
+            self._verified_images[image_name] = time.time()
+
+    def _create_and_start(self, container, input_data):
+        """
+        Creates the container in the Docker network, unless it was already created, and starts it
+        """
         if not container.is_created():
             # Create the container first before running.
             # Create the container in appropriate Docker network
             container.network_id = self.docker_network_id
-            container.create()
+            try:
+                container.create()
+            except docker.errors.ImageNotFound:
+                # Image was verified earlier but has been removed since then
+                LOG.debug("Image %s is not available anymore", container.image)
+                self._forget_image(container.image)
+                self._pull_image_if_needed(container.image)
+                container.create()
 
         container.start(input_data=input_data)
 
+    def release(self, container):
+        """
+        Hand back a container that was returned by ``run``. Warm containers are kept running to serve the next request
+        while any other container is stopped and deleted.
+
+        :param samcli.local.docker.container.Container container: Container to release
+        """
+        if not self._warm_containers.release(container):
+            self.stop(container)
+
     def stop(self, container):
         """
         Stop and delete the container
 
         :param samcli.local.docker.container.Container container: Container to stop
         """
+        self._warm_containers.remove(container)
         container.delete()
 
+    def shutdown(self):
+        """
+        Stop and delete all the warm containers. Call this when the manager is no longer needed.
+        """
+        self._warm_containers.drain()
+
     def pull_image(self, image_name, stream=None):
         """
         Ask Docker to pull the container image with given name.
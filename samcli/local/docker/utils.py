@@ -34,3 +34,31 @@ def to_posix_path(code_path):
     return re.sub("^([A-Za-z])+:",
                   lambda match: posixpath.sep + match.group().replace(":", "").lower(),
                   pathlib.PureWindowsPath(code_path).as_posix()) if os.name == "nt" else code_path
+
+
+def get_network_gateway(docker_client, network_id):
+    """
+    Returns the IP address of the gateway of the given Docker network. On Linux, this is the address of the host
+    machine as seen by the containers connected to the network.
+
+    Parameters
+    ----------
+    docker_client docker.DockerClient
+        Docker client to inspect the network with
+    network_id str
+        ID or name of the Docker network
+
+    Returns
+    -------
+    str
+        IP address of the gateway. None, if the network does not have a gateway
+    """
+
+    network = docker_client.networks.get(network_id)
+    ipam_configs = (network.attrs.get("IPAM") or {}).get("Config") or []
+
+    for config in ipam_configs:
+        if config.get("Gateway"):
+            return config["Gateway"]
+
+    return None
@@ -1,5 +1,7 @@
 """Holds Classes for API Gateway to Lambda Events"""
 
+from samcli.lib.utils import json_codec
+
 
 class ContextIdentity(object):
 
@@ -199,3 +201,98 @@ class ApiGatewayLambdaEvent(object):
                      }
 
         return json_dict
+
+
+class ApiGatewayLambdaEventSkeleton(object):
+    """
+    Serialized ApiGatewayLambdaEvent of a resource, with only the fields of the request left to fill in. The fields
+    that are the same for every request to the resource, like the request context and the identity defaults, are
+    serialized to JSON once for each HTTP method. An event is then the JSON of the fields of the request joined to it,
+    without constructing the objects of the event.
+    """
+
+    def __init__(self, resource_path, stage=None, api_id="1234567890"):
+        """
+        Constructs an ApiGatewayLambdaEventSkeleton
+
+        :param str resource_path: Path of the resource
+        :param str stage: Api Gateway Stage
+        :param str api_id: Api Id for the Request (Default: 1234567890)
+        """
+        self.resource_path = resource_path
+        self.stage = stage
+        self.api_id = api_id
+
+        # JSON of the event up to the source ip of the request, by HTTP method
+        self._prefixes = {}
+
+    def to_json(self,
+                http_method,
+                body=None,
+                query_string_params=None,
+                headers=None,
+                path_parameters=None,
+                path=None,
+                is_base_64_encoded=False,
+                source_ip="127.0.0.1"):
+        """
+        Constructs the JSON of the event of a request, the same as the ApiGatewayLambdaEvent of the request would be
+        serialized to
+
+        :param str http_method: HTTPMethod of the request
+        :param str body: Body or data for the request
+        :param dict query_string_params: Query String parameters
+        :param dict headers: dict of the request Headers
+        :param dict path_parameters: Path Parameters
+        :param str path: Path of the request
+        :param bool is_base_64_encoded: True if the data is base64 encoded.
+        :param str source_ip: Source Ip of the request (Default: 127.0.0.1)
+        :return str: JSON of the event
+        """
+        prefix = self._prefixes.get(http_method)
+        if prefix is None:
+            prefix = self._prefixes[http_method] = self._serialize_prefix(http_method)
+
+        request_fields = {"httpMethod": http_method,
+                          "body": body if body else None,
+                          "queryStringParameters": query_string_params if query_string_params else None,
+                          "headers": headers if headers else None,
+                          "pathParameters": path_parameters if path_parameters else None,
+                          "path": path,
+                          "isBase64Encoded": is_base_64_encoded
+                          }
+
+        # The prefix leaves the identity, the request context and the event open. The fields of the request continue
+        # the event after the request context
+        return "".join((prefix, json_codec.dumps(source_ip), "}}, ", json_codec.dumps(request_fields)[1:]))
+
+    def _serialize_prefix(self, http_method):
+        """
+        Serializes the fields of the event that don't depend on the request, other than its method
+
+        :param str http_method: HTTPMethod of the request
+        :return str: JSON of the event, that ends with the key of the source ip of the identity
+        """
+        event = ApiGatewayLambdaEvent(resource=self.resource_path).to_dict()
+        context = RequestContext(api_id=self.api_id,
+                                 resource_path=self.resource_path,
+                                 http_method=http_method,
+                                 stage=self.stage,
+                                 path=self.resource_path).to_dict()
+        identity = ContextIdentity().to_dict()
+
+        # Fields that are added after the others, or filled in for every request
+        del event["requestContext"]
+        for field in ("httpMethod", "body", "queryStringParameters", "headers", "pathParameters", "path",
+                      "isBase64Encoded"):
+            del event[field]
+        del context["identity"]
+        del identity["sourceIp"]
+
+        # Each object still has fields, so its JSON without the closing brace is continued with a comma
+        return "".join((json_codec.dumps(event)[:-1],
+                        ', "requestContext": ',
+                        json_codec.dumps(context)[:-1],
+                        ', "identity": ',
+                        json_codec.dumps(identity)[:-1],
+                        ', "sourceIp": '))
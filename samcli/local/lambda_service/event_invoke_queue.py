@@ -0,0 +1,168 @@
+"""
+Runs asynchronous ("Event") invokes of Lambda functions in the background
+"""
+
+import logging
+import threading
+
+from six.moves import queue
+
+from samcli.lib.utils.scheduler import Scheduler
+from samcli.local.services.base_local_service import LambdaOutputStream
+from samcli.local.lambdafn.exceptions import FunctionNotFound, ConcurrencyLimitExceeded
+
+LOG = logging.getLogger(__name__)
+
+
+class _EventInvoke(object):
+
+    def __init__(self, function_name, event):
+        self.function_name = function_name
+        self.event = event
+        self.attempt = 0
+
+
+class EventInvokeQueue(object):
+    """
+    Queue of asynchronous invokes, run by a pool of background workers. Like Lambda, an invoke that fails with an error
+    is retried after a delay, with the delay doubling for each retry, and dropped once it has no retries left.
+
+    When debugging, invokes are run on the thread that queues them instead, and are not retried. The runtime only
+    handles Ctrl+C of debugging sessions on the main thread, which is the thread that serves requests when debugging.
+
+    The workers are started on first use. This is thread-safe.
+    """
+
+    DEFAULT_WORKERS = 4
+    DEFAULT_MAX_RETRIES = 2
+    DEFAULT_RETRY_DELAY = 1
+    DEFAULT_MAX_QUEUED_EVENTS = 10000
+
+    def __init__(self,
+                 lambda_runner,
+                 workers=DEFAULT_WORKERS,
+                 max_retries=DEFAULT_MAX_RETRIES,
+                 retry_delay=DEFAULT_RETRY_DELAY,
+                 max_queued_events=DEFAULT_MAX_QUEUED_EVENTS,
+                 stderr=None,
+                 is_debugging=False):
+        """
+        Parameters
+        ----------
+        lambda_runner samcli.commands.local.lib.local_lambda.LocalLambdaRunner
+            The Lambda runner class capable of invoking the function
+        workers int
+            Optional. Number of invokes run at the same time. Defaults to 4
+        max_retries int
+            Optional. Number of times a failed invoke is retried. Defaults to 2, like Lambda
+        retry_delay float
+            Optional. Number of seconds to wait before the first retry. Each following retry waits twice as long.
+            Defaults to 1
+        max_queued_events int
+            Optional. Number of invokes that can wait for a worker. Defaults to 10000
+        stderr io.BaseIO
+            Optional stream where the stderr from Docker container should be written to
+        is_debugging bool
+            Optional. Are we debugging the invokes? Defaults to False
+        """
+        self.lambda_runner = lambda_runner
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_queued_events = max_queued_events
+        self.stderr = stderr
+        self.is_debugging = is_debugging
+
+        # Unbounded, so retries are never dropped. New invokes are bounded in ``put``
+        self._queue = queue.Queue()
+        self._retries = Scheduler()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def put(self, function_name, event):
+        """
+        Queues an invoke of the function, without waiting for it to run. When debugging, runs the invoke and waits
+        for it to complete instead
+
+        Parameters
+        ----------
+        function_name str
+            Name of the function to invoke
+        event str
+            Event data passed to the function. Must be a valid JSON String
+
+        Raises
+        ------
+        samcli.local.lambdafn.exceptions.ConcurrencyLimitExceeded
+            When too many invokes are waiting for a worker
+        """
+        if self.is_debugging:
+            # NOTE: BLOCKING CALL
+            self._invoke(_EventInvoke(function_name, event))
+            return
+
+        with self._lock:
+            self._start_workers()
+
+            if self._queue.qsize() >= self.max_queued_events:
+                LOG.info("Event invoke of function '%s' was throttled. %d invoke(s) are waiting to run",
+                         function_name, self._queue.qsize())
+                raise ConcurrencyLimitExceeded("Rate Exceeded.")
+
+            self._queue.put(_EventInvoke(function_name, event))
+
+    def _start_workers(self):
+        if self._threads:
+            return
+
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work)
+            # Daemon threads, so queued invokes don't prevent the process from exiting
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            invoke = self._queue.get()
+
+            try:
+                self._invoke(invoke)
+            except Exception:  # pylint: disable=broad-except
+                LOG.debug("Event invoke of function '%s' failed unexpectedly", invoke.function_name, exc_info=True)
+
+    def _invoke(self, invoke):
+        """
+        Runs the invoke, and schedules a retry if it failed
+        """
+        stdout_stream = LambdaOutputStream(log_stream=self.stderr)
+
+        try:
+            self.lambda_runner.invoke(invoke.function_name, invoke.event, stdout=stdout_stream, stderr=self.stderr)
+        except FunctionNotFound:
+            LOG.warning("Event invoke of function '%s' was dropped. The function was not found",
+                        invoke.function_name)
+            return
+        except Exception as ex:  # pylint: disable=broad-except
+            # Throttles and errors starting the container are retried like errors of the function
+            error = str(ex)
+        else:
+            lambda_response, is_lambda_user_error_response = stdout_stream.get_lambda_output()
+            error = lambda_response if is_lambda_user_error_response else None
+
+        if error is None:
+            LOG.debug("Event invoke of function '%s' succeeded", invoke.function_name)
+            return
+
+        # Retries would run later on the workers, where invokes can't be debugged
+        if invoke.attempt >= self.max_retries or self.is_debugging:
+            LOG.error("Event invoke of function '%s' failed after %d attempt(s) and was dropped: %s",
+                      invoke.function_name, invoke.attempt + 1, error)
+            return
+
+        delay = self.retry_delay * (2 ** invoke.attempt)
+        invoke.attempt += 1
+
+        LOG.info("Event invoke of function '%s' failed, retrying in %s second(s) (retry %d of %d): %s",
+                 invoke.function_name, delay, invoke.attempt, self.max_retries, error)
+        self._retries.call_later(delay, self._queue.put, invoke)
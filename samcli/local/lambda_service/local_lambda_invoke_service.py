@@ -1,22 +1,22 @@
 """Local Lambda Service that only invokes a function"""
 
-import json
 import logging
-import io
 
 from flask import Flask, request
 
-
-from samcli.local.services.base_local_service import BaseLocalService, LambdaOutputParser, CaseInsensitiveDict
-from samcli.local.lambdafn.exceptions import FunctionNotFound
+from samcli.lib.utils import json_codec
+from samcli.local.services.base_local_service import BaseLocalService, LambdaOutputStream, CaseInsensitiveDict
+from samcli.local.lambdafn.exceptions import FunctionNotFound, ConcurrencyLimitExceeded
 from .lambda_error_responses import LambdaErrorResponses
+from .event_invoke_queue import EventInvokeQueue
 
 LOG = logging.getLogger(__name__)
 
 
 class LocalLambdaInvokeService(BaseLocalService):
 
-    def __init__(self, lambda_runner, port, host, stderr=None):
+    def __init__(self, lambda_runner, port, host, stderr=None, max_workers=None, max_queued_requests=None,
+                 event_workers=None, event_retries=None):
         """
         Creates a Local Lambda Service that will only response to invoking a function
 
@@ -30,10 +30,21 @@ class LocalLambdaInvokeService(BaseLocalService):
             Optional. host to start the service on
         stderr io.BaseIO
             Optional stream where the stderr from Docker container should be written to
+        max_workers int
+            Optional. Number of requests served at the same time
+        max_queued_requests int
+            Optional. Number of requests that can wait to be served
+        event_workers int
+            Optional. Number of asynchronous ("Event") invokes run at the same time
+        event_retries int
+            Optional. Number of times a failed asynchronous invoke is retried
         """
-        super(LocalLambdaInvokeService, self).__init__(lambda_runner.is_debugging(), port=port, host=host)
+        super(LocalLambdaInvokeService, self).__init__(lambda_runner.is_debugging(), port=port, host=host,
+                                                       max_workers=max_workers,
+                                                       max_queued_requests=max_queued_requests)
         self.lambda_runner = lambda_runner
         self.stderr = stderr
+        self.event_queue = self._make_event_queue(event_workers, event_retries)
 
     def create(self):
         """
@@ -63,7 +74,7 @@ class LocalLambdaInvokeService(BaseLocalService):
             2. Query Parameters are sent to the endpoint
             3. The Request Content-Type is not application/json
             4. 'X-Amz-Log-Type' header is not 'None'
-            5. 'X-Amz-Invocation-Type' header is not 'RequestResponse'
+            5. 'X-Amz-Invocation-Type' header is not 'RequestResponse' or 'Event'
 
         Returns
         -------
@@ -82,7 +93,7 @@ class LocalLambdaInvokeService(BaseLocalService):
         request_data = request_data.decode('utf-8')
 
         try:
-            json.loads(request_data)
+            json_codec.loads(request_data)
         except ValueError as json_error:
             LOG.debug("Request body was not json. Exception: %s", str(json_error))
             return LambdaErrorResponses.invalid_request_content(
@@ -101,10 +112,32 @@ class LocalLambdaInvokeService(BaseLocalService):
                 "log-type: {} is not supported. None is only supported.".format(log_type))
 
         invocation_type = request_headers.get('X-Amz-Invocation-Type', 'RequestResponse')
-        if invocation_type != 'RequestResponse':
-            LOG.warning("invocation-type: %s is not supported. RequestResponse is only supported.", invocation_type)
+        if invocation_type not in ('RequestResponse', 'Event'):
+            LOG.warning("invocation-type: %s is not supported. RequestResponse and Event are only supported.",
+                        invocation_type)
             return LambdaErrorResponses.not_implemented_locally(
-                "invocation-type: {} is not supported. RequestResponse is only supported.".format(invocation_type))
+                "invocation-type: {} is not supported. RequestResponse and Event are only supported."
+                .format(invocation_type))
+
+    def _make_event_queue(self, event_workers, event_retries):
+        """
+        Creates the queue that runs asynchronous invokes, with the options that were given to the service
+
+        Returns
+        -------
+        samcli.local.lambda_service.event_invoke_queue.EventInvokeQueue
+            Queue of asynchronous invokes
+        """
+        queue_options = {}
+        if self.is_debugging:
+            # Invokes must run on the thread that serves requests, see EventInvokeQueue
+            queue_options["is_debugging"] = True
+        elif event_workers is not None:
+            queue_options["workers"] = event_workers
+        if event_retries is not None:
+            queue_options["max_retries"] = event_retries
+
+        return EventInvokeQueue(self.lambda_runner, stderr=self.stderr, **queue_options)
 
     def _construct_error_handling(self):
         """
@@ -138,20 +171,22 @@ class LocalLambdaInvokeService(BaseLocalService):
 
         request_data = request_data.decode('utf-8')
 
-        stdout_stream = io.BytesIO()
+        invocation_type = CaseInsensitiveDict(flask_request.headers).get('X-Amz-Invocation-Type', 'RequestResponse')
+        if invocation_type == 'Event':
+            return self._queue_event_invoke(function_name, request_data)
+
+        # Log statements of the function are written to stderr as they arrive
+        stdout_stream = LambdaOutputStream(log_stream=self.stderr)
 
         try:
             self.lambda_runner.invoke(function_name, request_data, stdout=stdout_stream, stderr=self.stderr)
         except FunctionNotFound:
             LOG.debug('%s was not found to invoke.', function_name)
             return LambdaErrorResponses.resource_not_found(function_name)
+        except ConcurrencyLimitExceeded as ex:
+            return LambdaErrorResponses.too_many_requests(str(ex))
 
-        lambda_response, lambda_logs, is_lambda_user_error_response = \
-            LambdaOutputParser.get_lambda_output(stdout_stream)
-
-        if self.stderr and lambda_logs:
-            # Write the logs to stderr if available.
-            self.stderr.write(lambda_logs)
+        lambda_response, is_lambda_user_error_response = stdout_stream.get_lambda_output()
 
         if is_lambda_user_error_response:
             return self.service_response(lambda_response,
@@ -159,3 +194,29 @@ class LocalLambdaInvokeService(BaseLocalService):
                                          200)
 
         return self.service_response(lambda_response, {'Content-Type': 'application/json'}, 200)
+
+    def _queue_event_invoke(self, function_name, request_data):
+        """
+        Queues an asynchronous invoke of the function, and responds without waiting for it to run
+
+        Parameters
+        ----------
+        function_name str
+            Name of the function to invoke
+        request_data str
+            Event data passed to the function
+
+        Returns
+        -------
+        A Flask Response response object as if it was returned from Lambda
+        """
+        if not self.lambda_runner.provider.get(function_name):
+            LOG.debug('%s was not found to invoke.', function_name)
+            return LambdaErrorResponses.resource_not_found(function_name)
+
+        try:
+            self.event_queue.put(function_name, request_data)
+        except ConcurrencyLimitExceeded as ex:
+            return LambdaErrorResponses.too_many_requests(str(ex))
+
+        return self.service_response('', {'Content-Type': 'application/json'}, 202)
@@ -0,0 +1,326 @@
+"""
+Cache of decompressed function code archives
+"""
+
+import os
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from samcli.lib.utils.osutils import dir_size
+from samcli.lib.utils.single_flight import SingleFlight
+from .zip import unzip
+
+LOG = logging.getLogger(__name__)
+
+
+class ArchiveCache(object):
+    """
+    Decompresses zip/jar archives into a cache directory that persists across invocations and processes. Every
+    archive is decompressed into a directory named after the SHA256 digest of its content, so an archive is only
+    decompressed again when its content changes. The digest of an archive is computed once for each size and
+    modification time of the file.
+
+    When the total size of the decompressed archives goes above the limit, the least recently used ones are deleted.
+    The cache directory is shared by every process, and the modification time of a directory records when any of them
+    last used it. Directories that are in use by this process, pinned by it, or used by any process within the grace
+    period are never deleted. A directory is renamed before it is deleted, so other processes never see it partially
+    deleted.
+
+    This is thread-safe.
+    """
+
+    DEFAULT_MAX_SIZE_MB = 1024
+
+    _TEMP_DIR_PREFIX = ".tmp-"
+    _READ_CHUNK_SIZE = 1024 * 1024
+
+    # Decompressed archives used more recently may still be in use by another process, like mounted in its warm
+    # containers. Temporary directories modified more recently may still be written by another process
+    _UNUSED_GRACE_PERIOD = 3600
+
+    def __init__(self, cache_dir, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        """
+        Parameters
+        ----------
+        cache_dir str
+            Directory to decompress archives into. It is created if it does not exist
+        max_size_mb int
+            Optional. Maximum total size of the decompressed archives in megabytes. Defaults to 1024
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size_mb * 1024 * 1024
+
+        self._lock = threading.Lock()
+
+        # Digest of each archive, keyed by the path, size and modification time of the archive
+        self._digests = {}
+
+        # Size of each decompressed archive, keyed by digest. Ordered from the least to the most recently used.
+        # Loaded from the cache directory when first needed
+        self._entries = None
+
+        # Number of times each decompressed archive is in use
+        self._in_use = {}
+
+        # Decompressed archives that are kept for the lifetime of this object
+        self._pinned = set()
+
+        self._extractions = SingleFlight()
+
+    @contextmanager
+    def extracted(self, archive_path):
+        """
+        Context manager that decompresses the archive, unless it is already in the cache, and yields the directory
+        containing its content. The directory will not be deleted until the context exits. It must not be modified.
+
+        Parameters
+        ----------
+        archive_path str
+            Path to the zip/jar archive
+
+        Returns
+        -------
+        str
+            Real path of the directory with the content of the archive
+        """
+        digest = self._get_digest(archive_path)
+
+        with self._lock:
+            self._in_use[digest] = self._in_use.get(digest, 0) + 1
+
+        try:
+            self._extractions.do(digest, self._extract, archive_path, digest)
+            yield os.path.realpath(self._get_entry_dir(digest))
+        finally:
+            with self._lock:
+                self._in_use[digest] -= 1
+                if not self._in_use[digest]:
+                    del self._in_use[digest]
+
+            self._evict()
+
+    def pin(self, archive_path):
+        """
+        Decompresses the archive, unless it is already in the cache, and returns the directory containing its content.
+        Unlike ``extracted``, the directory is not deleted for the lifetime of this object, so it can stay mounted in
+        containers that outlive an invoke. It must not be modified.
+
+        Parameters
+        ----------
+        archive_path str
+            Path to the zip/jar archive
+
+        Returns
+        -------
+        str
+            Real path of the directory with the content of the archive
+        """
+        digest = self._get_digest(archive_path)
+
+        with self._lock:
+            self._pinned.add(digest)
+
+        self._extractions.do(digest, self._extract, archive_path, digest)
+        return os.path.realpath(self._get_entry_dir(digest))
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict
+            Number of decompressed archives in the cache, their total size and the maximum total size, in bytes
+        """
+        with self._lock:
+            entries = self._load_entries()
+            return {
+                "entries": len(entries),
+                "size": sum(entries.values()),
+                "max_size": self.max_size
+            }
+
+    def _get_digest(self, archive_path):
+        stat = os.stat(archive_path)
+        key = (os.path.realpath(archive_path), stat.st_size, stat.st_mtime)
+
+        with self._lock:
+            digest = self._digests.get(key)
+
+        if digest:
+            return digest
+
+        LOG.debug("Computing the digest of %s", archive_path)
+        sha256 = hashlib.sha256()
+        with open(archive_path, "rb") as archive:
+            for chunk in iter(lambda: archive.read(self._READ_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+
+        digest = sha256.hexdigest()
+        with self._lock:
+            self._digests[key] = digest
+
+        return digest
+
+    def _extract(self, archive_path, digest):
+        """
+        Decompresses the archive into its directory in the cache, unless it is already there
+        """
+        entry_dir = self._get_entry_dir(digest)
+
+        if os.path.isdir(entry_dir):
+            LOG.debug("Using %s decompressed in %s", archive_path, entry_dir)
+            self._touch(digest)
+            return
+
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        # Decompress to a temporary directory first and rename it when complete. A directory in the cache is then
+        # always completely decompressed, even if this process is killed or another process races with us.
+        temp_dir = tempfile.mkdtemp(prefix=self._TEMP_DIR_PREFIX, dir=self.cache_dir)
+        try:
+            LOG.info("Decompressing %s", archive_path)
+            unzip(archive_path, temp_dir)
+
+            if os.name == 'posix':
+                os.chmod(temp_dir, 0o755)
+
+            os.rename(temp_dir, entry_dir)
+        except OSError:
+            if not os.path.isdir(entry_dir):
+                raise
+            LOG.debug("%s was decompressed by another process", archive_path)
+        finally:
+            if os.path.isdir(temp_dir):
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+        size = dir_size(entry_dir)
+        with self._lock:
+            entries = self._load_entries()
+            entries.pop(digest, None)
+            entries[digest] = size
+
+    def _touch(self, digest):
+        """
+        Marks the decompressed archive as the most recently used one
+        """
+        entry_dir = self._get_entry_dir(digest)
+
+        # Modification time of the directory records when it was last used, for the next processes
+        os.utime(entry_dir, None)
+
+        with self._lock:
+            entries = self._load_entries()
+            size = entries.pop(digest, None)
+
+        if size is None:
+            size = dir_size(entry_dir)
+
+        with self._lock:
+            self._entries[digest] = size
+
+    def _evict(self):
+        """
+        Deletes the least recently used decompressed archives that are not in use by any process, until the total size
+        is within the limit. Temporary directories left behind by processes that were killed are deleted too.
+        """
+        evicted = []
+        now = time.time()
+
+        with self._lock:
+            entries = self._load_entries()
+            total_size = sum(entries.values())
+
+            for digest, size in list(entries.items()):
+                if total_size <= self.max_size:
+                    break
+
+                if digest in self._in_use or digest in self._pinned:
+                    continue
+
+                last_used = self._get_mtime(self._get_entry_dir(digest))
+                if last_used is None:
+                    # Deleted by another process
+                    del entries[digest]
+                    total_size -= size
+                    continue
+
+                if now - last_used < self._UNUSED_GRACE_PERIOD:
+                    continue
+
+                del entries[digest]
+                total_size -= size
+                evicted.append(digest)
+
+        for digest in evicted:
+            LOG.debug("Deleting decompressed archive %s from the cache", digest)
+            self._delete_dir(self._get_entry_dir(digest))
+
+        self._delete_stale_temp_dirs(now)
+
+    def _delete_dir(self, path):
+        """
+        Renames the directory out of the way before deleting it, so it is gone at once for other processes
+        """
+        temp_dir = os.path.join(self.cache_dir, self._TEMP_DIR_PREFIX + uuid.uuid4().hex)
+        try:
+            os.rename(path, temp_dir)
+        except OSError:
+            LOG.debug("%s was deleted by another process", path)
+            return
+
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _delete_stale_temp_dirs(self, now):
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        for name in os.listdir(self.cache_dir):
+            if not name.startswith(self._TEMP_DIR_PREFIX):
+                continue
+
+            path = os.path.join(self.cache_dir, name)
+            modified = self._get_mtime(path)
+            if modified is not None and now - modified >= self._UNUSED_GRACE_PERIOD:
+                LOG.debug("Deleting %s left behind in the cache", name)
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _get_mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    def _load_entries(self):
+        """
+        Reads the decompressed archives from the cache directory. Must be called with the lock held.
+        """
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = OrderedDict()
+
+        if not os.path.isdir(self.cache_dir):
+            return self._entries
+
+        entry_dirs = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(self._TEMP_DIR_PREFIX) or not os.path.isdir(path):
+                continue
+            entry_dirs.append((os.path.getmtime(path), name, path))
+
+        for _, name, path in sorted(entry_dirs):
+            self._entries[name] = dir_size(path)
+
+        return self._entries
+
+    def _get_entry_dir(self, digest):
+        return os.path.join(self.cache_dir, digest)
@@ -0,0 +1,252 @@
+"""
+Limits the number of Lambda functions running at the same time
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from samcli.local.lambdafn.exceptions import ConcurrencyLimitExceeded
+
+LOG = logging.getLogger(__name__)
+
+
+class _Waiter(object):
+
+    def __init__(self, function_name, on_acquired):
+        self.function_name = function_name
+        self.on_acquired = on_acquired
+        self.queued_at = time.time()
+
+
+class ConcurrencyLimiter(object):
+    """
+    Limits the number of invokes running at the same time, across all functions and for each function. Invokes above
+    the limits wait in a FIFO queue. An invoke waits only for the invokes queued before it that can run at the same
+    time, so a function at its own limit doesn't hold up invokes of other functions. When the queue is full, invokes
+    are throttled the way Lambda throttles them, by raising ``ConcurrencyLimitExceeded``. Invokes of functions with a
+    limit of 0 are always throttled, like Lambda throttles functions whose ReservedConcurrentExecutions is 0.
+
+    This is thread-safe.
+    """
+
+    DEFAULT_MAX_QUEUED_INVOKES = 100
+
+    def __init__(self, max_concurrency=None, function_concurrency=None, max_queued=DEFAULT_MAX_QUEUED_INVOKES):
+        """
+        Parameters
+        ----------
+        max_concurrency int
+            Optional. Maximum number of invokes running at the same time, across all functions. None, for no limit
+        function_concurrency dict(str, int)
+            Optional. Maximum number of invokes running at the same time for each function, like their
+            ReservedConcurrentExecutions. Functions that are not in the dictionary are limited by ``max_concurrency``
+            only
+        max_queued int
+            Optional. Maximum number of invokes waiting to run. 0 throttles invokes as soon as they reach a limit.
+            Defaults to 100
+        """
+        self.max_concurrency = max_concurrency
+        self.function_concurrency = function_concurrency or {}
+        self.max_queued = max_queued
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._running_by_function = {}
+        self._waiters = deque()
+
+        # Metrics
+        self._throttled = 0
+        self._waited = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._max_queue_depth = 0
+
+    @contextmanager
+    def limit(self, function_name):
+        """
+        Context manager that waits for the function to be allowed to run, and lets the next invoke run on exit
+
+        Parameters
+        ----------
+        function_name str
+            Name of the function to invoke
+
+        Raises
+        ------
+        samcli.local.lambdafn.exceptions.ConcurrencyLimitExceeded
+            When the invoke is throttled
+        """
+        acquired = threading.Event()
+        waiter = self._acquire(function_name, acquired.set)
+
+        try:
+            # NOTE: BLOCKING CALL
+            # Event.wait without a timeout can't be interrupted by Ctrl+C on Python 2
+            while not acquired.wait(1):
+                pass
+        except BaseException:
+            if not self._cancel(waiter):
+                self.release(function_name)
+            raise
+
+        try:
+            yield
+        finally:
+            self.release(function_name)
+
+    def acquire_async(self, function_name, on_acquired):
+        """
+        Calls ``on_acquired()`` once the function is allowed to run, without blocking. If it can run right away, this
+        is called on the calling thread. Otherwise it is called on the thread that releases the invoke it waited for.
+        Call ``release`` once the invoke completes.
+
+        Parameters
+        ----------
+        function_name str
+            Name of the function to invoke
+        on_acquired
+            Function to call, without arguments, when the function can run
+
+        Raises
+        ------
+        samcli.local.lambdafn.exceptions.ConcurrencyLimitExceeded
+            When the invoke is throttled
+        """
+        self._acquire(function_name, on_acquired)
+
+    def _acquire(self, function_name, on_acquired):
+        """
+        Implementation of ``acquire_async``
+
+        :return _Waiter: The queued waiter. None, if the function was allowed to run right away
+        """
+        waiter = None
+
+        with self._lock:
+            # Queued invokes are all waiting for a limit that this invoke would also wait for, if it can't run now
+            run_now = self._can_run(function_name)
+
+            if run_now:
+                self._start(function_name)
+            elif self._is_disabled(function_name):
+                # Waiting is pointless, the function would never be allowed to run
+                self._throttled += 1
+                LOG.info("Invoke of function '%s' was throttled. Its concurrency limit is 0", function_name)
+                raise ConcurrencyLimitExceeded("Rate Exceeded.")
+            elif len(self._waiters) >= self.max_queued:
+                self._throttled += 1
+                LOG.info("Invoke of function '%s' was throttled. %d invoke(s) are waiting to run",
+                         function_name, len(self._waiters))
+                raise ConcurrencyLimitExceeded("Rate Exceeded.")
+            else:
+                waiter = _Waiter(function_name, on_acquired)
+                self._waiters.append(waiter)
+                self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+                LOG.debug("Invoke of function '%s' is waiting to run. %d invoke(s) are waiting",
+                          function_name, len(self._waiters))
+
+        if run_now:
+            on_acquired()
+
+        return waiter
+
+    def _cancel(self, waiter):
+        """
+        Removes the waiter from the queue
+
+        :return bool: True, if the waiter was still queued. False, if it was allowed to run already
+        """
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                return True
+        return False
+
+    def release(self, function_name):
+        """
+        Records that an invoke of the function completed, and lets the invokes that were waiting for it run
+
+        Parameters
+        ----------
+        function_name str
+            Name of the function that completed
+        """
+        with self._lock:
+            self._running -= 1
+            self._running_by_function[function_name] -= 1
+
+            ready = self._pop_ready_waiters()
+
+        for waiter in ready:
+            waiter.on_acquired()
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict
+            Number of running invokes, number of queued invokes overall and for each function, the largest queue
+            depth seen, number of invokes that waited and that were throttled, and the total, average and maximum time
+            invokes waited in the queue, in seconds
+        """
+        with self._lock:
+            queued_by_function = {}
+            for waiter in self._waiters:
+                queued_by_function[waiter.function_name] = queued_by_function.get(waiter.function_name, 0) + 1
+
+            return {
+                "running": self._running,
+                "queued": len(self._waiters),
+                "queued_by_function": queued_by_function,
+                "max_queue_depth": self._max_queue_depth,
+                "waited": self._waited,
+                "throttled": self._throttled,
+                "total_wait_time": self._total_wait_time,
+                "average_wait_time": self._total_wait_time / self._waited if self._waited else 0.0,
+                "max_wait_time": self._max_wait_time
+            }
+
+    def _can_run(self, function_name):
+        if self.max_concurrency is not None and self._running >= self.max_concurrency:
+            return False
+
+        function_limit = self.function_concurrency.get(function_name)
+        return function_limit is None or self._running_by_function.get(function_name, 0) < function_limit
+
+    def _is_disabled(self, function_name):
+        return self.max_concurrency == 0 or self.function_concurrency.get(function_name) == 0
+
+    def _start(self, function_name):
+        self._running += 1
+        self._running_by_function[function_name] = self._running_by_function.get(function_name, 0) + 1
+
+    def _pop_ready_waiters(self):
+        """
+        Removes the waiters that can run now from the queue, in FIFO order, and records how long they waited. Must be
+        called with the lock held.
+        """
+        ready = []
+        now = time.time()
+
+        for waiter in list(self._waiters):
+            if self.max_concurrency is not None and self._running >= self.max_concurrency:
+                break
+
+            if not self._can_run(waiter.function_name):
+                continue
+
+            self._waiters.remove(waiter)
+            self._start(waiter.function_name)
+
+            wait_time = now - waiter.queued_at
+            self._waited += 1
+            self._total_wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+            LOG.debug("Invoke of function '%s' waited %.3f seconds to run", waiter.function_name, wait_time)
+
+            ready.append(waiter)
+
+        return ready
@@ -8,3 +8,10 @@ class FunctionNotFound(Exception):
     Raised when the requested Lambda function is not found
     """
     pass
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """
+    Raised when an invoke is throttled because too many invokes are running or waiting to run
+    """
+    pass
@@ -9,7 +9,9 @@ import signal
 import logging
 import threading
 from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
 
+from samcli.lib.utils.scheduler import Scheduler
 from samcli.local.docker.lambda_container import LambdaContainer
 from .zip import unzip
 
@@ -25,7 +27,10 @@ class LambdaRuntime(object):
 
     SUPPORTED_ARCHIVE_EXTENSIONS = (".zip", ".jar", ".ZIP", ".JAR")
 
-    def __init__(self, container_manager, image_builder):
+    # Number of threads that run the blocking parts of ``invoke_async``
+    MAX_ASYNC_WORKERS = 32
+
+    def __init__(self, container_manager, image_builder, archive_cache=None):
         """
         Initialize the Local Lambda runtime
 
@@ -35,9 +40,16 @@ class LambdaRuntime(object):
             Instance of the ContainerManager class that can run a local Docker container
         image_builder samcli.local.docker.lambda_image.LambdaImage
             Instance of the LambdaImage class that can create am image
+        archive_cache samcli.local.lambdafn.archive_cache.ArchiveCache
+            Optional. Cache of decompressed code archives. When not given, archives are decompressed into a temporary
+            directory on every invoke
         """
         self._container_manager = container_manager
         self._image_builder = image_builder
+        self._archive_cache = archive_cache
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
 
     def invoke(self,
                function_config,
@@ -115,6 +127,49 @@ class LambdaRuntime(object):
                     timer.cancel()
                 self._container_manager.stop(container)
 
+    def invoke_async(self,
+                     function_config,
+                     event,
+                     debug_context=None,
+                     stdout=None,
+                     stderr=None):
+        """
+        Invoke the given Lambda function locally without blocking. Returns a future that completes when the function
+        completes or times out, after its output was written to the given streams. On Python 3 the future can be
+        awaited from a coroutine with ``asyncio.wrap_future``.
+
+        Containers started for a single invoke stream their output over a blocking attach socket, so each of these
+        invokes holds one of ``MAX_ASYNC_WORKERS`` threads while it runs. Invokes above that wait for a thread.
+        Debugging sessions run on the calling thread, because only the main thread can handle Ctrl+C.
+
+        :param FunctionConfig function_config: Configuration of the function to invoke
+        :param event: String input event passed to Lambda function
+        :param DebugContext debug_context: Debugging context for the function (includes port, args, and path)
+        :param io.IOBase stdout: Optional. IO Stream to that receives stdout text from container.
+        :param io.IOBase stderr: Optional. IO Stream that receives stderr text from container
+        :return concurrent.futures.Future: Future with a result of None, or the exception that failed the invoke
+        """
+        if debug_context:
+            future = Future()
+            future.set_running_or_notify_cancel()
+            try:
+                self.invoke(function_config, event, debug_context=debug_context, stdout=stdout, stderr=stderr)
+                future.set_result(None)
+            except Exception as ex:  # pylint: disable=broad-except
+                future.set_exception(ex)
+            return future
+
+        return self._get_executor().submit(self.invoke, function_config, event, stdout=stdout, stderr=stderr)
+
+    def _get_executor(self):
+        """
+        :return concurrent.futures.ThreadPoolExecutor: Pool that runs the blocking parts of asynchronous invokes
+        """
+        with self._executor_lock:
+            if not self._executor:
+                self._executor = ThreadPoolExecutor(max_workers=self.MAX_ASYNC_WORKERS)
+            return self._executor
+
     def _configure_interrupt(self, function_name, timeout, container, is_debugging):
         """
         When a Lambda function is executing, we setup certain interrupt handlers to stop the execution.
@@ -155,7 +210,8 @@ class LambdaRuntime(object):
         be mounted directly inside the Docker container.
 
         This method handles a few different cases for ``code_path``:
-            - ``code_path``is a existent zip/jar file: Unzip in a temp directory and return the temp directory
+            - ``code_path``is a existent zip/jar file: Unzip in a temp directory and return the temp directory. When
+                there is an archive cache, return the directory of the archive in the cache instead
             - ``code_path`` is a existent directory: Return this immediately
             - ``code_path`` is a file/dir that does not exist: Return it as is. May be this method is not clever to
                 detect the existence of the path
@@ -168,7 +224,12 @@ class LambdaRuntime(object):
         decompressed_dir = None
 
         try:
-            if os.path.isfile(code_path) and code_path.endswith(self.SUPPORTED_ARCHIVE_EXTENSIONS):
+            if self._is_archive(code_path) and self._archive_cache:
+
+                with self._archive_cache.extracted(code_path) as cached_dir:
+                    yield cached_dir
+
+            elif self._is_archive(code_path):
 
                 decompressed_dir = _unzip_file(code_path)
                 yield decompressed_dir
@@ -180,6 +241,296 @@ class LambdaRuntime(object):
             if decompressed_dir:
                 shutil.rmtree(decompressed_dir)
 
+    def _is_archive(self, code_path):
+        """
+        Is the code a zip/jar archive that must be decompressed before it can be mounted in the container?
+
+        :param string code_path: Path to the code
+        :return bool: True, if the code is an archive
+        """
+        return os.path.isfile(code_path) and code_path.endswith(self.SUPPORTED_ARCHIVE_EXTENSIONS)
+
+
+class WarmLambdaRuntime(LambdaRuntime):
+    """
+    Local Lambda runtime that keeps containers running after an invocation completes and reuses them for subsequent
+    invocations of the same function, ie. of functions with the same runtime, code, layers, memory, handler and
+    environment variables. This saves the cost of creating, starting and deleting a container on every invoke.
+
+    Warm containers are owned by the container manager. Call ``ContainerManager.shutdown`` to delete them.
+
+    Functions whose code is an archive use warm containers when there is an archive cache. The decompressed archive is
+    pinned in the cache, so it stays mounted in the containers for as long as they run. Without an archive cache,
+    archives are decompressed to a temporary directory that is deleted after every invoke, so these functions always
+    run in a new container.
+
+    When a Runtime API is given, functions whose runtime supports it run in a persistent runtime loop. The bootstrap
+    of the function starts once per container and takes every event from the Runtime API, so the cost of starting the
+    runtime and importing the function code is paid once per container instead of once per invoke. Functions of other
+    runtimes start the runtime again on every invoke, within the warm container.
+    """
+
+    _FUNCTION_ARN_FORMAT = "arn:aws:lambda:{region}:123456789012:function:{name}"
+
+    def __init__(self, container_manager, image_builder, runtime_api=None, archive_cache=None):
+        """
+        Initialize the warm Lambda runtime
+
+        Parameters
+        ----------
+        container_manager samcli.local.docker.manager.ContainerManager
+            Instance of the ContainerManager class that can run a local Docker container
+        image_builder samcli.local.docker.lambda_image.LambdaImage
+            Instance of the LambdaImage class that can create am image
+        runtime_api samcli.local.runtime_api.local_runtime_api_service.LocalRuntimeApiService
+            Optional. Running Runtime API service that serves events to persistent runtime loops
+        archive_cache samcli.local.lambdafn.archive_cache.ArchiveCache
+            Optional. Cache of decompressed code archives
+        """
+        super(WarmLambdaRuntime, self).__init__(container_manager, image_builder, archive_cache=archive_cache)
+        self._runtime_api = runtime_api
+
+        # Enforces the timeouts of asynchronous invokes, on one thread for all of them
+        self._timeouts = Scheduler()
+
+    def invoke(self,
+               function_config,
+               event,
+               debug_context=None,
+               stdout=None,
+               stderr=None):
+        """
+        Invoke the given Lambda function locally in a warm container. See ``LambdaRuntime.invoke`` for details.
+
+        Debugging sessions always run in a new container, and so do functions whose code is an archive when there is
+        no archive cache.
+
+        :param FunctionConfig function_config: Configuration of the function to invoke
+        :param event: String input event passed to Lambda function
+        :param DebugContext debug_context: Debugging context for the function (includes port, args, and path)
+        :param io.IOBase stdout: Optional. IO Stream to that receives stdout text from container.
+        :param io.IOBase stderr: Optional. IO Stream that receives stderr text from container
+        """
+
+        if debug_context or not self._can_stay_mounted(function_config.code_abs_path):
+            return super(WarmLambdaRuntime, self).invoke(function_config,
+                                                         event,
+                                                         debug_context=debug_context,
+                                                         stdout=stdout,
+                                                         stderr=stderr)
+
+        timer = None
+
+        container, env_vars = self._create_container(function_config, event)
+        use_runtime_api = self._uses_runtime_api(function_config)
+
+        # Whether the container is in a good state to serve another request after this one
+        reusable = False
+
+        try:
+            # Returns immediately with either a running warm container or a newly started one
+            container = self._container_manager.run(container, warm=True)
+
+            timer = self._configure_interrupt(function_config.name,
+                                              function_config.timeout,
+                                              container,
+                                              False)
+
+            # NOTE: BLOCKING METHOD
+            # Returns after the function completes, or after the container is killed by the timer above
+            if use_runtime_api:
+                function_arn = self._FUNCTION_ARN_FORMAT.format(region=env_vars.get("AWS_REGION"),
+                                                                name=function_config.name)
+                container.process_event(event, function_arn, function_config.timeout, stdout=stdout, stderr=stderr)
+            else:
+                container.invoke(env_vars=env_vars, stdout=stdout, stderr=stderr)
+
+            reusable = True
+
+        except KeyboardInterrupt:
+            LOG.debug("Ctrl+C was pressed. Aborting Lambda execution")
+
+        finally:
+            if timer:
+                timer.cancel()
+
+            if reusable:
+                # If the function timed out, the container was already stopped and the manager knows not to reuse it
+                self._container_manager.release(container)
+            else:
+                self._container_manager.stop(container)
+
+    def invoke_async(self,
+                     function_config,
+                     event,
+                     debug_context=None,
+                     stdout=None,
+                     stderr=None):
+        """
+        Invoke the given Lambda function locally in a warm container without blocking. See
+        ``LambdaRuntime.invoke_async`` for details.
+
+        Functions that run in a persistent runtime loop don't hold a thread while they run. A thread only acquires the
+        container and hands the event to the Runtime API. The future completes when the runtime posts the result back,
+        or when the container is stopped because the function timed out.
+
+        :param FunctionConfig function_config: Configuration of the function to invoke
+        :param event: String input event passed to Lambda function
+        :param DebugContext debug_context: Debugging context for the function (includes port, args, and path)
+        :param io.IOBase stdout: Optional. IO Stream to that receives stdout text from container.
+        :param io.IOBase stderr: Optional. IO Stream that receives stderr text from container
+        :return concurrent.futures.Future: Future with a result of None, or the exception that failed the invoke
+        """
+        if debug_context or not self._can_stay_mounted(function_config.code_abs_path) \
+                or not self._uses_runtime_api(function_config):
+            return super(WarmLambdaRuntime, self).invoke_async(function_config,
+                                                               event,
+                                                               debug_context=debug_context,
+                                                               stdout=stdout,
+                                                               stderr=stderr)
+
+        future = Future()
+        self._get_executor().submit(self._submit_event, future, function_config, event, stdout, stderr)
+        return future
+
+    def _submit_event(self, future, function_config, event, stdout, stderr):
+        """
+        Acquires a warm container for the function and hands the event to its runtime loop. Returns without waiting
+        for the function to complete. The future completes when it does.
+
+        :param concurrent.futures.Future future: Future of the invoke
+        :param FunctionConfig function_config: Configuration of the function to invoke
+        :param event: String input event passed to Lambda function
+        :param io.IOBase stdout: IO Stream to that receives stdout text from container.
+        :param io.IOBase stderr: IO Stream that receives stderr text from container
+        """
+        if not future.set_running_or_notify_cancel():
+            return
+
+        container = None
+        timer = None
+
+        def on_done(invocation):  # pylint: disable=unused-argument
+            timer.cancel()
+            # If the function timed out, the container was already stopped and the manager knows not to reuse it
+            self._container_manager.release(container)
+            future.set_result(None)
+
+        try:
+            container, env_vars = self._create_container(function_config, event)
+            container = self._container_manager.run(container, warm=True)
+
+            timer = self._timeouts.call_later(function_config.timeout,
+                                              self._stop_timed_out_container,
+                                              function_config.name,
+                                              function_config.timeout,
+                                              container)
+
+            function_arn = self._FUNCTION_ARN_FORMAT.format(region=env_vars.get("AWS_REGION"),
+                                                            name=function_config.name)
+            container.submit_event(event, function_arn, function_config.timeout, stdout=stdout, stderr=stderr,
+                                   callback=on_done)
+
+        except Exception as ex:  # pylint: disable=broad-except
+            if timer:
+                timer.cancel()
+            if container:
+                self._container_manager.stop(container)
+            future.set_exception(ex)
+
+    def _stop_timed_out_container(self, function_name, timeout, container):
+        LOG.info("Function '%s' timed out after %d seconds", function_name, timeout)
+
+        # Runs on the thread of the scheduler, which must not block. Stopping the container fails the invocation
+        self._get_executor().submit(self._container_manager.stop, container)
+
+    def prewarm(self, function_configs, count):
+        """
+        Starts idle warm containers for the given functions, so they are ready to serve the first invokes. Functions
+        whose code is an archive are skipped when there is no archive cache, since they can't use warm containers.
+
+        ##### NOTE: THIS IS A LONG BLOCKING CALL #####
+        This method will block until all the containers are started.
+
+        :param list(FunctionConfig) function_configs: Configuration of the functions to start containers for
+        :param int count: Number of containers to start for every function
+        """
+        containers = []
+        for function_config in function_configs:
+            if not self._can_stay_mounted(function_config.code_abs_path):
+                LOG.debug("Not pre-warming containers for function '%s' because its code is an archive and there is "
+                          "no archive cache", function_config.name)
+                continue
+
+            # Creating the container object resolves its image, building it if necessary. Do this sequentially
+            # because containers of the same function share the image
+            containers.extend(self._create_container(function_config)[0] for _ in range(count))
+
+        started = self._container_manager.prewarm(containers)
+        LOG.info("Pre-warmed %d container(s)", started)
+
+    def _create_container(self, function_config, event=None):
+        """
+        Creates a warm container for the function. The container is not started.
+
+        :param FunctionConfig function_config: Configuration of the function
+        :param event: Optional. String input event of the invoke this container is created for
+        :return tuple(LambdaContainer, dict): The container, and the environment variables of the invoke
+        """
+        environ = function_config.env_vars
+        code_dir = self._get_mounted_code_dir(function_config.code_abs_path)
+
+        if self._uses_runtime_api(function_config):
+            # Events are passed through the Runtime API
+            env_vars = environ.resolve()
+            container = LambdaContainer(function_config.runtime,
+                                        function_config.handler,
+                                        code_dir,
+                                        function_config.layers,
+                                        self._image_builder,
+                                        memory_mb=function_config.memory,
+                                        env_vars=env_vars,
+                                        runtime_api=self._runtime_api)
+            return container, env_vars
+
+        if event is not None:
+            environ.add_lambda_event_body(event)
+        env_vars = environ.resolve()
+
+        container = LambdaContainer(function_config.runtime,
+                                    function_config.handler,
+                                    code_dir,
+                                    function_config.layers,
+                                    self._image_builder,
+                                    memory_mb=function_config.memory,
+                                    env_vars=env_vars,
+                                    warm=True)
+        return container, env_vars
+
+    def _can_stay_mounted(self, code_path):
+        """
+        :param string code_path: Path to the code of the function
+        :return bool: True, if the code can stay mounted in a warm container after an invoke
+        """
+        return bool(self._archive_cache) or not self._is_archive(code_path)
+
+    def _get_mounted_code_dir(self, code_path):
+        """
+        :param string code_path: Path to the code of the function
+        :return string: Directory with the code of the function, which can stay mounted in a warm container
+        """
+        if self._is_archive(code_path):
+            return self._archive_cache.pin(code_path)
+
+        return code_path
+
+    def _uses_runtime_api(self, function_config):
+        """
+        :param FunctionConfig function_config: Configuration of the function
+        :return bool: True, if the function runs in a persistent runtime loop that takes events from the Runtime API
+        """
+        return bool(self._runtime_api) and function_config.runtime in LambdaContainer.RUNTIME_API_RUNTIMES
+
 
 def _unzip_file(filepath):
     """
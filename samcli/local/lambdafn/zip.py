@@ -3,9 +3,15 @@ Helper methods to unzip an archive preserving the file permissions. Python's zip
 this feature natively (https://bugs.python.org/issue15795).
 """
 
+import io
 import os
+import base64
+import hashlib
+import shutil
 import zipfile
 import logging
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 
 import requests
 
@@ -19,8 +25,19 @@ except ImportError:
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of threads that extract files of one archive in parallel
+MAX_UNZIP_WORKERS = 8
 
-def unzip(zip_file_path, output_dir, permission=None):
+# Zip files up to this size are downloaded into memory and extracted from there, instead of landing on disk first
+MAX_IN_MEMORY_ZIP_SIZE = 100 * 1024 * 1024
+
+# Threads are only worth starting for archives with many files
+_MIN_FILES_PER_WORKER = 32
+
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def unzip(zip_file_path, output_dir, permission=None, workers=None):
     """
     Unzip the given file into the given directory while preserving file permissions in the process.
 
@@ -34,23 +51,141 @@ def unzip(zip_file_path, output_dir, permission=None):
 
     permission : octal int
         Permission to set
+
+    workers : int
+        Maximum number of threads that extract files in parallel. Defaults to the number of CPUs, up to 8
+    """
+
+    _extract(lambda: zipfile.ZipFile(zip_file_path, 'r'), output_dir, permission, workers)
+
+
+def _unzip_bytes(data, output_dir, permission=None, workers=None):
+    """
+    Unzip the zip file held in memory into the given directory. Same as ``unzip``, for a zip file that was never
+    written to disk.
+
+    Parameters
+    ----------
+    data : bytes
+        Content of the zip file
     """
 
-    with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+    _extract(lambda: zipfile.ZipFile(io.BytesIO(data), 'r'), output_dir, permission, workers)
 
-        # For each item in the zip file, extract the file and set permissions if available
-        for file_info in zip_ref.infolist():
-            name = file_info.filename
-            extracted_path = os.path.join(output_dir, name)
 
-            zip_ref.extract(name, output_dir)
-            _set_permissions(file_info, extracted_path)
+def _extract(open_zip, output_dir, permission, workers):
+    """
+    Extracts every member of a zip file. All directories are created first, in one pass. Files are then partitioned
+    by size across a pool of threads, each reading from its own handle on the zip file. Permissions are applied last,
+    once all files are written, so a read-only directory does not prevent its files from being extracted.
 
-            _override_permissions(extracted_path, permission)
+    Parameters
+    ----------
+    open_zip : callable
+        Returns a new ``zipfile.ZipFile`` every time it is called
+    """
+
+    with open_zip() as zip_ref:
+        members = [(file_info, _get_extract_path(output_dir, file_info.filename))
+                   for file_info in zip_ref.infolist()]
+
+    # Skip members whose name has nothing left once made safe, like "../"
+    members = [(file_info, path) for file_info, path in members if path]
+
+    directories = set()
+    files = []
+    for file_info, path in members:
+        if file_info.filename.endswith('/'):
+            directories.add(path)
+        else:
+            directories.add(os.path.dirname(path))
+            files.append((file_info, path))
+
+    for directory in sorted(directories):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    partitions = _partition(files, _get_worker_count(len(files), workers))
+
+    if len(partitions) > 1:
+        pool = ThreadPool(len(partitions))
+        try:
+            pool.map(lambda partition: _extract_files(open_zip, partition), partitions)
+        finally:
+            pool.close()
+            pool.join()
+    elif partitions:
+        _extract_files(open_zip, partitions[0])
+
+    # Files first, then directories from the deepest one up
+    for file_info, path in files + sorted([member for member in members if member[0].filename.endswith('/')],
+                                          key=lambda member: len(member[1]),
+                                          reverse=True):
+        _set_permissions(file_info, path)
+        _override_permissions(path, permission)
 
     _override_permissions(output_dir, permission)
 
 
+def _extract_files(open_zip, files):
+    """
+    Writes the given members of the zip file to their paths. Directories must already exist.
+    """
+    with open_zip() as zip_ref:
+        for file_info, path in files:
+            with zip_ref.open(file_info) as source, open(path, 'wb') as target:
+                shutil.copyfileobj(source, target, _COPY_BUFFER_SIZE)
+
+
+def _get_worker_count(file_count, workers):
+    """
+    Number of threads worth starting to extract the given number of files. Small archives are extracted by the
+    calling thread.
+    """
+    if workers is None:
+        workers = min(MAX_UNZIP_WORKERS, multiprocessing.cpu_count())
+
+    return max(1, min(workers, file_count // _MIN_FILES_PER_WORKER))
+
+
+def _partition(files, count):
+    """
+    Splits the files into at most ``count`` lists with roughly the same total uncompressed size
+    """
+    partitions = [[] for _ in range(count)]
+    sizes = [0] * count
+
+    for file_info, path in sorted(files, key=lambda member: member[0].file_size, reverse=True):
+        smallest = sizes.index(min(sizes))
+        partitions[smallest].append((file_info, path))
+        sizes[smallest] += file_info.file_size
+
+    return [partition for partition in partitions if partition]
+
+
+def _get_extract_path(output_dir, name):
+    """
+    Path that a member of a zip file is extracted to. Absolute paths, drive letters and ".." components are removed
+    from the name, the same way as ``zipfile.ZipFile.extract`` does, so members can't be written outside of the
+    output directory.
+
+    Returns
+    -------
+    str
+        Path within the output directory. None, if nothing is left of the name
+    """
+    name = name.replace('/', os.path.sep)
+    if os.path.altsep:
+        name = name.replace(os.path.altsep, os.path.sep)
+
+    name = os.path.splitdrive(name)[1]
+    parts = [part for part in name.split(os.path.sep) if part not in ('', os.path.curdir, os.path.pardir)]
+    if not parts:
+        return None
+
+    return os.path.join(output_dir, *parts)
+
+
 def _override_permissions(path, permission):
     """
     Forcefully override the permissions on the path
@@ -91,40 +226,87 @@ def _set_permissions(zip_file_info, extracted_path):
     os.chmod(extracted_path, permission)
 
 
-def unzip_from_uri(uri, layer_zip_path, unzip_output_dir, progressbar_label):
+def unzip_from_uri(uri, layer_zip_path, unzip_output_dir, progressbar_label, progress_callback=None):
     """
-    Download the LayerVersion Zip to the Layer Pkg Cache
+    Download the LayerVersion Zip and unzip it into the Layer Pkg Cache. Zips up to ``MAX_IN_MEMORY_ZIP_SIZE`` are
+    kept in memory while downloading and extracted from there. Larger ones are downloaded to ``layer_zip_path`` first.
 
     Parameters
     ----------
     uri str
         Uri to download from
     layer_zip_path str
-        Path to where the content from the uri should be downloaded to
+        Path to where the content from the uri should be downloaded to, when it is too large to be kept in memory
     unzip_output_dir str
         Path to unzip the zip to
     progressbar_label str
         Label to use in the Progressbar
+    progress_callback callable
+        Optional. Called with the number of bytes downloaded so far and the total number of bytes, every time more
+        data is downloaded. When given, no progressbar is shown
+
+    Returns
+    -------
+    str
+        Base64 encoded SHA256 digest of the downloaded zip, in the same format as the CodeSha256 of AWS Lambda
     """
+    sha256 = hashlib.sha256()
+
     try:
         get_request = requests.get(uri, stream=True)
+        file_length = int(get_request.headers['Content-length'])
+        in_memory = file_length <= MAX_IN_MEMORY_ZIP_SIZE
+
+        with (io.BytesIO() if in_memory else open(layer_zip_path, 'wb')) as local_layer_file:
 
-        with open(layer_zip_path, 'wb') as local_layer_file:
-            file_length = int(get_request.headers['Content-length'])
+            if progress_callback:
+                download_progress = _CallbackProgress(file_length, progress_callback)
+            else:
+                download_progress = progressbar(file_length, progressbar_label)
 
-            with progressbar(file_length, progressbar_label) as p_bar:
+            with download_progress as p_bar:
                 # Set the chunk size to None. Since we are streaming the request, None will allow the data to be
                 # read as it arrives in whatever size the chunks are received.
                 for data in get_request.iter_content(chunk_size=None):
                     local_layer_file.write(data)
+                    sha256.update(data)
                     p_bar.update(len(data))
 
+            layer_zip_data = local_layer_file.getvalue() if in_memory else None
+
         # Forcefully set the permissions to 700 on files and directories. This is to ensure the owner
         # of the files is the only one that can read, write, or execute the files.
-        unzip(layer_zip_path, unzip_output_dir, permission=0o700)
+        if in_memory:
+            _unzip_bytes(layer_zip_data, unzip_output_dir, permission=0o700)
+        else:
+            unzip(layer_zip_path, unzip_output_dir, permission=0o700)
+
+        return base64.b64encode(sha256.digest()).decode('utf-8')
 
     finally:
         # Remove the downloaded zip file
         path_to_layer = Path(layer_zip_path)
         if path_to_layer.exists():
             path_to_layer.unlink()
+
+
+class _CallbackProgress(object):
+    """
+    Reports download progress to a callback instead of a progressbar. Has the same interface as a progressbar.
+    """
+
+    def __init__(self, length, callback):
+        self._length = length
+        self._callback = callback
+        self._position = 0
+
+    def __enter__(self):
+        self._callback(self._position, self._length)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def update(self, n_steps):
+        self._position += n_steps
+        self._callback(self._position, self._length)
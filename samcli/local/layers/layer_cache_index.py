@@ -0,0 +1,329 @@
+"""
+Index of the layers downloaded into the layer cache
+"""
+
+import os
+import json
+import errno
+import time
+import shutil
+import logging
+import tempfile
+import threading
+
+from samcli.lib.utils.osutils import dir_size
+
+LOG = logging.getLogger(__name__)
+
+
+class LayerCacheIndex(object):
+    """
+    Keeps track of the layers in the layer cache directory. Every layer is extracted into a temporary directory first,
+    then renamed into place, and finally recorded in a metadata file next to the layer directory. The metadata holds
+    the CodeSha256 and CodeSize of the layer version and the size of the extracted layer. A layer is only considered
+    cached when its metadata file exists, so a partially extracted layer from an interrupted download is never used.
+    While a layer is added, a marker file next to its directory records that the directory belongs to the cache. Only
+    directories with a marker and no metadata are deleted as incomplete, so other directories in the cache directory
+    are left alone. Layers cached by earlier versions have neither, and are adopted the first time they are used.
+    Temporary directories and archives left behind by processes that were killed are deleted once they are too old
+    to still be in use.
+
+    When the total size of the cached layers goes above the limit, the least recently used ones are deleted. Layers
+    used by this process are never deleted.
+
+    This is thread-safe.
+    """
+
+    DEFAULT_MAX_SIZE_MB = 5120
+
+    _METADATA_SUFFIX = ".metadata.json"
+    _INCOMPLETE_SUFFIX = ".incomplete"
+    _TEMP_PREFIX = ".tmp-"
+
+    # Layers without metadata that were modified more recently may still be added by another process
+    _INCOMPLETE_LAYER_GRACE_PERIOD = 3600
+
+    def __init__(self, cache_dir, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        """
+        Parameters
+        ----------
+        cache_dir str
+            Layer cache directory
+        max_size_mb int
+            Optional. Maximum total size of the cached layers in megabytes. None, for no limit. Defaults to 5120
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size_mb * 1024 * 1024 if max_size_mb is not None else None
+
+        self._lock = threading.Lock()
+        self._in_use = set()
+
+    def is_cached(self, name):
+        """
+        Is the layer completely extracted in the cache? A layer cached by an earlier version, which did not record
+        metadata, is adopted by recording its metadata now.
+
+        Parameters
+        ----------
+        name str
+            Name of the layer, which is the name of its directory in the cache
+
+        Returns
+        -------
+        bool
+            True, if the layer is cached
+        """
+        if not os.path.isdir(self._get_layer_dir(name)):
+            return False
+
+        if os.path.isfile(self._get_metadata_path(name)):
+            return True
+
+        if self._is_incomplete(name):
+            return False
+
+        LOG.debug("Adopting layer %s cached by an earlier version", name)
+        self._write_metadata(name, {"size": dir_size(self._get_layer_dir(name))})
+        return True
+
+    def get_metadata(self, name):
+        """
+        Parameters
+        ----------
+        name str
+            Name of the layer
+
+        Returns
+        -------
+        dict
+            Metadata recorded when the layer was added. None, if the layer is not cached
+        """
+        try:
+            with open(self._get_metadata_path(name), "r") as metadata_file:
+                return json.load(metadata_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def mark_used(self, name):
+        """
+        Marks the layer as the most recently used one and protects it from eviction for the lifetime of this object
+
+        Parameters
+        ----------
+        name str
+            Name of the layer
+        """
+        with self._lock:
+            self._in_use.add(name)
+
+        try:
+            # Modification time of the directory records when the layer was last used, for the next processes
+            os.utime(self._get_layer_dir(name), None)
+        except OSError:
+            LOG.debug("Layer %s is not in the cache", name)
+
+    def create_temp_dir(self, name):
+        """
+        Creates a directory within the cache to extract the layer into, before adding it. Extracting on the same file
+        system as the cache makes adding the layer a cheap rename.
+
+        Parameters
+        ----------
+        name str
+            Name of the layer
+
+        Returns
+        -------
+        str
+            Path to the new directory
+        """
+        try:
+            os.makedirs(self.cache_dir)
+        except OSError as ex:
+            # Layers are downloaded concurrently, and other processes may create the directory too
+            if ex.errno != errno.EEXIST:
+                raise
+
+        return tempfile.mkdtemp(prefix="{}{}-".format(self._TEMP_PREFIX, name), dir=self.cache_dir)
+
+    def add(self, name, extracted_dir, metadata):
+        """
+        Moves the extracted layer into the cache, replacing the cached version of the layer if any, and records its
+        metadata.
+
+        Parameters
+        ----------
+        name str
+            Name of the layer
+        extracted_dir str
+            Directory that the layer was completely extracted into. Must be created with ``create_temp_dir``
+        metadata dict
+            Metadata to record, like the CodeSha256 and CodeSize of the layer version
+        """
+        layer_dir = self._get_layer_dir(name)
+        metadata_path = self._get_metadata_path(name)
+        incomplete_path = self._get_incomplete_path(name)
+
+        # Protect the directory from eviction while it has no metadata yet
+        with self._lock:
+            self._in_use.add(name)
+
+        # Marks the directory as one of the cache, so it is deleted if this process dies before adding the metadata
+        with open(incomplete_path, "w"):
+            pass
+
+        # Remove the metadata first, so the layer is never considered cached while its directory is replaced
+        if os.path.isfile(metadata_path):
+            os.remove(metadata_path)
+        if os.path.isdir(layer_dir):
+            shutil.rmtree(layer_dir)
+
+        try:
+            os.rename(extracted_dir, layer_dir)
+        except OSError:
+            if not os.path.isdir(layer_dir):
+                raise
+            LOG.debug("Layer %s was added to the cache by another process", name)
+            shutil.rmtree(extracted_dir, ignore_errors=True)
+
+        self._write_metadata(name, dict(metadata, size=dir_size(layer_dir)))
+
+        try:
+            os.remove(incomplete_path)
+        except OSError:
+            LOG.debug("Layer %s was also added to the cache by another process", name)
+
+        self.mark_used(name)
+
+    def evict(self):
+        """
+        Deletes the least recently used layers that are not in use by this process, until the total size of the cached
+        layers is within the limit. Directories of layers that were never completely added are always deleted, once
+        they are too old to still be added by another process, and so are temporary directories and archives left
+        behind. Directories that weren't created by the cache are never deleted.
+        """
+        entries = []
+        invalid_dirs = []
+        now = time.time()
+
+        self._delete_stale_temp_files(now)
+
+        for name in self._list_layer_dirs():
+            metadata = self.get_metadata(name)
+            if metadata is None:
+                if self._is_incomplete(name) and \
+                        now - os.path.getmtime(self._get_incomplete_path(name)) > self._INCOMPLETE_LAYER_GRACE_PERIOD:
+                    invalid_dirs.append(name)
+            else:
+                entries.append((os.path.getmtime(self._get_layer_dir(name)), name, metadata.get("size", 0)))
+
+        with self._lock:
+            in_use = set(self._in_use)
+
+        for name in invalid_dirs:
+            if name not in in_use:
+                LOG.debug("Deleting incomplete layer %s from the cache", name)
+                shutil.rmtree(self._get_layer_dir(name), ignore_errors=True)
+                try:
+                    os.remove(self._get_incomplete_path(name))
+                except OSError:
+                    LOG.debug("Incomplete layer %s was deleted by another process", name)
+
+        if self.max_size is None:
+            return
+
+        total_size = sum(size for _, _, size in entries)
+        for _, name, size in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            if name in in_use:
+                continue
+
+            LOG.info("Deleting layer %s from the cache to keep it under %d MB", name, self.max_size // (1024 * 1024))
+            os.remove(self._get_metadata_path(name))
+            shutil.rmtree(self._get_layer_dir(name), ignore_errors=True)
+            total_size -= size
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict
+            Number of cached layers, number of incomplete layers, total size of the cached layers and the maximum total
+            size, in bytes
+        """
+        layers = 0
+        incomplete = 0
+        size = 0
+
+        for name in self._list_layer_dirs():
+            metadata = self.get_metadata(name)
+            if metadata is not None:
+                layers += 1
+                size += metadata.get("size", 0)
+            elif self._is_incomplete(name):
+                incomplete += 1
+
+        return {
+            "entries": layers,
+            "incomplete": incomplete,
+            "size": size,
+            "max_size": self.max_size
+        }
+
+    def _write_metadata(self, name, metadata):
+        metadata_path = self._get_metadata_path(name)
+
+        temp_metadata_path = "{}.{}.{}".format(metadata_path, os.getpid(), threading.current_thread().ident)
+        with open(temp_metadata_path, "w") as metadata_file:
+            json.dump(metadata, metadata_file)
+
+        if os.path.isfile(metadata_path):
+            # Rename can't replace an existing file on Windows
+            os.remove(metadata_path)
+        os.rename(temp_metadata_path, metadata_path)
+
+    def _delete_stale_temp_files(self, now):
+        """
+        Deletes the temporary directories that layers are extracted into, and the archives downloaded next to them,
+        that are too old to still be in use by any process
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        for name in os.listdir(self.cache_dir):
+            if not name.startswith(self._TEMP_PREFIX):
+                continue
+
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if now - os.path.getmtime(path) <= self._INCOMPLETE_LAYER_GRACE_PERIOD:
+                    continue
+
+                LOG.debug("Deleting %s left behind in the cache", name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            except OSError:
+                LOG.debug("%s was deleted by another process", name)
+
+    def _list_layer_dirs(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        return [name for name in os.listdir(self.cache_dir)
+                if not name.startswith(self._TEMP_PREFIX) and os.path.isdir(self._get_layer_dir(name))]
+
+    def _get_layer_dir(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _get_metadata_path(self, name):
+        return os.path.join(self.cache_dir, name + self._METADATA_SUFFIX)
+
+    def _get_incomplete_path(self, name):
+        return os.path.join(self.cache_dir, name + self._INCOMPLETE_SUFFIX)
+
+    def _is_incomplete(self, name):
+        return os.path.isfile(self._get_incomplete_path(name))
@@ -2,14 +2,23 @@
 Downloads Layers locally
 """
 
+import os
+import shutil
 import logging
+import threading
+from functools import partial
+from multiprocessing.pool import ThreadPool
 
 import boto3
+import click
 from botocore.exceptions import NoCredentialsError, ClientError
 
 from samcli.lib.utils.codeuri import resolve_code_path
+from samcli.lib.utils.single_flight import SingleFlight
 from samcli.local.lambdafn.zip import unzip_from_uri
-from samcli.commands.local.cli_common.user_exceptions import CredentialsRequired, ResourceNotFound
+from samcli.commands.local.cli_common.user_exceptions import CredentialsRequired, ResourceNotFound, \
+    InvalidLayerContent
+from .layer_cache_index import LayerCacheIndex
 
 try:
     from pathlib import Path
@@ -22,7 +31,16 @@ LOG = logging.getLogger(__name__)
 
 class LayerDownloader(object):
 
-    def __init__(self, layer_cache, cwd, lambda_client=None):
+    # Number of layers downloaded at the same time in the concurrent download mode
+    DEFAULT_MAX_CONCURRENT_DOWNLOADS = 4
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 layer_cache,
+                 cwd,
+                 lambda_client=None,
+                 max_concurrent_downloads=1,
+                 lambda_endpoint_url=None,
+                 max_cache_size_mb=LayerCacheIndex.DEFAULT_MAX_SIZE_MB):
         """
 
         Parameters
@@ -33,10 +51,24 @@ class LayerDownloader(object):
             Current working directory
         lambda_client boto3.client('lambda')
             Boto3 Client for AWS Lambda
+        max_concurrent_downloads int
+            Maximum number of layers that ``download_all`` downloads at the same time. Defaults to 1, which downloads
+            layers one after the other
+        lambda_endpoint_url str
+            Optional. Url of the AWS Lambda endpoint to fetch layers from, like a local fake of the service. Ignored
+            when a ``lambda_client`` is given
+        max_cache_size_mb int
+            Optional. Maximum total size of the layers in the cache, in megabytes. Least recently used layers are
+            deleted when it is exceeded. None, for no limit. Defaults to 5120
         """
         self._layer_cache = layer_cache
         self.cwd = cwd
-        self.lambda_client = lambda_client or boto3.client('lambda')
+        self.lambda_client = lambda_client or boto3.client('lambda', endpoint_url=lambda_endpoint_url)
+        self._max_concurrent_downloads = max_concurrent_downloads
+        self._cache_index = LayerCacheIndex(layer_cache, max_cache_size_mb)
+
+        # Threads that download the same layer at the same time share one download
+        self._downloads = SingleFlight()
 
     @property
     def layer_cache(self):
@@ -67,15 +99,30 @@ class LayerDownloader(object):
         List(Path)
             List of Paths to where the layer was cached
         """
-        layer_dirs = []
-        for layer in layers:
-            layer_dirs.append(self.download(layer, force))
+        if self._max_concurrent_downloads <= 1 or len(layers) <= 1:
+            layer_dirs = []
+            for layer in layers:
+                layer_dirs.append(self.download(layer, force))
 
-        return layer_dirs
+            return layer_dirs
 
-    def download(self, layer, force=False):
+        progress = _DownloadProgress()
+        pool = ThreadPool(min(self._max_concurrent_downloads, len(layers)))
+        try:
+            # Results are in the same order as the layers
+            return pool.map(lambda layer: self.download(layer,
+                                                        force,
+                                                        progress_callback=partial(progress.update, layer.layer_arn)),
+                            layers)
+        finally:
+            pool.close()
+            pool.join()
+            progress.close()
+
+    def download(self, layer, force=False, progress_callback=None):
         """
-        Download a given layer to the local cache.
+        Download a given layer to the local cache. When another thread is already downloading the same layer, this
+        waits for that download instead of starting another one.
 
         Parameters
         ----------
@@ -83,6 +130,9 @@ class LayerDownloader(object):
             Layer representing the layer to be downloaded.
         force bool
             True to download the layer even if it exists already on the system
+        progress_callback callable
+            Optional. Called with the number of bytes downloaded so far and the total number of bytes, instead of
+            showing a progressbar
 
         Returns
         -------
@@ -99,19 +149,55 @@ class LayerDownloader(object):
         is_layer_downloaded = self._is_layer_cached(layer_path)
         layer.codeuri = str(layer_path)
 
-        if is_layer_downloaded and not force:
+        if is_layer_downloaded and not force and not self._downloads.is_running(layer.name):
             LOG.info("%s is already cached. Skipping download", layer.arn)
+            self._cache_index.mark_used(layer.name)
             return layer
 
-        layer_zip_path = layer.codeuri + '.zip'
-        layer_zip_uri = self._fetch_layer_uri(layer)
-        unzip_from_uri(layer_zip_uri,
-                       layer_zip_path,
-                       unzip_output_dir=layer.codeuri,
-                       progressbar_label='Downloading {}'.format(layer.layer_arn))
+        self._downloads.do(layer.name, self._download_layer, layer, force, progress_callback)
 
         return layer
 
+    def _download_layer(self, layer, force, progress_callback):
+        """
+        Downloads the layer into ``layer.codeuri``, unless it was downloaded while waiting for another download. The
+        layer is extracted into a temporary directory and only added to the cache once its content is verified.
+
+        Raises
+        ------
+        samcli.commands.local.cli_common.user_exceptions.InvalidLayerContent
+            When the content downloaded does not match the CodeSha256 of the layer
+        """
+        if self._is_layer_cached(Path(layer.codeuri)) and not force:
+            LOG.info("%s is already cached. Skipping download", layer.arn)
+            self._cache_index.mark_used(layer.name)
+            return
+
+        layer_content = self._fetch_layer_content(layer)
+        temp_dir = self._cache_index.create_temp_dir(layer.name)
+        try:
+            code_sha256 = unzip_from_uri(layer_content.get("Location"),
+                                         temp_dir + '.zip',
+                                         unzip_output_dir=temp_dir,
+                                         progressbar_label='Downloading {}'.format(layer.layer_arn),
+                                         progress_callback=progress_callback)
+
+            expected_code_sha256 = layer_content.get("CodeSha256")
+            if expected_code_sha256 and code_sha256 != expected_code_sha256:
+                raise InvalidLayerContent("Content downloaded for {} has a SHA256 of {}, but {} was expected. "
+                                          "Please try again.".format(layer.arn, code_sha256, expected_code_sha256))
+
+            self._cache_index.add(layer.name, temp_dir, {
+                "arn": layer.arn,
+                "code_sha256": code_sha256,
+                "code_size": layer_content.get("CodeSize")
+            })
+        finally:
+            if os.path.isdir(temp_dir):
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+        self._cache_index.evict()
+
     def _fetch_layer_uri(self, layer):
         """
         Fetch the Layer Uri based on the LayerVersion Arn
@@ -125,6 +211,22 @@ class LayerDownloader(object):
         -------
         str
             The Uri to download the LayerVersion Content from
+        """
+        return self._fetch_layer_content(layer).get("Location")
+
+    def _fetch_layer_content(self, layer):
+        """
+        Fetch the Content of the LayerVersion based on its Arn
+
+        Parameters
+        ----------
+        layer samcli.commands.local.lib.provider.LayerVersion
+            LayerVersion to fetch
+
+        Returns
+        -------
+        dict
+            Content of the LayerVersion: the Uri to download it from (Location), its CodeSha256 and CodeSize
 
         Raises
         ------
@@ -151,11 +253,12 @@ class LayerDownloader(object):
             # If it was not 'AccessDeniedException' or 'ResourceNotFoundException' re-raise
             raise e
 
-        return layer_version_response.get("Content").get("Location")
+        return layer_version_response.get("Content")
 
     def _is_layer_cached(self, layer_path):
         """
-        Checks if the layer is already cached on the system
+        Checks if the layer is already cached on the system. Layers that were not completely downloaded and extracted
+        are not cached.
 
         Parameters
         ----------
@@ -165,10 +268,10 @@ class LayerDownloader(object):
         Returns
         -------
         bool
-            True if the layer_path already exists otherwise False
+            True if the layer was completely downloaded into layer_path otherwise False
 
         """
-        return layer_path.exists()
+        return self._cache_index.is_cached(layer_path.name)
 
     @staticmethod
     def _create_cache(layer_cache):
@@ -186,3 +289,51 @@ class LayerDownloader(object):
 
         """
         Path(layer_cache).mkdir(mode=0o700, parents=True, exist_ok=True)
+
+
+class _DownloadProgress(object):
+    """
+    Aggregates the progress of layers downloaded at the same time into a single line, because progressbars of
+    concurrent downloads would overwrite each other.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._layers = {}
+        self._shown = False
+
+    def update(self, layer_arn, downloaded, total):
+        """
+        Records the progress of one layer and shows the progress of all layers
+
+        Parameters
+        ----------
+        layer_arn str
+            Arn of the layer
+        downloaded int
+            Number of bytes of the layer downloaded so far
+        total int
+            Size of the layer in bytes
+        """
+        with self._lock:
+            self._layers[layer_arn] = (downloaded, total)
+
+            completed = len([layer for layer in self._layers.values() if layer[0] >= layer[1]])
+            downloaded = sum(layer[0] for layer in self._layers.values())
+            total = sum(layer[1] for layer in self._layers.values())
+
+            click.echo("\rDownloading layers: {}/{} completed, {}/{} KB".format(completed,
+                                                                                len(self._layers),
+                                                                                downloaded // 1024,
+                                                                                total // 1024),
+                       nl=False,
+                       err=True)
+            self._shown = True
+
+    def close(self):
+        """
+        Ends the line of progress, if it was shown
+        """
+        with self._lock:
+            if self._shown:
+                click.echo(err=True)
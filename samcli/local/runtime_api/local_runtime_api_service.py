@@ -0,0 +1,418 @@
+"""
+Local implementation of the Lambda Runtime API. Containers running a persistent runtime loop poll this service for
+events and post the results back, so one container can serve many invocations.
+"""
+
+import json
+import time
+import uuid
+import logging
+import threading
+
+from six.moves import queue
+from flask import Flask, request
+from werkzeug.serving import make_server
+
+from samcli.local.services.base_local_service import BaseLocalService
+
+LOG = logging.getLogger(__name__)
+
+
+class RuntimeApiInvocation(object):
+    """
+    A single event handed to a runtime through the Runtime API. The caller waits on the invocation, or adds a callback
+    to it, until the runtime posts a response or an error back.
+    """
+
+    def __init__(self, event, function_arn, timeout):
+        """
+        Parameters
+        ----------
+        event str
+            Event to pass to the function
+        function_arn str
+            ARN of the function being invoked
+        timeout int
+            Timeout of the function in seconds. Used to compute the deadline given to the runtime
+        """
+        self.request_id = str(uuid.uuid4())
+        self.event = event
+        self.function_arn = function_arn
+        self.deadline_ms = int((time.time() + timeout) * 1000)
+
+        self.response = None
+        self.error = None
+
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def complete(self, response):
+        """
+        Records the response of the function and wakes up the waiter
+        """
+        self._finish(response=response)
+
+    def fail(self, error):
+        """
+        Records an error reported by the runtime and wakes up the waiter
+        """
+        self._finish(error=error)
+
+    def add_done_callback(self, callback):
+        """
+        Calls ``callback(invocation)`` once the invocation completes or fails, on the thread that completes it. When
+        the invocation is done already, the callback is called right away.
+
+        Parameters
+        ----------
+        callback
+            Function to call with this invocation
+        """
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+
+        callback(self)
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the invocation completes or fails
+
+        Returns
+        -------
+        bool
+            True if the invocation is done. False if the timeout expired first
+        """
+        return self._done.wait(timeout)
+
+    def _finish(self, response=None, error=None):
+        with self._lock:
+            if self._done.is_set():
+                return
+
+            self.response = response
+            self.error = error
+            self._done.set()
+
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:  # pylint: disable=broad-except
+                LOG.exception("Failed to handle the result of invocation %s", self.request_id)
+
+
+class _RuntimeApiChannel(object):
+    """
+    Events queued for one container, along with the events that container is currently processing
+    """
+
+    def __init__(self):
+        self.pending = queue.Queue()
+        self.in_flight = {}
+        self.closed = False
+
+    def abort(self, error):
+        """
+        Fails every invocation that is queued or in flight on this channel
+        """
+        aborted = list(self.in_flight.values())
+        self.in_flight.clear()
+
+        while not self.pending.empty():
+            invocation = self.pending.get_nowait()
+            if invocation:
+                aborted.append(invocation)
+
+        for invocation in aborted:
+            invocation.fail(error)
+
+
+class LocalRuntimeApiService(BaseLocalService):
+    """
+    Serves the Lambda Runtime API (https://docs.aws.amazon.com/lambda/latest/dg/runtimes-api.html) to containers
+    running locally. Every container is given its own channel, which is a path prefix included in the value of the
+    ``AWS_LAMBDA_RUNTIME_API`` environment variable. Runtimes build their URLs by appending the API path to this value,
+    so events queued on a channel are only ever picked up by the container that owns it.
+
+    Unlike the other local services, this runs in a background thread alongside them.
+    """
+
+    _API_VERSION = "2018-06-01"
+
+    _ERROR_TYPE_HEADER = "Lambda-Runtime-Function-Error-Type"
+
+    _CHANNEL_CLOSED_ERROR = {"errorMessage": "Container was stopped before the function completed",
+                             "errorType": "ContainerStopped",
+                             "stackTrace": []}
+
+    # Seconds a runtime waiting for the next event waits before checking whether its channel was closed
+    _NEXT_INVOCATION_POLL_INTERVAL = 1
+
+    def __init__(self, host, port=0, container_host=None):
+        """
+        Creates the service
+
+        Parameters
+        ----------
+        host str
+            Host to start the service on. Containers must be able to reach the service on this host
+        port int
+            Optional. Port for the service to listen on. Defaults to 0, ie. any free port
+        container_host str
+            Optional. Host name containers use to reach the service, if it is different from ``host``
+        """
+        super(LocalRuntimeApiService, self).__init__(False, port=port, host=host)
+        self.container_host = container_host or host
+
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def create(self):
+        """
+        Creates a Flask Application that can be started.
+        """
+        self._app = Flask(__name__)
+
+        base_path = "/<channel_id>/" + self._API_VERSION + "/runtime"
+
+        self._add_route(base_path + "/invocation/next", self._next_invocation_handler, "GET")
+        self._add_route(base_path + "/invocation/<request_id>/response", self._invocation_response_handler, "POST")
+        self._add_route(base_path + "/invocation/<request_id>/error", self._invocation_error_handler, "POST")
+        self._add_route(base_path + "/init/error", self._init_error_handler, "POST")
+
+    def start(self):
+        """
+        Starts the server in a background thread and returns immediately. When the service was created with port 0,
+        ``port`` is updated with the port the server actually listens on.
+
+        Raises
+        ------
+        RuntimeError
+            if the service was not created
+        """
+        if not self._app:
+            raise RuntimeError("The application must be created before running")
+
+        self._server = make_server(self.host, self.port, self._app, threaded=True)
+        self.port = self._server.server_port
+
+        LOG.debug("Runtime API is listening on %s:%d", self.host, self.port)
+
+        thread = threading.Thread(target=self._server.serve_forever)
+        # Daemon thread, so this doesn't prevent the process from exiting
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        """
+        Fails every pending invocation and stops the server
+        """
+        with self._lock:
+            channel_ids = list(self._channels)
+
+        for channel_id in channel_ids:
+            self.close_channel(channel_id)
+
+        if self._server:
+            self._server.shutdown()
+            self._server = None
+
+    def get_address(self, channel_id):
+        """
+        Value of ``AWS_LAMBDA_RUNTIME_API`` for the container that owns the given channel
+
+        Parameters
+        ----------
+        channel_id str
+            ID of the channel
+
+        Returns
+        -------
+        str
+            Address of the Runtime API for the channel
+        """
+        return "{}:{}/{}".format(self.container_host, self.port, channel_id)
+
+    def open_channel(self, channel_id):
+        """
+        Creates the channel for a container, before the container starts. Runtimes can only poll channels that are
+        open, so a container that polls after its channel was closed is turned away instead of waiting forever.
+
+        Parameters
+        ----------
+        channel_id str
+            ID of the channel
+        """
+        with self._lock:
+            self._channels.setdefault(channel_id, _RuntimeApiChannel())
+
+    def submit(self, channel_id, event, function_arn, timeout):
+        """
+        Queues an event for the container that owns the given channel. The invocation fails right away if the channel
+        is not open.
+
+        Parameters
+        ----------
+        channel_id str
+            ID of the channel
+        event str
+            Event to pass to the function
+        function_arn str
+            ARN of the function being invoked
+        timeout int
+            Timeout of the function in seconds
+
+        Returns
+        -------
+        RuntimeApiInvocation
+            Invocation to wait on for the result
+        """
+        invocation = RuntimeApiInvocation(event, function_arn, timeout)
+
+        with self._lock:
+            channel = self._channels.get(channel_id)
+
+        if not channel:
+            invocation.fail(self._CHANNEL_CLOSED_ERROR)
+            return invocation
+
+        channel.pending.put(invocation)
+        return invocation
+
+    def close_channel(self, channel_id):
+        """
+        Fails every invocation queued on or being processed by the container that owns the given channel. Call this
+        when the container is stopped.
+
+        Parameters
+        ----------
+        channel_id str
+            ID of the channel
+        """
+        with self._lock:
+            channel = self._channels.pop(channel_id, None)
+
+        if not channel:
+            return
+
+        channel.closed = True
+        channel.abort(self._CHANNEL_CLOSED_ERROR)
+
+        # Wake up the container if it is waiting for the next event
+        channel.pending.put(None)
+
+    def _next_invocation_handler(self, channel_id):
+        """
+        Long polls for the next event queued on the channel. Runtimes polling a channel that is not open, or that is
+        closed while they wait, are told the channel is gone.
+        """
+        with self._lock:
+            channel = self._channels.get(channel_id)
+
+        invocation = None
+        while channel and not channel.closed and invocation is None:
+            try:
+                invocation = channel.pending.get(timeout=self._NEXT_INVOCATION_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+        if invocation is None or channel.closed:
+            if invocation:
+                invocation.fail(self._CHANNEL_CLOSED_ERROR)
+            return self.service_response(self._error_body("Channel is closed", "ChannelClosed"),
+                                         {"Content-Type": "application/json"},
+                                         410)
+
+        channel.in_flight[invocation.request_id] = invocation
+
+        headers = {
+            "Content-Type": "application/json",
+            "Lambda-Runtime-Aws-Request-Id": invocation.request_id,
+            "Lambda-Runtime-Deadline-Ms": str(invocation.deadline_ms),
+            "Lambda-Runtime-Invoked-Function-Arn": invocation.function_arn,
+        }
+        return self.service_response(invocation.event, headers, 200)
+
+    def _invocation_response_handler(self, channel_id, request_id):
+        invocation = self._pop_in_flight(channel_id, request_id)
+        if not invocation:
+            return self._unknown_request_response(request_id)
+
+        invocation.complete(request.get_data())
+        return self._accepted_response()
+
+    def _invocation_error_handler(self, channel_id, request_id):
+        invocation = self._pop_in_flight(channel_id, request_id)
+        if not invocation:
+            return self._unknown_request_response(request_id)
+
+        invocation.fail(self._parse_error(request.get_data(), request.headers.get(self._ERROR_TYPE_HEADER)))
+        return self._accepted_response()
+
+    def _init_error_handler(self, channel_id):
+        """
+        Runtime failed to initialize. It will exit after this call, so fail everything that was sent to it.
+        """
+        error = self._parse_error(request.get_data(), request.headers.get(self._ERROR_TYPE_HEADER))
+        LOG.info("Runtime failed to initialize: %s", error.get("errorMessage"))
+
+        with self._lock:
+            channel = self._channels.get(channel_id)
+
+        if channel:
+            channel.abort(error)
+
+        return self._accepted_response()
+
+    def _pop_in_flight(self, channel_id, request_id):
+        with self._lock:
+            channel = self._channels.get(channel_id)
+
+        if not channel:
+            return None
+
+        return channel.in_flight.pop(request_id, None)
+
+    def _add_route(self, path, view_func, method):
+        self._app.add_url_rule(path,
+                               endpoint=path,
+                               view_func=view_func,
+                               methods=[method],
+                               provide_automatic_options=False)
+
+    def _accepted_response(self):
+        return self.service_response(json.dumps({"status": "OK"}), {"Content-Type": "application/json"}, 202)
+
+    def _unknown_request_response(self, request_id):
+        LOG.debug("Runtime posted a result for unknown request %s", request_id)
+        return self.service_response(self._error_body("Unknown request " + request_id, "InvalidRequestID"),
+                                     {"Content-Type": "application/json"},
+                                     400)
+
+    @staticmethod
+    def _parse_error(body, error_type=None):
+        """
+        Runtimes post errors as a JSON object with ``errorMessage`` and ``errorType``. Be lenient about what we get and
+        always return a dict with both keys plus a ``stackTrace``, which is the shape of an error returned by Lambda.
+        """
+        try:
+            error = json.loads(body.decode("utf-8"))
+        except ValueError:
+            error = None
+
+        if not isinstance(error, dict):
+            error = {"errorMessage": body.decode("utf-8", "replace")}
+
+        error.setdefault("errorMessage", "")
+        error.setdefault("errorType", error_type or "Unhandled")
+        error.setdefault("stackTrace", [])
+        return error
+
+    @staticmethod
+    def _error_body(message, error_type):
+        return json.dumps({"errorMessage": message, "errorType": error_type})
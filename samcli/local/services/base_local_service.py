@@ -1,34 +1,154 @@
 """Base class for all Services that interact with Local Lambda"""
 
-import json
 import logging
 import os
 
 from flask import Response
 
+from samcli.lib.utils import json_codec
+from samcli.local.services.http_server import PooledWSGIServer
+
 LOG = logging.getLogger(__name__)
 
 
 class CaseInsensitiveDict(dict):
     """
-    Implement a simple case insensitive dictionary for storing headers. To preserve the original
-    case of the given Header (e.g. X-FooBar-Fizz) this only touches the get and contains magic
-    methods rather than implementing a __setitem__ where we normalize the case of the headers.
+    Implement a case insensitive dictionary for storing headers. To preserve the original case of the given Header
+    (e.g. X-FooBar-Fizz), the Header is stored in its original case and an index maps the lowercase Header to it. This
+    keeps getting, setting and checking for a Header a single dictionary lookup, however many Headers there are.
+
+    A Header can be given more than once. The dictionary holds its first value, and ``getlist`` returns all of them.
     """
 
+    def __init__(self, data=None, **kwargs):
+        super(CaseInsensitiveDict, self).__init__()
+
+        # Lowercase Header to the Header in its original case
+        self._keys = {}
+        # Lowercase Header to all the values of the Header
+        self._values = {}
+
+        for key, value in self._iter_items(data):
+            self.add(key, value)
+        for key, value in kwargs.items():
+            self.add(key, value)
+
     def __getitem__(self, key):
-        matches = [v for k, v in self.items() if k.lower() == key.lower()]
-        if not matches:
+        values = self._values.get(key.lower())
+        if not values:
             raise KeyError(key)
-        return matches[0]
+        return values[0]
+
+    def __setitem__(self, key, value):
+        lower_key = key.lower()
+
+        original_key = self._keys.get(lower_key)
+        if original_key is None:
+            original_key = self._keys[lower_key] = key
+
+        self._values[lower_key] = [value]
+        super(CaseInsensitiveDict, self).__setitem__(original_key, value)
+
+    def __delitem__(self, key):
+        lower_key = key.lower()
+        if lower_key not in self._keys:
+            raise KeyError(key)
+
+        del self._values[lower_key]
+        super(CaseInsensitiveDict, self).__delitem__(self._keys.pop(lower_key))
 
     def __contains__(self, key):
-        return key.lower() in [k.lower() for k in self.keys()]
+        return key.lower() in self._keys
+
+    def get(self, key, default=None):
+        values = self._values.get(key.lower())
+        return values[0] if values else default
+
+    def getlist(self, key):
+        """
+        Returns all the values of the Header, in the order they were given. Empty list if there is no such Header
+        """
+        return list(self._values.get(key.lower(), []))
+
+    def add(self, key, value):
+        """
+        Adds a value to the Header, keeping the values it already has
+        """
+        values = self._values.get(key.lower())
+        if values:
+            values.append(value)
+        else:
+            self[key] = value
+
+    def multi_items(self):
+        """
+        Yields a (Header, value) tuple for every value of every Header
+        """
+        for lower_key, values in self._values.items():
+            key = self._keys[lower_key]
+            for value in values:
+                yield key, value
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self):
+        key, value = super(CaseInsensitiveDict, self).popitem()
+        del self._keys[key.lower()]
+        del self._values[key.lower()]
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, data=None, **kwargs):  # pylint: disable=arguments-differ
+        for key, value in self._iter_items(data):
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def clear(self):
+        super(CaseInsensitiveDict, self).clear()
+        self._keys.clear()
+        self._values.clear()
+
+    def copy(self):
+        return CaseInsensitiveDict(list(self.multi_items()))
+
+    @staticmethod
+    def _iter_items(data):
+        """
+        Iterates over the (key, value) tuples of a dictionary or an iterable of tuples. Headers of Werkzeug yield a
+        tuple for every value of a Header that was given more than once
+        """
+        if data is None:
+            return []
+
+        if isinstance(data, CaseInsensitiveDict):
+            return data.multi_items()
+
+        if hasattr(data, "items"):
+            return data.items()
+
+        return data
 
 
 class BaseLocalService(object):
 
-    def __init__(self, is_debugging, port, host):
+    # Server that serves the application, when it is not debugged. Subclasses can plug in a different server, which
+    # is created with the host, port, application and the server options given to the service
+    server_class = PooledWSGIServer
+
+    def __init__(self, is_debugging, port, host, max_workers=None, max_queued_requests=None):
         """
         Creates a BaseLocalService class
 
@@ -40,10 +160,17 @@ class BaseLocalService(object):
             Optional. port for the service to start listening on Defaults to 3000
         host str
             Optional. host to start the service on Defaults to '127.0.0.1
+        max_workers int
+            Optional. Number of requests served at the same time. Defaults to the default of the server
+        max_queued_requests int
+            Optional. Number of requests that can wait to be served. Requests above this are rejected with
+            "429 Too Many Requests". Defaults to the default of the server
         """
         self.is_debugging = is_debugging
         self.port = port
         self.host = host
+        self.max_workers = max_workers
+        self.max_queued_requests = max_queued_requests
         self._app = None
 
     def create(self):
@@ -65,20 +192,44 @@ class BaseLocalService(object):
         if not self._app:
             raise RuntimeError("The application must be created before running")
 
-        # Flask can operate as a single threaded server (which is default) and a multi-threaded server which is
-        # more for development. When the Lambda container is going to be debugged, then it does not make sense
-        # to turn on multi-threading because customers can realistically attach only one container at a time to
-        # the debugger. Keeping this single threaded also enables the Lambda Runner to handle Ctrl+C in order to
-        # kill the container gracefully (Ctrl+C can be handled only by the main thread)
-        multi_threaded = not self.is_debugging
+        # When the Lambda container is going to be debugged, then it does not make sense to serve requests in
+        # parallel because customers can realistically attach only one container at a time to the debugger. Flask's
+        # single threaded server also enables the Lambda Runner to handle Ctrl+C in order to kill the container
+        # gracefully (Ctrl+C can be handled only by the main thread)
+        if self.is_debugging:
+            LOG.debug("Localhost server is starting up. Multi-threading = False")
 
-        LOG.debug("Localhost server is starting up. Multi-threading = %s", multi_threaded)
+            # This environ signifies we are running a main function for Flask. This is true, since we are using it
+            # within our cli and not on a production server.
+            os.environ['WERKZEUG_RUN_MAIN'] = 'true'
 
-        # This environ signifies we are running a main function for Flask. This is true, since we are using it within
-        # our cli and not on a production server.
-        os.environ['WERKZEUG_RUN_MAIN'] = 'true'
+            self._app.run(threaded=False, host=self.host, port=self.port)
+            return
 
-        self._app.run(threaded=multi_threaded, host=self.host, port=self.port)
+        server = self._make_server()
+
+        LOG.debug("Localhost server is starting up with %s", type(server).__name__)
+        LOG.info("Running on http://%s:%d/ (Press CTRL+C to quit)", self.host, server.server_port)
+
+        # Blocks until interrupted. Requests that are being served are completed before the server is closed
+        server.serve_forever()
+
+    def _make_server(self):
+        """
+        Creates the server for the application, with the server options that were given to the service
+
+        Returns
+        -------
+        server_class
+            Server bound to the host and port of the service
+        """
+        server_options = {}
+        if self.max_workers is not None:
+            server_options["max_workers"] = self.max_workers
+        if self.max_queued_requests is not None:
+            server_options["max_queued_requests"] = self.max_queued_requests
+
+        return self.server_class(self.host, self.port, self._app, **server_options)
 
     @staticmethod
     def service_response(body, headers, status_code):
@@ -96,6 +247,103 @@ class BaseLocalService(object):
         return response
 
 
+class LambdaOutputStream(object):
+    """
+    Writable stream for the stdout of a Lambda function, that separates log statements from the response as the output
+    arrives from the container. Like ``LambdaOutputParser``, the last line of the output is the response and every line
+    before it is a log statement. Log lines are written to the log stream as soon as a line after them starts, and
+    only the line being received is kept in memory, so the output is never held more than once.
+    """
+
+    # Whitespace stripped from around the response
+    _WHITESPACE = bytearray(b' \t\r\n')
+    _NEWLINE = bytearray(b'\n')[0]
+
+    def __init__(self, log_stream=None):
+        """
+        Parameters
+        ----------
+        log_stream io.BaseIO
+            Optional. Stream to write the log statements to. Log statements are discarded if not given
+        """
+        self._log_stream = log_stream
+        # Output of the function since the last log line
+        self._pending = bytearray()
+        # Number of bytes at the start of ``_pending`` known to be free of newlines
+        self._scanned = 0
+
+    def write(self, data):
+        """
+        Adds the output of the function. Any complete line before the last line is written to the log stream
+
+        Parameters
+        ----------
+        data bytes
+            Output of the function
+        """
+        self._pending.extend(data)
+
+        # Trailing newlines don't start a new line, since the response may be followed by newlines
+        end = len(self._pending)
+        while end > self._scanned and self._pending[end - 1] == self._NEWLINE:
+            end -= 1
+
+        # Only the bytes that were not scanned yet can contain a newline
+        last_newline = self._pending.rfind(b'\n', self._scanned, end)
+        if last_newline >= 0:
+            if self._log_stream:
+                self._log_stream.write(self._pending[:last_newline + 1])
+
+            del self._pending[:last_newline + 1]
+            end -= last_newline + 1
+
+        self._scanned = end
+
+    def flush(self):
+        pass
+
+    def get_lambda_output(self):
+        """
+        Returns the response of the function, once all of its output was written
+
+        Returns
+        -------
+        str
+            String data containing response from Lambda function
+        bool
+            If the response is an error/exception from the container
+        """
+        lambda_response = self.get_lambda_response()
+
+        return lambda_response, LambdaOutputParser.is_lambda_error_response(lambda_response)
+
+    def get_lambda_response(self):
+        """
+        Returns the response of the function, once all of its output was written, without checking if it is an
+        error. Callers that parse the response anyway use this, and check the parsed response with
+        ``LambdaOutputParser.is_lambda_error``, so the response is parsed only once
+
+        Returns
+        -------
+        str
+            String data containing response from Lambda function
+        """
+        response = self._pending
+
+        # Strips in place, to not copy the response
+        end = len(response)
+        while end and response[end - 1] in self._WHITESPACE:
+            end -= 1
+        del response[end:]
+
+        start = 0
+        while start < end and response[start] in self._WHITESPACE:
+            start += 1
+        del response[:start]
+
+        return response.decode('utf-8')
+
+
 class LambdaOutputParser(object):
 
     @staticmethod
@@ -163,22 +411,37 @@ class LambdaOutputParser(object):
         bool
             True if the output matches the Error/Exception Dictionary otherwise False
         """
-        is_lambda_user_error_response = False
         try:
-            lambda_response_dict = json.loads(lambda_response)
-
-            # This is a best effort attempt to determine if the output (lambda_response) from the container was an
-            # Error/Exception that was raised/returned/thrown from the container. To ensure minimal false positives in
-            # this checking, we check for all three keys that can occur in Lambda raised/thrown/returned an
-            # Error/Exception. This still risks false positives when the data returned matches exactly a dictionary with
-            # the keys 'errorMessage', 'errorType' and 'stackTrace'.
-            if isinstance(lambda_response_dict, dict) and \
-                    len(lambda_response_dict) == 3 and \
-                    'errorMessage' in lambda_response_dict and \
-                    'errorType' in lambda_response_dict and \
-                    'stackTrace' in lambda_response_dict:
-                is_lambda_user_error_response = True
+            lambda_response_dict = json_codec.loads(lambda_response)
         except ValueError:
             # If you can't serialize the output into a dict, then do nothing
-            pass
-        return is_lambda_user_error_response
+            return False
+
+        return LambdaOutputParser.is_lambda_error(lambda_response_dict)
+
+    @staticmethod
+    def is_lambda_error(lambda_response_dict):
+        """
+        Check to see if the response from the container, already parsed from JSON, is in the form of an
+        Error/Exception from the Lambda invoke
+
+        Parameters
+        ----------
+        lambda_response_dict
+            The response the container returned, parsed from JSON
+
+        Returns
+        -------
+        bool
+            True if the output matches the Error/Exception Dictionary otherwise False
+        """
+        # This is a best effort attempt to determine if the output (lambda_response) from the container was an
+        # Error/Exception that was raised/returned/thrown from the container. To ensure minimal false positives in
+        # this checking, we check for all three keys that can occur in Lambda raised/thrown/returned an
+        # Error/Exception. This still risks false positives when the data returned matches exactly a dictionary with
+        # the keys 'errorMessage', 'errorType' and 'stackTrace'.
+        return isinstance(lambda_response_dict, dict) and \
+            len(lambda_response_dict) == 3 and \
+            'errorMessage' in lambda_response_dict and \
+            'errorType' in lambda_response_dict and \
+            'stackTrace' in lambda_response_dict
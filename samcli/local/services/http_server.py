@@ -0,0 +1,239 @@
+"""
+HTTP Server that serves the local services with a bounded pool of worker threads
+"""
+
+import time
+import socket
+import logging
+import threading
+
+from six.moves import queue
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+LOG = logging.getLogger(__name__)
+
+
+class PooledWSGIRequestHandler(WSGIRequestHandler):
+    """
+    Request Handler that keeps connections alive between requests, as long as no other connection is waiting for a
+    worker and the server is not shutting down
+    """
+
+    # HTTP/1.1 keeps connections open by default, so clients don't pay for a new connection on every request
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # Idle connections are closed after this many seconds, to release their worker
+        self.timeout = self.server.keep_alive_timeout
+        WSGIRequestHandler.setup(self)
+
+    def handle_one_request(self):
+        result = WSGIRequestHandler.handle_one_request(self)
+
+        # A worker serves one connection at a time. Give it up for the connections that are waiting
+        if self.server.is_draining() or self.server.queued_connections():
+            self.close_connection = True
+
+        return result
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    WSGI Server that serves connections with a fixed number of worker threads, instead of starting a new thread for
+    every connection. Accepted connections wait in a bounded queue for a worker. When the queue is full, new connections
+    are rejected with "429 Too Many Requests", so the server never takes on more work than it can finish.
+
+    When the server is closed, requests that are being served are completed and connections still waiting for a worker
+    are rejected with "503 Service Unavailable".
+    """
+
+    multithread = True
+
+    DEFAULT_MAX_WORKERS = 32
+    DEFAULT_MAX_QUEUED_REQUESTS = 1024
+    DEFAULT_KEEP_ALIVE_TIMEOUT = 5
+    DEFAULT_SHUTDOWN_TIMEOUT = 10
+
+    # Seconds a rejected client is given to send its request, before the rejection is sent
+    _REJECT_READ_TIMEOUT = 1
+
+    # Number of rejected connections that can wait to be answered. Above this they are closed without an answer
+    _MAX_PENDING_REJECTIONS = 128
+
+    _STOP = object()
+
+    def __init__(self,
+                 host,
+                 port,
+                 app,
+                 max_workers=DEFAULT_MAX_WORKERS,
+                 max_queued_requests=DEFAULT_MAX_QUEUED_REQUESTS,
+                 keep_alive_timeout=DEFAULT_KEEP_ALIVE_TIMEOUT,
+                 shutdown_timeout=DEFAULT_SHUTDOWN_TIMEOUT,
+                 handler=None):
+        """
+        Creates the server and binds it to the host and port
+
+        Parameters
+        ----------
+        host str
+            Host to listen on
+        port int
+            Port to listen on. 0, for any free port
+        app
+            WSGI application to serve
+        max_workers int
+            Optional. Number of requests that are served at the same time. Defaults to 32
+        max_queued_requests int
+            Optional. Number of connections that can wait for a worker. Defaults to 1024
+        keep_alive_timeout int
+            Optional. Seconds an idle connection is kept open. Defaults to 5
+        shutdown_timeout int
+            Optional. Seconds to wait for requests that are being served, when the server is closed. Defaults to 10
+        handler
+            Optional. Request handler class. Defaults to PooledWSGIRequestHandler
+        """
+        super(PooledWSGIServer, self).__init__(host, port, app, handler=handler or PooledWSGIRequestHandler)
+
+        self.max_workers = max_workers
+        self.keep_alive_timeout = keep_alive_timeout
+        self.shutdown_timeout = shutdown_timeout
+
+        self._connections = queue.Queue(maxsize=max_queued_requests)
+        self._rejections = queue.Queue(maxsize=self._MAX_PENDING_REJECTIONS)
+        self._draining = threading.Event()
+        self._closed = False
+
+        self._workers = [self._start_thread(self._work) for _ in range(max_workers)]
+        self._rejector = self._start_thread(self._reject_connections)
+
+    def is_draining(self):
+        """
+        Returns
+        -------
+        bool
+            True, if the server is shutting down
+        """
+        return self._draining.is_set()
+
+    def queued_connections(self):
+        """
+        Returns
+        -------
+        int
+            Number of connections that are waiting for a worker
+        """
+        return self._connections.qsize()
+
+    def process_request(self, request, client_address):
+        """
+        Hands the connection to a worker, or rejects it if too many connections are waiting already. Called by
+        ``serve_forever`` for every accepted connection.
+        """
+        if self.is_draining():
+            self._reject(request, 503)
+            return
+
+        try:
+            self._connections.put_nowait((request, client_address))
+        except queue.Full:
+            LOG.debug("Too many queued requests. Rejecting the connection from %s", client_address)
+            self._reject(request, 429)
+
+    def server_close(self):
+        """
+        Stops accepting connections, waits for the requests that are being served and rejects the connections that
+        are still waiting for a worker
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        self._draining.set()
+        super(PooledWSGIServer, self).server_close()
+
+        deadline = time.time() + self.shutdown_timeout
+
+        # Workers stop once they rejected the connections queued before them
+        if self._stop_threads(self._workers, self._connections, deadline):
+            self._stop_threads([self._rejector], self._rejections, deadline)
+
+    def _work(self):
+        while True:
+            request, client_address = self._connections.get()
+            if request is self._STOP:
+                return
+
+            if self.is_draining():
+                self._reject(request, 503)
+                continue
+
+            try:
+                self.finish_request(request, client_address)
+            except Exception:  # pylint: disable=broad-except
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def _reject(self, request, status_code):
+        try:
+            self._rejections.put_nowait((request, status_code))
+        except queue.Full:
+            self.shutdown_request(request)
+
+    def _reject_connections(self):
+        while True:
+            request, status_code = self._rejections.get()
+            if request is self._STOP:
+                return
+
+            try:
+                # Read the request first. Closing a connection with unread data resets it, and the client would
+                # never see the response
+                request.settimeout(self._REJECT_READ_TIMEOUT)
+                request.recv(65536)
+                request.sendall(_rejection_response(status_code))
+            except (socket.error, socket.timeout):
+                LOG.debug("Failed to send the rejection to a connection", exc_info=True)
+            finally:
+                self.shutdown_request(request)
+
+    def _stop_threads(self, threads, work_queue, deadline):
+        try:
+            for _ in threads:
+                work_queue.put((self._STOP, None), timeout=max(deadline - time.time(), 0))
+        except queue.Full:
+            LOG.debug("Requests were still being served when the server was closed")
+            return False
+
+        for thread in threads:
+            thread.join(max(deadline - time.time(), 0))
+            if thread.is_alive():
+                LOG.debug("Requests were still being served when the server was closed")
+                return False
+
+        return True
+
+    @staticmethod
+    def _start_thread(target):
+        thread = threading.Thread(target=target)
+        # Daemon thread, so a request that never completes doesn't prevent the process from exiting
+        thread.daemon = True
+        thread.start()
+        return thread
+
+
+def _rejection_response(status_code):
+    reasons = {
+        429: "Too Many Requests",
+        503: "Service Unavailable"
+    }
+    body = '{{"message": "{}"}}'.format(reasons[status_code])
+
+    return ("HTTP/1.1 {} {}\r\n"
+            "Content-Type: application/json\r\n"
+            "Content-Length: {}\r\n"
+            "Retry-After: 1\r\n"
+            "Connection: close\r\n"
+            "\r\n"
+            "{}").format(status_code, reasons[status_code], len(body), body).encode("utf-8")
@@ -0,0 +1,60 @@
+"""
+Events of API Gateway requests built from the skeleton of the events of the route must be the same as the events built
+from the event objects
+"""
+
+import json
+from unittest import TestCase
+
+from samcli.lib.utils import json_codec
+from samcli.local.events.api_event import ContextIdentity, RequestContext, ApiGatewayLambdaEvent, \
+    ApiGatewayLambdaEventSkeleton
+
+
+class TestEventSkeleton(TestCase):
+
+    def setUp(self):
+        self.request = {"http_method": "POST",
+                        "body": '{"hello": "world"}',
+                        "query_string_params": {"query": "param"},
+                        "headers": {"Content-Type": "application/json",
+                                    "Host": "127.0.0.1:3000",
+                                    "User-Agent": "python-requests",
+                                    "X-Forwarded-Proto": "http",
+                                    "X-Forwarded-Port": "3000"},
+                        "path_parameters": {"id": "42"},
+                        "path": "/resource/42",
+                        "is_base_64_encoded": False}
+
+    def _object_event(self):
+        identity = ContextIdentity(source_ip="127.0.0.1")
+        context = RequestContext(resource_path="/resource/{id}",
+                                 http_method=self.request["http_method"],
+                                 stage="prod",
+                                 identity=identity,
+                                 path="/resource/{id}")
+        event = ApiGatewayLambdaEvent(resource="/resource/{id}", request_context=context, **self.request)
+        return json_codec.dumps(event.to_dict())
+
+    def test_skeleton_events(self):
+        skeleton = ApiGatewayLambdaEventSkeleton("/resource/{id}", stage="prod")
+
+        self.assertEquals(json.loads(skeleton.to_json(source_ip="127.0.0.1", **self.request)),
+                          json.loads(self._object_event()))
+
+    def test_skeleton_events_without_body_or_parameters(self):
+        skeleton = ApiGatewayLambdaEventSkeleton("/resource/{id}", stage="prod")
+        self.request.update({"http_method": "GET",
+                             "body": None,
+                             "query_string_params": None,
+                             "path_parameters": None})
+
+        self.assertEquals(json.loads(skeleton.to_json(source_ip="127.0.0.1", **self.request)),
+                          json.loads(self._object_event()))
+
+    def test_skeleton_events_with_binary_body(self):
+        skeleton = ApiGatewayLambdaEventSkeleton("/resource/{id}", stage="prod")
+        self.request.update({"body": "aGVsbG8=", "is_base_64_encoded": True})
+
+        self.assertEquals(json.loads(skeleton.to_json(source_ip="127.0.0.1", **self.request)),
+                          json.loads(self._object_event()))
@@ -0,0 +1,61 @@
+"""
+Requests to a service with a large number of routes. The function is mocked and echoes the resource of its event, so
+this checks that every request is matched to the route it was made for.
+"""
+
+import json
+from unittest import TestCase
+
+from mock import Mock
+
+from samcli.local.apigw.local_apigw_service import Route, LocalApigwService
+
+ROUTE_COUNT = 1200
+
+
+class TestService_ManyRoutes(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.paths = []
+        for index in range(ROUTE_COUNT // 3):
+            cls.paths.append('/resource{}'.format(index))
+            cls.paths.append('/resource{}/{{id}}'.format(index))
+            cls.paths.append('/resource{}/{{id}}/{{proxy+}}'.format(index))
+
+        list_of_routes = [Route(['GET', 'POST'], 'Function', path) for path in cls.paths]
+
+        cls.lambda_runner = Mock()
+        cls.lambda_runner.invoke.side_effect = cls._echo_resource
+
+        cls.service = LocalApigwService(list_of_routes, cls.lambda_runner)
+        cls.service.create()
+        cls.client = cls.service._app.test_client()
+
+    @staticmethod
+    def _echo_resource(function_name, event, stdout=None, stderr=None):
+        resource = json.loads(event)["resource"]
+        stdout.write(json.dumps({"statusCode": 200, "body": resource}).encode("utf-8"))
+
+    @staticmethod
+    def _request_path(path):
+        return path.replace('{id}', '42').replace('{proxy+}', 'a/b/c')
+
+    def test_every_route_resolves_to_its_resource(self):
+        for path in self.paths:
+            response = self.client.get(self._request_path(path))
+
+            self.assertEquals(response.status_code, 200)
+            self.assertEquals(response.get_data(as_text=True), path)
+
+    def test_every_method_of_route_resolves_to_its_resource(self):
+        for path in self.paths:
+            response = self.client.post(self._request_path(path), data='{}')
+
+            self.assertEquals(response.status_code, 200)
+            self.assertEquals(response.get_data(as_text=True), path)
+
+    def test_unknown_path_is_not_routed(self):
+        response = self.client.get('/resource{}'.format(ROUTE_COUNT))
+
+        self.assertEquals(response.status_code, 403)
@@ -0,0 +1,34 @@
+from unittest import TestCase
+from mock import patch, Mock, call
+
+from samcli.commands.local.cache_stats.cli import do_cli as cache_stats_cli
+
+
+class TestCli(TestCase):
+
+    @patch("samcli.commands.local.cache_stats.cli.click")
+    @patch("samcli.commands.local.cache_stats.cli.ArchiveCache")
+    @patch("samcli.commands.local.cache_stats.cli.LayerCacheIndex")
+    def test_must_show_stats_of_both_caches(self,
+                                            LayerCacheIndexMock,
+                                            ArchiveCacheMock,
+                                            click_mock):
+        LayerCacheIndexMock.return_value.stats.return_value = {"entries": 2,
+                                                               "incomplete": 1,
+                                                               "size": 3 * 1024 * 1024,
+                                                               "max_size": 10 * 1024 * 1024}
+        ArchiveCacheMock.return_value.stats.return_value = {"entries": 0, "size": 0, "max_size": None}
+
+        cache_stats_cli(Mock(), "layer-cache", "code-cache", 512)
+
+        LayerCacheIndexMock.assert_called_with("layer-cache")
+        ArchiveCacheMock.assert_called_with("code-cache", max_size_mb=512)
+        click_mock.echo.assert_has_calls([
+            call("Layer cache: layer-cache"),
+            call("  Entries: 2"),
+            call("  Incomplete entries: 1 (deleted by the first download after they are an hour old)"),
+            call("  Size: 3.0 MB of 10.0 MB"),
+            call("Code cache: code-cache"),
+            call("  Entries: 0"),
+            call("  Size: 0.0 MB"),
+        ])
@@ -58,6 +58,7 @@ class TestInvokeContext__enter__(TestCase):
         invoke_context._get_debug_context.return_value = debug_context_mock
 
         invoke_context._check_docker_connectivity = Mock()
+        invoke_context._create_local_lambda_runner = Mock()
 
         # Call Enter method manually for testing purposes
         result = invoke_context.__enter__()
@@ -68,6 +69,7 @@ class TestInvokeContext__enter__(TestCase):
         self.assertEquals(invoke_context._env_vars_value, env_vars_value)
         self.assertEquals(invoke_context._log_file_handle, log_file_handle)
         self.assertEquals(invoke_context._debug_context, debug_context_mock)
+        self.assertEquals(invoke_context.local_lambda_runner, invoke_context._create_local_lambda_runner.return_value)
 
         invoke_context._get_template_data.assert_called_with(template_file)
         SamFunctionProviderMock.assert_called_with(template_dict, {"AWS::Region": "region"})
@@ -76,6 +78,93 @@ class TestInvokeContext__enter__(TestCase):
         invoke_context._get_debug_context.assert_called_once_with(1111, "args", "path-to-debugger")
         invoke_context._check_docker_connectivity.assert_called_with()
 
+    @patch("samcli.commands.local.cli_common.invoke_context.SamFunctionProvider")
+    def test_must_prewarm_containers(self, SamFunctionProviderMock):
+        invoke_context = InvokeContext(template_file="template_file", prewarm_containers=2)
+        invoke_context._get_template_data = Mock()
+        invoke_context._get_env_vars_value = Mock()
+        invoke_context._setup_log_file = Mock()
+        invoke_context._get_debug_context = Mock()
+        invoke_context._check_docker_connectivity = Mock()
+        invoke_context._create_local_lambda_runner = Mock()
+        # Pre-warming containers implies warm containers
+        self.assertTrue(invoke_context._warm_containers)
+
+        invoke_context.__enter__()
+
+        # Invokes use the runner that pre-warmed the containers
+        runner = invoke_context._create_local_lambda_runner.return_value
+        runner.prewarm.assert_called_with(2)
+        self.assertEquals(invoke_context.local_lambda_runner, runner)
+
+    @patch("samcli.commands.local.cli_common.invoke_context.configure_docker_client")
+    @patch("samcli.commands.local.cli_common.invoke_context.SamFunctionProvider")
+    def test_must_size_docker_pool_for_parallel_invokes(self, SamFunctionProviderMock, configure_docker_client_mock):
+        invoke_context = InvokeContext(template_file="template_file", max_parallel_invokes=36)
+        invoke_context._get_template_data = Mock()
+        invoke_context._get_env_vars_value = Mock()
+        invoke_context._setup_log_file = Mock()
+        invoke_context._get_debug_context = Mock()
+        invoke_context._check_docker_connectivity = Mock()
+        invoke_context._create_local_lambda_runner = Mock()
+
+        invoke_context.__enter__()
+
+        configure_docker_client_mock.assert_called_once_with(max_pool_size=36)
+
+    @patch("samcli.commands.local.cli_common.invoke_context.configure_docker_client")
+    @patch("samcli.commands.local.cli_common.invoke_context.SamFunctionProvider")
+    def test_must_keep_docker_pool_without_parallel_invokes(self, SamFunctionProviderMock,
+                                                            configure_docker_client_mock):
+        invoke_context = InvokeContext(template_file="template_file")
+        invoke_context._get_template_data = Mock()
+        invoke_context._get_env_vars_value = Mock()
+        invoke_context._setup_log_file = Mock()
+        invoke_context._get_debug_context = Mock()
+        invoke_context._check_docker_connectivity = Mock()
+        invoke_context._create_local_lambda_runner = Mock()
+
+        invoke_context.__enter__()
+
+        configure_docker_client_mock.assert_not_called()
+
+    @patch("samcli.commands.local.cli_common.invoke_context.TemplateCache")
+    @patch("samcli.commands.local.cli_common.invoke_context.SamBaseProvider")
+    @patch("samcli.commands.local.cli_common.invoke_context.SamFunctionProvider")
+    def test_must_use_template_cache_dir_until_exit(self, SamFunctionProviderMock, SamBaseProviderMock,
+                                                    TemplateCacheMock):
+        previous_cache = Mock()
+        SamBaseProviderMock.template_cache = previous_cache
+        invoke_context = InvokeContext(template_file="template_file", template_cache_dir="templates")
+        invoke_context._get_template_data = Mock()
+        invoke_context._get_env_vars_value = Mock()
+        invoke_context._setup_log_file = Mock()
+        invoke_context._get_debug_context = Mock()
+        invoke_context._check_docker_connectivity = Mock()
+        invoke_context._create_local_lambda_runner = Mock()
+
+        invoke_context.__enter__()
+
+        TemplateCacheMock.assert_called_with(cache_dir="templates")
+        self.assertEquals(SamBaseProviderMock.template_cache, TemplateCacheMock.return_value)
+
+        invoke_context.__exit__()
+
+        self.assertEquals(SamBaseProviderMock.template_cache, previous_cache)
+
+    @patch("samcli.commands.local.cli_common.invoke_context.TemplateCache")
+    @patch("samcli.commands.local.cli_common.invoke_context.SamBaseProvider")
+    def test_must_restore_template_cache_when_enter_fails(self, SamBaseProviderMock, TemplateCacheMock):
+        previous_cache = Mock()
+        SamBaseProviderMock.template_cache = previous_cache
+        invoke_context = InvokeContext(template_file="template_file", template_cache_dir="templates")
+        invoke_context._get_template_data = Mock(side_effect=ValueError("bad template"))
+
+        with self.assertRaises(ValueError):
+            invoke_context.__enter__()
+
+        self.assertEquals(SamBaseProviderMock.template_cache, previous_cache)
+
 
 class TestInvokeContext__exit__(TestCase):
 
@@ -96,6 +185,34 @@ class TestInvokeContext__exit__(TestCase):
         context.__exit__()
         self.assertIsNone(context._log_file_handle)
 
+    def test_must_shutdown_container_manager(self):
+        context = InvokeContext(template_file="template")
+        manager_mock = Mock()
+        context._container_manager = manager_mock
+
+        context.__exit__()
+
+        manager_mock.shutdown.assert_called_with()
+        self.assertIsNone(context._container_manager)
+
+    def test_must_release_local_lambda_runner(self):
+        context = InvokeContext(template_file="template")
+        context._local_lambda_runner = Mock()
+
+        context.__exit__()
+
+        self.assertIsNone(context.local_lambda_runner)
+
+    def test_must_stop_runtime_api(self):
+        context = InvokeContext(template_file="template")
+        runtime_api_mock = Mock()
+        context._runtime_api = runtime_api_mock
+
+        context.__exit__()
+
+        runtime_api_mock.stop.assert_called_with()
+        self.assertIsNone(context._runtime_api)
+
 
 class TestInvokeContextAsContextManager(TestCase):
     """
@@ -153,7 +270,7 @@ class TestInvokeContext_function_name_property(TestCase):
             context.function_name
 
 
-class TestInvokeContext_local_lambda_runner(TestCase):
+class TestInvokeContext_create_local_lambda_runner(TestCase):
 
     def setUp(self):
         self.context = InvokeContext(template_file="template_file",
@@ -168,6 +285,7 @@ class TestInvokeContext_local_lambda_runner(TestCase):
                                      debugger_path="path-to-debugger",
                                      debug_args='args')
 
+    @patch("samcli.commands.local.cli_common.invoke_context.ArchiveCache")
     @patch("samcli.commands.local.cli_common.invoke_context.LambdaImage")
     @patch("samcli.commands.local.cli_common.invoke_context.LayerDownloader")
     @patch("samcli.commands.local.cli_common.invoke_context.ContainerManager")
@@ -178,7 +296,8 @@ class TestInvokeContext_local_lambda_runner(TestCase):
                                 LambdaRuntimeMock,
                                 ContainerManagerMock,
                                 download_layers_mock,
-                                lambda_image_patch):
+                                lambda_image_patch,
+                                ArchiveCacheMock):
 
         container_mock = Mock()
         ContainerManagerMock.return_value = container_mock
@@ -198,19 +317,222 @@ class TestInvokeContext_local_lambda_runner(TestCase):
         cwd = "cwd"
         self.context.get_cwd = Mock()
         self.context.get_cwd.return_value = cwd
+        self.context._get_concurrency_limiter = Mock()
 
-        result = self.context.local_lambda_runner
+        result = self.context._create_local_lambda_runner()
         self.assertEquals(result, runner_mock)
 
         ContainerManagerMock.assert_called_with(docker_network_id="network",
-                                                skip_pull_image=True)
-        LambdaRuntimeMock.assert_called_with(container_mock, image_mock)
+                                                skip_pull_image=True,
+                                                max_warm_containers=None,
+                                                warm_container_ttl=None)
+        ArchiveCacheMock.assert_called_with(self.context._code_cache_basedir)
+        LambdaRuntimeMock.assert_called_with(container_mock, image_mock, archive_cache=ArchiveCacheMock.return_value)
+        download_layers_mock.assert_called_with(
+            ANY, cwd, max_concurrent_downloads=download_layers_mock.DEFAULT_MAX_CONCURRENT_DOWNLOADS)
         lambda_image_patch.assert_called_once_with(download_mock, True, True)
         LocalLambdaMock.assert_called_with(local_runtime=runtime_mock,
                                            function_provider=ANY,
                                            cwd=cwd,
                                            debug_context=None,
-                                           env_vars_values=ANY)
+                                           env_vars_values=ANY,
+                                           concurrency_limiter=self.context._get_concurrency_limiter.return_value)
+
+    @patch("samcli.commands.local.cli_common.invoke_context.ArchiveCache")
+    @patch("samcli.commands.local.cli_common.invoke_context.LambdaImage")
+    @patch("samcli.commands.local.cli_common.invoke_context.LayerDownloader")
+    @patch("samcli.commands.local.cli_common.invoke_context.ContainerManager")
+    @patch("samcli.commands.local.cli_common.invoke_context.WarmLambdaRuntime")
+    @patch("samcli.commands.local.cli_common.invoke_context.LocalLambdaRunner")
+    def test_must_create_warm_runner(self,
+                                     LocalLambdaMock,
+                                     WarmLambdaRuntimeMock,
+                                     ContainerManagerMock,
+                                     download_layers_mock,
+                                     lambda_image_patch,
+                                     ArchiveCacheMock):
+        self.context._warm_containers = True
+        self.context._get_runtime_api = Mock()
+        self.context.get_cwd = Mock(return_value="cwd")
+        self.context._get_concurrency_limiter = Mock(return_value=None)
+
+        self.context._create_local_lambda_runner()
+
+        WarmLambdaRuntimeMock.assert_called_with(ContainerManagerMock.return_value,
+                                                 lambda_image_patch.return_value,
+                                                 runtime_api=self.context._get_runtime_api.return_value,
+                                                 archive_cache=ArchiveCacheMock.return_value)
+        LocalLambdaMock.assert_called_with(local_runtime=WarmLambdaRuntimeMock.return_value,
+                                           function_provider=ANY,
+                                           cwd="cwd",
+                                           debug_context=None,
+                                           env_vars_values=ANY,
+                                           concurrency_limiter=None)
+
+    @patch("samcli.commands.local.cli_common.invoke_context.ArchiveCache")
+    @patch("samcli.commands.local.cli_common.invoke_context.LambdaImage")
+    @patch("samcli.commands.local.cli_common.invoke_context.LayerDownloader")
+    @patch("samcli.commands.local.cli_common.invoke_context.ContainerManager")
+    @patch("samcli.commands.local.cli_common.invoke_context.LambdaRuntime")
+    @patch("samcli.commands.local.cli_common.invoke_context.LocalLambdaRunner")
+    def test_must_limit_size_of_code_cache(self,
+                                           LocalLambdaMock,
+                                           LambdaRuntimeMock,
+                                           ContainerManagerMock,
+                                           download_layers_mock,
+                                           lambda_image_patch,
+                                           ArchiveCacheMock):
+        self.context._code_cache_max_size = 512
+        self.context._get_concurrency_limiter = Mock()
+
+        self.context._create_local_lambda_runner()
+
+        ArchiveCacheMock.assert_called_with(self.context._code_cache_basedir, max_size_mb=512)
+        LambdaRuntimeMock.assert_called_with(ContainerManagerMock.return_value,
+                                             lambda_image_patch.return_value,
+                                             archive_cache=ArchiveCacheMock.return_value)
+
+    @patch("samcli.commands.local.cli_common.invoke_context.ArchiveCache")
+    @patch("samcli.commands.local.cli_common.invoke_context.LambdaImage")
+    @patch("samcli.commands.local.cli_common.invoke_context.LayerDownloader")
+    @patch("samcli.commands.local.cli_common.invoke_context.ContainerManager")
+    @patch("samcli.commands.local.cli_common.invoke_context.LambdaRuntime")
+    @patch("samcli.commands.local.cli_common.invoke_context.LocalLambdaRunner")
+    def test_must_not_keep_archives_without_code_cache(self,
+                                                       LocalLambdaMock,
+                                                       LambdaRuntimeMock,
+                                                       ContainerManagerMock,
+                                                       download_layers_mock,
+                                                       lambda_image_patch,
+                                                       ArchiveCacheMock):
+        self.context._code_cache_max_size = 0
+        self.context._get_concurrency_limiter = Mock()
+
+        self.context._create_local_lambda_runner()
+
+        ArchiveCacheMock.assert_not_called()
+        LambdaRuntimeMock.assert_called_with(ContainerManagerMock.return_value,
+                                             lambda_image_patch.return_value,
+                                             archive_cache=None)
+
+
+class TestInvokeContext_get_concurrency_limiter(TestCase):
+
+    def setUp(self):
+        self.context = InvokeContext(template_file="template_file")
+        self.context._function_provider = Mock()
+
+    def test_must_not_limit_by_default(self):
+        self.context._function_provider.get_all.return_value = [Mock(reserved_concurrency=None)]
+
+        self.assertIsNone(self.context._get_concurrency_limiter())
+
+    @patch("samcli.commands.local.cli_common.invoke_context.ConcurrencyLimiter")
+    def test_must_limit_functions_with_reserved_concurrency(self, ConcurrencyLimiterMock):
+        function1 = Mock(reserved_concurrency=2)
+        function1.name = "function1"
+        function2 = Mock(reserved_concurrency=None)
+        function2.name = "function2"
+        self.context._function_provider.get_all.return_value = [function1, function2]
+
+        result = self.context._get_concurrency_limiter()
+
+        self.assertEquals(result, ConcurrencyLimiterMock.return_value)
+        ConcurrencyLimiterMock.assert_called_once_with(max_concurrency=None,
+                                                       function_concurrency={"function1": 2},
+                                                       max_queued=ConcurrencyLimiterMock.DEFAULT_MAX_QUEUED_INVOKES)
+
+        # Shared by all runners
+        self.assertEquals(self.context._get_concurrency_limiter(), result)
+        ConcurrencyLimiterMock.assert_called_once()
+
+    @patch("samcli.commands.local.cli_common.invoke_context.ConcurrencyLimiter")
+    def test_must_limit_all_functions(self, ConcurrencyLimiterMock):
+        self.context._max_concurrent_invokes = 4
+        self.context._max_queued_invokes = 0
+        self.context._function_provider.get_all.return_value = []
+
+        self.context._get_concurrency_limiter()
+
+        ConcurrencyLimiterMock.assert_called_once_with(max_concurrency=4, function_concurrency={}, max_queued=0)
+
+
+class TestInvokeContext_get_runtime_api(TestCase):
+
+    def setUp(self):
+        self.context = InvokeContext(template_file="template_file")
+        self.context._container_manager = Mock()
+
+    @patch("samcli.commands.local.cli_common.invoke_context.LocalRuntimeApiService")
+    @patch("samcli.commands.local.cli_common.invoke_context.get_network_gateway")
+    @patch("samcli.commands.local.cli_common.invoke_context.platform")
+    def test_must_listen_on_network_gateway_on_linux(self, platform_mock, get_gateway_mock, RuntimeApiMock):
+        platform_mock.system.return_value = "Linux"
+        get_gateway_mock.return_value = "172.17.0.1"
+        self.context._docker_network = "network"
+
+        result = self.context._get_runtime_api()
+
+        self.assertEquals(result, RuntimeApiMock.return_value)
+        get_gateway_mock.assert_called_with(self.context._container_manager.docker_client, "network")
+        RuntimeApiMock.assert_called_with("172.17.0.1", container_host=None)
+        result.create.assert_called_with()
+        result.start.assert_called_with()
+
+    @patch("samcli.commands.local.cli_common.invoke_context.LocalRuntimeApiService")
+    @patch("samcli.commands.local.cli_common.invoke_context.get_network_gateway")
+    @patch("samcli.commands.local.cli_common.invoke_context.platform")
+    def test_must_use_default_bridge_network(self, platform_mock, get_gateway_mock, RuntimeApiMock):
+        platform_mock.system.return_value = "Linux"
+
+        self.context._get_runtime_api()
+
+        get_gateway_mock.assert_called_with(self.context._container_manager.docker_client, "bridge")
+
+    @patch("samcli.commands.local.cli_common.invoke_context.LocalRuntimeApiService")
+    @patch("samcli.commands.local.cli_common.invoke_context.platform")
+    def test_must_use_docker_desktop_host_name(self, platform_mock, RuntimeApiMock):
+        platform_mock.system.return_value = "Darwin"
+
+        self.context._get_runtime_api()
+
+        RuntimeApiMock.assert_called_with("127.0.0.1", container_host="host.docker.internal")
+
+    @patch("samcli.commands.local.cli_common.invoke_context.LocalRuntimeApiService")
+    def test_must_use_loopback_on_host_network(self, RuntimeApiMock):
+        self.context._docker_network = "host"
+
+        self.context._get_runtime_api()
+
+        RuntimeApiMock.assert_called_with("127.0.0.1", container_host=None)
+
+    @patch("samcli.commands.local.cli_common.invoke_context.LocalRuntimeApiService")
+    @patch("samcli.commands.local.cli_common.invoke_context.get_network_gateway")
+    @patch("samcli.commands.local.cli_common.invoke_context.platform")
+    def test_must_return_none_without_gateway(self, platform_mock, get_gateway_mock, RuntimeApiMock):
+        platform_mock.system.return_value = "Linux"
+        get_gateway_mock.return_value = None
+
+        self.assertIsNone(self.context._get_runtime_api())
+        RuntimeApiMock.assert_not_called()
+
+    @patch("samcli.commands.local.cli_common.invoke_context.LocalRuntimeApiService")
+    @patch("samcli.commands.local.cli_common.invoke_context.get_network_gateway")
+    @patch("samcli.commands.local.cli_common.invoke_context.platform")
+    def test_must_return_none_when_network_is_not_found(self, platform_mock, get_gateway_mock, RuntimeApiMock):
+        platform_mock.system.return_value = "Linux"
+        get_gateway_mock.side_effect = docker.errors.NotFound("network not found")
+        self.context._docker_network = "missing"
+
+        self.assertIsNone(self.context._get_runtime_api())
+        RuntimeApiMock.assert_not_called()
+
+    @patch("samcli.commands.local.cli_common.invoke_context.LocalRuntimeApiService")
+    def test_must_start_service_once(self, RuntimeApiMock):
+        self.context._docker_network = "host"
+
+        self.assertEquals(self.context._get_runtime_api(), self.context._get_runtime_api())
+        RuntimeApiMock.assert_called_once_with("127.0.0.1", container_host=None)
 
 
 class TestInvokeContext_stdout_property(TestCase):
@@ -260,6 +582,36 @@ class TestInvokeContext_template_property(TestCase):
         self.assertEquals("My template", context.template)
 
 
+class TestInvokeContext_reload_template(TestCase):
+
+    @patch("samcli.commands.local.cli_common.invoke_context.SamFunctionProvider")
+    def test_must_read_template_and_create_function_provider(self, SamFunctionProviderMock):
+        context = InvokeContext(template_file="template_file", parameter_overrides={"a": "b"})
+        context._get_template_data = Mock(return_value="new template")
+        context._template_dict = "old template"
+
+        result = context.reload_template()
+
+        self.assertEquals(result, SamFunctionProviderMock.return_value)
+        self.assertEquals(context.template, "new template")
+        self.assertEquals(context._function_provider, SamFunctionProviderMock.return_value)
+        self.assertEquals(context.template_file, "template_file")
+        context._get_template_data.assert_called_with("template_file")
+        SamFunctionProviderMock.assert_called_with("new template", {"a": "b"})
+
+    def test_must_keep_template_if_not_valid(self):
+        context = InvokeContext(template_file="template_file")
+        context._get_template_data = Mock(side_effect=InvokeContextException("not valid"))
+        context._template_dict = "old template"
+        context._function_provider = "old provider"
+
+        with self.assertRaises(InvokeContextException):
+            context.reload_template()
+
+        self.assertEquals(context.template, "old template")
+        self.assertEquals(context._function_provider, "old provider")
+
+
 class TestInvokeContextget_cwd(TestCase):
 
     def test_must_return_template_file_dir_name(self):
@@ -407,10 +759,10 @@ class TestInvokeContext_check_docker_connectivity(TestCase):
         InvokeContext._check_docker_connectivity(client)
         client.ping.assert_called_with()
 
-    @patch("samcli.commands.local.cli_common.invoke_context.docker")
-    def test_must_call_ping_with_docker_client_from_env(self, docker_mock):
+    @patch("samcli.commands.local.cli_common.invoke_context.get_docker_client")
+    def test_must_call_ping_with_shared_docker_client(self, get_docker_client_mock):
         client = Mock()
-        docker_mock.from_env.return_value = client
+        get_docker_client_mock.return_value = client
 
         InvokeContext._check_docker_connectivity()
         client.ping.assert_called_with()
@@ -429,3 +781,19 @@ class TestInvokeContext_check_docker_connectivity(TestCase):
 
         msg = str(ex_ctx.exception)
         self.assertEquals(msg, "Running AWS SAM projects locally requires Docker. Have you got it installed?")
+
+
+class TestInvokeContext_get_docker_pool_size(TestCase):
+
+    @parameterized.expand([
+        (32, None, 32),
+        (32, 4, 10),
+        (64, 40, 40),
+        (2, None, 10),
+    ])
+    def test_must_size_pool_for_running_invokes(self, max_parallel_invokes, max_concurrent_invokes, expected):
+        context = InvokeContext(template_file="template",
+                                max_parallel_invokes=max_parallel_invokes,
+                                max_concurrent_invokes=max_concurrent_invokes)
+
+        self.assertEquals(context._get_docker_pool_size(), expected)
@@ -2,6 +2,10 @@
 Tests Local Invoke CLI
 """
 
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
 from unittest import TestCase
 from mock import patch, Mock
 from parameterized import parameterized, param
@@ -10,7 +14,8 @@ from samcli.local.lambdafn.exceptions import FunctionNotFound
 from samcli.commands.local.lib.exceptions import InvalidLayerReference
 from samcli.commands.validate.lib.exceptions import InvalidSamDocumentException
 from samcli.commands.exceptions import UserException
-from samcli.commands.local.invoke.cli import do_cli as invoke_cli, _get_event as invoke_cli_get_event
+from samcli.commands.local.invoke.cli import do_cli as invoke_cli, _get_event as invoke_cli_get_event, \
+    _get_batch_events
 from samcli.commands.local.lib.exceptions import OverridesNotWellDefinedError
 from samcli.local.docker.manager import DockerImagePullFailedException
 from samcli.local.docker.lambda_container import DebuggingNotSupported
@@ -36,6 +41,9 @@ class TestCli(TestCase):
         self.no_event = False
         self.parameter_overrides = {}
         self.layer_cache_basedir = "/some/layers/path"
+        self.template_cache_dir = "/some/templates/path"
+        self.code_cache_basedir = "/some/code/path"
+        self.code_cache_max_size = 512
         self.force_image_build = True
         self.region_name = "region"
 
@@ -57,6 +65,8 @@ class TestCli(TestCase):
                    template=self.template,
                    event=self.eventfile,
                    no_event=self.no_event,
+                   batch=None,
+                   batch_workers=1,
                    env_vars=self.env_vars,
                    debug_port=self.debug_port,
                    debug_args=self.debug_args,
@@ -67,6 +77,9 @@ class TestCli(TestCase):
                    skip_pull_image=self.skip_pull_image,
                    parameter_overrides=self.parameter_overrides,
                    layer_cache_basedir=self.layer_cache_basedir,
+                   template_cache_dir=self.template_cache_dir,
+                   code_cache_basedir=self.code_cache_basedir,
+                   code_cache_max_size=self.code_cache_max_size,
                    force_image_build=self.force_image_build)
 
         InvokeContextMock.assert_called_with(template_file=self.template,
@@ -81,8 +94,14 @@ class TestCli(TestCase):
                                              debugger_path=self.debugger_path,
                                              parameter_overrides=self.parameter_overrides,
                                              layer_cache_basedir=self.layer_cache_basedir,
+                                             template_cache_dir=self.template_cache_dir,
+                                             code_cache_basedir=self.code_cache_basedir,
+                                             code_cache_max_size=self.code_cache_max_size,
                                              force_image_build=self.force_image_build,
-                                             aws_region=self.region_name)
+                                             aws_region=self.region_name,
+                                             warm_containers=False,
+                                             max_warm_containers=None,
+                                             max_parallel_invokes=None)
 
         context_mock.local_lambda_runner.invoke.assert_called_with(context_mock.function_name,
                                                                    event=event_data,
@@ -106,6 +125,8 @@ class TestCli(TestCase):
                    template=self.template,
                    event=STDIN_FILE_NAME,
                    no_event=self.no_event,
+                   batch=None,
+                   batch_workers=1,
                    env_vars=self.env_vars,
                    debug_port=self.debug_port,
                    debug_args=self.debug_args,
@@ -116,6 +137,9 @@ class TestCli(TestCase):
                    skip_pull_image=self.skip_pull_image,
                    parameter_overrides=self.parameter_overrides,
                    layer_cache_basedir=self.layer_cache_basedir,
+                   template_cache_dir=self.template_cache_dir,
+                   code_cache_basedir=self.code_cache_basedir,
+                   code_cache_max_size=self.code_cache_max_size,
                    force_image_build=self.force_image_build)
 
         InvokeContextMock.assert_called_with(template_file=self.template,
@@ -130,8 +154,14 @@ class TestCli(TestCase):
                                              debugger_path=self.debugger_path,
                                              parameter_overrides=self.parameter_overrides,
                                              layer_cache_basedir=self.layer_cache_basedir,
+                                             template_cache_dir=self.template_cache_dir,
+                                             code_cache_basedir=self.code_cache_basedir,
+                                             code_cache_max_size=self.code_cache_max_size,
                                              force_image_build=self.force_image_build,
-                                             aws_region=self.region_name)
+                                             aws_region=self.region_name,
+                                             warm_containers=False,
+                                             max_warm_containers=None,
+                                             max_parallel_invokes=None)
 
         context_mock.local_lambda_runner.invoke.assert_called_with(context_mock.function_name,
                                                                    event="{}",
@@ -154,6 +184,8 @@ class TestCli(TestCase):
                        template=self.template,
                        event=self.eventfile,
                        no_event=self.no_event,
+                       batch=None,
+                       batch_workers=1,
                        env_vars=self.env_vars,
                        debug_port=self.debug_port,
                        debug_args=self.debug_args,
@@ -164,6 +196,9 @@ class TestCli(TestCase):
                        skip_pull_image=self.skip_pull_image,
                        parameter_overrides=self.parameter_overrides,
                        layer_cache_basedir=self.layer_cache_basedir,
+                       template_cache_dir=self.template_cache_dir,
+                       code_cache_basedir=self.code_cache_basedir,
+                       code_cache_max_size=self.code_cache_max_size,
                        force_image_build=self.force_image_build)
 
         msg = str(ex_ctx.exception)
@@ -199,6 +234,8 @@ class TestCli(TestCase):
                        template=self.template,
                        event=self.eventfile,
                        no_event=self.no_event,
+                       batch=None,
+                       batch_workers=1,
                        env_vars=self.env_vars,
                        debug_port=self.debug_port,
                        debug_args=self.debug_args,
@@ -209,6 +246,9 @@ class TestCli(TestCase):
                        skip_pull_image=self.skip_pull_image,
                        parameter_overrides=self.parameter_overrides,
                        layer_cache_basedir=self.layer_cache_basedir,
+                       template_cache_dir=self.template_cache_dir,
+                       code_cache_basedir=self.code_cache_basedir,
+                       code_cache_max_size=self.code_cache_max_size,
                        force_image_build=self.force_image_build)
 
         msg = str(ex_ctx.exception)
@@ -241,6 +281,8 @@ class TestCli(TestCase):
                        template=self.template,
                        event=self.eventfile,
                        no_event=self.no_event,
+                       batch=None,
+                       batch_workers=1,
                        env_vars=self.env_vars,
                        debug_port=self.debug_port,
                        debug_args=self.debug_args,
@@ -251,6 +293,9 @@ class TestCli(TestCase):
                        skip_pull_image=self.skip_pull_image,
                        parameter_overrides=self.parameter_overrides,
                        layer_cache_basedir=self.layer_cache_basedir,
+                       template_cache_dir=self.template_cache_dir,
+                       code_cache_basedir=self.code_cache_basedir,
+                       code_cache_max_size=self.code_cache_max_size,
                        force_image_build=self.force_image_build)
 
         msg = str(ex_ctx.exception)
@@ -274,6 +319,8 @@ class TestCli(TestCase):
                        template=self.template,
                        event=self.eventfile,
                        no_event=self.no_event,
+                       batch=None,
+                       batch_workers=1,
                        env_vars=self.env_vars,
                        debug_port=self.debug_port,
                        debug_args=self.debug_args,
@@ -284,12 +331,115 @@ class TestCli(TestCase):
                        skip_pull_image=self.skip_pull_image,
                        parameter_overrides=self.parameter_overrides,
                        layer_cache_basedir=self.layer_cache_basedir,
+                       template_cache_dir=self.template_cache_dir,
+                       code_cache_basedir=self.code_cache_basedir,
+                       code_cache_max_size=self.code_cache_max_size,
                        force_image_build=self.force_image_build)
 
         msg = str(ex_ctx.exception)
         self.assertEquals(msg, "bad env vars")
 
 
+class TestCliBatch(TestCase):
+
+    def setUp(self):
+        self.ctx_mock = Mock()
+        self.ctx_mock.region = "region"
+
+    def call_cli(self, batch="events.jsonl", event=STDIN_FILE_NAME, no_event=False, batch_workers=4):
+        invoke_cli(ctx=self.ctx_mock,
+                   function_identifier="id",
+                   template="template",
+                   event=event,
+                   no_event=no_event,
+                   batch=batch,
+                   batch_workers=batch_workers,
+                   env_vars=None,
+                   debug_port=None,
+                   debug_args=None,
+                   debugger_path=None,
+                   docker_volume_basedir=None,
+                   docker_network=None,
+                   log_file=None,
+                   skip_pull_image=True,
+                   parameter_overrides={},
+                   layer_cache_basedir=None,
+                   template_cache_dir=None,
+                   code_cache_basedir=None,
+                   code_cache_max_size=None,
+                   force_image_build=False)
+
+    @patch("samcli.commands.local.invoke.cli.osutils")
+    @patch("samcli.commands.local.invoke.cli._get_batch_events")
+    @patch("samcli.commands.local.invoke.cli.BatchInvoke")
+    @patch("samcli.commands.local.invoke.cli.InvokeContext")
+    def test_must_invoke_batch_in_warm_containers(self, InvokeContextMock, BatchInvokeMock, get_batch_events_mock,
+                                                  osutils_mock):
+        context_mock = Mock()
+        InvokeContextMock.return_value.__enter__.return_value = context_mock
+        BatchInvokeMock.return_value.run.return_value = OrderedDict([("success", 2), ("function_error", 1)])
+
+        self.call_cli()
+
+        _, kwargs = InvokeContextMock.call_args
+        self.assertTrue(kwargs["warm_containers"])
+        self.assertEquals(kwargs["max_warm_containers"], 4)
+        self.assertEquals(kwargs["max_parallel_invokes"], 4)
+
+        BatchInvokeMock.assert_called_with(context_mock.local_lambda_runner,
+                                           context_mock.function_name,
+                                           workers=4,
+                                           stderr=context_mock.stderr,
+                                           is_debugging=context_mock.local_lambda_runner.is_debugging.return_value)
+        get_batch_events_mock.assert_called_with("events.jsonl")
+        BatchInvokeMock.return_value.run.assert_called_with(get_batch_events_mock.return_value,
+                                                            osutils_mock.stdout.return_value)
+        context_mock.local_lambda_runner.invoke.assert_not_called()
+
+    @parameterized.expand([
+        param("eventfile", False),
+        param(STDIN_FILE_NAME, True)
+    ])
+    def test_must_raise_when_batch_is_used_with_event(self, event, no_event):
+        with self.assertRaises(UserException):
+            self.call_cli(event=event, no_event=no_event)
+
+    def test_must_raise_without_batch_workers(self):
+        with self.assertRaises(UserException):
+            self.call_cli(batch_workers=0)
+
+
+class TestGetBatchEvents(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, file_name, content):
+        path = os.path.join(self.directory, file_name)
+        with open(path, "w") as fp:
+            fp.write(content)
+        return path
+
+    def test_must_read_one_event_per_line(self):
+        path = self._write("events.jsonl", '{"a": 1}\n\n{"b": 2}\n')
+
+        events = list(_get_batch_events(path))
+
+        self.assertEquals(events, [(1, '{"a": 1}'), (3, '{"b": 2}')])
+
+    def test_must_read_json_files_of_directory(self):
+        self._write("2.json", '{"b": 2}')
+        self._write("1.json", '{"a": 1}')
+        self._write("README.md", 'not an event')
+
+        events = list(_get_batch_events(self.directory))
+
+        self.assertEquals(events, [("1.json", '{"a": 1}'), ("2.json", '{"b": 2}')])
+
+
 class TestGetEvent(TestCase):
 
     @parameterized.expand([
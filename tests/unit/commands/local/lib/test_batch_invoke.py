@@ -0,0 +1,120 @@
+"""
+Testing batch invoke
+"""
+import io
+import json
+import threading
+from unittest import TestCase
+
+from mock import Mock, ANY
+
+from samcli.commands.local.lib.batch_invoke import BatchInvoke
+from samcli.local.lambdafn.exceptions import FunctionNotFound
+
+
+class TestBatchInvoke_run(TestCase):
+
+    def setUp(self):
+        self.lambda_runner = Mock()
+        self.responses = {}
+
+        def invoke(function_name, event, stdout=None, stderr=None):
+            response = self.responses[event]
+            if isinstance(response, Exception):
+                raise response
+            stdout.write(response)
+
+        self.lambda_runner.invoke.side_effect = invoke
+        self.output = io.BytesIO()
+
+    def _results(self):
+        return [json.loads(line) for line in self.output.getvalue().decode("utf-8").splitlines()]
+
+    def test_must_write_one_line_per_event(self):
+        self.responses = {
+            '{"a": 1}': b'{"hello": "world"}',
+            '{"b": 2}': b'log line\n"plain"',
+            '{"c": 3}': b'{"errorMessage": "boom", "errorType": "Exception", "stackTrace": []}',
+            '{"d": 4}': ValueError("container failed"),
+        }
+        stderr = Mock()
+        batch = BatchInvoke(self.lambda_runner, "HelloWorld", stderr=stderr)
+
+        counts = batch.run([(1, '{"a": 1}'), (2, '{"b": 2}'), (3, '{"c": 3}'), (4, '{"d": 4}'), (5, 'not json')],
+                           self.output)
+
+        results = self._results()
+        self.assertEquals([result["event"] for result in results], [1, 2, 3, 4, 5])
+        self.assertEquals([result["status"] for result in results],
+                          ["success", "success", "function_error", "invoke_error", "invalid_event"])
+        self.assertEquals(results[0]["response"], {"hello": "world"})
+        self.assertEquals(results[1]["response"], "plain")
+        self.assertEquals(results[3]["error"], "container failed")
+        self.assertNotIn("duration_ms", results[4])
+        for result in results[:4]:
+            self.assertGreaterEqual(result["duration_ms"], 0)
+
+        self.assertEquals(dict(counts), {"success": 2, "function_error": 1, "invoke_error": 1, "invalid_event": 1})
+        stderr.write.assert_called_once_with(b"log line\n")
+        self.lambda_runner.invoke.assert_any_call("HelloWorld", '{"a": 1}', stdout=ANY, stderr=stderr)
+
+    def test_must_write_results_in_order_of_events(self):
+        first_started = threading.Event()
+        release_first = threading.Event()
+
+        def invoke(function_name, event, stdout=None, stderr=None):
+            if event == '{"first": true}':
+                first_started.set()
+                release_first.wait(10)
+            else:
+                # The second event completes while the first one is still running
+                self.assertTrue(first_started.wait(10))
+                release_first.set()
+            stdout.write(b'{}')
+
+        self.lambda_runner.invoke.side_effect = invoke
+        batch = BatchInvoke(self.lambda_runner, "HelloWorld", workers=2)
+
+        batch.run([("first", '{"first": true}'), ("second", '{"second": true}')], self.output)
+
+        self.assertEquals([result["event"] for result in self._results()], ["first", "second"])
+
+    def test_must_read_events_lazily(self):
+        read = []
+
+        def events():
+            for index in range(10):
+                read.append(index)
+                # Events are read at most one ahead of the results that were written
+                self.assertLessEqual(len(read), len(self.output.getvalue().splitlines()) + 2)
+                yield index, '{}'
+
+        self.responses = {'{}': b'{}'}
+        batch = BatchInvoke(self.lambda_runner, "HelloWorld")
+
+        batch.run(events(), self.output)
+
+        self.assertEquals(len(self._results()), 10)
+
+    def test_must_raise_when_function_is_not_found(self):
+        self.responses = {'{}': FunctionNotFound()}
+        batch = BatchInvoke(self.lambda_runner, "NotFound")
+
+        with self.assertRaises(FunctionNotFound):
+            batch.run([(1, '{}')], self.output)
+
+    def test_must_invoke_on_calling_thread_when_debugging(self):
+        threads = []
+
+        def invoke(function_name, event, stdout=None, stderr=None):
+            threads.append(threading.current_thread())
+            stdout.write(b'{}')
+
+        self.lambda_runner.invoke.side_effect = invoke
+        batch = BatchInvoke(self.lambda_runner, "HelloWorld", workers=4, is_debugging=True)
+
+        counts = batch.run([(1, '{}'), (2, '{}'), (3, 'not json')], self.output)
+
+        self.assertEquals(threads, [threading.current_thread()] * 2)
+        self.assertEquals([result["event"] for result in self._results()], [1, 2, 3])
+        self.assertEquals(dict(counts), {"success": 2, "function_error": 0, "invoke_error": 0, "invalid_event": 1})
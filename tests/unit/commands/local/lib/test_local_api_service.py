@@ -3,7 +3,7 @@ Unit test for local API service
 """
 
 from unittest import TestCase
-from mock import Mock, patch
+from mock import Mock, patch, ANY
 
 from samcli.commands.local.lib.local_api_service import LocalApiService
 from samcli.commands.local.lib.exceptions import NoApisDefined
@@ -70,7 +70,9 @@ class TestLocalApiService_start(TestCase):
                                             static_dir=static_dir_path,
                                             port=self.port,
                                             host=self.host,
-                                            stderr=self.stderr_mock)
+                                            stderr=self.stderr_mock,
+                                            max_workers=None,
+                                            max_queued_requests=None)
 
         self.apigw_service.create.assert_called_with()
         self.apigw_service.run.assert_called_with()
@@ -181,3 +183,154 @@ class TestLocalApiService_make_static_dir_path(TestCase):
 
         result = LocalApiService._make_static_dir_path(cwd, static_dir)
         self.assertIsNone(result)
+
+
+class TestLocalApiService_watch_template(TestCase):
+
+    def setUp(self):
+        self.lambda_invoke_context_mock = Mock()
+        self.lambda_invoke_context_mock.get_cwd.return_value = "cwd"
+        self.lambda_invoke_context_mock.template_file = "template.yaml"
+        self.lambda_runner_mock = self.lambda_invoke_context_mock.local_lambda_runner
+        self.apigw_service = Mock()
+
+    @patch("samcli.commands.local.lib.local_api_service.FileWatcher")
+    @patch("samcli.commands.local.lib.local_api_service.LocalApigwService")
+    @patch("samcli.commands.local.lib.local_api_service.SamApiProvider")
+    @patch.object(LocalApiService, "_print_routes")
+    @patch.object(LocalApiService, "_make_routing_list")
+    def test_must_watch_template_while_service_runs(self,
+                                                    make_routing_list_mock,
+                                                    print_routes_mock,
+                                                    SamApiProviderMock,
+                                                    ApiGwServiceMock,
+                                                    FileWatcherMock):
+        make_routing_list_mock.return_value = [1]
+        ApiGwServiceMock.return_value = self.apigw_service
+        self.apigw_service.run.side_effect = KeyboardInterrupt()
+
+        local_service = LocalApiService(self.lambda_invoke_context_mock, 123, "abc", None, watch_template=True)
+        local_service._reload_template = Mock()
+
+        with self.assertRaises(KeyboardInterrupt):
+            local_service.start()
+
+        FileWatcherMock.assert_called_with("template.yaml", ANY)
+        FileWatcherMock.return_value.start.assert_called_with()
+        FileWatcherMock.return_value.stop.assert_called_with()
+
+        # The watcher reloads the template into the running service
+        FileWatcherMock.call_args[0][1]()
+        local_service._reload_template.assert_called_with(self.apigw_service)
+
+    @patch("samcli.commands.local.lib.local_api_service.FileWatcher")
+    @patch("samcli.commands.local.lib.local_api_service.LocalApigwService")
+    @patch("samcli.commands.local.lib.local_api_service.SamApiProvider")
+    @patch.object(LocalApiService, "_print_routes")
+    @patch.object(LocalApiService, "_make_routing_list")
+    def test_must_not_watch_template_by_default(self,
+                                                make_routing_list_mock,
+                                                print_routes_mock,
+                                                SamApiProviderMock,
+                                                ApiGwServiceMock,
+                                                FileWatcherMock):
+        make_routing_list_mock.return_value = [1]
+
+        LocalApiService(self.lambda_invoke_context_mock, 123, "abc", None).start()
+
+        FileWatcherMock.assert_not_called()
+
+
+class TestLocalApiService_reload_template(TestCase):
+
+    def setUp(self):
+        self.lambda_invoke_context_mock = Mock()
+        self.lambda_invoke_context_mock.get_cwd.return_value = "cwd"
+        self.lambda_runner_mock = self.lambda_invoke_context_mock.local_lambda_runner
+        self.service = Mock()
+
+        self.function_provider = Mock()
+        self.function_provider.get_all.return_value = [Mock()]
+        self.lambda_runner_mock.provider.get_all.return_value = self.function_provider.get_all.return_value
+        self.lambda_invoke_context_mock.reload_template.return_value = self.function_provider
+
+        self.previous_api_provider = Mock()
+        self.previous_api_provider.get_all.return_value = [Api(path="/path", method="GET", function_name="Function1")]
+
+    def _reload(self, SamApiProviderMock, apis):
+        new_api_provider = Mock()
+        new_api_provider.get_all.return_value = apis
+        SamApiProviderMock.side_effect = [self.previous_api_provider, new_api_provider]
+
+        local_service = LocalApiService(self.lambda_invoke_context_mock, 123, "abc", None)
+        local_service._print_routes = Mock()
+        local_service._reload_template(self.service)
+
+        return local_service, new_api_provider
+
+    @patch("samcli.commands.local.lib.local_api_service.SamApiProvider")
+    def test_must_update_routes_that_changed(self, SamApiProviderMock):
+        apis = [Api(path="/path", method="GET", function_name="Function1"),
+                Api(path="/other", method="POST", function_name="Function1")]
+
+        local_service, new_api_provider = self._reload(SamApiProviderMock, apis)
+
+        self.assertEquals(self.lambda_runner_mock.provider, self.function_provider)
+        self.assertEquals(local_service.api_provider, new_api_provider)
+        routing_list = self.service.update_routes.call_args[0][0]
+        self.assertEquals([(route.path, route.methods) for route in routing_list],
+                          [("/path", ["GET"]), ("/other", ["POST"])])
+        local_service._print_routes.assert_called_with(new_api_provider, "abc", 123)
+
+    @patch("samcli.commands.local.lib.local_api_service.SamApiProvider")
+    def test_must_only_swap_functions_if_routes_did_not_change(self, SamApiProviderMock):
+        apis = [Api(path="/path", method="GET", function_name="Function1")]
+
+        self._reload(SamApiProviderMock, apis)
+
+        self.assertEquals(self.lambda_runner_mock.provider, self.function_provider)
+        self.service.update_routes.assert_not_called()
+
+    @patch("samcli.commands.local.lib.local_api_service.SamApiProvider")
+    def test_must_keep_previous_template_if_not_valid(self, SamApiProviderMock):
+        previous_function_provider = self.lambda_runner_mock.provider
+        self.lambda_invoke_context_mock.reload_template.side_effect = ValueError("not valid")
+
+        local_service, _ = self._reload(SamApiProviderMock, [])
+
+        self.assertEquals(self.lambda_runner_mock.provider, previous_function_provider)
+        self.assertEquals(local_service.api_provider, self.previous_api_provider)
+        self.service.update_routes.assert_not_called()
+
+    @patch("samcli.commands.local.lib.local_api_service.SamApiProvider")
+    def test_must_keep_previous_template_without_apis(self, SamApiProviderMock):
+        previous_function_provider = self.lambda_runner_mock.provider
+
+        self._reload(SamApiProviderMock, [])
+
+        self.assertEquals(self.lambda_runner_mock.provider, previous_function_provider)
+        self.service.update_routes.assert_not_called()
+
+
+class TestLocalApiService_changed_functions(TestCase):
+
+    @staticmethod
+    def _provider(*functions):
+        provider = Mock()
+        provider.get_all.return_value = functions
+        return provider
+
+    @staticmethod
+    def _function(name):
+        function = Mock()
+        function.name = name
+        return function
+
+    def test_must_return_added_removed_and_changed_functions(self):
+        same = self._function("Same")
+        previous_provider = self._provider(same, self._function("Changed"), self._function("Removed"))
+        new_provider = self._provider(same, self._function("Changed"), self._function("Added"))
+
+        result = LocalApiService._changed_functions(previous_provider, new_provider)
+
+        self.assertEquals(result, ["Added", "Changed", "Removed"])
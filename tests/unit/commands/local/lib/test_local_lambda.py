@@ -2,12 +2,14 @@
 Testing local lambda runner
 """
 from unittest import TestCase
+from concurrent.futures import Future
 from mock import Mock, patch
 from parameterized import parameterized, param
 
 from samcli.commands.local.lib.local_lambda import LocalLambdaRunner
 from samcli.commands.local.lib.provider import Function
-from samcli.local.lambdafn.exceptions import FunctionNotFound
+from samcli.local.lambdafn.concurrency import ConcurrencyLimiter
+from samcli.local.lambdafn.exceptions import FunctionNotFound, ConcurrencyLimitExceeded
 from samcli.commands.local.lib.exceptions import OverridesNotWellDefinedError
 
 
@@ -233,7 +235,8 @@ class TestLocalLambda_make_env_vars(TestCase):
                             codeuri="codeuri",
                             environment=self.environ,
                             rolearn=None,
-                            layers=[])
+                            layers=[],
+                            reserved_concurrency=None)
 
         self.local_lambda.env_vars_values = env_vars_values
 
@@ -268,7 +271,8 @@ class TestLocalLambda_make_env_vars(TestCase):
                             codeuri="codeuri",
                             environment=self.environ,
                             rolearn=None,
-                            layers=[])
+                            layers=[],
+                            reserved_concurrency=None)
 
         self.local_lambda.env_vars_values = env_vars_values
 
@@ -294,7 +298,8 @@ class TestLocalLambda_make_env_vars(TestCase):
                             codeuri="codeuri",
                             environment=environment_variable,
                             rolearn=None,
-                            layers=[])
+                            layers=[],
+                            reserved_concurrency=None)
 
         self.local_lambda.env_vars_values = {}
 
@@ -349,7 +354,8 @@ class TestLocalLambda_get_invoke_config(TestCase):
                             codeuri="codeuri",
                             environment=None,
                             rolearn=None,
-                            layers=layers)
+                            layers=layers,
+                            reserved_concurrency=None)
 
         config = "someconfig"
         FunctionConfigMock.return_value = config
@@ -389,7 +395,8 @@ class TestLocalLambda_get_invoke_config(TestCase):
                             codeuri="codeuri",
                             environment=None,
                             rolearn=None,
-                            layers=[])
+                            layers=[],
+                            reserved_concurrency=None)
 
         config = "someconfig"
         FunctionConfigMock.return_value = config
@@ -432,7 +439,7 @@ class TestLocalLambda_invoke(TestCase):
         stdout = "stdout"
         stderr = "stderr"
         function = Mock()
-        invoke_config = "config"
+        invoke_config = Mock()
 
         self.function_provider_mock.get.return_value = function
         self.local_lambda._get_invoke_config = Mock()
@@ -450,6 +457,117 @@ class TestLocalLambda_invoke(TestCase):
         with self.assertRaises(FunctionNotFound):
             self.local_lambda.invoke("name", "event")
 
+    def test_must_invoke_async(self):
+        self.function_provider_mock.get.return_value = Mock()
+        self.local_lambda._get_invoke_config = Mock()
+        self.local_lambda._get_invoke_config.return_value = "config"
+
+        result = self.local_lambda.invoke_async("name", "event", "stdout", "stderr")
+
+        self.assertEquals(result, self.runtime_mock.invoke_async.return_value)
+        self.runtime_mock.invoke_async.assert_called_with("config", "event",
+                                                          debug_context=None,
+                                                          stdout="stdout", stderr="stderr")
+
+    def test_must_raise_if_function_not_found_async(self):
+
+        self.function_provider_mock.get.return_value = None  # function not found
+        with self.assertRaises(FunctionNotFound):
+            self.local_lambda.invoke_async("name", "event")
+
+
+class TestLocalLambda_invoke_with_concurrency_limiter(TestCase):
+
+    def setUp(self):
+        self.runtime_mock = Mock()
+        self.function_provider_mock = Mock()
+        self.limiter = ConcurrencyLimiter(max_concurrency=1)
+
+        self.local_lambda = LocalLambdaRunner(self.runtime_mock,
+                                              self.function_provider_mock,
+                                              "cwd",
+                                              concurrency_limiter=self.limiter)
+
+        self.config = Mock()
+        self.config.name = "HelloWorld"
+        self.local_lambda._get_invoke_config = Mock(return_value=self.config)
+
+    def test_must_release_after_invoke(self):
+        self.runtime_mock.invoke.side_effect = lambda *args, **kwargs: \
+            self.assertEquals(self.limiter.stats()["running"], 1)
+
+        self.local_lambda.invoke("HelloWorld", "event")
+
+        self.runtime_mock.invoke.assert_called_once()
+        self.assertEquals(self.limiter.stats()["running"], 0)
+
+    def test_must_release_after_async_invoke(self):
+        invoke_future = Future()
+        self.runtime_mock.invoke_async.return_value = invoke_future
+
+        future = self.local_lambda.invoke_async("HelloWorld", "event")
+
+        self.assertFalse(future.done())
+        self.assertEquals(self.limiter.stats()["running"], 1)
+
+        invoke_future.set_result("result")
+
+        self.assertEquals(future.result(), "result")
+        self.assertEquals(self.limiter.stats()["running"], 0)
+
+    def test_must_queue_async_invoke_until_running_invoke_completes(self):
+        first, second = Future(), Future()
+        self.runtime_mock.invoke_async.side_effect = [first, second]
+
+        first_result = self.local_lambda.invoke_async("HelloWorld", "event")
+        second_result = self.local_lambda.invoke_async("HelloWorld", "event")
+
+        self.assertEquals(self.runtime_mock.invoke_async.call_count, 1)
+
+        error = ValueError()
+        first.set_exception(error)
+
+        self.assertEquals(first_result.exception(), error)
+        self.assertEquals(self.runtime_mock.invoke_async.call_count, 2)
+
+        second.set_result(None)
+        self.assertIsNone(second_result.result())
+
+    def test_must_raise_when_throttled(self):
+        self.limiter.max_queued = 0
+        self.runtime_mock.invoke_async.return_value = Future()
+
+        self.local_lambda.invoke_async("HelloWorld", "event")
+
+        with self.assertRaises(ConcurrencyLimitExceeded):
+            self.local_lambda.invoke_async("HelloWorld", "event")
+
+
+class TestLocalLambda_prewarm(TestCase):
+
+    def setUp(self):
+        self.runtime_mock = Mock()
+        self.function_provider_mock = Mock()
+
+        self.local_lambda = LocalLambdaRunner(self.runtime_mock,
+                                              self.function_provider_mock,
+                                              "cwd")
+        self.local_lambda._get_invoke_config = Mock(side_effect=lambda function: function + "-config")
+
+    def test_must_prewarm_all_functions(self):
+        self.function_provider_mock.get_all.return_value = ["function1", "function2"]
+
+        self.local_lambda.prewarm(2)
+
+        self.runtime_mock.prewarm.assert_called_with(["function1-config", "function2-config"], 2)
+
+    def test_must_not_prewarm_when_debugging(self):
+        self.local_lambda.debug_context = Mock()
+
+        self.local_lambda.prewarm(2)
+
+        self.runtime_mock.prewarm.assert_not_called()
+
 
 class TestLocalLambda_is_debugging(TestCase):
 
@@ -33,13 +33,18 @@ class TestLocalLambdaService(TestCase):
         lambda_invoke_context_mock.local_lambda_runner = lambda_runner_mock
         lambda_invoke_context_mock.stderr = stderr_mock
 
-        service = LocalLambdaService(lambda_invoke_context=lambda_invoke_context_mock, port=3000, host='localhost')
+        service = LocalLambdaService(lambda_invoke_context=lambda_invoke_context_mock, port=3000, host='localhost',
+                                     max_workers=8, max_queued_requests=100, event_workers=2, event_retries=1)
 
         service.start()
 
         local_lambda_invoke_service_mock.assert_called_once_with(lambda_runner=lambda_runner_mock,
                                                                  port=3000,
                                                                  host='localhost',
-                                                                 stderr=stderr_mock)
+                                                                 stderr=stderr_mock,
+                                                                 max_workers=8,
+                                                                 max_queued_requests=100,
+                                                                 event_workers=2,
+                                                                 event_retries=1)
         lambda_context_mock.create.assert_called_once()
         lambda_context_mock.run.assert_called_once()
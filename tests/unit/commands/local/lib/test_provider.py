@@ -2,7 +2,7 @@ from unittest import TestCase
 
 from parameterized import parameterized
 
-from samcli.commands.local.lib.provider import LayerVersion
+from samcli.commands.local.lib.provider import LayerVersion, Function
 from samcli.commands.local.cli_common.user_exceptions import InvalidLayerVersionArn, UnsupportedIntrinsic
 
 
@@ -56,3 +56,12 @@ class TestLayerVersion(TestCase):
 
         with self.assertRaises(UnsupportedIntrinsic):
             LayerVersion(intrinsic_arn, ".")
+
+
+class TestFunction(TestCase):
+
+    def test_reserved_concurrency_defaults_to_none(self):
+        function = Function(name="name", runtime="python3.6", memory=128, timeout=3, handler="app.handler",
+                            codeuri="code", environment=None, rolearn=None, layers=[])
+
+        self.assertIsNone(function.reserved_concurrency)
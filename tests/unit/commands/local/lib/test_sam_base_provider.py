@@ -4,6 +4,7 @@ from mock import Mock, patch
 from nose_parameterized import parameterized
 
 from samcli.commands.local.lib.sam_base_provider import SamBaseProvider
+from samcli.commands.local.lib.template_cache import TemplateCache
 
 
 class TestSamBaseProvider_resolve_parameters(TestCase):
@@ -178,6 +179,12 @@ class TestSamBaseProvider_resolve_parameters(TestCase):
 
 class TestSamBaseProvider_get_template(TestCase):
 
+    def setUp(self):
+        # Templates processed by other tests must not be returned from the cache
+        template_cache_patch = patch.object(SamBaseProvider, "template_cache", TemplateCache())
+        template_cache_patch.start()
+        self.addCleanup(template_cache_patch.stop)
+
     @patch("samcli.commands.local.lib.sam_base_provider.SamTranslatorWrapper")
     @patch.object(SamBaseProvider, "_resolve_parameters")
     def test_must_run_translator_plugins(self, resolve_params_mock, SamTranslatorWrapperMock):
@@ -191,3 +198,18 @@ class TestSamBaseProvider_get_template(TestCase):
         SamTranslatorWrapperMock.assert_called_once_with(template)
         translator_instance.run_plugins.assert_called_once()
         resolve_params_mock.assert_called_once()
+
+    @patch("samcli.commands.local.lib.sam_base_provider.SamTranslatorWrapper")
+    @patch.object(SamBaseProvider, "_resolve_parameters")
+    def test_must_process_template_once(self, resolve_params_mock, SamTranslatorWrapperMock):
+        resolve_params_mock.return_value = {"Resources": {"Function": {}}}
+
+        first = SamBaseProvider.get_template({"Key": "Value"}, {'some': 'value'})
+        second = SamBaseProvider.get_template({"Key": "Value"}, {'some': 'value'})
+        SamBaseProvider.get_template({"Key": "Value"}, {'some': 'other value'})
+
+        self.assertEquals(first, {"Resources": {"Function": {}}})
+        self.assertEquals(second, first)
+        # Callers get their own copy
+        self.assertIsNot(second, first)
+        self.assertEquals(SamTranslatorWrapperMock.call_count, 2)
@@ -89,7 +89,8 @@ class TestSamFunctionProviderEndToEnd(TestCase):
             timeout=None,
             environment=None,
             rolearn=None,
-            layers=[]
+            layers=[],
+            reserved_concurrency=None
         )),
         ("SamFunc2", Function(
             name="SamFunc2",
@@ -100,7 +101,8 @@ class TestSamFunctionProviderEndToEnd(TestCase):
             timeout=None,
             environment=None,
             rolearn=None,
-            layers=[]
+            layers=[],
+            reserved_concurrency=None
         )),
         ("SamFunc3", Function(
             name="SamFunc3",
@@ -111,7 +113,8 @@ class TestSamFunctionProviderEndToEnd(TestCase):
             timeout=None,
             environment=None,
             rolearn=None,
-            layers=[]
+            layers=[],
+            reserved_concurrency=None
         )),
         ("LambdaFunc1", Function(
             name="LambdaFunc1",
@@ -122,7 +125,8 @@ class TestSamFunctionProviderEndToEnd(TestCase):
             timeout=None,
             environment=None,
             rolearn=None,
-            layers=[]
+            layers=[],
+            reserved_concurrency=None
         )),
         ("LambdaFuncWithLocalPath", Function(
             name="LambdaFuncWithLocalPath",
@@ -133,7 +137,8 @@ class TestSamFunctionProviderEndToEnd(TestCase):
             timeout=None,
             environment=None,
             rolearn=None,
-            layers=[]
+            layers=[],
+            reserved_concurrency=None
         ))
     ])
     def test_get_must_return_each_function(self, name, expected_output):
@@ -284,7 +289,8 @@ class TestSamFunctionProvider_convert_sam_function_resource(TestCase):
             codeuri="/usr/local",
             environment="myenvironment",
             rolearn="myrole",
-            layers=["Layer1", "Layer2"]
+            layers=["Layer1", "Layer2"],
+            reserved_concurrency=None
         )
 
         result = SamFunctionProvider._convert_sam_function_resource(name, properties, ["Layer1", "Layer2"])
@@ -307,7 +313,8 @@ class TestSamFunctionProvider_convert_sam_function_resource(TestCase):
             codeuri="/usr/local",
             environment=None,
             rolearn=None,
-            layers=[]
+            layers=[],
+            reserved_concurrency=None
         )
 
         result = SamFunctionProvider._convert_sam_function_resource(name, properties, [])
@@ -375,7 +382,8 @@ class TestSamFunctionProvider_convert_lambda_function_resource(TestCase):
             codeuri=".",
             environment="myenvironment",
             rolearn="myrole",
-            layers=["Layer1", "Layer2"]
+            layers=["Layer1", "Layer2"],
+            reserved_concurrency=None
         )
 
         result = SamFunctionProvider._convert_lambda_function_resource(name, properties, ["Layer1", "Layer2"])
@@ -400,7 +408,8 @@ class TestSamFunctionProvider_convert_lambda_function_resource(TestCase):
             codeuri=".",
             environment=None,
             rolearn=None,
-            layers=[]
+            layers=[],
+            reserved_concurrency=None
         )
 
         result = SamFunctionProvider._convert_lambda_function_resource(name, properties, [])
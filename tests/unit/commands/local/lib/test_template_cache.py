@@ -0,0 +1,157 @@
+import os
+import shutil
+import datetime
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from samcli.commands.local.lib.template_cache import TemplateCache
+
+
+class TestTemplateCache_get(TestCase):
+
+    def setUp(self):
+        self.template = {"Resources": {"Function": {"Type": "AWS::Serverless::Function"}}}
+        self.processed = {"Resources": {"Function": {"Type": "AWS::Lambda::Function"}}}
+        self.process = Mock()
+        self.process.return_value = self.processed
+
+    def test_must_process_template_once(self):
+        cache = TemplateCache()
+
+        first = cache.get(self.template, {"Key": "Value"}, self.process)
+        second = cache.get(self.template, {"Key": "Value"}, self.process)
+
+        self.assertEquals(first, self.processed)
+        self.assertEquals(second, self.processed)
+        self.process.assert_called_once_with(self.template, {"Key": "Value"})
+
+    def test_must_return_copies(self):
+        cache = TemplateCache()
+
+        first = cache.get(self.template, None, self.process)
+        first["Resources"]["Function"]["Type"] = "Modified"
+        second = cache.get(self.template, None, self.process)
+
+        self.assertEquals(second, {"Resources": {"Function": {"Type": "AWS::Lambda::Function"}}})
+        self.assertIsNot(second, self.processed)
+
+    def test_must_process_template_with_other_parameters(self):
+        cache = TemplateCache()
+
+        cache.get(self.template, {"Key": "Value"}, self.process)
+        cache.get(self.template, {"Key": "Other Value"}, self.process)
+        cache.get(self.template, None, self.process)
+
+        self.assertEquals(self.process.call_count, 3)
+
+    def test_must_process_changed_template(self):
+        cache = TemplateCache()
+
+        cache.get(self.template, None, self.process)
+        cache.get({"Resources": {}}, None, self.process)
+
+        self.assertEquals(self.process.call_count, 2)
+
+    def test_must_treat_missing_and_empty_parameters_the_same(self):
+        cache = TemplateCache()
+
+        cache.get(self.template, None, self.process)
+        cache.get(self.template, {}, self.process)
+
+        self.process.assert_called_once_with(self.template, None)
+
+    def test_must_evict_least_recently_used_template(self):
+        cache = TemplateCache(max_entries=2)
+
+        cache.get({"Template": 1}, None, self.process)
+        cache.get({"Template": 2}, None, self.process)
+        # Template 1 is used more recently than template 2 now
+        cache.get({"Template": 1}, None, self.process)
+        cache.get({"Template": 3}, None, self.process)
+        self.assertEquals(self.process.call_count, 3)
+
+        cache.get({"Template": 1}, None, self.process)
+        self.assertEquals(self.process.call_count, 3)
+
+        cache.get({"Template": 2}, None, self.process)
+        self.assertEquals(self.process.call_count, 4)
+
+    def test_must_not_cache_failures(self):
+        cache = TemplateCache()
+        self.process.side_effect = [ValueError("failed"), self.processed]
+
+        with self.assertRaises(ValueError):
+            cache.get(self.template, None, self.process)
+
+        self.assertEquals(cache.get(self.template, None, self.process), self.processed)
+
+    @patch("samcli.commands.local.lib.template_cache.samtranslator")
+    def test_key_must_depend_on_translator_version(self, samtranslator_mock):
+        samtranslator_mock.__version__ = "1.0.0"
+        key = TemplateCache._key(self.template, None)
+
+        samtranslator_mock.__version__ = "2.0.0"
+
+        self.assertNotEquals(TemplateCache._key(self.template, None), key)
+
+
+class TestTemplateCache_cache_dir(TestCase):
+
+    def setUp(self):
+        self.temp_dir = mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "templates")
+
+        self.template = {"Resources": {"Function": {"Type": "AWS::Serverless::Function"}}}
+        self.processed = {"Resources": {"Function": {"Type": "AWS::Lambda::Function"}}}
+        self.process = Mock()
+        self.process.return_value = self.processed
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _cache_files(self):
+        return os.listdir(self.cache_dir)
+
+    def test_must_read_template_processed_by_other_cache(self):
+        TemplateCache(cache_dir=self.cache_dir).get(self.template, None, self.process)
+
+        result = TemplateCache(cache_dir=self.cache_dir).get(self.template, None, self.process)
+
+        self.assertEquals(result, self.processed)
+        self.process.assert_called_once_with(self.template, None)
+        self.assertEquals(self._cache_files(), [TemplateCache._key(self.template, None) + ".json"])
+
+    def test_must_ignore_invalid_cache_file(self):
+        os.makedirs(self.cache_dir)
+        path = os.path.join(self.cache_dir, TemplateCache._key(self.template, None) + ".json")
+        with open(path, "w") as fp:
+            fp.write("{not json")
+
+        result = TemplateCache(cache_dir=self.cache_dir).get(self.template, None, self.process)
+
+        self.assertEquals(result, self.processed)
+        self.process.assert_called_once_with(self.template, None)
+
+        # Replaced by the processed template
+        self.process.reset_mock()
+        TemplateCache(cache_dir=self.cache_dir).get(self.template, None, self.process)
+        self.process.assert_not_called()
+
+    def test_must_not_write_template_that_is_not_json(self):
+        self.process.return_value = {"Date": datetime.date(2018, 1, 1)}
+
+        result = TemplateCache(cache_dir=self.cache_dir).get(self.template, None, self.process)
+
+        self.assertEquals(result, {"Date": datetime.date(2018, 1, 1)})
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_must_ignore_errors_writing_cache_file(self):
+        # A file, so the directory can't be created
+        with open(self.cache_dir, "w") as fp:
+            fp.write("")
+
+        result = TemplateCache(cache_dir=self.cache_dir).get(self.template, None, self.process)
+
+        self.assertEquals(result, self.processed)
@@ -29,6 +29,9 @@ class TestCli(TestCase):
         self.skip_pull_image = True
         self.parameter_overrides = {}
         self.layer_cache_basedir = "/some/layers/path"
+        self.template_cache_dir = "/some/templates/path"
+        self.code_cache_basedir = "/some/code/path"
+        self.code_cache_max_size = 512
         self.force_image_build = True
         self.region_name = "region"
 
@@ -37,7 +40,16 @@ class TestCli(TestCase):
 
         self.host = "host"
         self.port = 123
+        self.warm_containers = True
+        self.warm_container_ttl = 60
+        self.max_warm_containers = 5
+        self.prewarm_containers = 2
+        self.max_workers = 8
+        self.max_queued_requests = 100
+        self.max_concurrent_invokes = 4
+        self.max_queued_invokes = 10
         self.static_dir = "staticdir"
+        self.watch_template = True
 
     @patch("samcli.commands.local.start_api.cli.InvokeContext")
     @patch("samcli.commands.local.start_api.cli.LocalApiService")
@@ -64,16 +76,39 @@ class TestCli(TestCase):
                                                debugger_path=self.debugger_path,
                                                parameter_overrides=self.parameter_overrides,
                                                layer_cache_basedir=self.layer_cache_basedir,
+                                               template_cache_dir=self.template_cache_dir,
+                                               code_cache_basedir=self.code_cache_basedir,
+                                               code_cache_max_size=self.code_cache_max_size,
                                                force_image_build=self.force_image_build,
-                                               aws_region=self.region_name)
+                                               aws_region=self.region_name,
+                                               warm_containers=self.warm_containers,
+                                               warm_container_ttl=self.warm_container_ttl,
+                                               max_warm_containers=self.max_warm_containers,
+                                               prewarm_containers=self.prewarm_containers,
+                                               max_concurrent_invokes=self.max_concurrent_invokes,
+                                               max_queued_invokes=self.max_queued_invokes,
+                                               max_parallel_invokes=self.max_workers)
 
         local_api_service_mock.assert_called_with(lambda_invoke_context=context_mock,
                                                   port=self.port,
                                                   host=self.host,
-                                                  static_dir=self.static_dir)
+                                                  static_dir=self.static_dir,
+                                                  max_workers=self.max_workers,
+                                                  max_queued_requests=self.max_queued_requests,
+                                                  watch_template=self.watch_template)
 
         service_mock.start.assert_called_with()
 
+    @patch("samcli.commands.local.start_api.cli.InvokeContext")
+    @patch("samcli.commands.local.start_api.cli.LocalApiService")
+    def test_must_size_invoke_context_for_default_workers(self, local_api_service_mock, invoke_context_mock):
+        self.max_workers = None
+
+        self.call_cli()
+
+        _, kwargs = invoke_context_mock.call_args
+        self.assertEquals(kwargs["max_parallel_invokes"], 32)
+
     @patch("samcli.commands.local.start_api.cli.InvokeContext")
     @patch("samcli.commands.local.start_api.cli.LocalApiService")
     def test_must_raise_if_no_api_defined(self, local_api_service_mock, invoke_context_mock):
@@ -128,7 +163,16 @@ class TestCli(TestCase):
         start_api_cli(ctx=self.ctx_mock,
                       host=self.host,
                       port=self.port,
+                      warm_containers=self.warm_containers,
+                      warm_container_ttl=self.warm_container_ttl,
+                      max_warm_containers=self.max_warm_containers,
+                      prewarm_containers=self.prewarm_containers,
+                      max_workers=self.max_workers,
+                      max_queued_requests=self.max_queued_requests,
+                      max_concurrent_invokes=self.max_concurrent_invokes,
+                      max_queued_invokes=self.max_queued_invokes,
                       static_dir=self.static_dir,
+                      watch_template=self.watch_template,
                       template=self.template,
                       env_vars=self.env_vars,
                       debug_port=self.debug_port,
@@ -140,4 +184,7 @@ class TestCli(TestCase):
                       skip_pull_image=self.skip_pull_image,
                       parameter_overrides=self.parameter_overrides,
                       layer_cache_basedir=self.layer_cache_basedir,
+                      template_cache_dir=self.template_cache_dir,
+                      code_cache_basedir=self.code_cache_basedir,
+                      code_cache_max_size=self.code_cache_max_size,
                       force_image_build=self.force_image_build)
@@ -0,0 +1,80 @@
+import os
+import shutil
+import threading
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from samcli.lib.utils.file_watcher import FileWatcher
+
+
+class TestFileWatcher(TestCase):
+
+    def setUp(self):
+        self.temp_dir = mkdtemp()
+        self.path = os.path.join(self.temp_dir, "template.yaml")
+        self._write(b"Resources: {}")
+
+        self.on_change = Mock()
+        # Polls are not expected while the tests run, the tests check the file themselves
+        self.watcher = FileWatcher(self.path, self.on_change, interval=1000)
+        self.watcher.start()
+
+    def tearDown(self):
+        self.watcher.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, content):
+        with open(self.path, "wb") as fp:
+            fp.write(content)
+
+        # Modification times are not precise enough to see writes that follow each other quickly
+        stat = os.stat(self.path)
+        mtime = stat.st_mtime + 10
+        os.utime(self.path, (mtime, mtime))
+
+    def test_must_not_report_unchanged_file(self):
+        self.assertFalse(self.watcher.check())
+        self.on_change.assert_not_called()
+
+    def test_must_report_changed_content(self):
+        self._write(b"Resources: {Function: {}}")
+
+        self.assertTrue(self.watcher.check())
+        self.assertFalse(self.watcher.check())
+        self.on_change.assert_called_once_with()
+
+    def test_must_not_report_file_saved_without_changes(self):
+        self._write(b"Resources: {}")
+
+        self.assertFalse(self.watcher.check())
+        self.on_change.assert_not_called()
+
+    def test_must_report_file_replaced_after_removal(self):
+        os.remove(self.path)
+
+        self.assertFalse(self.watcher.check())
+
+        self._write(b"Resources: {Function: {}}")
+
+        self.assertTrue(self.watcher.check())
+        self.on_change.assert_called_once_with()
+
+    @patch("samcli.lib.utils.file_watcher.LOG")
+    def test_must_log_errors_of_function(self, log_mock):
+        self.on_change.side_effect = ValueError("not valid")
+        self._write(b"Resources: {Function: {}}")
+
+        self.assertTrue(self.watcher.check())
+        self.assertTrue(log_mock.warning.called)
+
+    def test_must_poll_file(self):
+        changed = threading.Event()
+        watcher = FileWatcher(self.path, changed.set, interval=0.01)
+        watcher.start()
+        self.addCleanup(watcher.stop)
+
+        self._write(b"Resources: {Function: {}}")
+
+        self.assertTrue(changed.wait(10))
@@ -0,0 +1,71 @@
+import os
+import shutil
+import hashlib
+from unittest import TestCase
+from tempfile import mkdtemp
+from mock import patch
+
+from samcli.lib.utils.hash import dir_checksum, file_checksum
+
+
+class TestFileChecksum(TestCase):
+
+    def test_must_return_sha256_of_content(self):
+        temp_dir = mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, "file")
+        with open(path, "wb") as fp:
+            fp.write(b"content")
+
+        self.assertEquals(file_checksum(path), hashlib.sha256(b"content").hexdigest())
+
+
+class TestDirChecksum(TestCase):
+
+    def setUp(self):
+        self.temp_dir = mkdtemp()
+        self.tree = os.path.join(self.temp_dir, "tree")
+        os.makedirs(os.path.join(self.tree, "sub"))
+        self._write("a.txt", b"a")
+        self._write(os.path.join("sub", "b.txt"), b"b")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_must_not_depend_on_location_or_time(self):
+        digest = dir_checksum(self.tree)
+
+        copy = os.path.join(self.temp_dir, "copy")
+        shutil.copytree(self.tree, copy)
+        os.utime(os.path.join(copy, "a.txt"), (1, 1))
+
+        self.assertEquals(dir_checksum(copy), digest)
+
+    def test_must_change_with_content(self):
+        digest = dir_checksum(self.tree)
+
+        self._write(os.path.join("sub", "b.txt"), b"changed")
+
+        self.assertNotEquals(dir_checksum(self.tree), digest)
+
+    def test_must_change_with_file_name(self):
+        digest = dir_checksum(self.tree)
+
+        os.rename(os.path.join(self.tree, "a.txt"), os.path.join(self.tree, "c.txt"))
+
+        self.assertNotEquals(dir_checksum(self.tree), digest)
+
+    @patch("samcli.lib.utils.hash.file_checksum")
+    def test_must_not_read_unchanged_files_again(self, file_checksum_patch):
+        file_checksum_patch.return_value = "digest"
+        file_checksums = {}
+
+        first = dir_checksum(self.tree, file_checksums)
+        second = dir_checksum(self.tree, file_checksums)
+
+        self.assertEquals(first, second)
+        self.assertEquals(file_checksum_patch.call_count, 2)
+
+    def _write(self, name, content):
+        with open(os.path.join(self.tree, name), "wb") as fp:
+            fp.write(content)
@@ -0,0 +1,63 @@
+import json
+from collections import OrderedDict
+from unittest import TestCase
+
+from mock import patch, Mock
+
+from samcli.lib.utils import json_codec
+
+
+class TestJsonCodec(TestCase):
+
+    def tearDown(self):
+        json_codec.use_codec()
+
+    def test_must_round_trip_with_installed_codec(self):
+        obj = OrderedDict([("body", u"caf\u00e9 / \"quoted\"\n"), ("statusCode", 200), ("isBase64Encoded", False),
+                           ("headers", None), ("list", [1, 2.5, {"a": "b"}])])
+
+        encoded = json_codec.dumps(obj)
+
+        self.assertEquals(json.loads(encoded), obj)
+        self.assertEquals(json_codec.loads(encoded), obj)
+        self.assertEquals(json_codec.loads(encoded.encode("utf-8")), obj)
+
+    def test_must_raise_value_error_for_invalid_json(self):
+        with self.assertRaises(ValueError):
+            json_codec.loads("{not json")
+
+    def test_must_use_json_module(self):
+        self.assertEquals(json_codec.use_codec("json"), "json")
+
+        self.assertEquals(json_codec.dumps({"a": "/"}), '{"a": "/"}')
+        self.assertEquals(json_codec.loads('{"a": 1}'), {"a": 1})
+
+    def test_must_use_first_installed_codec(self):
+        def not_installed():
+            raise ImportError("not installed")
+
+        codec_loads = Mock()
+        codec_dumps = Mock()
+        codecs = OrderedDict([("missing", not_installed),
+                              ("installed", lambda: (codec_loads, codec_dumps)),
+                              ("json", Mock())])
+
+        with patch.object(json_codec, "CODECS", codecs):
+            self.assertEquals(json_codec.use_codec(), "installed")
+
+        json_codec.loads("data")
+        json_codec.dumps("obj")
+        codec_loads.assert_called_once_with("data")
+        codec_dumps.assert_called_once_with("obj")
+
+    def test_must_raise_for_unknown_codec(self):
+        with self.assertRaises(KeyError):
+            json_codec.use_codec("unknown")
+
+    def test_must_raise_for_codec_that_is_not_installed(self):
+        def not_installed():
+            raise ImportError("not installed")
+
+        with patch.dict(json_codec.CODECS, {"missing": not_installed}):
+            with self.assertRaises(ImportError):
+                json_codec.use_codec("missing")
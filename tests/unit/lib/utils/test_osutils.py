@@ -26,6 +26,19 @@ class Test_mkdir_temp(TestCase):
         self.assertFalse(os.path.exists(dir_name))
 
 
+class Test_dir_size(TestCase):
+
+    def test_must_sum_size_of_all_files(self):
+        with osutils.mkdir_temp() as tempdir:
+            os.makedirs(os.path.join(tempdir, "sub"))
+            with open(os.path.join(tempdir, "a"), "wb") as fp:
+                fp.write(b"12345")
+            with open(os.path.join(tempdir, "sub", "b"), "wb") as fp:
+                fp.write(b"123")
+
+            self.assertEquals(osutils.dir_size(tempdir), 8)
+
+
 class Test_stderr(TestCase):
 
     def test_must_return_sys_stderr(self):
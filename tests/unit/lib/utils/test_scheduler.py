@@ -0,0 +1,50 @@
+import threading
+
+from unittest import TestCase
+from mock import Mock
+
+from samcli.lib.utils.scheduler import Scheduler
+
+
+class TestScheduler(TestCase):
+
+    def test_must_run_calls_in_order_of_delay(self):
+        scheduler = Scheduler()
+        done = threading.Event()
+        calls = []
+
+        scheduler.call_later(0.2, done.set)
+        scheduler.call_later(0.1, calls.append, "second")
+        scheduler.call_later(0, calls.append, "first")
+
+        self.assertTrue(done.wait(10))
+        self.assertEquals(calls, ["first", "second"])
+
+    def test_must_not_run_cancelled_call(self):
+        scheduler = Scheduler()
+        done = threading.Event()
+        func = Mock()
+
+        scheduler.call_later(0, func).cancel()
+        scheduler.call_later(0.05, done.set)
+
+        self.assertTrue(done.wait(10))
+        func.assert_not_called()
+
+    def test_must_keep_running_after_failed_call(self):
+        scheduler = Scheduler()
+        done = threading.Event()
+
+        scheduler.call_later(0, Mock(side_effect=ValueError("failed")))
+        scheduler.call_later(0.05, done.set)
+
+        self.assertTrue(done.wait(10))
+
+    def test_must_start_one_thread(self):
+        scheduler = Scheduler()
+        scheduler.call_later(10, Mock())
+        thread = scheduler._thread
+
+        scheduler.call_later(10, Mock())
+
+        self.assertIs(scheduler._thread, thread)
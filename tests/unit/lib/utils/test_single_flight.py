@@ -0,0 +1,72 @@
+import threading
+
+from unittest import TestCase
+from mock import Mock
+
+from samcli.lib.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight(TestCase):
+
+    def test_must_return_result_of_function(self):
+        func = Mock(return_value="result")
+
+        result = SingleFlight().do("key", func, "arg", kwarg="value")
+
+        self.assertEquals(result, "result")
+        func.assert_called_with("arg", kwarg="value")
+
+    def test_must_run_function_again_after_call_completes(self):
+        single_flight = SingleFlight()
+        func = Mock()
+
+        single_flight.do("key", func)
+        single_flight.do("key", func)
+
+        self.assertEquals(func.call_count, 2)
+        self.assertFalse(single_flight.is_running("key"))
+
+    def test_must_raise_exception_of_function(self):
+        single_flight = SingleFlight()
+
+        with self.assertRaises(ValueError):
+            single_flight.do("key", Mock(side_effect=ValueError("failed")))
+
+        self.assertFalse(single_flight.is_running("key"))
+
+    def test_must_collapse_concurrent_calls(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        finish = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            started.set()
+            finish.wait(5)
+            return "result"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(single_flight.do("key", func)))
+        leader.start()
+        started.wait(5)
+
+        self.assertTrue(single_flight.is_running("key"))
+        follower = threading.Thread(target=lambda: results.append(single_flight.do("key", func)))
+        follower.start()
+
+        finish.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEquals(calls, [1])
+        self.assertEquals(results, ["result", "result"])
+
+    def test_must_not_collapse_calls_with_different_keys(self):
+        single_flight = SingleFlight()
+        func = Mock()
+
+        single_flight.do("key1", func)
+        single_flight.do("key2", func)
+
+        self.assertEquals(func.call_count, 2)
@@ -1,7 +1,14 @@
+import io
+import os
+import shutil
+import tarfile
+import threading
 from unittest import TestCase
+from tempfile import mkdtemp
 from mock import Mock, patch, call
+from parameterized import parameterized
 
-from samcli.lib.utils.tar import create_tarball
+from samcli.lib.utils.tar import create_tarball, stream_tarball, STREAM_CHUNK_SIZE
 
 
 class TestTar(TestCase):
@@ -26,3 +33,50 @@ class TestTar(TestCase):
         temp_file_mock.seek.assert_called_once_with(0)
         temp_file_mock.close.assert_called_once()
         tarfile_open_patch.assert_called_once_with(fileobj=temp_file_mock, mode='w:gz')
+
+
+class TestStreamTarball(TestCase):
+
+    def setUp(self):
+        self.temp_dir = mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, "layer1"))
+        with open(os.path.join(self.temp_dir, "layer1", "file"), "wb") as fp:
+            fp.write(b"x" * (3 * STREAM_CHUNK_SIZE + 10))
+        with open(os.path.join(self.temp_dir, "Dockerfile"), "w") as fp:
+            fp.write("FROM image")
+
+        self.tar_paths = {os.path.join(self.temp_dir, "layer1"): "/layer1",
+                          os.path.join(self.temp_dir, "Dockerfile"): "Dockerfile"}
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @parameterized.expand([(False, "r:"), (True, "r:gz")])
+    def test_must_stream_tarball(self, compress, read_mode):
+        with stream_tarball(self.tar_paths, compress=compress) as chunks:
+            content = b"".join(chunks)
+
+        with tarfile.open(fileobj=io.BytesIO(content), mode=read_mode) as archive:
+            self.assertEquals(sorted(archive.getnames()), ["Dockerfile", "layer1", "layer1/file"])
+            self.assertEquals(archive.extractfile("Dockerfile").read(), b"FROM image")
+
+    def test_must_produce_chunks_of_bounded_size(self):
+        with stream_tarball(self.tar_paths) as chunks:
+            sizes = [len(chunk) for chunk in chunks]
+
+        self.assertTrue(len(sizes) > 3)
+        self.assertTrue(all(size <= STREAM_CHUNK_SIZE for size in sizes))
+
+    def test_must_raise_error_of_writer(self):
+        with self.assertRaises(OSError):
+            with stream_tarball({os.path.join(self.temp_dir, "missing"): "missing"}) as chunks:
+                list(chunks)
+
+    def test_must_stop_writer_when_consumer_stops_early(self):
+        initial_thread_count = threading.active_count()
+
+        with stream_tarball(self.tar_paths) as chunks:
+            next(chunks)
+
+        # Exiting the context must not hang on the blocked writer
+        self.assertEquals(threading.active_count(), initial_thread_count)
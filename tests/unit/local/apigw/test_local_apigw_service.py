@@ -1,3 +1,6 @@
+import os
+import shutil
+from tempfile import mkdtemp
 from unittest import TestCase
 from mock import Mock, patch, ANY
 import json
@@ -6,7 +9,8 @@ import base64
 from parameterized import parameterized, param
 
 from samcli.local.apigw.local_apigw_service import LocalApigwService, Route
-from samcli.local.lambdafn.exceptions import FunctionNotFound
+from samcli.local.events.api_event import ApiGatewayLambdaEventSkeleton
+from samcli.local.lambdafn.exceptions import FunctionNotFound, ConcurrencyLimitExceeded
 
 
 class TestApiGatewayService(TestCase):
@@ -49,8 +53,8 @@ class TestApiGatewayService(TestCase):
                                                      stdout=ANY,
                                                      stderr=self.stderr)
 
-    @patch('samcli.local.apigw.local_apigw_service.LambdaOutputParser')
-    def test_request_handler_returns_process_stdout_when_making_response(self, lambda_output_parser_mock):
+    @patch('samcli.local.apigw.local_apigw_service.LambdaOutputStream')
+    def test_request_handler_returns_process_stdout_when_making_response(self, lambda_output_stream_mock):
 
         make_response_mock = Mock()
 
@@ -62,10 +66,8 @@ class TestApiGatewayService(TestCase):
         parse_output_mock.return_value = ("status_code", "headers", "body")
         self.service._parse_lambda_output = parse_output_mock
 
-        lambda_logs = "logs"
         lambda_response = "response"
-        is_customer_error = False
-        lambda_output_parser_mock.get_lambda_output.return_value = lambda_response, lambda_logs, is_customer_error
+        lambda_output_stream_mock.return_value.get_lambda_response.return_value = lambda_response
         service_response_mock = Mock()
         service_response_mock.return_value = make_response_mock
         self.service.service_response = service_response_mock
@@ -73,12 +75,12 @@ class TestApiGatewayService(TestCase):
         result = self.service._request_handler()
 
         self.assertEquals(result, make_response_mock)
-        lambda_output_parser_mock.get_lambda_output.assert_called_with(ANY)
+        # Logs are written to stderr by the stream, as they arrive
+        lambda_output_stream_mock.assert_called_with(log_stream=self.stderr)
+        lambda_output_stream_mock.return_value.get_lambda_response.assert_called_with()
 
         # Make sure the parse method is called only on the returned response and not on the raw data from stdout
         parse_output_mock.assert_called_with(lambda_response, ANY, ANY)
-        # Make sure the logs are written to stderr
-        self.stderr.write.assert_called_with(lambda_logs)
 
     def test_request_handler_returns_make_response(self):
         make_response_mock = Mock()
@@ -113,10 +115,50 @@ class TestApiGatewayService(TestCase):
 
         service.create()
 
-        self.assertEquals(service._dict_of_routes, {'/:GET': api_gateway_route_1,
-                                                    '/:POST': api_gateway_route_2
+        self.assertEquals(service._dict_of_routes, {('/', 'GET'): api_gateway_route_1,
+                                                    ('/', 'POST'): api_gateway_route_2
                                                     })
 
+    def test_create_creates_event_skeletons_of_routes(self):
+        list_of_routes = [Route(['GET'], Mock(), '/id/{id}'),
+                          Route(['GET', 'PUT'], Mock(), '/id/{id}/user/{proxy+}')]
+
+        service = LocalApigwService(list_of_routes, Mock())
+
+        service.create()
+
+        self.assertEquals(set(service._event_skeletons.keys()), {'/id/{id}', '/id/{id}/user/{proxy+}'})
+        for path, event_skeleton in service._event_skeletons.items():
+            self.assertEquals(event_skeleton.resource_path, path)
+            self.assertEquals(event_skeleton.stage, "prod")
+
+    def test_create_indexes_routes_by_endpoint_and_method(self):
+        list_of_routes = [Route(['GET'], Mock(), '/id/{id}'),
+                          Route(['GET', 'PUT'], Mock(), '/id/{id}/user/{proxy+}')]
+
+        service = LocalApigwService(list_of_routes, Mock())
+
+        service.create()
+
+        self.assertEquals(service._dict_of_routes, {('/id/<id>', 'GET'): list_of_routes[0],
+                                                    ('/id/<id>/user/<path:proxy>', 'GET'): list_of_routes[1],
+                                                    ('/id/<id>/user/<path:proxy>', 'PUT'): list_of_routes[1]})
+
+    @patch('samcli.local.apigw.local_apigw_service.request')
+    def test_request_handler_uses_event_skeleton_of_route(self, request_patch):
+        route = Route(['GET'], "function", '/id/{id}', binary_types=["image/png"])
+        event_skeleton = Mock()
+        self.service._event_skeletons = {'/id/{id}': event_skeleton}
+        self.service._get_current_route = Mock(return_value=route)
+        self.service._construct_event = Mock()
+        self.service._parse_lambda_output = Mock(return_value=("status_code", "headers", "body"))
+        self.service.service_response = Mock()
+
+        self.service._request_handler()
+
+        self.service._construct_event.assert_called_with(request_patch, 3000, ["image/png"],
+                                                         event_skeleton=event_skeleton)
+
     @patch('samcli.local.apigw.local_apigw_service.Flask')
     def test_create_creates_flask_app_with_url_rules(self, flask):
         app_mock = Mock()
@@ -162,6 +204,20 @@ class TestApiGatewayService(TestCase):
 
         self.assertEquals(response, not_found_response_mock)
 
+    @patch('samcli.local.apigw.local_apigw_service.ServiceErrorResponses')
+    def test_request_handles_error_when_invoke_is_throttled(self, service_error_responses_patch):
+
+        throttled_response_mock = Mock()
+        self.service._construct_event = Mock()
+        self.service._get_current_route = Mock()
+        service_error_responses_patch.lambda_throttled_response.return_value = throttled_response_mock
+
+        self.lambda_runner.invoke.side_effect = ConcurrencyLimitExceeded()
+
+        response = self.service._request_handler()
+
+        self.assertEquals(response, throttled_response_mock)
+
     def test_request_throws_when_invoke_fails(self):
         self.lambda_runner.invoke.side_effect = Exception()
 
@@ -248,6 +304,59 @@ class TestApiGatewayService(TestCase):
             self.service._get_current_route(request_mock)
 
 
+class TestService_update_routes(TestCase):
+
+    def setUp(self):
+        self.lambda_runner = Mock()
+        self.lambda_runner.is_debugging.return_value = False
+
+        def invoke(function_name, event, stdout=None, stderr=None):
+            body = "{} {}".format(function_name, json.loads(event)["resource"])
+            stdout.write(json.dumps({"statusCode": 200, "body": body}).encode("utf-8"))
+
+        self.lambda_runner.invoke.side_effect = invoke
+
+        self.service = LocalApigwService([Route(['GET'], "Function1", '/id/{id}'),
+                                          Route(['GET'], "Function1", '/removed')],
+                                         self.lambda_runner)
+        self.service.create()
+        self.client = self.service._app.test_client()
+
+    def test_must_serve_new_routes(self):
+        event_skeleton = self.service._event_skeletons['/id/{id}']
+
+        self.service.update_routes([Route(['GET', 'POST'], "Function2", '/id/{id}'),
+                                    Route(['PUT'], "Function1", '/added/{proxy+}')])
+
+        self.assertEquals(self.client.get('/id/1').get_data(as_text=True), "Function2 /id/{id}")
+        self.assertEquals(self.client.post('/id/1').get_data(as_text=True), "Function2 /id/{id}")
+        self.assertEquals(self.client.put('/added/a/b').get_data(as_text=True), "Function1 /added/{proxy+}")
+        self.assertEquals(self.client.get('/removed').status_code, 403)
+
+        self.assertEquals(set(self.service._dict_of_routes.keys()), {('/id/<id>', 'GET'),
+                                                                     ('/id/<id>', 'POST'),
+                                                                     ('/added/<path:proxy>', 'PUT')})
+        # Skeletons of paths that did not change are kept
+        self.assertIs(self.service._event_skeletons['/id/{id}'], event_skeleton)
+        self.assertEquals(set(self.service._event_skeletons.keys()), {'/id/{id}', '/added/{proxy+}'})
+
+    def test_must_keep_static_files(self):
+        static_dir = mkdtemp()
+        self.addCleanup(shutil.rmtree, static_dir)
+        with open(os.path.join(static_dir, "index.html"), "w") as fp:
+            fp.write("static")
+
+        service = LocalApigwService([Route(['GET'], "Function1", '/id/{id}')], self.lambda_runner,
+                                    static_dir=static_dir)
+        service.create()
+
+        service.update_routes([Route(['GET'], "Function1", '/other')])
+
+        client = service._app.test_client()
+        self.assertEquals(client.get('/index.html').get_data(as_text=True), "static")
+        self.assertEquals(client.get('/other').get_data(as_text=True), "Function1 /other")
+
+
 class TestApiGatewayModel(TestCase):
 
     def setUp(self):
@@ -412,6 +521,19 @@ class TestService_construct_event(TestCase):
         actual_event_str = LocalApigwService._construct_event(self.request_mock, 3000, binary_types=[])
         self.assertEquals(json.loads(actual_event_str), self.expected_dict)
 
+    @patch('samcli.local.apigw.local_apigw_service.PathConverter')
+    def test_construct_event_with_event_skeleton(self, path_converter_patch):
+        self.expected_dict["resource"] = "/resource/{id}"
+        self.expected_dict["requestContext"]["resourcePath"] = "/resource/{id}"
+        self.expected_dict["requestContext"]["path"] = "/resource/{id}"
+
+        actual_event_str = LocalApigwService._construct_event(self.request_mock, 3000, binary_types=[],
+                                                              event_skeleton=ApiGatewayLambdaEventSkeleton(
+                                                                  "/resource/{id}", stage="prod"))
+
+        self.assertEquals(json.loads(actual_event_str), self.expected_dict)
+        path_converter_patch.convert_path_to_api_gateway.assert_not_called()
+
     def test_construct_event_no_data(self):
         self.request_mock.get_data.return_value = None
         self.expected_dict["body"] = None
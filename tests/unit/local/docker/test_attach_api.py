@@ -0,0 +1,144 @@
+import errno
+import struct
+from socket import timeout
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from samcli.local.docker.attach_api import _read_socket, attach, attach_exec
+
+
+def frame(frame_type, payload):
+    return struct.pack(">BxxxL", frame_type, len(payload)) + payload
+
+
+class MockSocket(object):
+    """
+    Socket that returns the given chunks of data, one chunk per read
+    """
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.reads = 0
+
+    def recv_into(self, view):
+        self.reads += 1
+        if not self.chunks:
+            return 0
+
+        chunk = self.chunks.pop(0)
+        if isinstance(chunk, Exception):
+            raise chunk
+
+        size = min(len(chunk), len(view))
+        view[:size] = chunk[:size]
+        if size < len(chunk):
+            self.chunks.insert(0, chunk[size:])
+        return size
+
+
+class TestReadSocket(TestCase):
+
+    def test_must_read_many_frames_with_one_read(self):
+        data = b"".join(frame(1, "line {}\n".format(index).encode("utf-8")) for index in range(1000))
+        socket = MockSocket([data])
+
+        result = list(_read_socket(socket))
+
+        # All frames fit in two blocks, and consecutive stdout frames are joined
+        self.assertLessEqual(socket.reads, 3)
+        self.assertLessEqual(len(result), 2)
+        self.assertEquals(b"".join(data for _, data in result),
+                          b"".join("line {}\n".format(index).encode("utf-8") for index in range(1000)))
+
+    def test_must_keep_frame_types_apart(self):
+        socket = MockSocket([frame(1, b"out1") + frame(1, b"out2") + frame(2, b"err") + frame(1, b"out3")])
+
+        result = list(_read_socket(socket))
+
+        self.assertEquals(result, [(1, b"out1out2"), (2, b"err"), (1, b"out3")])
+
+    def test_must_read_frames_split_across_reads(self):
+        data = frame(1, b"hello") + frame(2, b"world")
+        # Splits headers and payloads at every possible position
+        socket = MockSocket([data[index:index + 1] for index in range(len(data))])
+
+        result = list(_read_socket(socket))
+
+        self.assertEquals(b"".join(data for frame_type, data in result if frame_type == 1), b"hello")
+        self.assertEquals(b"".join(data for frame_type, data in result if frame_type == 2), b"world")
+
+    def test_must_yield_payloads_larger_than_a_block(self):
+        payload = b"x" * (200 * 1024)
+        socket = MockSocket([frame(1, payload)])
+
+        result = list(_read_socket(socket))
+
+        self.assertGreater(len(result), 1)
+        self.assertEquals(b"".join(data for _, data in result), payload)
+
+    def test_must_ignore_timeouts_and_recoverable_errors(self):
+        socket = MockSocket([frame(1, b"before"), timeout(), EnvironmentError(errno.EINTR, "interrupted"),
+                             frame(1, b"after")])
+
+        result = list(_read_socket(socket))
+
+        self.assertEquals(result, [(1, b"before"), (1, b"after")])
+
+    def test_must_raise_other_errors(self):
+        socket = MockSocket([EnvironmentError(errno.ECONNRESET, "reset")])
+
+        with self.assertRaises(EnvironmentError):
+            list(_read_socket(socket))
+
+    def test_must_stop_at_end_of_partial_frame(self):
+        socket = MockSocket([frame(1, b"complete") + frame(1, b"partial")[:-2]])
+
+        result = list(_read_socket(socket))
+
+        self.assertEquals(result, [(1, b"completeparti")])
+
+    def test_must_read_sockets_without_recv_into(self):
+        data = frame(1, b"hello")
+        socket = Mock(spec=["readinto"])
+        reads = [data]
+
+        def readinto(view):
+            if not reads:
+                return 0
+            chunk = reads.pop(0)
+            view[:len(chunk)] = chunk
+            return len(chunk)
+
+        socket.readinto.side_effect = readinto
+
+        self.assertEquals(list(_read_socket(socket)), [(1, b"hello")])
+
+
+class TestAttach(TestCase):
+
+    @patch("samcli.local.docker.attach_api._read_socket")
+    def test_must_read_attached_socket(self, read_socket_mock):
+        docker_client = Mock()
+        container = Mock()
+        container.id = "id"
+        docker_client.api.base_url = "http://docker"
+
+        result = attach(docker_client, container, logs=True)
+
+        self.assertEquals(result, read_socket_mock.return_value)
+        docker_client.api._post.assert_called_with("http://docker/containers/id/attach",
+                                                   headers={"Connection": "Upgrade", "Upgrade": "tcp"},
+                                                   params={"stdout": 1, "stderr": 1, "logs": 1, "stream": 1,
+                                                           "stdin": 0},
+                                                   stream=True)
+        read_socket_mock.assert_called_with(docker_client.api._get_raw_response_socket.return_value)
+
+    @patch("samcli.local.docker.attach_api._read_socket")
+    def test_must_read_exec_socket(self, read_socket_mock):
+        docker_client = Mock()
+
+        result = attach_exec(docker_client, "exec-id")
+
+        self.assertEquals(result, read_socket_mock.return_value)
+        docker_client.api.exec_start.assert_called_with("exec-id", socket=True)
@@ -0,0 +1,60 @@
+"""
+Tests the shared Docker client
+"""
+
+from unittest import TestCase
+from mock import Mock, patch, call
+
+from samcli.local.docker import client
+from samcli.local.docker.client import get_docker_client, configure_docker_client
+
+
+class TestGetDockerClient(TestCase):
+
+    def setUp(self):
+        configure_docker_client()
+
+    def tearDown(self):
+        configure_docker_client()
+
+    @patch("samcli.local.docker.client.docker")
+    def test_must_create_client_once(self, docker_mock):
+        result1 = get_docker_client()
+        result2 = get_docker_client()
+
+        self.assertEquals(result1, docker_mock.from_env.return_value)
+        self.assertEquals(result2, docker_mock.from_env.return_value)
+        docker_mock.from_env.assert_called_once_with(max_pool_size=client.DEFAULT_MAX_POOL_SIZE)
+
+    @patch("samcli.local.docker.client.docker")
+    def test_must_create_new_client_after_configuring(self, docker_mock):
+        get_docker_client()
+
+        configure_docker_client(max_pool_size=50)
+        get_docker_client()
+
+        self.assertEquals(docker_mock.from_env.call_args_list,
+                          [call(max_pool_size=client.DEFAULT_MAX_POOL_SIZE), call(max_pool_size=50)])
+
+    @patch("samcli.local.docker.client.docker")
+    def test_must_fall_back_if_pool_size_is_not_supported(self, docker_mock):
+        client_mock = Mock()
+        docker_mock.from_env.side_effect = [TypeError("unexpected keyword argument"), client_mock]
+
+        self.assertEquals(get_docker_client(), client_mock)
+        self.assertEquals(docker_mock.from_env.call_args_list,
+                          [call(max_pool_size=client.DEFAULT_MAX_POOL_SIZE), call()])
+
+    @patch("samcli.local.docker.client.docker")
+    def test_must_close_connections_without_keep_alive(self, docker_mock):
+        docker_mock.from_env.return_value.api.headers = {}
+
+        configure_docker_client(keep_alive=False)
+
+        self.assertEquals(get_docker_client().api.headers, {"Connection": "close"})
+
+    @patch("samcli.local.docker.client.docker")
+    def test_must_keep_connections_alive_by_default(self, docker_mock):
+        docker_mock.from_env.return_value.api.headers = {}
+
+        self.assertEquals(get_docker_client().api.headers, {})
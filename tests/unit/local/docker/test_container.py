@@ -502,6 +502,66 @@ class TestContainer_wait_for_logs(TestCase):
             self.container.wait_for_logs(stdout=Mock())
 
 
+class TestContainer_execute(TestCase):
+
+    def setUp(self):
+        self.mock_docker_client = Mock()
+        self.container = Container("image", ["cmd"], "working_dir", "host_dir", docker_client=self.mock_docker_client)
+        self.container.id = "someid"
+
+    @patch("samcli.local.docker.container.attach_exec")
+    def test_must_run_command_and_write_output(self, attach_exec_mock):
+        self.mock_docker_client.api.exec_create.return_value = "execid"
+        output_itr = Mock()
+        attach_exec_mock.return_value = output_itr
+        self.container._write_container_output = Mock()
+
+        stdout_mock = Mock()
+        stderr_mock = Mock()
+
+        self.container.execute(["a", "b"], env_vars={"x": "y"}, stdout=stdout_mock, stderr=stderr_mock)
+
+        self.mock_docker_client.api.exec_create.assert_called_with("someid", ["a", "b"], stdout=True, stderr=True,
+                                                                   environment={"x": "y"})
+        attach_exec_mock.assert_called_with(self.mock_docker_client, "execid")
+        self.container._write_container_output.assert_called_with(output_itr, stdout=stdout_mock, stderr=stderr_mock)
+
+    def test_must_raise_if_container_is_not_created(self):
+        self.container.id = None
+
+        with self.assertRaises(RuntimeError):
+            self.container.execute(["a"])
+
+
+class TestContainer_is_running(TestCase):
+
+    def setUp(self):
+        self.mock_docker_client = Mock()
+        self.container = Container("image", ["cmd"], "working_dir", "host_dir", docker_client=self.mock_docker_client)
+        self.container.id = "someid"
+
+    def test_must_return_true_if_running(self):
+        self.mock_docker_client.containers.get.return_value.status = "running"
+
+        self.assertTrue(self.container.is_running())
+
+    def test_must_return_false_if_exited(self):
+        self.mock_docker_client.containers.get.return_value.status = "exited"
+
+        self.assertFalse(self.container.is_running())
+
+    def test_must_return_false_if_not_found(self):
+        self.mock_docker_client.containers.get.side_effect = NotFound("msg")
+
+        self.assertFalse(self.container.is_running())
+
+    def test_must_return_false_if_not_created(self):
+        self.container.id = None
+
+        self.assertFalse(self.container.is_running())
+        self.mock_docker_client.containers.get.assert_not_called()
+
+
 class TestContainer_write_container_output(TestCase):
 
     def setUp(self):
@@ -0,0 +1,192 @@
+"""
+Tests the warm container pool
+"""
+
+import threading
+
+from unittest import TestCase
+from mock import Mock, patch
+
+from samcli.local.docker.container_pool import ContainerPool
+
+
+def make_container(key="key"):
+    container = Mock()
+    container.pool_key = key
+    return container
+
+
+class TestContainerPool_acquire(TestCase):
+
+    def test_must_reserve_slot_if_no_idle_container(self):
+        pool = ContainerPool()
+
+        self.assertIsNone(pool.acquire("key"))
+
+    def test_must_return_idle_container_with_same_key(self):
+        pool = ContainerPool()
+        container = make_container()
+
+        pool.acquire("key")
+        pool.add(container)
+        pool.release(container)
+
+        self.assertEquals(pool.acquire("key"), container)
+
+    def test_must_not_return_idle_container_with_different_key(self):
+        pool = ContainerPool()
+        container = make_container("other key")
+
+        pool.acquire("other key")
+        pool.add(container)
+        pool.release(container)
+
+        self.assertIsNone(pool.acquire("key"))
+        container.delete.assert_not_called()
+
+    def test_must_not_return_busy_container(self):
+        pool = ContainerPool()
+        container = make_container()
+
+        pool.acquire("key")
+        pool.add(container)
+
+        self.assertIsNone(pool.acquire("key"))
+
+    def test_must_evict_least_recently_used_idle_container_when_full(self):
+        pool = ContainerPool(max_containers=2)
+        container1 = make_container("key1")
+        container2 = make_container("key2")
+
+        for container in [container1, container2]:
+            pool.acquire(container.pool_key)
+            pool.add(container)
+            pool.release(container)
+
+        self.assertIsNone(pool.acquire("key3"))
+
+        container1.delete.assert_called_with()
+        container2.delete.assert_not_called()
+
+    def test_must_wait_for_busy_container_when_full(self):
+        pool = ContainerPool(max_containers=1)
+        container = make_container()
+
+        pool.acquire("key")
+        pool.add(container)
+
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(pool.acquire("key")))
+        waiter.start()
+
+        pool.release(container)
+        waiter.join(5)
+
+        self.assertEquals(result, [container])
+
+    def test_must_free_slot_on_cancel(self):
+        pool = ContainerPool(max_containers=1)
+
+        pool.acquire("key")
+        pool.cancel()
+
+        self.assertIsNone(pool.acquire("key"))
+
+
+class TestContainerPool_reserve(TestCase):
+
+    def test_must_reserve_slot_without_reusing_idle_container(self):
+        pool = ContainerPool(max_containers=2)
+        container = make_container()
+
+        pool.acquire("key")
+        pool.add(container)
+        pool.release(container)
+
+        self.assertTrue(pool.reserve())
+        self.assertEquals(pool.acquire("key"), container)
+
+    def test_must_not_reserve_slot_when_full(self):
+        pool = ContainerPool(max_containers=1)
+        container = make_container()
+
+        pool.acquire("key")
+        pool.add(container)
+        pool.release(container)
+
+        self.assertFalse(pool.reserve())
+        container.delete.assert_not_called()
+
+
+class TestContainerPool_release(TestCase):
+
+    def test_must_return_false_for_unknown_container(self):
+        pool = ContainerPool()
+
+        self.assertFalse(pool.release(make_container()))
+
+    def test_must_return_false_after_container_was_removed(self):
+        pool = ContainerPool()
+        container = make_container()
+
+        pool.acquire("key")
+        pool.add(container)
+        pool.remove(container)
+
+        self.assertFalse(pool.release(container))
+        self.assertIsNone(pool.acquire("key"))
+
+
+class TestContainerPool_evict_expired(TestCase):
+
+    @patch("samcli.local.docker.container_pool.time")
+    def test_must_delete_containers_idle_for_too_long(self, time_mock):
+        pool = ContainerPool(idle_timeout=10)
+        pool._start_reaper = Mock()
+        old_container = make_container("key1")
+        new_container = make_container("key2")
+
+        time_mock.time.return_value = 100
+        pool.acquire("key1")
+        pool.add(old_container)
+        pool.release(old_container)
+
+        time_mock.time.return_value = 105
+        pool.acquire("key2")
+        pool.add(new_container)
+        pool.release(new_container)
+
+        time_mock.time.return_value = 111
+        self.assertEquals(pool.evict_expired(), [old_container])
+
+        old_container.delete.assert_called_with()
+        new_container.delete.assert_not_called()
+
+    def test_must_not_evict_without_timeout(self):
+        pool = ContainerPool()
+        container = make_container()
+
+        pool.acquire("key")
+        pool.add(container)
+        pool.release(container)
+
+        self.assertEquals(pool.evict_expired(), [])
+
+
+class TestContainerPool_drain(TestCase):
+
+    def test_must_delete_all_containers(self):
+        pool = ContainerPool()
+        idle_container = make_container()
+        busy_container = make_container()
+
+        for container in [idle_container, busy_container]:
+            pool.acquire("key")
+            pool.add(container)
+        pool.release(idle_container)
+
+        pool.drain()
+
+        idle_container.delete.assert_called_with()
+        busy_container.delete.assert_called_with()
+        self.assertIsNone(pool.acquire("key"))
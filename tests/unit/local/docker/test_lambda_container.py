@@ -8,6 +8,7 @@ from parameterized import parameterized, param
 
 from samcli.commands.local.lib.debug_context import DebugContext
 from samcli.local.docker.lambda_container import LambdaContainer, Runtime, DebuggingNotSupported
+from samcli.local.runtime_api.local_runtime_api_service import RuntimeApiInvocation
 
 RUNTIMES_WITH_ENTRYPOINT = [Runtime.java8.value,
                             Runtime.go1x.value,
@@ -93,6 +94,220 @@ class TestLambdaContainer_init(TestCase):
 
         self.assertEquals(str(context.exception), "Unsupported Lambda runtime foo")
 
+    def test_must_fail_for_warm_container_with_debugging(self):
+
+        with self.assertRaises(ValueError):
+            LambdaContainer(self.runtime, self.handler, self.code_dir, [], Mock(), debug_options=self.debug_options,
+                            warm=True)
+
+    def test_must_keep_warm_container_running(self):
+        image_builder_mock = Mock()
+        image_builder_mock.build.return_value = "image"
+
+        container = LambdaContainer(self.runtime, self.handler, self.code_dir, [], image_builder_mock, warm=True)
+
+        self.assertEquals(LambdaContainer._WARM_ENTRYPOINT, container._entrypoint)
+        self.assertEquals([self.handler], container._cmd)
+
+
+class TestLambdaContainer_runtime_api(TestCase):
+
+    def setUp(self):
+        self.image_builder_mock = Mock()
+        self.image_builder_mock.build.return_value = "image"
+        self.runtime_api = Mock()
+        self.runtime_api.get_address.return_value = "host:1234/channel"
+
+    def make_container(self, env_vars=None):
+        return LambdaContainer("provided", "handler", "codedir", [], self.image_builder_mock, env_vars=env_vars,
+                               runtime_api=self.runtime_api)
+
+    def test_must_run_bootstrap_with_runtime_api_address(self):
+        container = self.make_container(env_vars={"a": "b"})
+
+        self.assertEquals(LambdaContainer._RUNTIME_API_ENTRYPOINT, container._entrypoint)
+        self.runtime_api.open_channel.assert_called_with(container._runtime_api_channel)
+        self.runtime_api.get_address.assert_called_with(container._runtime_api_channel)
+        self.assertEquals({"a": "b",
+                           "AWS_LAMBDA_RUNTIME_API": "host:1234/channel",
+                           "LAMBDA_TASK_ROOT": "/var/task",
+                           "_HANDLER": "handler"}, container._env_vars)
+
+    def test_must_not_share_channel_between_containers(self):
+        self.assertNotEquals(self.make_container()._runtime_api_channel, self.make_container()._runtime_api_channel)
+
+    def test_must_include_function_config_in_pool_key(self):
+        container1 = self.make_container(env_vars={"a": "b"})
+        container2 = self.make_container(env_vars={"a": "b"})
+        container3 = self.make_container(env_vars={"a": "c"})
+
+        self.assertEquals(container1.pool_key, container2.pool_key)
+        self.assertNotEquals(container1.pool_key, container3.pool_key)
+
+    def test_must_fail_for_unsupported_runtime(self):
+        with self.assertRaises(ValueError):
+            LambdaContainer("python3.6", "handler", "codedir", [], self.image_builder_mock,
+                            runtime_api=self.runtime_api)
+
+    def test_must_fail_with_debugging(self):
+        with self.assertRaises(ValueError):
+            LambdaContainer("provided", "handler", "codedir", [], self.image_builder_mock, debug_options=Mock(),
+                            runtime_api=self.runtime_api)
+
+    def test_must_write_response_of_event(self):
+        container = self.make_container()
+        container._start_log_thread = Mock()
+        invocation = RuntimeApiInvocation("event", "arn", 3)
+        invocation.complete(b"response")
+        self.runtime_api.submit.return_value = invocation
+        stdout = Mock()
+        stderr = Mock()
+
+        container.process_event("event", "arn", 3, stdout=stdout, stderr=stderr)
+
+        self.runtime_api.submit.assert_called_with(container._runtime_api_channel, "event", "arn", 3)
+        stdout.write.assert_called_with(b"response")
+        container._start_log_thread.assert_called_with()
+        self.assertIsNone(container._log_writer.stream)
+
+    def test_must_write_error_of_event(self):
+        container = self.make_container()
+        container._start_log_thread = Mock()
+        invocation = RuntimeApiInvocation("event", "arn", 3)
+        invocation.fail({"errorMessage": "message"})
+        self.runtime_api.submit.return_value = invocation
+        stdout = Mock()
+
+        container.process_event("event", "arn", 3, stdout=stdout)
+
+        stdout.write.assert_called_with(b'{"errorMessage": "message"}')
+
+    def test_must_submit_event_without_waiting(self):
+        container = self.make_container()
+        container._start_log_thread = Mock()
+        invocation = RuntimeApiInvocation("event", "arn", 3)
+        self.runtime_api.submit.return_value = invocation
+        stdout = Mock()
+        stderr = Mock()
+        callback = Mock()
+
+        result = container.submit_event("event", "arn", 3, stdout=stdout, stderr=stderr, callback=callback)
+
+        self.assertEquals(result, invocation)
+        self.assertEquals(container._log_writer.stream, stderr)
+        callback.assert_not_called()
+
+        invocation.complete(b"response")
+
+        stdout.write.assert_called_with(b"response")
+        callback.assert_called_with(invocation)
+        self.assertIsNone(container._log_writer.stream)
+
+    def test_must_forward_logs_to_stream_of_current_event(self):
+        container = self.make_container()
+        container._start_log_thread = Mock()
+        stderr = Mock()
+
+        def submit(*args):
+            container._log_writer.write(b"log")
+            invocation = RuntimeApiInvocation("event", "arn", 3)
+            invocation.complete(b"response")
+            return invocation
+
+        self.runtime_api.submit.side_effect = submit
+
+        container.process_event("event", "arn", 3, stderr=stderr)
+        container._log_writer.write(b"dropped")
+
+        stderr.write.assert_called_once_with(b"log")
+
+    def test_must_fail_to_process_event_without_runtime_api(self):
+        container = LambdaContainer("provided", "handler", "codedir", [], self.image_builder_mock)
+
+        with self.assertRaises(RuntimeError):
+            container.process_event("event", "arn", 3)
+
+    @patch("samcli.local.docker.lambda_container.Container.delete")
+    def test_must_close_channel_on_delete(self, delete_mock):
+        container = self.make_container()
+
+        container.delete()
+
+        self.runtime_api.close_channel.assert_called_with(container._runtime_api_channel)
+        delete_mock.assert_called_with()
+
+
+class TestLambdaContainer_pool_key(TestCase):
+
+    def test_must_use_runtime_image_code_layers_and_memory(self):
+        layer = Mock()
+        layer.name = "layer1"
+        image_builder_mock = Mock()
+        image_builder_mock.build.return_value = "image"
+
+        container = LambdaContainer("python3.6", "handler", "codedir", [layer], image_builder_mock, memory_mb=256)
+
+        self.assertEquals(("python3.6", "image", "codedir", ("layer1",), 256, "handler", ()), container.pool_key)
+
+    def test_must_not_share_containers_of_functions_with_other_handlers(self):
+        image_builder_mock = Mock()
+        image_builder_mock.build.return_value = "image"
+
+        container_a = LambdaContainer("python3.6", "app.handler_a", "codedir", [], image_builder_mock, warm=True)
+        container_b = LambdaContainer("python3.6", "app.handler_b", "codedir", [], image_builder_mock, warm=True)
+
+        self.assertNotEquals(container_a.pool_key, container_b.pool_key)
+
+    def test_must_include_function_env_vars_but_not_event(self):
+        image_builder_mock = Mock()
+        image_builder_mock.build.return_value = "image"
+
+        container1 = LambdaContainer("python3.6", "handler", "codedir", [], image_builder_mock, warm=True,
+                                     env_vars={"a": "b", "AWS_LAMBDA_EVENT_BODY": "event1"})
+        container2 = LambdaContainer("python3.6", "handler", "codedir", [], image_builder_mock, warm=True,
+                                     env_vars={"a": "b", "AWS_LAMBDA_EVENT_BODY": "event2"})
+        container3 = LambdaContainer("python3.6", "handler", "codedir", [], image_builder_mock, warm=True,
+                                     env_vars={"a": "c", "AWS_LAMBDA_EVENT_BODY": "event1"})
+
+        self.assertEquals(container1.pool_key, container2.pool_key)
+        self.assertNotEquals(container1.pool_key, container3.pool_key)
+
+
+class TestLambdaContainer_invoke(TestCase):
+
+    def setUp(self):
+        image_builder_mock = Mock()
+        image_builder_mock.build.return_value = "image"
+
+        self.container = LambdaContainer("python3.6", "handler", "codedir", [], image_builder_mock, warm=True)
+        self.container.docker_client = Mock()
+        self.container.execute = Mock()
+
+    def test_must_run_image_entry_point_with_handler(self):
+        self.container.docker_client.images.get.return_value.attrs = {"Config": {"Entrypoint": ["/bootstrap"]}}
+        env_vars = {"a": "b"}
+
+        self.container.invoke(env_vars=env_vars, stdout="stdout", stderr="stderr")
+        self.container.invoke(env_vars=env_vars, stdout="stdout", stderr="stderr")
+
+        self.container.execute.assert_called_with(["/bootstrap", "handler"], env_vars=env_vars, stdout="stdout",
+                                                  stderr="stderr")
+        # Entry point is read from the image only once
+        self.container.docker_client.images.get.assert_called_once_with("image")
+
+    def test_must_run_handler_if_image_has_no_entry_point(self):
+        self.container.docker_client.images.get.return_value.attrs = {"Config": {"Entrypoint": None}}
+
+        self.container.invoke()
+
+        self.container.execute.assert_called_with(["handler"], env_vars=None, stdout=None, stderr=None)
+
+    def test_must_fail_if_container_is_not_warm(self):
+        container = LambdaContainer("python3.6", "handler", "codedir", [], Mock())
+
+        with self.assertRaises(RuntimeError):
+            container.invoke()
+
 
 class TestLambdaContainer_get_exposed_ports(TestCase):
 
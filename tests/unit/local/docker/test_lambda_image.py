@@ -1,5 +1,10 @@
+import os
+import shutil
+import tempfile
+import time
+import threading
 from unittest import TestCase
-from mock import patch, Mock, mock_open
+from mock import patch, Mock, mock_open, call
 
 from docker.errors import ImageNotFound, BuildError, APIError
 
@@ -9,6 +14,9 @@ from samcli.commands.local.cli_common.user_exceptions import ImageBuildException
 
 class TestLambdaImage(TestCase):
 
+    def setUp(self):
+        LambdaImage._base_image_ids.clear()
+
     def test_initialization_without_defaults(self):
         lambda_image = LambdaImage("layer_downloader", False, False, docker_client="docker_client")
 
@@ -17,10 +25,10 @@ class TestLambdaImage(TestCase):
         self.assertFalse(lambda_image.force_image_build)
         self.assertEquals(lambda_image.docker_client, "docker_client")
 
-    @patch("samcli.local.docker.lambda_image.docker")
-    def test_initialization_with_defaults(self, docker_patch):
+    @patch("samcli.local.docker.lambda_image.get_docker_client")
+    def test_initialization_with_defaults(self, get_docker_client_patch):
         docker_client_mock = Mock()
-        docker_patch.from_env.return_value = docker_client_mock
+        get_docker_client_patch.return_value = docker_client_mock
 
         lambda_image = LambdaImage("layer_downloader", False, False)
 
@@ -58,8 +66,11 @@ class TestLambdaImage(TestCase):
         self.assertEquals(actual_image_id, "samcli/lambda:image-version")
 
         layer_downloader_mock.download_all.assert_called_once_with([layer_mock], False)
-        generate_docker_image_version_patch.assert_called_once_with([layer_mock], "python3.6")
-        docker_client_mock.images.get.assert_called_once_with("samcli/lambda:image-version")
+        generate_docker_image_version_patch.assert_called_once_with([layer_mock],
+                                                                    "python3.6",
+                                                                    docker_client_mock.images.get.return_value.id)
+        docker_client_mock.images.get.assert_has_calls([call("lambci/lambda:python3.6"),
+                                                        call("samcli/lambda:image-version")])
         build_image_patch.assert_not_called()
 
     @patch("samcli.local.docker.lambda_image.LambdaImage._build_image")
@@ -81,8 +92,12 @@ class TestLambdaImage(TestCase):
         self.assertEquals(actual_image_id, "samcli/lambda:image-version")
 
         layer_downloader_mock.download_all.assert_called_once_with(["layers1"], True)
-        generate_docker_image_version_patch.assert_called_once_with(["layers1"], "python3.6")
-        docker_client_mock.images.get.assert_called_once_with("samcli/lambda:image-version")
+        generate_docker_image_version_patch.assert_called_once_with(["layers1"],
+                                                                    "python3.6",
+                                                                    docker_client_mock.images.pull.return_value.id)
+        docker_client_mock.images.pull.assert_called_once_with("lambci/lambda", tag="python3.6")
+        docker_client_mock.images.get.assert_has_calls([call("lambci/lambda:python3.6"),
+                                                        call("samcli/lambda:image-version")])
         build_image_patch.assert_called_once_with("lambci/lambda:python3.6", "samcli/lambda:image-version", ["layers1"])
 
     @patch("samcli.local.docker.lambda_image.LambdaImage._build_image")
@@ -104,8 +119,52 @@ class TestLambdaImage(TestCase):
         self.assertEquals(actual_image_id, "samcli/lambda:image-version")
 
         layer_downloader_mock.download_all.assert_called_once_with(["layers1"], False)
-        generate_docker_image_version_patch.assert_called_once_with(["layers1"], "python3.6")
-        docker_client_mock.images.get.assert_called_once_with("samcli/lambda:image-version")
+        generate_docker_image_version_patch.assert_called_once_with(["layers1"],
+                                                                    "python3.6",
+                                                                    docker_client_mock.images.pull.return_value.id)
+        docker_client_mock.images.pull.assert_called_once_with("lambci/lambda", tag="python3.6")
+        docker_client_mock.images.get.assert_has_calls([call("lambci/lambda:python3.6"),
+                                                        call("samcli/lambda:image-version")])
+        build_image_patch.assert_called_once_with("lambci/lambda:python3.6", "samcli/lambda:image-version", ["layers1"])
+
+    @patch("samcli.local.docker.lambda_image.LambdaImage._build_image")
+    @patch("samcli.local.docker.lambda_image.LambdaImage._generate_docker_image_version")
+    def test_concurrent_builds_of_same_image_build_once(self,
+                                                        generate_docker_image_version_patch,
+                                                        build_image_patch):
+        generate_docker_image_version_patch.return_value = "image-version"
+        built = threading.Event()
+        release_build = threading.Event()
+
+        def get_image(image):
+            if image == "samcli/lambda:image-version" and not built.is_set():
+                raise ImageNotFound("image not found")
+            return Mock()
+
+        def build_image(base_image, docker_tag, layers):
+            release_build.wait()
+            built.set()
+
+        docker_client_mock = Mock()
+        docker_client_mock.images.get.side_effect = get_image
+        build_image_patch.side_effect = build_image
+
+        layer_downloader_mock = Mock()
+        layer_downloader_mock.download_all.return_value = ["layers1"]
+        lambda_image = LambdaImage(layer_downloader_mock, False, False, docker_client=docker_client_mock)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(lambda_image.build("python3.6", ["layers1"])))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+
+        time.sleep(0.1)
+        release_build.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEquals(results, ["samcli/lambda:image-version"] * 5)
         build_image_patch.assert_called_once_with("lambci/lambda:python3.6", "samcli/lambda:image-version", ["layers1"])
 
     @patch("samcli.local.docker.lambda_image.hashlib")
@@ -116,18 +175,86 @@ class TestLambdaImage(TestCase):
 
         layer_mock = Mock()
         layer_mock.name = 'layer1'
+        layer_mock.is_defined_within_template = False
 
-        image_version = LambdaImage._generate_docker_image_version([layer_mock], 'runtime')
+        lambda_image = LambdaImage(Mock(), False, False, docker_client=Mock())
+        image_version = lambda_image._generate_docker_image_version([layer_mock], 'runtime')
 
         self.assertEquals(image_version, "runtime-thisisahexdigestofshahash")
 
         hashlib_patch.sha256.assert_called_once_with(b'layer1')
 
-    @patch("samcli.local.docker.lambda_image.docker")
-    def test_generate_dockerfile(self, docker_patch):
+    @patch("samcli.local.docker.lambda_image.dir_checksum")
+    @patch("samcli.local.docker.lambda_image.hashlib")
+    def test_generate_docker_image_version_from_layer_content(self, hashlib_patch, dir_checksum_patch):
+        hashlib_patch.sha256.return_value.hexdigest.return_value = "thisisahexdigestofshahash"
+        dir_checksum_patch.return_value = "treedigest"
+
+        local_layer = Mock(is_defined_within_template=True, codeuri="/layer1")
+        local_layer.name = 'LocalLayer'
+        remote_layer = Mock(is_defined_within_template=False)
+        remote_layer.name = 'layer2'
+
+        lambda_image = LambdaImage(Mock(), False, False, docker_client=Mock())
+        image_version = lambda_image._generate_docker_image_version([local_layer, remote_layer],
+                                                                    'runtime',
+                                                                    'sha256:baseimageid')
+
+        self.assertEquals(image_version, "runtime-thisisahexdigestofshahash")
+
+        dir_checksum_patch.assert_called_once_with("/layer1", lambda_image._file_checksums)
+        hashlib_patch.sha256.assert_called_once_with(b'LocalLayer@treedigest-layer2-sha256:baseimageid')
+
+    def test_image_version_changes_when_layer_content_changes(self):
+        layer_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, layer_dir)
+        layer_file = os.path.join(layer_dir, "layer.py")
+        with open(layer_file, "w") as fp:
+            fp.write("first")
+
+        local_layer = Mock(is_defined_within_template=True, codeuri=layer_dir)
+        local_layer.name = "LocalLayer"
+
+        lambda_image = LambdaImage(Mock(), False, False, docker_client=Mock())
+        first_version = lambda_image._generate_docker_image_version([local_layer], "runtime")
+        self.assertEquals(lambda_image._generate_docker_image_version([local_layer], "runtime"), first_version)
+
+        with open(layer_file, "w") as fp:
+            fp.write("second content")
+
+        self.assertNotEquals(lambda_image._generate_docker_image_version([local_layer], "runtime"), first_version)
+
+    def test_base_image_id_is_looked_up_once_per_image(self):
         docker_client_mock = Mock()
-        docker_patch.from_env.return_value = docker_client_mock
+        docker_client_mock.images.get.return_value.id = "sha256:baseimageid"
+
+        lambda_image = LambdaImage(Mock(), False, False, docker_client=docker_client_mock)
+        other_lambda_image = LambdaImage(Mock(), False, False, docker_client=docker_client_mock)
+
+        self.assertEquals(lambda_image._get_image_id("lambci/lambda:python3.6"), "sha256:baseimageid")
+        self.assertEquals(other_lambda_image._get_image_id("lambci/lambda:python3.6"), "sha256:baseimageid")
+
+        docker_client_mock.images.get.assert_called_once_with("lambci/lambda:python3.6")
+
+    def test_missing_base_image_id_is_not_remembered(self):
+        docker_client_mock = Mock()
+        docker_client_mock.images.get.side_effect = [ImageNotFound("image not found"), Mock(id="sha256:baseimageid")]
+
+        lambda_image = LambdaImage(Mock(), True, False, docker_client=docker_client_mock)
+
+        self.assertIsNone(lambda_image._get_image_id("lambci/lambda:python3.6"))
+        self.assertEquals(lambda_image._get_image_id("lambci/lambda:python3.6"), "sha256:baseimageid")
+
+    def test_must_not_pull_missing_base_image_when_skipping_pull(self):
+        docker_client_mock = Mock()
+        docker_client_mock.images.get.side_effect = ImageNotFound("image not found")
+
+        lambda_image = LambdaImage(Mock(), True, False, docker_client=docker_client_mock)
+
+        self.assertIsNone(lambda_image._get_image_id("lambci/lambda:python3.6"))
+        docker_client_mock.images.pull.assert_not_called()
 
+    def test_generate_dockerfile(self):
         expected_docker_file = "FROM python\nADD --chown=sbx_user1051:495 layer1 /opt\n"
 
         layer_mock = Mock()
@@ -135,11 +262,11 @@ class TestLambdaImage(TestCase):
 
         self.assertEquals(LambdaImage._generate_dockerfile("python", [layer_mock]), expected_docker_file)
 
-    @patch("samcli.local.docker.lambda_image.create_tarball")
+    @patch("samcli.local.docker.lambda_image.stream_tarball")
     @patch("samcli.local.docker.lambda_image.uuid")
     @patch("samcli.local.docker.lambda_image.Path")
     @patch("samcli.local.docker.lambda_image.LambdaImage._generate_dockerfile")
-    def test_build_image(self, generate_dockerfile_patch, path_patch, uuid_patch, create_tarball_patch):
+    def test_build_image(self, generate_dockerfile_patch, path_patch, uuid_patch, stream_tarball_patch):
         uuid_patch.uuid4.return_value = "uuid"
         generate_dockerfile_patch.return_value = "Dockerfile content"
 
@@ -152,7 +279,7 @@ class TestLambdaImage(TestCase):
         layer_downloader_mock.layer_cache = "cached layers"
 
         tarball_fileobj = Mock()
-        create_tarball_patch.return_value.__enter__.return_value = tarball_fileobj
+        stream_tarball_patch.return_value.__enter__.return_value = tarball_fileobj
 
         layer_version1 = Mock()
         layer_version1.codeuri = "somevalue"
@@ -172,11 +299,11 @@ class TestLambdaImage(TestCase):
                                                                 tag="docker_tag",
                                                                 pull=False,
                                                                 custom_context=True,
-                                                                encoding='gzip')
+                                                                encoding=None)
 
         docker_full_path_mock.unlink.assert_called_once()
 
-    @patch("samcli.local.docker.lambda_image.create_tarball")
+    @patch("samcli.local.docker.lambda_image.stream_tarball")
     @patch("samcli.local.docker.lambda_image.uuid")
     @patch("samcli.local.docker.lambda_image.Path")
     @patch("samcli.local.docker.lambda_image.LambdaImage._generate_dockerfile")
@@ -184,7 +311,7 @@ class TestLambdaImage(TestCase):
                                                generate_dockerfile_patch,
                                                path_patch,
                                                uuid_patch,
-                                               create_tarball_patch):
+                                               stream_tarball_patch):
         uuid_patch.uuid4.return_value = "uuid"
         generate_dockerfile_patch.return_value = "Dockerfile content"
 
@@ -198,7 +325,7 @@ class TestLambdaImage(TestCase):
         layer_downloader_mock.layer_cache = "cached layers"
 
         tarball_fileobj = Mock()
-        create_tarball_patch.return_value.__enter__.return_value = tarball_fileobj
+        stream_tarball_patch.return_value.__enter__.return_value = tarball_fileobj
 
         layer_version1 = Mock()
         layer_version1.codeuri = "somevalue"
@@ -219,11 +346,11 @@ class TestLambdaImage(TestCase):
                                                                 tag="docker_tag",
                                                                 pull=False,
                                                                 custom_context=True,
-                                                                encoding='gzip')
+                                                                encoding=None)
 
         docker_full_path_mock.unlink.assert_not_called()
 
-    @patch("samcli.local.docker.lambda_image.create_tarball")
+    @patch("samcli.local.docker.lambda_image.stream_tarball")
     @patch("samcli.local.docker.lambda_image.uuid")
     @patch("samcli.local.docker.lambda_image.Path")
     @patch("samcli.local.docker.lambda_image.LambdaImage._generate_dockerfile")
@@ -231,7 +358,7 @@ class TestLambdaImage(TestCase):
                                              generate_dockerfile_patch,
                                              path_patch,
                                              uuid_patch,
-                                             create_tarball_patch):
+                                             stream_tarball_patch):
         uuid_patch.uuid4.return_value = "uuid"
         generate_dockerfile_patch.return_value = "Dockerfile content"
 
@@ -244,7 +371,7 @@ class TestLambdaImage(TestCase):
         layer_downloader_mock.layer_cache = "cached layers"
 
         tarball_fileobj = Mock()
-        create_tarball_patch.return_value.__enter__.return_value = tarball_fileobj
+        stream_tarball_patch.return_value.__enter__.return_value = tarball_fileobj
 
         layer_version1 = Mock()
         layer_version1.codeuri = "somevalue"
@@ -265,5 +392,5 @@ class TestLambdaImage(TestCase):
                                                                 tag="docker_tag",
                                                                 pull=False,
                                                                 custom_context=True,
-                                                                encoding='gzip')
+                                                                encoding=None)
         docker_full_path_mock.unlink.assert_called_once()
@@ -3,9 +3,10 @@ Tests container manager
 """
 
 import io
+import threading
 
 from unittest import TestCase
-from mock import Mock
+from mock import Mock, call, patch
 from docker.errors import APIError, ImageNotFound
 from samcli.local.docker.manager import ContainerManager, DockerImagePullFailedException
 
@@ -31,11 +32,62 @@ class TestContainerManager_run(TestCase):
         self.container_mock.create = Mock()
         self.container_mock.is_created = Mock()
 
-    def test_must_error_with_warm(self):
+    def test_must_start_new_warm_container_if_none_is_idle(self):
+        self.manager.has_image = Mock()
+        self.manager.pull_image = Mock()
+        self.container_mock.is_created.return_value = False
+
+        result = self.manager.run(self.container_mock, warm=True)
+
+        self.assertEquals(result, self.container_mock)
+        self.container_mock.create.assert_called_with()
+        self.container_mock.start.assert_called_with(input_data=None)
+
+    def test_must_reuse_released_warm_container(self):
+        self.manager.has_image = Mock()
+        self.manager.pull_image = Mock()
+        self.container_mock.is_running.return_value = True
+
+        self.manager.run(self.container_mock, warm=True)
+        self.manager.release(self.container_mock)
+
+        other_container = Mock()
+        other_container.pool_key = self.container_mock.pool_key
+        result = self.manager.run(other_container, warm=True)
+
+        self.assertEquals(result, self.container_mock)
+        other_container.create.assert_not_called()
+        other_container.start.assert_not_called()
+
+    def test_must_not_reuse_warm_container_that_stopped_running(self):
+        self.manager.has_image = Mock()
+        self.manager.pull_image = Mock()
+        self.container_mock.is_running.return_value = False
+
+        self.manager.run(self.container_mock, warm=True)
+        self.manager.release(self.container_mock)
+
+        other_container = Mock()
+        other_container.pool_key = self.container_mock.pool_key
+        result = self.manager.run(other_container, warm=True)
+
+        self.assertEquals(result, other_container)
+        self.container_mock.delete.assert_called_with()
+        other_container.start.assert_called_with(input_data=None)
+
+    def test_must_give_up_warm_slot_if_container_failed_to_start(self):
+        self.manager = ContainerManager(docker_client=self.mock_docker_client, max_warm_containers=1)
+        self.manager.has_image = Mock()
+        self.manager.pull_image = Mock()
+        self.container_mock.start.side_effect = ValueError("failed")
 
         with self.assertRaises(ValueError):
             self.manager.run(self.container_mock, warm=True)
 
+        # Slot must be available for the next container. Otherwise this would block forever
+        other_container = Mock()
+        self.assertEquals(self.manager.run(other_container, warm=True), other_container)
+
     def test_must_pull_image_and_run_container(self):
         input_data = "input data"
 
@@ -167,6 +219,117 @@ class TestContainerManager_run(TestCase):
         self.container_mock.create.assert_not_called()
 
 
+class TestContainerManager_image_cache(TestCase):
+
+    def setUp(self):
+        self.manager = ContainerManager(docker_client=Mock(), image_refresh_interval=60)
+        self.manager.has_image = Mock(return_value=True)
+        self.manager.pull_image = Mock()
+
+        self.container_mock = Mock()
+        self.container_mock.image = "image"
+        self.container_mock.is_created.return_value = False
+
+    @patch("samcli.local.docker.manager.time")
+    def test_must_verify_image_once(self, time_mock):
+        time_mock.time.return_value = 100
+
+        self.manager.run(self.container_mock)
+        self.manager.run(self.container_mock)
+
+        self.manager.has_image.assert_called_once_with("image")
+        self.manager.pull_image.assert_called_once_with("image")
+
+    @patch("samcli.local.docker.manager.time")
+    def test_must_remember_image_if_pull_failed_but_image_is_local(self, time_mock):
+        time_mock.time.return_value = 100
+        self.manager.pull_image.side_effect = DockerImagePullFailedException("failed")
+
+        self.manager.run(self.container_mock)
+        self.manager.run(self.container_mock)
+
+        self.manager.pull_image.assert_called_once_with("image")
+
+    def test_must_not_remember_image_if_it_is_not_available(self):
+        self.manager.has_image.return_value = False
+        self.manager.pull_image.side_effect = DockerImagePullFailedException("failed")
+
+        for _ in range(2):
+            with self.assertRaises(DockerImagePullFailedException):
+                self.manager.run(self.container_mock)
+
+        self.assertEquals(self.manager.pull_image.call_count, 2)
+
+    @patch("samcli.local.docker.manager.threading")
+    @patch("samcli.local.docker.manager.time")
+    def test_must_refresh_stale_image_in_background(self, time_mock, threading_mock):
+        time_mock.time.return_value = 100
+        self.manager.run(self.container_mock)
+
+        time_mock.time.return_value = 160
+        self.manager.run(self.container_mock)
+
+        # Stale image is used right away
+        self.manager.pull_image.assert_called_once_with("image")
+        threading_mock.Thread.assert_called_with(target=self.manager._refresh_image, args=("image",))
+        threading_mock.Thread.return_value.start.assert_called_with()
+
+        self.manager._refresh_image("image")
+        self.assertEquals(self.manager.pull_image.call_count, 2)
+
+    @patch("samcli.local.docker.manager.threading")
+    @patch("samcli.local.docker.manager.time")
+    def test_must_not_refresh_without_interval(self, time_mock, threading_mock):
+        self.manager.image_refresh_interval = None
+        time_mock.time.return_value = 100
+        self.manager.run(self.container_mock)
+
+        time_mock.time.return_value = 100000
+        self.manager.run(self.container_mock)
+
+        threading_mock.Thread.assert_not_called()
+
+    def test_must_ignore_errors_when_refreshing_in_background(self):
+        self.manager.has_image.side_effect = ValueError("failed")
+
+        self.manager._refresh_image("image")
+
+    def test_must_pull_image_once_for_concurrent_runs(self):
+        pull_started = threading.Event()
+        finish_pull = threading.Event()
+
+        def pull_image(image_name):
+            pull_started.set()
+            finish_pull.wait(5)
+
+        self.manager.pull_image.side_effect = pull_image
+
+        other_container = Mock()
+        other_container.image = "image"
+        threads = [threading.Thread(target=self.manager.run, args=(container,))
+                   for container in [self.container_mock, other_container]]
+
+        threads[0].start()
+        pull_started.wait(5)
+        threads[1].start()
+        finish_pull.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.manager.pull_image.assert_called_once_with("image")
+        self.container_mock.start.assert_called_with(input_data=None)
+        other_container.start.assert_called_with(input_data=None)
+
+    def test_must_verify_image_again_if_it_was_removed(self):
+        self.manager.run(self.container_mock)
+        self.container_mock.create.side_effect = [ImageNotFound("not found"), "id"]
+
+        self.manager.run(self.container_mock)
+
+        self.assertEquals(self.manager.pull_image.call_count, 2)
+        self.assertEquals(self.container_mock.create.call_count, 3)
+
+
 class TestContainerManager_pull_image(TestCase):
 
     def setUp(self):
@@ -237,3 +400,89 @@ class TestContainerManager_stop(TestCase):
 
         manager.stop(container)
         container.delete.assert_called_with()
+
+
+class TestContainerManager_prewarm(TestCase):
+
+    def setUp(self):
+        self.manager = ContainerManager(docker_client=Mock())
+        self.manager._pull_image_if_needed = Mock()
+
+    def make_container(self, image="image"):
+        container = Mock()
+        container.image = image
+        container.pool_key = "key"
+        container.is_created.return_value = False
+        return container
+
+    def test_must_start_idle_warm_containers(self):
+        containers = [self.make_container("image1"), self.make_container("image2"), self.make_container("image1")]
+
+        result = self.manager.prewarm(containers)
+
+        self.assertEquals(result, 3)
+        self.assertEquals(self.manager._pull_image_if_needed.call_args_list, [call("image1"), call("image2")])
+        for container in containers:
+            container.create.assert_called_with()
+            container.start.assert_called_with(input_data=None)
+
+        # Pre-warmed containers are returned by the next run
+        self.assertIn(self.manager.run(self.make_container(), warm=True), containers)
+
+    def test_must_not_start_more_than_max_warm_containers(self):
+        self.manager = ContainerManager(docker_client=Mock(), max_warm_containers=1)
+        self.manager._pull_image_if_needed = Mock()
+        containers = [self.make_container(), self.make_container()]
+
+        result = self.manager.prewarm(containers, parallelism=1)
+
+        self.assertEquals(result, 1)
+        containers[1].start.assert_not_called()
+
+    def test_must_free_slot_if_container_fails_to_start(self):
+        self.manager = ContainerManager(docker_client=Mock(), max_warm_containers=1)
+        self.manager._pull_image_if_needed = Mock()
+        container = self.make_container()
+        container.start.side_effect = ValueError("failed")
+
+        with self.assertRaises(ValueError):
+            self.manager.prewarm([container])
+
+        self.assertTrue(self.manager._warm_containers.reserve())
+
+    def test_must_do_nothing_without_containers(self):
+        self.assertEquals(self.manager.prewarm([]), 0)
+        self.manager._pull_image_if_needed.assert_not_called()
+
+
+class TestContainerManager_release(TestCase):
+
+    def setUp(self):
+        self.manager = ContainerManager(docker_client=Mock())
+        self.manager.has_image = Mock()
+        self.manager.pull_image = Mock()
+
+    def test_must_keep_warm_container_running(self):
+        container = Mock()
+
+        self.manager.run(container, warm=True)
+        self.manager.release(container)
+
+        container.delete.assert_not_called()
+
+    def test_must_delete_container_that_is_not_warm(self):
+        container = Mock()
+
+        self.manager.run(container)
+        self.manager.release(container)
+
+        container.delete.assert_called_with()
+
+    def test_must_delete_warm_containers_on_shutdown(self):
+        container = Mock()
+
+        self.manager.run(container, warm=True)
+        self.manager.release(container)
+        self.manager.shutdown()
+
+        container.delete.assert_called_with()
@@ -5,9 +5,9 @@ Unit test for Utils
 import os
 from unittest import TestCase
 
-from mock import patch
+from mock import Mock, patch
 
-from samcli.local.docker.utils import to_posix_path
+from samcli.local.docker.utils import to_posix_path, get_network_gateway
 
 
 class TestUtils(TestCase):
@@ -26,3 +26,21 @@ class TestUtils(TestCase):
     def test_do_not_convert_posix_path(self, mock_os):
         mock_os.name = "posix"
         self.assertEquals(self.current_working_dir, to_posix_path(self.current_working_dir))
+
+
+class TestGetNetworkGateway(TestCase):
+
+    def test_must_return_gateway_of_network(self):
+        docker_client = Mock()
+        docker_client.networks.get.return_value.attrs = {
+            "IPAM": {"Config": [{"Subnet": "10.0.0.0/16"}, {"Subnet": "172.17.0.0/16", "Gateway": "172.17.0.1"}]}
+        }
+
+        self.assertEquals(get_network_gateway(docker_client, "bridge"), "172.17.0.1")
+        docker_client.networks.get.assert_called_with("bridge")
+
+    def test_must_return_none_without_gateway(self):
+        docker_client = Mock()
+        docker_client.networks.get.return_value.attrs = {"IPAM": {"Config": None}}
+
+        self.assertIsNone(get_network_gateway(docker_client, "bridge"))
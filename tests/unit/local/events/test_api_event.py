@@ -1,7 +1,9 @@
+import json
 from unittest import TestCase
-from mock import Mock
+from mock import Mock, patch
 
-from samcli.local.events.api_event import ContextIdentity, RequestContext, ApiGatewayLambdaEvent
+from samcli.local.events.api_event import ContextIdentity, RequestContext, ApiGatewayLambdaEvent, \
+    ApiGatewayLambdaEventSkeleton
 
 
 class TestContextIdentity(TestCase):
@@ -280,3 +282,53 @@ class TestApiGatewayLambdaEvent(TestCase):
                                   'request_path',
                                   False
                                   )
+
+
+class TestApiGatewayLambdaEventSkeleton(TestCase):
+
+    def _event(self, http_method, source_ip="127.0.0.1", **kwargs):
+        context = RequestContext(resource_path="/id/{id}",
+                                 http_method=http_method,
+                                 stage="prod",
+                                 identity=ContextIdentity(source_ip=source_ip),
+                                 path="/id/{id}")
+        return ApiGatewayLambdaEvent(http_method=http_method, resource="/id/{id}", request_context=context, **kwargs)
+
+    def test_must_serialize_same_event_as_objects(self):
+        skeleton = ApiGatewayLambdaEventSkeleton("/id/{id}", stage="prod")
+        request_fields = {"body": u"caf\u00e9",
+                          "query_string_params": {"query": "param"},
+                          "headers": {"Content-Type": "application/json"},
+                          "path_parameters": {"id": "1"},
+                          "path": "/id/1",
+                          "is_base_64_encoded": True}
+
+        event_json = skeleton.to_json("POST", source_ip="190.0.0.0", **request_fields)
+
+        expected_event = self._event("POST", source_ip="190.0.0.0", **request_fields)
+        self.assertEquals(json.loads(event_json), expected_event.to_dict())
+
+    def test_must_serialize_empty_request_fields_as_null(self):
+        skeleton = ApiGatewayLambdaEventSkeleton("/id/{id}", stage="prod")
+
+        event_json = skeleton.to_json("GET", body="", query_string_params={}, headers={}, path_parameters=None)
+
+        self.assertEquals(json.loads(event_json), self._event("GET").to_dict())
+
+    def test_must_use_api_id(self):
+        skeleton = ApiGatewayLambdaEventSkeleton("/", api_id="abcdef")
+
+        self.assertEquals(json.loads(skeleton.to_json("GET"))["requestContext"]["apiId"], "abcdef")
+
+    @patch("samcli.local.events.api_event.RequestContext")
+    def test_must_serialize_request_context_once_per_method(self, request_context_patch):
+        request_context_patch.return_value.to_dict.side_effect = lambda: {"identity": {}, "stage": "prod"}
+        skeleton = ApiGatewayLambdaEventSkeleton("/", stage="prod")
+
+        get_event = json.loads(skeleton.to_json("GET"))
+        skeleton.to_json("GET")
+        skeleton.to_json("POST")
+
+        self.assertEquals(request_context_patch.call_count, 2)
+        self.assertEquals(get_event["requestContext"]["stage"], "prod")
+        self.assertEquals(get_event["requestContext"]["identity"]["sourceIp"], "127.0.0.1")
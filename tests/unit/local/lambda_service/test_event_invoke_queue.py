@@ -0,0 +1,106 @@
+import threading
+from unittest import TestCase
+
+from mock import Mock, patch, ANY
+
+from samcli.local.lambda_service.event_invoke_queue import EventInvokeQueue
+from samcli.local.lambdafn.exceptions import FunctionNotFound, ConcurrencyLimitExceeded
+
+ERROR_RESPONSE = b'{"errorMessage": "boom", "errorType": "Exception", "stackTrace": []}'
+
+
+class TestEventInvokeQueue(TestCase):
+
+    def setUp(self):
+        self.lambda_runner = Mock()
+        self.results = []
+
+        def invoke(function_name, event, stdout=None, stderr=None):
+            result = self.results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            stdout.write(result)
+
+        self.lambda_runner.invoke.side_effect = invoke
+
+        self.queue = EventInvokeQueue(self.lambda_runner, workers=1, retry_delay=0)
+
+    def _wait_for_invokes(self, count):
+        event = threading.Event()
+        for _ in range(1000):
+            if self.lambda_runner.invoke.call_count >= count:
+                return
+            event.wait(0.01)
+        raise AssertionError("Function was not invoked")
+
+    def test_must_invoke_in_background(self):
+        self.results = [b'{"hello": "world"}']
+
+        self.queue.put("HelloWorld", '{}')
+        self._wait_for_invokes(1)
+
+        self.lambda_runner.invoke.assert_called_once_with("HelloWorld", '{}', stdout=ANY, stderr=None)
+
+    def test_must_retry_function_errors(self):
+        self.results = [ERROR_RESPONSE, ERROR_RESPONSE, b'{"hello": "world"}']
+
+        self.queue.put("HelloWorld", '{}')
+        self._wait_for_invokes(3)
+
+        self.assertEquals(self.lambda_runner.invoke.call_count, 3)
+
+    def test_must_retry_throttled_invokes(self):
+        self.results = [ConcurrencyLimitExceeded("Rate Exceeded."), b'{}']
+
+        self.queue.put("HelloWorld", '{}')
+        self._wait_for_invokes(2)
+
+        self.assertEquals(self.lambda_runner.invoke.call_count, 2)
+
+    @patch("samcli.local.lambda_service.event_invoke_queue.LOG")
+    def test_must_drop_invoke_without_retries_left(self, log_mock):
+        dropped = threading.Event()
+        log_mock.error.side_effect = lambda *args: dropped.set()
+        self.queue.max_retries = 1
+        self.results = [ERROR_RESPONSE, ERROR_RESPONSE]
+
+        self.queue.put("HelloWorld", '{}')
+
+        self.assertTrue(dropped.wait(10))
+        self.assertEquals(self.lambda_runner.invoke.call_count, 2)
+
+    @patch("samcli.local.lambda_service.event_invoke_queue.LOG")
+    def test_must_not_retry_unknown_function(self, log_mock):
+        dropped = threading.Event()
+        log_mock.warning.side_effect = lambda *args: dropped.set()
+        self.results = [FunctionNotFound()]
+
+        self.queue.put("NotFound", '{}')
+
+        self.assertTrue(dropped.wait(10))
+        self.assertEquals(self.lambda_runner.invoke.call_count, 1)
+
+    def test_must_throttle_when_queue_is_full(self):
+        queue = EventInvokeQueue(self.lambda_runner, workers=0, max_queued_events=1)
+
+        queue.put("HelloWorld", '{}')
+
+        with self.assertRaises(ConcurrencyLimitExceeded):
+            queue.put("HelloWorld", '{}')
+
+    @patch("samcli.local.lambda_service.event_invoke_queue.LOG")
+    def test_must_invoke_on_calling_thread_without_retries_when_debugging(self, log_mock):
+        threads = []
+
+        def invoke(function_name, event, stdout=None, stderr=None):
+            threads.append(threading.current_thread())
+            stdout.write(ERROR_RESPONSE)
+
+        self.lambda_runner.invoke.side_effect = invoke
+        queue = EventInvokeQueue(self.lambda_runner, retry_delay=0, is_debugging=True)
+
+        queue.put("HelloWorld", '{}')
+
+        self.assertEquals(threads, [threading.current_thread()])
+        self.assertEquals(queue._threads, [])
+        log_mock.error.assert_called_once_with(ANY, "HelloWorld", 1, ANY)
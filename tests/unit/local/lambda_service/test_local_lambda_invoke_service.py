@@ -2,7 +2,7 @@ from unittest import TestCase
 from mock import Mock, patch, ANY, call
 
 from samcli.local.lambda_service.local_lambda_invoke_service import LocalLambdaInvokeService
-from samcli.local.lambdafn.exceptions import FunctionNotFound
+from samcli.local.lambdafn.exceptions import FunctionNotFound, ConcurrencyLimitExceeded
 
 
 class TestLocalLambdaService(TestCase):
@@ -24,6 +24,28 @@ class TestLocalLambdaService(TestCase):
         self.assertEquals(local_service.stderr, stderr_mock)
         self.assertEquals(local_service.lambda_runner, lambda_runner_mock)
 
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.EventInvokeQueue')
+    def test_initialize_event_queue(self, event_invoke_queue_mock):
+        lambda_runner_mock = Mock()
+        lambda_runner_mock.is_debugging.return_value = False
+        stderr_mock = Mock()
+
+        service = LocalLambdaInvokeService(lambda_runner_mock, port=3000, host='localhost', stderr=stderr_mock,
+                                           event_workers=8, event_retries=0)
+
+        self.assertEquals(service.event_queue, event_invoke_queue_mock.return_value)
+        event_invoke_queue_mock.assert_called_once_with(lambda_runner_mock, stderr=stderr_mock, workers=8,
+                                                        max_retries=0)
+
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.EventInvokeQueue')
+    def test_initialize_event_queue_for_debugging(self, event_invoke_queue_mock):
+        lambda_runner_mock = Mock()
+        lambda_runner_mock.is_debugging.return_value = True
+
+        LocalLambdaInvokeService(lambda_runner_mock, port=3000, host='localhost', event_workers=8)
+
+        event_invoke_queue_mock.assert_called_once_with(lambda_runner_mock, stderr=None, is_debugging=True)
+
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.LocalLambdaInvokeService._construct_error_handling')
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.Flask')
     def test_create_service_endpoints(self, flask_mock, error_handling_mock):
@@ -44,10 +66,10 @@ class TestLocalLambdaService(TestCase):
                                                       provide_automatic_options=False)
 
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.LocalLambdaInvokeService.service_response')
-    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaOutputParser')
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaOutputStream')
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
-    def test_invoke_request_handler(self, request_mock, lambda_output_parser_mock, service_response_mock):
-        lambda_output_parser_mock.get_lambda_output.return_value = 'hello world', None, False
+    def test_invoke_request_handler(self, request_mock, lambda_output_stream_mock, service_response_mock):
+        lambda_output_stream_mock.return_value.get_lambda_output.return_value = 'hello world', False
         service_response_mock.return_value = 'request response'
         request_mock.get_data.return_value = b'{}'
 
@@ -61,6 +83,75 @@ class TestLocalLambdaService(TestCase):
         lambda_runner_mock.invoke.assert_called_once_with('HelloWorld', '{}', stdout=ANY, stderr=None)
         service_response_mock.assert_called_once_with('hello world', {'Content-Type': 'application/json'}, 200)
 
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaErrorResponses')
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
+    def test_invoke_request_handler_when_throttled(self, request_mock, lambda_error_responses_mock):
+        request_mock.get_data.return_value = b'{}'
+        lambda_runner_mock = Mock()
+        lambda_runner_mock.invoke.side_effect = ConcurrencyLimitExceeded("Rate Exceeded.")
+
+        lambda_error_responses_mock.too_many_requests.return_value = "Throttled"
+
+        service = LocalLambdaInvokeService(lambda_runner=lambda_runner_mock, port=3000, host='localhost')
+
+        response = service._invoke_request_handler(function_name='HelloWorld')
+
+        self.assertEquals(response, "Throttled")
+        lambda_error_responses_mock.too_many_requests.assert_called_once_with("Rate Exceeded.")
+
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LocalLambdaInvokeService.service_response')
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
+    def test_invoke_request_handler_queues_event_invoke(self, request_mock, service_response_mock):
+        service_response_mock.return_value = 'request response'
+        request_mock.get_data.return_value = b'{}'
+        request_mock.headers = {'X-Amz-Invocation-Type': 'Event'}
+
+        lambda_runner_mock = Mock()
+        service = LocalLambdaInvokeService(lambda_runner=lambda_runner_mock, port=3000, host='localhost')
+        service.event_queue = Mock()
+
+        response = service._invoke_request_handler(function_name='HelloWorld')
+
+        self.assertEquals(response, 'request response')
+
+        lambda_runner_mock.invoke.assert_not_called()
+        service.event_queue.put.assert_called_once_with('HelloWorld', '{}')
+        service_response_mock.assert_called_once_with('', {'Content-Type': 'application/json'}, 202)
+
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaErrorResponses')
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
+    def test_event_invoke_of_unknown_function(self, request_mock, lambda_error_responses_mock):
+        request_mock.get_data.return_value = b'{}'
+        request_mock.headers = {'X-Amz-Invocation-Type': 'Event'}
+        lambda_error_responses_mock.resource_not_found.return_value = "Couldn't find Lambda"
+
+        lambda_runner_mock = Mock()
+        lambda_runner_mock.provider.get.return_value = None
+        service = LocalLambdaInvokeService(lambda_runner=lambda_runner_mock, port=3000, host='localhost')
+        service.event_queue = Mock()
+
+        response = service._invoke_request_handler(function_name='NotFound')
+
+        self.assertEquals(response, "Couldn't find Lambda")
+        service.event_queue.put.assert_not_called()
+        lambda_error_responses_mock.resource_not_found.assert_called_once_with('NotFound')
+
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaErrorResponses')
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
+    def test_event_invoke_when_queue_is_full(self, request_mock, lambda_error_responses_mock):
+        request_mock.get_data.return_value = b'{}'
+        request_mock.headers = {'X-Amz-Invocation-Type': 'Event'}
+        lambda_error_responses_mock.too_many_requests.return_value = "Throttled"
+
+        service = LocalLambdaInvokeService(lambda_runner=Mock(), port=3000, host='localhost')
+        service.event_queue = Mock()
+        service.event_queue.put.side_effect = ConcurrencyLimitExceeded("Rate Exceeded.")
+
+        response = service._invoke_request_handler(function_name='HelloWorld')
+
+        self.assertEquals(response, "Throttled")
+        lambda_error_responses_mock.too_many_requests.assert_called_once_with("Rate Exceeded.")
+
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaErrorResponses')
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
     def test_invoke_request_handler_on_incorrect_path(self, request_mock, lambda_error_responses_mock):
@@ -81,16 +172,15 @@ class TestLocalLambdaService(TestCase):
         lambda_error_responses_mock.resource_not_found.assert_called_once_with('NotFound')
 
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.LocalLambdaInvokeService.service_response')
-    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaOutputParser')
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaOutputStream')
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
-    def test_request_handler_returns_process_stdout_when_making_response(self, request_mock, lambda_output_parser_mock,
+    def test_request_handler_returns_process_stdout_when_making_response(self, request_mock, lambda_output_stream_mock,
                                                                          service_response_mock):
         request_mock.get_data.return_value = b'{}'
 
-        lambda_logs = "logs"
         lambda_response = "response"
         is_customer_error = False
-        lambda_output_parser_mock.get_lambda_output.return_value = lambda_response, lambda_logs, is_customer_error
+        lambda_output_stream_mock.return_value.get_lambda_output.return_value = lambda_response, is_customer_error
 
         service_response_mock.return_value = 'request response'
 
@@ -104,10 +194,9 @@ class TestLocalLambdaService(TestCase):
         result = service._invoke_request_handler(function_name='HelloWorld')
 
         self.assertEquals(result, 'request response')
-        lambda_output_parser_mock.get_lambda_output.assert_called_with(ANY)
-
-        # Make sure the logs are written to stderr
-        stderr_mock.write.assert_called_with(lambda_logs)
+        # Logs are written to stderr by the stream, as they arrive
+        lambda_output_stream_mock.assert_called_with(log_stream=stderr_mock)
+        lambda_output_stream_mock.return_value.get_lambda_output.assert_called_with()
 
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaErrorResponses')
     def test_construct_error_handling(self, lambda_error_response_mock):
@@ -126,13 +215,13 @@ class TestLocalLambdaService(TestCase):
             call(405, lambda_error_response_mock.generic_method_not_allowed)])
 
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.LocalLambdaInvokeService.service_response')
-    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaOutputParser')
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaOutputStream')
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
     def test_invoke_request_handler_with_lambda_that_errors(self,
                                                             request_mock,
-                                                            lambda_output_parser_mock,
+                                                            lambda_output_stream_mock,
                                                             service_response_mock):
-        lambda_output_parser_mock.get_lambda_output.return_value = 'hello world', None, True
+        lambda_output_stream_mock.return_value.get_lambda_output.return_value = 'hello world', True
         service_response_mock.return_value = 'request response'
         request_mock.get_data.return_value = b'{}'
 
@@ -150,10 +239,10 @@ class TestLocalLambdaService(TestCase):
                                                       200)
 
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.LocalLambdaInvokeService.service_response')
-    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaOutputParser')
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.LambdaOutputStream')
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
-    def test_invoke_request_handler_with_no_data(self, request_mock, lambda_output_parser_mock, service_response_mock):
-        lambda_output_parser_mock.get_lambda_output.return_value = 'hello world', None, False
+    def test_invoke_request_handler_with_no_data(self, request_mock, lambda_output_stream_mock, service_response_mock):
+        lambda_output_stream_mock.return_value.get_lambda_output.return_value = 'hello world', False
         service_response_mock.return_value = 'request response'
         request_mock.get_data.return_value = None
 
@@ -237,7 +326,18 @@ class TestValidateRequestHandling(TestCase):
         self.assertEquals(response, "NotImplementedLocally")
 
         lambda_error_responses_mock.not_implemented_locally.assert_called_once_with(
-            "invocation-type: DryRun is not supported. RequestResponse is only supported.")
+            "invocation-type: DryRun is not supported. RequestResponse and Event are only supported.")
+
+    @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
+    def test_request_invocation_type_Event(self, flask_request):
+        flask_request.get_data.return_value = None
+        flask_request.headers = {'X-Amz-Invocation-Type': 'Event'}
+        flask_request.content_type = 'application/json'
+        flask_request.args = {}
+
+        response = LocalLambdaInvokeService.validate_request()
+
+        self.assertIsNone(response)
 
     @patch('samcli.local.lambda_service.local_lambda_invoke_service.request')
     def test_request_with_no_data(self, flask_request):
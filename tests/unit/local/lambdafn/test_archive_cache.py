@@ -0,0 +1,163 @@
+import os
+import time
+import shutil
+import zipfile
+from unittest import TestCase
+from tempfile import mkdtemp
+from mock import patch
+
+from samcli.local.lambdafn.archive_cache import ArchiveCache
+
+
+class TestArchiveCache(TestCase):
+
+    def setUp(self):
+        self.work_dir = mkdtemp()
+        self.cache_dir = os.path.join(self.work_dir, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_must_extract_archive(self):
+        archive = self._create_zip("code.zip", {"index.py": "print(1)"})
+        cache = ArchiveCache(self.cache_dir)
+
+        with cache.extracted(archive) as code_dir:
+            self.assertEquals(os.path.dirname(code_dir), os.path.realpath(self.cache_dir))
+            with open(os.path.join(code_dir, "index.py")) as fp:
+                self.assertEquals(fp.read(), "print(1)")
+
+        # Directory is kept for later invokes
+        self.assertTrue(os.path.isdir(code_dir))
+
+    @patch("samcli.local.lambdafn.archive_cache.unzip")
+    def test_must_extract_same_content_once(self, unzip_mock):
+        archive1 = self._create_zip("code1.zip", {"index.py": "print(1)"})
+        archive2 = os.path.join(self.work_dir, "code2.zip")
+        shutil.copy(archive1, archive2)
+        cache = ArchiveCache(self.cache_dir)
+
+        with cache.extracted(archive1) as code_dir1:
+            pass
+        with cache.extracted(archive2) as code_dir2:
+            pass
+        with ArchiveCache(self.cache_dir).extracted(archive1) as code_dir3:
+            pass
+
+        self.assertEquals(code_dir1, code_dir2)
+        self.assertEquals(code_dir1, code_dir3)
+        self.assertEquals(unzip_mock.call_count, 1)
+
+    def test_must_extract_again_when_content_changes(self):
+        archive = self._create_zip("code.zip", {"index.py": "print(1)"})
+        cache = ArchiveCache(self.cache_dir)
+
+        with cache.extracted(archive) as code_dir1:
+            pass
+
+        self._create_zip("code.zip", {"index.py": "print(2)"})
+        os.utime(archive, (1, 1))
+
+        with cache.extracted(archive) as code_dir2:
+            with open(os.path.join(code_dir2, "index.py")) as fp:
+                self.assertEquals(fp.read(), "print(2)")
+
+        self.assertNotEquals(code_dir1, code_dir2)
+
+    @patch.object(ArchiveCache, "_UNUSED_GRACE_PERIOD", 0)
+    def test_must_evict_least_recently_used(self):
+        archives = [self._create_zip("code{}.zip".format(i), {"data": str(i) * 400 * 1024}) for i in range(3)]
+        cache = ArchiveCache(self.cache_dir, max_size_mb=1)
+
+        code_dirs = []
+        for archive in archives:
+            with cache.extracted(archive) as code_dir:
+                code_dirs.append(code_dir)
+
+        self.assertFalse(os.path.exists(code_dirs[0]))
+        self.assertTrue(os.path.isdir(code_dirs[1]))
+        self.assertTrue(os.path.isdir(code_dirs[2]))
+
+    @patch.object(ArchiveCache, "_UNUSED_GRACE_PERIOD", 0)
+    def test_must_not_evict_directories_in_use(self):
+        archives = [self._create_zip("code{}.zip".format(i), {"data": str(i) * 800 * 1024}) for i in range(2)]
+        cache = ArchiveCache(self.cache_dir, max_size_mb=1)
+
+        with cache.extracted(archives[0]) as code_dir1:
+            with cache.extracted(archives[1]) as code_dir2:
+                pass
+
+            self.assertTrue(os.path.isdir(code_dir1))
+            self.assertFalse(os.path.exists(code_dir2))
+
+        self.assertTrue(os.path.isdir(code_dir1))
+
+    @patch.object(ArchiveCache, "_UNUSED_GRACE_PERIOD", 0)
+    def test_must_not_evict_pinned_directories(self):
+        archives = [self._create_zip("code{}.zip".format(i), {"data": str(i) * 800 * 1024}) for i in range(2)]
+        cache = ArchiveCache(self.cache_dir, max_size_mb=1)
+
+        code_dir1 = cache.pin(archives[0])
+        with open(os.path.join(code_dir1, "data")) as fp:
+            self.assertEquals(len(fp.read()), 800 * 1024)
+
+        with cache.extracted(archives[1]) as code_dir2:
+            pass
+
+        self.assertTrue(os.path.isdir(code_dir1))
+        self.assertFalse(os.path.exists(code_dir2))
+
+        # Pinned directories are kept even when they are no longer in use
+        with cache.extracted(archives[0]):
+            pass
+        self.assertTrue(os.path.isdir(code_dir1))
+
+    def test_must_not_evict_directories_recently_used_by_any_process(self):
+        archives = [self._create_zip("code{}.zip".format(i), {"data": str(i) * 800 * 1024}) for i in range(2)]
+
+        # Another process used the first archive a minute ago, the second one used it long ago
+        with ArchiveCache(self.cache_dir).extracted(archives[0]) as recent_dir:
+            pass
+        with ArchiveCache(self.cache_dir).extracted(archives[1]) as old_dir:
+            pass
+        os.utime(recent_dir, (time.time() - 60, time.time() - 60))
+        os.utime(old_dir, (time.time() - 7200, time.time() - 7200))
+
+        archive = self._create_zip("code.zip", {"data": "2" * 800 * 1024})
+        with ArchiveCache(self.cache_dir, max_size_mb=1).extracted(archive) as code_dir:
+            pass
+
+        self.assertTrue(os.path.isdir(recent_dir))
+        self.assertFalse(os.path.exists(old_dir))
+        self.assertTrue(os.path.isdir(code_dir))
+
+    def test_must_delete_stale_temporary_directories(self):
+        os.makedirs(os.path.join(self.cache_dir, ".tmp-stale", "nested"))
+        os.makedirs(os.path.join(self.cache_dir, ".tmp-recent"))
+        os.utime(os.path.join(self.cache_dir, ".tmp-stale"), (time.time() - 7200, time.time() - 7200))
+        archive = self._create_zip("code.zip", {"index.py": "print(1)"})
+
+        with ArchiveCache(self.cache_dir).extracted(archive) as code_dir:
+            pass
+
+        self.assertEquals(sorted(os.listdir(self.cache_dir)), sorted([".tmp-recent", os.path.basename(code_dir)]))
+
+    @patch("samcli.local.lambdafn.archive_cache.unzip")
+    def test_must_remove_partial_extraction(self, unzip_mock):
+        archive = self._create_zip("code.zip", {"index.py": "print(1)"})
+        unzip_mock.side_effect = IOError("disk full")
+        cache = ArchiveCache(self.cache_dir)
+
+        with self.assertRaises(IOError):
+            with cache.extracted(archive):
+                pass
+
+        self.assertEquals(os.listdir(self.cache_dir), [])
+
+    def _create_zip(self, name, files):
+        path = os.path.join(self.work_dir, name)
+        with zipfile.ZipFile(path, "w") as zip_file:
+            for file_name, content in files.items():
+                zip_file.writestr(file_name, content)
+
+        return path
@@ -0,0 +1,159 @@
+import threading
+from unittest import TestCase
+
+from samcli.local.lambdafn.concurrency import ConcurrencyLimiter
+from samcli.local.lambdafn.exceptions import ConcurrencyLimitExceeded
+
+
+class TestConcurrencyLimiter_acquire_async(TestCase):
+
+    def setUp(self):
+        self.acquired = []
+
+    def _acquire(self, limiter, function_name, tag=None):
+        limiter.acquire_async(function_name, lambda: self.acquired.append(tag or function_name))
+
+    def test_must_run_right_away_without_limits(self):
+        limiter = ConcurrencyLimiter()
+
+        for _ in range(10):
+            self._acquire(limiter, "HelloWorld")
+
+        self.assertEquals(len(self.acquired), 10)
+        self.assertEquals(limiter.stats()["running"], 10)
+
+    def test_must_queue_above_max_concurrency_in_order(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+
+        self._acquire(limiter, "A", "first")
+        self._acquire(limiter, "B", "second")
+        self._acquire(limiter, "C", "third")
+
+        self.assertEquals(self.acquired, ["first"])
+        self.assertEquals(limiter.stats()["queued"], 2)
+
+        limiter.release("A")
+        self.assertEquals(self.acquired, ["first", "second"])
+
+        limiter.release("B")
+        self.assertEquals(self.acquired, ["first", "second", "third"])
+
+    def test_function_at_its_limit_must_not_block_other_functions(self):
+        limiter = ConcurrencyLimiter(max_concurrency=2, function_concurrency={"A": 1})
+
+        self._acquire(limiter, "A", "A1")
+        self._acquire(limiter, "A", "A2")
+        self._acquire(limiter, "B", "B1")
+
+        self.assertEquals(self.acquired, ["A1", "B1"])
+        self.assertEquals(limiter.stats()["queued_by_function"], {"A": 1})
+
+        limiter.release("A")
+        self.assertEquals(self.acquired, ["A1", "B1", "A2"])
+
+    def test_must_throttle_when_queue_is_full(self):
+        limiter = ConcurrencyLimiter(function_concurrency={"A": 1}, max_queued=1)
+
+        self._acquire(limiter, "A")
+        self._acquire(limiter, "A")
+
+        with self.assertRaises(ConcurrencyLimitExceeded):
+            self._acquire(limiter, "A")
+
+        self.assertEquals(limiter.stats()["throttled"], 1)
+
+    def test_must_throttle_right_away_without_queue(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queued=0)
+
+        self._acquire(limiter, "A")
+
+        with self.assertRaises(ConcurrencyLimitExceeded):
+            self._acquire(limiter, "B")
+
+    def test_must_throttle_function_with_limit_of_zero(self):
+        limiter = ConcurrencyLimiter(function_concurrency={"A": 0})
+
+        with self.assertRaises(ConcurrencyLimitExceeded):
+            self._acquire(limiter, "A")
+
+        self._acquire(limiter, "B")
+
+        self.assertEquals(self.acquired, ["B"])
+        self.assertEquals(limiter.stats()["queued"], 0)
+        self.assertEquals(limiter.stats()["throttled"], 1)
+
+    def test_must_throttle_every_function_with_max_concurrency_of_zero(self):
+        limiter = ConcurrencyLimiter(max_concurrency=0)
+
+        with self.assertRaises(ConcurrencyLimitExceeded):
+            self._acquire(limiter, "A")
+
+        self.assertEquals(limiter.stats()["queued"], 0)
+
+    def test_must_record_wait_metrics(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+
+        self._acquire(limiter, "A")
+        self._acquire(limiter, "A")
+        self._acquire(limiter, "A")
+        limiter.release("A")
+
+        stats = limiter.stats()
+        self.assertEquals(stats["waited"], 1)
+        self.assertEquals(stats["max_queue_depth"], 2)
+        self.assertEquals(stats["queued"], 1)
+        self.assertEquals(stats["running"], 1)
+        self.assertGreaterEqual(stats["max_wait_time"], 0.0)
+        self.assertEquals(stats["average_wait_time"], stats["total_wait_time"])
+
+
+class TestConcurrencyLimiter_limit(TestCase):
+
+    def test_must_release_on_exit(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+
+        with limiter.limit("A"):
+            self.assertEquals(limiter.stats()["running"], 1)
+
+        self.assertEquals(limiter.stats()["running"], 0)
+
+    def test_must_release_when_invoke_fails(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+
+        with self.assertRaises(ValueError):
+            with limiter.limit("A"):
+                raise ValueError()
+
+        self.assertEquals(limiter.stats()["running"], 0)
+
+    def test_must_throttle_function_with_limit_of_zero_without_blocking(self):
+        limiter = ConcurrencyLimiter(function_concurrency={"A": 0})
+
+        with self.assertRaises(ConcurrencyLimitExceeded):
+            with limiter.limit("A"):
+                self.fail("Function with a limit of 0 must not run")
+
+        self.assertEquals(limiter.stats()["running"], 0)
+
+    def test_must_wait_for_running_invoke(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+        entered = threading.Event()
+        order = []
+
+        def invoke():
+            with limiter.limit("A"):
+                order.append("second")
+
+        with limiter.limit("A"):
+            thread = threading.Thread(target=invoke)
+            thread.start()
+
+            # Wait for the second invoke to be queued
+            while not limiter.stats()["queued"]:
+                entered.wait(0.01)
+            order.append("first")
+
+        thread.join(10)
+
+        self.assertEquals(order, ["first", "second"])
+        self.assertEquals(limiter.stats()["running"], 0)
@@ -2,11 +2,12 @@
 Unit tests for Lambda runtime
 """
 
+import threading
 from unittest import TestCase
 from mock import Mock, patch, MagicMock, ANY
 from parameterized import parameterized
 
-from samcli.local.lambdafn.runtime import LambdaRuntime, _unzip_file
+from samcli.local.lambdafn.runtime import LambdaRuntime, WarmLambdaRuntime, _unzip_file
 from samcli.local.lambdafn.config import FunctionConfig
 
 
@@ -198,6 +199,292 @@ class LambdaRuntime_invoke(TestCase):
         self.manager_mock.stop.assert_called_with(container)
 
 
+class WarmLambdaRuntime_invoke(TestCase):
+
+    def setUp(self):
+        self.manager_mock = Mock()
+        self.image_builder = Mock()
+        self.runtime = WarmLambdaRuntime(self.manager_mock, self.image_builder)
+        self.runtime._configure_interrupt = Mock()
+        self.timer = self.runtime._configure_interrupt.return_value
+
+        self.func_config = FunctionConfig("name", "runtime", "handler", "code-path", [])
+        self.env_vars = Mock()
+        self.func_config.env_vars = self.env_vars
+        self.env_var_value = {"a": "b"}
+        self.env_vars.resolve.return_value = self.env_var_value
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_invoke_in_warm_container_and_release_it(self, LambdaContainerMock):
+        warm_container = Mock()
+        self.manager_mock.run.return_value = warm_container
+
+        self.runtime.invoke(self.func_config, "event", stdout="stdout", stderr="stderr")
+
+        self.env_vars.add_lambda_event_body.assert_called_with("event")
+        LambdaContainerMock.assert_called_with("runtime", "handler", "code-path", [], self.image_builder,
+                                               memory_mb=128, env_vars=self.env_var_value, warm=True)
+        self.manager_mock.run.assert_called_with(LambdaContainerMock.return_value, warm=True)
+        self.runtime._configure_interrupt.assert_called_with("name", 3, warm_container, False)
+        warm_container.invoke.assert_called_with(env_vars=self.env_var_value, stdout="stdout", stderr="stderr")
+
+        self.timer.cancel.assert_called_with()
+        self.manager_mock.release.assert_called_with(warm_container)
+        self.manager_mock.stop.assert_not_called()
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_stop_container_if_invoke_failed(self, LambdaContainerMock):
+        warm_container = Mock()
+        self.manager_mock.run.return_value = warm_container
+        warm_container.invoke.side_effect = ValueError("failed")
+
+        with self.assertRaises(ValueError):
+            self.runtime.invoke(self.func_config, "event")
+
+        self.manager_mock.stop.assert_called_with(warm_container)
+        self.manager_mock.release.assert_not_called()
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_stop_container_on_keyboard_interrupt(self, LambdaContainerMock):
+        warm_container = Mock()
+        self.manager_mock.run.return_value = warm_container
+        warm_container.invoke.side_effect = KeyboardInterrupt()
+
+        self.runtime.invoke(self.func_config, "event")
+
+        self.manager_mock.stop.assert_called_with(warm_container)
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_send_event_to_runtime_api(self, LambdaContainerMock):
+        LambdaContainerMock.RUNTIME_API_RUNTIMES = {"runtime"}
+        runtime_api = Mock()
+        self.runtime._runtime_api = runtime_api
+        self.env_var_value["AWS_REGION"] = "region"
+        warm_container = Mock()
+        self.manager_mock.run.return_value = warm_container
+
+        self.runtime.invoke(self.func_config, "event", stdout="stdout", stderr="stderr")
+
+        self.env_vars.add_lambda_event_body.assert_not_called()
+        LambdaContainerMock.assert_called_with("runtime", "handler", "code-path", [], self.image_builder,
+                                               memory_mb=128, env_vars=self.env_var_value, runtime_api=runtime_api)
+        warm_container.process_event.assert_called_with("event",
+                                                        "arn:aws:lambda:region:123456789012:function:name",
+                                                        3,
+                                                        stdout="stdout",
+                                                        stderr="stderr")
+        warm_container.invoke.assert_not_called()
+        self.manager_mock.release.assert_called_with(warm_container)
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_not_use_runtime_api_for_unsupported_runtime(self, LambdaContainerMock):
+        LambdaContainerMock.RUNTIME_API_RUNTIMES = {"provided"}
+        self.runtime._runtime_api = Mock()
+        warm_container = Mock()
+        self.manager_mock.run.return_value = warm_container
+
+        self.runtime.invoke(self.func_config, "event")
+
+        self.env_vars.add_lambda_event_body.assert_called_with("event")
+        warm_container.invoke.assert_called_with(env_vars=self.env_var_value, stdout=None, stderr=None)
+        warm_container.process_event.assert_not_called()
+
+    @patch("samcli.local.lambdafn.runtime.LambdaRuntime.invoke")
+    def test_must_not_use_warm_container_when_debugging(self, invoke_mock):
+        debug_context = Mock()
+
+        self.runtime.invoke(self.func_config, "event", debug_context=debug_context, stdout="stdout", stderr="stderr")
+
+        invoke_mock.assert_called_with(self.func_config, "event", debug_context=debug_context, stdout="stdout",
+                                       stderr="stderr")
+        self.manager_mock.run.assert_not_called()
+
+    @patch("samcli.local.lambdafn.runtime.LambdaRuntime.invoke")
+    def test_must_not_use_warm_container_for_archives_without_archive_cache(self, invoke_mock):
+        self.runtime._is_archive = Mock(return_value=True)
+
+        self.runtime.invoke(self.func_config, "event")
+
+        invoke_mock.assert_called_with(self.func_config, "event", debug_context=None, stdout=None, stderr=None)
+        self.runtime._is_archive.assert_called_with("code-path")
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_mount_pinned_archive_in_warm_container(self, LambdaContainerMock):
+        archive_cache = Mock()
+        archive_cache.pin.return_value = "cached-dir"
+        self.runtime._archive_cache = archive_cache
+        self.runtime._is_archive = Mock(return_value=True)
+        warm_container = Mock()
+        self.manager_mock.run.return_value = warm_container
+
+        self.runtime.invoke(self.func_config, "event")
+
+        archive_cache.pin.assert_called_with("code-path")
+        LambdaContainerMock.assert_called_with("runtime", "handler", "cached-dir", [], self.image_builder,
+                                               memory_mb=128, env_vars=self.env_var_value, warm=True)
+        self.manager_mock.run.assert_called_with(LambdaContainerMock.return_value, warm=True)
+        self.manager_mock.release.assert_called_with(warm_container)
+
+
+class LambdaRuntime_invoke_async(TestCase):
+
+    def setUp(self):
+        self.runtime = LambdaRuntime(Mock(), Mock())
+        self.runtime.invoke = Mock(return_value=None)
+        self.func_config = Mock()
+
+    def test_must_invoke_on_thread_pool(self):
+        future = self.runtime.invoke_async(self.func_config, "event", stdout="stdout", stderr="stderr")
+
+        self.assertIsNone(future.result(timeout=10))
+        self.runtime.invoke.assert_called_with(self.func_config, "event", stdout="stdout", stderr="stderr")
+
+    def test_must_return_error_of_invoke(self):
+        self.runtime.invoke.side_effect = ValueError("failed")
+
+        future = self.runtime.invoke_async(self.func_config, "event")
+
+        with self.assertRaises(ValueError):
+            future.result(timeout=10)
+
+    def test_must_invoke_on_calling_thread_when_debugging(self):
+        debug_context = Mock()
+        self.runtime._get_executor = Mock()
+
+        future = self.runtime.invoke_async(self.func_config, "event", debug_context=debug_context)
+
+        self.assertTrue(future.done())
+        self.runtime.invoke.assert_called_with(self.func_config, "event", debug_context=debug_context, stdout=None,
+                                               stderr=None)
+        self.runtime._get_executor.assert_not_called()
+
+
+class WarmLambdaRuntime_invoke_async(TestCase):
+
+    def setUp(self):
+        self.manager_mock = Mock()
+        self.runtime_api = Mock()
+        self.runtime = WarmLambdaRuntime(self.manager_mock, Mock(), runtime_api=self.runtime_api)
+        self.runtime._timeouts = Mock()
+        self.timer = self.runtime._timeouts.call_later.return_value
+
+        self.func_config = FunctionConfig("name", "provided", "handler", "code-path", [])
+        self.func_config.env_vars = Mock()
+        self.func_config.env_vars.resolve.return_value = {"AWS_REGION": "region"}
+
+        self.warm_container = Mock()
+        self.manager_mock.run.return_value = self.warm_container
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_complete_when_runtime_posts_result(self, LambdaContainerMock):
+        LambdaContainerMock.RUNTIME_API_RUNTIMES = {"provided"}
+
+        future = self.runtime.invoke_async(self.func_config, "event", stdout="stdout", stderr="stderr")
+        self._wait_for_submit()
+
+        self.assertFalse(future.done())
+        self.warm_container.submit_event.assert_called_with("event",
+                                                            "arn:aws:lambda:region:123456789012:function:name",
+                                                            3,
+                                                            stdout="stdout",
+                                                            stderr="stderr",
+                                                            callback=ANY)
+        self.runtime._timeouts.call_later.assert_called_with(3, ANY, "name", 3, self.warm_container)
+
+        # Runtime posts the result
+        callback = self.warm_container.submit_event.call_args[1]["callback"]
+        callback(Mock())
+
+        self.assertIsNone(future.result(timeout=10))
+        self.timer.cancel.assert_called_with()
+        self.manager_mock.release.assert_called_with(self.warm_container)
+        self.manager_mock.stop.assert_not_called()
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_stop_container_if_submit_failed(self, LambdaContainerMock):
+        LambdaContainerMock.RUNTIME_API_RUNTIMES = {"provided"}
+        self.warm_container.submit_event.side_effect = ValueError("failed")
+
+        future = self.runtime.invoke_async(self.func_config, "event")
+
+        with self.assertRaises(ValueError):
+            future.result(timeout=10)
+        self.timer.cancel.assert_called_with()
+        self.manager_mock.stop.assert_called_with(self.warm_container)
+        self.manager_mock.release.assert_not_called()
+
+    def test_must_stop_timed_out_container(self):
+        self.runtime._stop_timed_out_container("name", 3, self.warm_container)
+        self.runtime._get_executor().shutdown(wait=True)
+
+        self.manager_mock.stop.assert_called_with(self.warm_container)
+
+    @patch("samcli.local.lambdafn.runtime.LambdaRuntime.invoke_async")
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_hold_thread_for_unsupported_runtime(self, LambdaContainerMock, invoke_async_mock):
+        LambdaContainerMock.RUNTIME_API_RUNTIMES = {"go1.x"}
+
+        result = self.runtime.invoke_async(self.func_config, "event")
+
+        self.assertEquals(result, invoke_async_mock.return_value)
+        invoke_async_mock.assert_called_with(self.func_config, "event", debug_context=None, stdout=None, stderr=None)
+
+    def _wait_for_submit(self):
+        for _ in range(1000):
+            if self.warm_container.submit_event.called:
+                return
+            threading.Event().wait(0.01)
+
+
+class WarmLambdaRuntime_prewarm(TestCase):
+
+    def setUp(self):
+        self.manager_mock = Mock()
+        self.image_builder = Mock()
+        self.runtime = WarmLambdaRuntime(self.manager_mock, self.image_builder)
+
+    def make_config(self, code_path):
+        config = FunctionConfig("name", "runtime", "handler", code_path, [])
+        config.env_vars = Mock()
+        return config
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_start_containers_for_every_function(self, LambdaContainerMock):
+        configs = [self.make_config("code1"), self.make_config("code2")]
+
+        self.runtime.prewarm(configs, 2)
+
+        self.assertEquals(LambdaContainerMock.call_count, 4)
+        LambdaContainerMock.assert_called_with("runtime", "handler", "code2", [], self.image_builder,
+                                               memory_mb=128, env_vars=configs[1].env_vars.resolve.return_value,
+                                               warm=True)
+        configs[0].env_vars.add_lambda_event_body.assert_not_called()
+        self.manager_mock.prewarm.assert_called_with([LambdaContainerMock.return_value] * 4)
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_skip_functions_with_archives_without_archive_cache(self, LambdaContainerMock):
+        self.runtime._is_archive = Mock(side_effect=lambda path: path == "code.zip")
+
+        self.runtime.prewarm([self.make_config("code.zip"), self.make_config("code")], 1)
+
+        LambdaContainerMock.assert_called_once_with("runtime", "handler", "code", [], self.image_builder,
+                                                    memory_mb=128, env_vars=ANY, warm=True)
+        self.manager_mock.prewarm.assert_called_with([LambdaContainerMock.return_value])
+
+    @patch("samcli.local.lambdafn.runtime.LambdaContainer")
+    def test_must_start_containers_for_archives_with_archive_cache(self, LambdaContainerMock):
+        archive_cache = Mock()
+        archive_cache.pin.return_value = "cached-dir"
+        self.runtime._archive_cache = archive_cache
+        self.runtime._is_archive = Mock(side_effect=lambda path: path == "code.zip")
+
+        self.runtime.prewarm([self.make_config("code.zip")], 1)
+
+        archive_cache.pin.assert_called_with("code.zip")
+        LambdaContainerMock.assert_called_once_with("runtime", "handler", "cached-dir", [], self.image_builder,
+                                                    memory_mb=128, env_vars=ANY, warm=True)
+
+
 class TestLambdaRuntime_configure_interrupt(TestCase):
 
     def setUp(self):
@@ -329,6 +616,28 @@ class TestLambdaRuntime_get_code_dir(TestCase):
         # Because we never unzipped anything, we should never delete
         shutil_mock.rmtree.assert_not_called()
 
+    @patch("samcli.local.lambdafn.runtime.os")
+    @patch("samcli.local.lambdafn.runtime.shutil")
+    @patch("samcli.local.lambdafn.runtime._unzip_file")
+    def test_must_use_archive_cache(self, unzip_file_mock, shutil_mock, os_mock):
+        code_path = "foo.zip"
+        os_mock.path.isfile.return_value = True
+
+        archive_cache_mock = MagicMock()
+        archive_cache_mock.extracted.return_value.__enter__.return_value = "cached-dir"
+        runtime = LambdaRuntime(self.manager_mock, self.layer_downloader, archive_cache=archive_cache_mock)
+
+        with runtime._get_code_dir(code_path) as result:
+            self.assertEquals(result, "cached-dir")
+            archive_cache_mock.extracted.return_value.__exit__.assert_not_called()
+
+        archive_cache_mock.extracted.assert_called_with(code_path)
+        archive_cache_mock.extracted.return_value.__exit__.assert_called_once()
+
+        # Cached directory must be kept for later invokes
+        unzip_file_mock.assert_not_called()
+        shutil_mock.rmtree.assert_not_called()
+
 
 class TestUnzipFile(TestCase):
 
@@ -9,7 +9,7 @@ from mock import Mock, patch
 
 from nose_parameterized import parameterized, param
 
-from samcli.local.lambdafn.zip import unzip, unzip_from_uri, _override_permissions
+from samcli.local.lambdafn.zip import unzip, unzip_from_uri, _override_permissions, _unzip_bytes, _partition
 
 
 class TestUnzipWithPermissions(TestCase):
@@ -81,6 +81,7 @@ class TestUnzipWithPermissions(TestCase):
 
 class TestUnzipFromUri(TestCase):
 
+    @patch('samcli.local.lambdafn.zip.MAX_IN_MEMORY_ZIP_SIZE', 100)
     @patch('samcli.local.lambdafn.zip.unzip')
     @patch('samcli.local.lambdafn.zip.Path')
     @patch('samcli.local.lambdafn.zip.progressbar')
@@ -113,6 +114,7 @@ class TestUnzipFromUri(TestCase):
         path_mock.unlink.assert_called()
         unzip_patch.assert_called_with('layer_zip_path', 'output_zip_dir', permission=0o700)
 
+    @patch('samcli.local.lambdafn.zip.MAX_IN_MEMORY_ZIP_SIZE', 100)
     @patch('samcli.local.lambdafn.zip.unzip')
     @patch('samcli.local.lambdafn.zip.Path')
     @patch('samcli.local.lambdafn.zip.progressbar')
@@ -150,6 +152,100 @@ class TestUnzipFromUri(TestCase):
         path_mock.unlink.assert_not_called()
         unzip_patch.assert_called_with('layer_zip_path', 'output_zip_dir', permission=0o700)
 
+    @patch('samcli.local.lambdafn.zip._unzip_bytes')
+    @patch('samcli.local.lambdafn.zip.unzip')
+    @patch('samcli.local.lambdafn.zip.Path')
+    @patch('samcli.local.lambdafn.zip.progressbar')
+    @patch('samcli.local.lambdafn.zip.requests')
+    @patch('samcli.local.lambdafn.zip.open')
+    def test_must_unzip_small_zip_from_memory(self,
+                                              open_patch,
+                                              requests_patch,
+                                              progressbar_patch,
+                                              path_patch,
+                                              unzip_patch,
+                                              unzip_bytes_patch):
+        get_request_mock = Mock()
+        get_request_mock.headers = {"Content-length": "10"}
+        get_request_mock.iter_content.return_value = [b'data1', b'data2']
+        requests_patch.get.return_value = get_request_mock
+
+        path_patch.return_value.exists.return_value = False
+
+        unzip_from_uri('uri', 'layer_zip_path', 'output_zip_dir', 'layer_arn')
+
+        open_patch.assert_not_called()
+        unzip_patch.assert_not_called()
+        unzip_bytes_patch.assert_called_with(b'data1data2', 'output_zip_dir', permission=0o700)
+
+
+class TestParallelUnzip(TestCase):
+
+    def setUp(self):
+        self.work_dir = mkdtemp()
+        self.output_dir = os.path.join(self.work_dir, "output")
+        self.zip_path = os.path.join(self.work_dir, "code.zip")
+
+        self.files = {"dir{}/file{}.txt".format(i % 7, i): "content {}".format(i) * i for i in range(200)}
+
+        with zipfile.ZipFile(self.zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(zipfile.ZipInfo("empty/"), b'')
+            for name, content in self.files.items():
+                zf.writestr(name, content)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    @parameterized.expand([param(1), param(4), param(None)])
+    def test_must_extract_all_files(self, workers):
+        unzip(self.zip_path, self.output_dir, workers=workers)
+
+        self._assert_extracted()
+
+    def test_must_extract_from_bytes(self):
+        with open(self.zip_path, "rb") as fp:
+            _unzip_bytes(fp.read(), self.output_dir, permission=0o700)
+
+        self._assert_extracted()
+        self.assertEquals(stat.S_IMODE(os.stat(self.output_dir).st_mode), 0o700)
+
+    def test_must_not_extract_outside_of_output_dir(self):
+        with zipfile.ZipFile(self.zip_path, "w") as zf:
+            zf.writestr("../../outside.txt", "x")
+            zf.writestr("/absolute.txt", "y")
+
+        unzip(self.zip_path, self.output_dir)
+
+        self.assertEquals(sorted(os.listdir(self.output_dir)), ["absolute.txt", "outside.txt"])
+        self.assertFalse(os.path.exists(os.path.join(self.work_dir, "outside.txt")))
+
+    def _assert_extracted(self):
+        self.assertTrue(os.path.isdir(os.path.join(self.output_dir, "empty")))
+        for name, content in self.files.items():
+            with open(os.path.join(self.output_dir, name)) as fp:
+                self.assertEquals(fp.read(), content)
+
+
+class TestPartition(TestCase):
+
+    def test_must_balance_uncompressed_size(self):
+        files = []
+        for size in [100, 50, 40, 10]:
+            file_info = zipfile.ZipInfo(str(size))
+            file_info.file_size = size
+            files.append((file_info, "path"))
+
+        partitions = _partition(files, 2)
+
+        self.assertEquals(sorted(sum(member[0].file_size for member in partition) for partition in partitions),
+                          [100, 100])
+
+    def test_must_skip_empty_partitions(self):
+        file_info = zipfile.ZipInfo("a")
+        file_info.file_size = 1
+
+        self.assertEquals(_partition([(file_info, "path")], 4), [[(file_info, "path")]])
+
 
 class TestOverridePermissions(TestCase):
 
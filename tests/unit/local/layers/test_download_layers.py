@@ -1,10 +1,28 @@
+import io
+import os
+import base64
+import hashlib
+import time
+import shutil
+import zipfile
+import threading
 from unittest import TestCase
-from mock import patch, Mock, call
+from tempfile import mkdtemp
+from mock import patch, Mock, call, ANY
 
 from botocore.exceptions import NoCredentialsError, ClientError
+from flask import Flask, Response, jsonify
+from werkzeug.serving import make_server
 
 from samcli.local.layers.layer_downloader import LayerDownloader
-from samcli.commands.local.cli_common.user_exceptions import CredentialsRequired, ResourceNotFound
+from samcli.commands.local.lib.provider import LayerVersion
+from samcli.commands.local.cli_common.user_exceptions import CredentialsRequired, ResourceNotFound, \
+    InvalidLayerContent
+
+try:
+    from pathlib import Path
+except ImportError:
+    from pathlib2 import Path
 
 
 class TestDownloadLayers(TestCase):
@@ -80,14 +98,22 @@ class TestDownloadLayers(TestCase):
         resolve_code_path_patch.assert_called_once_with(".", "/some/custom/path")
 
     @patch("samcli.local.layers.layer_downloader.unzip_from_uri")
-    @patch("samcli.local.layers.layer_downloader.LayerDownloader._fetch_layer_uri")
-    @patch("samcli.local.layers.layer_downloader.LayerDownloader._create_cache")
-    @patch("samcli.local.layers.layer_downloader.LayerDownloader._is_layer_cached")
-    def test_download_layer(self, is_layer_cached_patch, create_cache_patch,
-                            fetch_layer_uri_patch, unzip_from_uri_patch):
-        is_layer_cached_patch.return_value = False
+    @patch("samcli.local.layers.layer_downloader.LayerDownloader._fetch_layer_content")
+    def test_download_layer(self, fetch_layer_content_patch, unzip_from_uri_patch):
+        cache_dir = mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
 
-        download_layers = LayerDownloader("/home", ".")
+        def fake_unzip(uri, layer_zip_path, unzip_output_dir, progressbar_label, progress_callback):
+            self.assertEquals(layer_zip_path, unzip_output_dir + ".zip")
+            self.assertEquals(os.path.dirname(unzip_output_dir), cache_dir)
+            with open(os.path.join(unzip_output_dir, "file"), "w") as fp:
+                fp.write("content")
+            return "sha256"
+
+        unzip_from_uri_patch.side_effect = fake_unzip
+        fetch_layer_content_patch.return_value = {"Location": "layer/uri", "CodeSha256": "sha256", "CodeSize": 10}
+
+        download_layers = LayerDownloader(cache_dir, ".", Mock())
 
         layer_mock = Mock()
         layer_mock.is_defined_within_template = False
@@ -95,34 +121,51 @@ class TestDownloadLayers(TestCase):
         layer_mock.arn = "arn:layer:layer1:1"
         layer_mock.layer_arn = "arn:layer:layer1"
 
-        fetch_layer_uri_patch.return_value = "layer/uri"
-
         actual = download_layers.download(layer_mock)
 
-        self.assertEquals(actual.codeuri, "/home/layer1")
-
-        create_cache_patch.assert_called_once_with("/home")
-        fetch_layer_uri_patch.assert_called_once_with(layer_mock)
+        self.assertEquals(actual.codeuri, os.path.join(os.path.realpath(cache_dir), "layer1"))
+        self.assertEquals(os.listdir(actual.codeuri), ["file"])
+        fetch_layer_content_patch.assert_called_once_with(layer_mock)
         unzip_from_uri_patch.assert_called_once_with("layer/uri",
-                                                     '/home/layer1.zip',
-                                                     unzip_output_dir='/home/layer1',
-                                                     progressbar_label="Downloading arn:layer:layer1")
+                                                     ANY,
+                                                     unzip_output_dir=ANY,
+                                                     progressbar_label="Downloading arn:layer:layer1",
+                                                     progress_callback=None)
+        self.assertTrue(download_layers._is_layer_cached(Path(actual.codeuri)))
+
+    @patch("samcli.local.layers.layer_downloader.unzip_from_uri")
+    @patch("samcli.local.layers.layer_downloader.LayerDownloader._fetch_layer_content")
+    def test_must_not_cache_layer_with_wrong_sha256(self, fetch_layer_content_patch, unzip_from_uri_patch):
+        cache_dir = mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+
+        unzip_from_uri_patch.return_value = "corrupted"
+        fetch_layer_content_patch.return_value = {"Location": "layer/uri", "CodeSha256": "sha256"}
+
+        download_layers = LayerDownloader(cache_dir, ".", Mock())
+        layer = LayerVersion("arn:aws:lambda:us-west-2:123456789012:layer:layer1:1", None)
+
+        with self.assertRaises(InvalidLayerContent):
+            download_layers.download(layer)
+
+        self.assertFalse(download_layers._is_layer_cached(Path(layer.codeuri)))
+        self.assertEquals(os.listdir(cache_dir), [])
 
     def test_layer_is_cached(self):
-        download_layers = LayerDownloader("/", ".")
+        download_layers = LayerDownloader("/", ".", Mock())
+        download_layers._cache_index = Mock()
+        download_layers._cache_index.is_cached.return_value = True
 
-        layer_path = Mock()
-        layer_path.exists.return_value = True
+        self.assertTrue(download_layers._is_layer_cached(Path("/cache/layer1")))
 
-        self.assertTrue(download_layers._is_layer_cached(layer_path))
+        download_layers._cache_index.is_cached.assert_called_once_with("layer1")
 
     def test_layer_is_not_cached(self):
-        download_layers = LayerDownloader("/", ".")
+        download_layers = LayerDownloader("/", ".", Mock())
+        download_layers._cache_index = Mock()
+        download_layers._cache_index.is_cached.return_value = False
 
-        layer_path = Mock()
-        layer_path.exists.return_value = False
-
-        self.assertFalse(download_layers._is_layer_cached(layer_path))
+        self.assertFalse(download_layers._is_layer_cached(Path("/cache/layer1")))
 
     @patch("samcli.local.layers.layer_downloader.Path")
     def test_create_cache(self, path_patch):
@@ -199,3 +242,112 @@ class TestLayerDownloader_fetch_layer_uri(TestCase):
 
         with self.assertRaises(ClientError):
             download_layers._fetch_layer_uri(layer=layer)
+
+
+class TestLayerDownloader_download_all_concurrently(TestCase):
+
+    @patch("samcli.local.layers.layer_downloader.LayerDownloader.download")
+    def test_must_return_layers_in_order(self, download_patch):
+        download_patch.side_effect = lambda layer, force, progress_callback: "/home/" + layer.name
+        layers = [Mock(layer_arn="arn{}".format(i)) for i in range(6)]
+        for i, layer in enumerate(layers):
+            layer.name = "layer{}".format(i)
+
+        download_layers = LayerDownloader("/home", ".", Mock(), max_concurrent_downloads=3)
+
+        actual_results = download_layers.download_all(layers, force=True)
+
+        self.assertEquals(actual_results, ["/home/layer{}".format(i) for i in range(6)])
+        for layer in layers:
+            download_patch.assert_any_call(layer, True, progress_callback=ANY)
+
+    @patch("samcli.local.layers.layer_downloader.unzip_from_uri")
+    def test_must_download_layer_once_for_concurrent_requests(self, unzip_from_uri_patch):
+        cache_dir = mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        release_download = threading.Event()
+
+        def fake_unzip(uri, layer_zip_path, unzip_output_dir, progressbar_label, progress_callback):
+            release_download.wait()
+            os.makedirs(unzip_output_dir)
+
+        unzip_from_uri_patch.side_effect = fake_unzip
+
+        lambda_client_mock = Mock()
+        lambda_client_mock.get_layer_version.return_value = {"Content": {"Location": "layer/uri"}}
+        download_layers = LayerDownloader(cache_dir, ".", lambda_client_mock, max_concurrent_downloads=4)
+
+        layers = [LayerVersion("arn:aws:lambda:us-west-2:123456789012:layer:layer1:1", None) for _ in range(4)]
+        threads = [threading.Thread(target=download_layers.download, args=(layer,)) for layer in layers]
+        for thread in threads:
+            thread.start()
+
+        time.sleep(0.1)
+        release_download.set()
+        for thread in threads:
+            thread.join()
+
+        unzip_from_uri_patch.assert_called_once()
+        lambda_client_mock.get_layer_version.assert_called_once()
+        for layer in layers:
+            self.assertEquals(layer.codeuri, os.path.join(os.path.realpath(cache_dir), layer.name))
+
+
+class TestLayerDownloader_with_fake_lambda_endpoint(TestCase):
+
+    def setUp(self):
+        self.cache_dir = mkdtemp()
+        self.layer_zips = {}
+
+        app = Flask(__name__)
+
+        @app.route("/2018-10-31/layers/<path:layer_name>/versions/<int:version>")
+        def get_layer_version(layer_name, version):  # pylint: disable=unused-variable
+            name = layer_name.split(":")[-1]
+            return jsonify({"Content": {"Location": "{}/zips/{}".format(self.url, name),
+                                        "CodeSha256": base64.b64encode(hashlib.sha256(self.layer_zips[name]).digest())
+                                                            .decode("utf-8"),
+                                        "CodeSize": len(self.layer_zips[name])}})
+
+        @app.route("/zips/<name>")
+        def get_layer_zip(name):  # pylint: disable=unused-variable
+            return Response(self.layer_zips[name], mimetype="application/zip")
+
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.url = "http://127.0.0.1:{}".format(self.server.server_port)
+
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        shutil.rmtree(self.cache_dir)
+
+    @patch.dict(os.environ, {"AWS_ACCESS_KEY_ID": "fake",
+                             "AWS_SECRET_ACCESS_KEY": "fake",
+                             "AWS_DEFAULT_REGION": "us-west-2"})
+    def test_must_download_all_layers(self):
+        layers = []
+        for i in range(5):
+            name = "layer{}".format(i)
+            self.layer_zips[name] = self._create_zip({"python/{}.py".format(name): "content"})
+            layers.append(LayerVersion("arn:aws:lambda:us-west-2:123456789012:layer:{}:1".format(name), None))
+
+        download_layers = LayerDownloader(self.cache_dir, ".", max_concurrent_downloads=3,
+                                          lambda_endpoint_url=self.url)
+
+        actual_results = download_layers.download_all(layers)
+
+        self.assertEquals(actual_results, layers)
+        for i, layer in enumerate(layers):
+            self.assertTrue(os.path.isfile(os.path.join(layer.codeuri, "python", "layer{}.py".format(i))))
+
+    @staticmethod
+    def _create_zip(files):
+        data = io.BytesIO()
+        with zipfile.ZipFile(data, "w") as zf:
+            for name, content in files.items():
+                zf.writestr(name, content)
+
+        return data.getvalue()
@@ -0,0 +1,183 @@
+import os
+import shutil
+from unittest import TestCase
+from tempfile import mkdtemp
+
+from mock import patch
+
+from samcli.local.layers.layer_cache_index import LayerCacheIndex
+
+
+class TestLayerCacheIndex(TestCase):
+
+    def setUp(self):
+        self.cache_dir = mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_must_add_layer(self):
+        index = LayerCacheIndex(self.cache_dir)
+
+        self._add_layer(index, "layer1", 10)
+
+        self.assertTrue(index.is_cached("layer1"))
+        self.assertEquals(index.get_metadata("layer1"), {"code_sha256": "sha", "size": 10})
+        self.assertEquals(sorted(os.listdir(self.cache_dir)), ["layer1", "layer1.metadata.json"])
+
+    @patch("samcli.local.layers.layer_cache_index.os.makedirs")
+    def test_must_create_temp_dir_when_cache_dir_is_created_concurrently(self, makedirs_mock):
+        makedirs_mock.side_effect = OSError(17, "File exists")
+        index = LayerCacheIndex(self.cache_dir)
+
+        temp_dir = index.create_temp_dir("layer1")
+
+        self.assertTrue(os.path.isdir(temp_dir))
+
+    @patch("samcli.local.layers.layer_cache_index.os.makedirs")
+    def test_must_raise_when_cache_dir_cannot_be_created(self, makedirs_mock):
+        makedirs_mock.side_effect = OSError(13, "Permission denied")
+        index = LayerCacheIndex(self.cache_dir)
+
+        with self.assertRaises(OSError):
+            index.create_temp_dir("layer1")
+
+    def test_must_replace_cached_layer(self):
+        index = LayerCacheIndex(self.cache_dir)
+        self._add_layer(index, "layer1", 10)
+
+        self._add_layer(index, "layer1", 20)
+
+        self.assertEquals(index.get_metadata("layer1")["size"], 20)
+        self.assertEquals(os.listdir(os.path.join(self.cache_dir, "layer1")), ["file"])
+
+    def test_incomplete_layer_is_not_cached(self):
+        self._make_incomplete_layer("partial")
+        index = LayerCacheIndex(self.cache_dir)
+
+        self.assertFalse(index.is_cached("partial"))
+        self.assertIsNone(index.get_metadata("partial"))
+
+    def test_must_adopt_layer_cached_by_earlier_version(self):
+        layer_dir = os.path.join(self.cache_dir, "layer1")
+        os.makedirs(layer_dir)
+        with open(os.path.join(layer_dir, "file"), "wb") as fp:
+            fp.write(b"x" * 10)
+        index = LayerCacheIndex(self.cache_dir)
+
+        self.assertTrue(index.is_cached("layer1"))
+        self.assertEquals(index.get_metadata("layer1"), {"size": 10})
+        self.assertEquals(sorted(os.listdir(self.cache_dir)), ["layer1", "layer1.metadata.json"])
+
+    def test_missing_layer_is_not_cached(self):
+        index = LayerCacheIndex(self.cache_dir)
+
+        self.assertFalse(index.is_cached("layer1"))
+        self.assertEquals(os.listdir(self.cache_dir), [])
+
+    def test_must_delete_incomplete_layers(self):
+        self._make_incomplete_layer("partial", mtime=1)
+        self._make_incomplete_layer("recent")
+        index = LayerCacheIndex(self.cache_dir)
+        self._add_layer(index, "layer1", 10)
+
+        index.evict()
+
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "partial")))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "partial.incomplete")))
+        # May still be added by another process
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, "recent")))
+        self.assertTrue(index.is_cached("layer1"))
+
+    def test_must_delete_stale_temp_dirs_and_archives(self):
+        index = LayerCacheIndex(self.cache_dir)
+        stale_dir = index.create_temp_dir("layer1")
+        stale_zip = stale_dir + ".zip"
+        with open(stale_zip, "w"):
+            pass
+        os.utime(stale_dir, (1, 1))
+        os.utime(stale_zip, (1, 1))
+        recent_dir = index.create_temp_dir("layer2")
+        recent_zip = recent_dir + ".zip"
+        with open(recent_zip, "w"):
+            pass
+
+        index.evict()
+
+        self.assertFalse(os.path.exists(stale_dir))
+        self.assertFalse(os.path.exists(stale_zip))
+        # May still be in use by another process
+        self.assertTrue(os.path.isdir(recent_dir))
+        self.assertTrue(os.path.isfile(recent_zip))
+
+    def test_must_not_delete_directories_that_are_not_layers(self):
+        other_dir = os.path.join(self.cache_dir, "other")
+        os.makedirs(other_dir)
+        os.utime(other_dir, (1, 1))
+        index = LayerCacheIndex(self.cache_dir)
+
+        index.evict()
+
+        self.assertTrue(os.path.exists(other_dir))
+        self.assertEquals(index.stats()["incomplete"], 0)
+
+    def test_must_evict_least_recently_used_layers(self):
+        writer = LayerCacheIndex(self.cache_dir)
+        for i, name in enumerate(["layer1", "layer2", "layer3"]):
+            self._add_layer(writer, name, 400 * 1024)
+            os.utime(os.path.join(self.cache_dir, name), (i, i))
+
+        index = LayerCacheIndex(self.cache_dir, max_size_mb=1)
+        index.evict()
+
+        self.assertFalse(index.is_cached("layer1"))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "layer1")))
+        self.assertTrue(index.is_cached("layer2"))
+        self.assertTrue(index.is_cached("layer3"))
+
+    def test_must_not_evict_layers_in_use(self):
+        writer = LayerCacheIndex(self.cache_dir)
+        for i, name in enumerate(["layer1", "layer2", "layer3"]):
+            self._add_layer(writer, name, 400 * 1024)
+            os.utime(os.path.join(self.cache_dir, name), (i, i))
+
+        index = LayerCacheIndex(self.cache_dir, max_size_mb=1)
+        index.mark_used("layer1")
+        index.evict()
+
+        self.assertTrue(index.is_cached("layer1"))
+        self.assertFalse(index.is_cached("layer2"))
+        self.assertTrue(index.is_cached("layer3"))
+
+    def test_must_not_evict_without_limit(self):
+        index = LayerCacheIndex(self.cache_dir, max_size_mb=None)
+        self._add_layer(index, "layer1", 2 * 1024 * 1024)
+
+        index.evict()
+
+        self.assertTrue(index.is_cached("layer1"))
+
+    def test_must_return_stats(self):
+        self._make_incomplete_layer("partial")
+        os.makedirs(os.path.join(self.cache_dir, "other"))
+        index = LayerCacheIndex(self.cache_dir, max_size_mb=1)
+        self._add_layer(index, "layer1", 10)
+        self._add_layer(index, "layer2", 20)
+        index.create_temp_dir("layer3")
+
+        self.assertEquals(index.stats(), {"entries": 2, "incomplete": 1, "size": 30, "max_size": 1024 * 1024})
+
+    def _add_layer(self, index, name, size):
+        temp_dir = index.create_temp_dir(name)
+        with open(os.path.join(temp_dir, "file"), "wb") as fp:
+            fp.write(b"x" * size)
+
+        index.add(name, temp_dir, {"code_sha256": "sha"})
+
+    def _make_incomplete_layer(self, name, mtime=None):
+        os.makedirs(os.path.join(self.cache_dir, name))
+        incomplete_path = os.path.join(self.cache_dir, name + ".incomplete")
+        with open(incomplete_path, "w"):
+            pass
+        if mtime is not None:
+            os.utime(incomplete_path, (mtime, mtime))
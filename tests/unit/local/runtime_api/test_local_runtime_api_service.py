@@ -0,0 +1,234 @@
+import json
+import threading
+
+from unittest import TestCase
+from mock import Mock, patch
+
+from samcli.local.runtime_api.local_runtime_api_service import LocalRuntimeApiService, RuntimeApiInvocation
+
+
+class TestRuntimeApiInvocation(TestCase):
+
+    @patch("samcli.local.runtime_api.local_runtime_api_service.time")
+    def test_must_compute_deadline(self, time_mock):
+        time_mock.time.return_value = 100
+
+        invocation = RuntimeApiInvocation("event", "arn", 3)
+
+        self.assertEquals(invocation.deadline_ms, 103000)
+
+    def test_must_wait_until_complete(self):
+        invocation = RuntimeApiInvocation("event", "arn", 3)
+
+        self.assertFalse(invocation.wait(0))
+        invocation.complete(b"response")
+
+        self.assertTrue(invocation.wait(0))
+        self.assertEquals(invocation.response, b"response")
+
+    def test_must_wait_until_failed(self):
+        invocation = RuntimeApiInvocation("event", "arn", 3)
+
+        invocation.fail({"errorMessage": "message"})
+
+        self.assertTrue(invocation.wait(0))
+        self.assertEquals(invocation.error, {"errorMessage": "message"})
+
+    def test_must_call_callbacks_once_done(self):
+        invocation = RuntimeApiInvocation("event", "arn", 3)
+        callback = Mock()
+        invocation.add_done_callback(callback)
+
+        callback.assert_not_called()
+        invocation.complete(b"response")
+        invocation.fail({"errorMessage": "message"})
+
+        callback.assert_called_once_with(invocation)
+        self.assertEquals(invocation.response, b"response")
+        self.assertIsNone(invocation.error)
+
+    def test_must_call_callback_right_away_when_done(self):
+        invocation = RuntimeApiInvocation("event", "arn", 3)
+        invocation.fail({"errorMessage": "message"})
+        callback = Mock()
+
+        invocation.add_done_callback(callback)
+
+        callback.assert_called_once_with(invocation)
+
+
+class TestLocalRuntimeApiService(TestCase):
+
+    def setUp(self):
+        self.service = LocalRuntimeApiService("host", port=1234)
+        self.service.create()
+        self.service.open_channel("channel")
+        self.client = self.service._app.test_client()
+
+    def test_must_use_host_as_container_host_by_default(self):
+        self.assertEquals(self.service.get_address("channel"), "host:1234/channel")
+
+    def test_must_use_container_host(self):
+        service = LocalRuntimeApiService("host", port=1234, container_host="container-host")
+
+        self.assertEquals(service.get_address("channel"), "container-host:1234/channel")
+
+    def test_must_return_next_event_with_headers(self):
+        invocation = self.service.submit("channel", "event", "arn", 3)
+
+        response = self.client.get("/channel/2018-06-01/runtime/invocation/next")
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(response.get_data(), b"event")
+        self.assertEquals(response.headers["Lambda-Runtime-Aws-Request-Id"], invocation.request_id)
+        self.assertEquals(response.headers["Lambda-Runtime-Deadline-Ms"], str(invocation.deadline_ms))
+        self.assertEquals(response.headers["Lambda-Runtime-Invoked-Function-Arn"], "arn")
+
+    def test_must_only_return_events_of_channel(self):
+        self.service.open_channel("channel1")
+        self.service.open_channel("channel2")
+        self.service.submit("channel1", "event1", "arn", 3)
+        self.service.submit("channel2", "event2", "arn", 3)
+
+        response = self.client.get("/channel2/2018-06-01/runtime/invocation/next")
+
+        self.assertEquals(response.get_data(), b"event2")
+
+    def test_must_complete_invocation_with_response(self):
+        invocation = self.service.submit("channel", "event", "arn", 3)
+        self.client.get("/channel/2018-06-01/runtime/invocation/next")
+
+        response = self.client.post("/channel/2018-06-01/runtime/invocation/{}/response".format(invocation.request_id),
+                                    data=b"result")
+
+        self.assertEquals(response.status_code, 202)
+        self.assertTrue(invocation.wait(0))
+        self.assertEquals(invocation.response, b"result")
+
+    def test_must_fail_invocation_with_error(self):
+        invocation = self.service.submit("channel", "event", "arn", 3)
+        self.client.get("/channel/2018-06-01/runtime/invocation/next")
+
+        response = self.client.post("/channel/2018-06-01/runtime/invocation/{}/error".format(invocation.request_id),
+                                    data=json.dumps({"errorMessage": "message", "errorType": "type"}))
+
+        self.assertEquals(response.status_code, 202)
+        self.assertEquals(invocation.error, {"errorMessage": "message", "errorType": "type", "stackTrace": []})
+
+    def test_must_accept_error_that_is_not_json(self):
+        invocation = self.service.submit("channel", "event", "arn", 3)
+        self.client.get("/channel/2018-06-01/runtime/invocation/next")
+
+        self.client.post("/channel/2018-06-01/runtime/invocation/{}/error".format(invocation.request_id),
+                         data=b"message",
+                         headers={"Lambda-Runtime-Function-Error-Type": "type"})
+
+        self.assertEquals(invocation.error, {"errorMessage": "message", "errorType": "type", "stackTrace": []})
+
+    def test_must_reject_result_for_unknown_request(self):
+        response = self.client.post("/channel/2018-06-01/runtime/invocation/unknown/response", data=b"result")
+
+        self.assertEquals(response.status_code, 400)
+
+    def test_must_fail_queued_invocations_on_init_error(self):
+        invocation = self.service.submit("channel", "event", "arn", 3)
+
+        response = self.client.post("/channel/2018-06-01/runtime/init/error",
+                                    data=json.dumps({"errorMessage": "message", "errorType": "type"}))
+
+        self.assertEquals(response.status_code, 202)
+        self.assertEquals(invocation.error["errorMessage"], "message")
+
+    def test_must_fail_invocations_when_channel_is_closed(self):
+        queued = self.service.submit("channel", "event1", "arn", 3)
+        in_flight = self.service.submit("channel", "event2", "arn", 3)
+        self.client.get("/channel/2018-06-01/runtime/invocation/next")
+
+        self.service.close_channel("channel")
+
+        self.assertEquals(queued.error["errorType"], "ContainerStopped")
+        self.assertEquals(in_flight.error["errorType"], "ContainerStopped")
+
+    def test_must_wake_up_runtime_waiting_on_closed_channel(self):
+        responses = []
+        poller = threading.Thread(target=lambda: responses.append(
+            self.client.get("/channel/2018-06-01/runtime/invocation/next")))
+        poller.start()
+
+        self.service.close_channel("channel")
+        poller.join(5)
+
+        self.assertEquals(responses[0].status_code, 410)
+
+    @patch.object(LocalRuntimeApiService, "_NEXT_INVOCATION_POLL_INTERVAL", 0.01)
+    def test_must_stop_waiting_when_channel_is_closed_without_waking_up(self):
+        responses = []
+        poller = threading.Thread(target=lambda: responses.append(
+            self.client.get("/channel/2018-06-01/runtime/invocation/next")))
+        poller.start()
+
+        # Closed without the event that wakes up the runtime, which must notice on its own
+        self.service._channels["channel"].closed = True
+        poller.join(5)
+
+        self.assertFalse(poller.is_alive())
+        self.assertEquals(responses[0].status_code, 410)
+
+    def test_must_turn_away_runtime_polling_closed_channel(self):
+        self.service.close_channel("channel")
+
+        response = self.client.get("/channel/2018-06-01/runtime/invocation/next")
+
+        self.assertEquals(response.status_code, 410)
+        self.assertNotIn("channel", self.service._channels)
+
+    def test_must_turn_away_runtime_polling_unknown_channel(self):
+        response = self.client.get("/unknown/2018-06-01/runtime/invocation/next")
+
+        self.assertEquals(response.status_code, 410)
+        self.assertNotIn("unknown", self.service._channels)
+
+    def test_must_fail_invocation_submitted_to_closed_channel(self):
+        self.service.close_channel("channel")
+
+        invocation = self.service.submit("channel", "event", "arn", 3)
+
+        self.assertTrue(invocation.wait(0))
+        self.assertEquals(invocation.error["errorType"], "ContainerStopped")
+        self.assertNotIn("channel", self.service._channels)
+
+
+class TestLocalRuntimeApiService_start(TestCase):
+
+    def test_must_fail_if_not_created(self):
+        service = LocalRuntimeApiService("host")
+
+        with self.assertRaises(RuntimeError):
+            service.start()
+
+    @patch("samcli.local.runtime_api.local_runtime_api_service.threading")
+    @patch("samcli.local.runtime_api.local_runtime_api_service.make_server")
+    def test_must_serve_in_background_on_free_port(self, make_server_mock, threading_mock):
+        service = LocalRuntimeApiService("host")
+        service._app = Mock()
+        make_server_mock.return_value.server_port = 4567
+
+        service.start()
+
+        make_server_mock.assert_called_with("host", 0, service._app, threaded=True)
+        self.assertEquals(service.port, 4567)
+        threading_mock.Thread.assert_called_with(target=make_server_mock.return_value.serve_forever)
+        self.assertTrue(threading_mock.Thread.return_value.daemon)
+        threading_mock.Thread.return_value.start.assert_called_with()
+
+    def test_must_close_channels_and_shutdown_server_on_stop(self):
+        service = LocalRuntimeApiService("host")
+        server_mock = Mock()
+        service._server = server_mock
+        service.open_channel("channel")
+        invocation = service.submit("channel", "event", "arn", 3)
+
+        service.stop()
+
+        self.assertTrue(invocation.wait(0))
+        server_mock.shutdown.assert_called_with()
@@ -1,9 +1,12 @@
+import io
 from unittest import TestCase
 from mock import Mock, patch
 
 from parameterized import parameterized, param
+from werkzeug.datastructures import Headers
 
-from samcli.local.services.base_local_service import BaseLocalService, LambdaOutputParser, CaseInsensitiveDict
+from samcli.local.services.base_local_service import BaseLocalService, LambdaOutputParser, LambdaOutputStream, \
+    CaseInsensitiveDict
 
 
 class TestLocalHostRunner(TestCase):
@@ -15,17 +18,30 @@ class TestLocalHostRunner(TestCase):
         with self.assertRaises(RuntimeError):
             service.run()
 
-    def test_run_starts_service_multithreaded(self):
+    def test_run_starts_pooled_server(self):
         is_debugging = False  # multithreaded
         service = BaseLocalService(is_debugging=is_debugging, port=3000, host='127.0.0.1')
 
         service._app = Mock()
-        app_run_mock = Mock()
-        service._app.run = app_run_mock
+        service.server_class = Mock()
+
+        service.run()
+
+        service.server_class.assert_called_once_with('127.0.0.1', 3000, service._app)
+        service.server_class.return_value.serve_forever.assert_called_once_with()
+        service._app.run.assert_not_called()
+
+    def test_run_passes_server_options(self):
+        service = BaseLocalService(is_debugging=False, port=3000, host='127.0.0.1', max_workers=4,
+                                   max_queued_requests=10)
+
+        service._app = Mock()
+        service.server_class = Mock()
 
         service.run()
 
-        app_run_mock.assert_called_once_with(threaded=True, host='127.0.0.1', port=3000)
+        service.server_class.assert_called_once_with('127.0.0.1', 3000, service._app, max_workers=4,
+                                                     max_queued_requests=10)
 
     def test_run_starts_service_singlethreaded(self):
         is_debugging = True  # singlethreaded
@@ -34,10 +50,12 @@ class TestLocalHostRunner(TestCase):
         service._app = Mock()
         app_run_mock = Mock()
         service._app.run = app_run_mock
+        service.server_class = Mock()
 
         service.run()
 
         app_run_mock.assert_called_once_with(threaded=False, host='127.0.0.1', port=3000)
+        service.server_class.assert_not_called()
 
     @patch('samcli.local.services.base_local_service.Response')
     def test_service_response(self, flask_response_patch):
@@ -64,6 +82,90 @@ class TestLocalHostRunner(TestCase):
             service.create()
 
 
+class TestLambdaOutputStream(TestCase):
+
+    @parameterized.expand([
+        param(
+            "with both logs and response",
+            b'this\nis\nlog\ndata\n{"a": "b"}', b'this\nis\nlog\ndata\n', '{"a": "b"}'
+        ),
+        param(
+            "with response as string",
+            b"logs\nresponse", b"logs\n", "response"
+        ),
+        param(
+            "with response only",
+            b'{"a": "b"}', b'', '{"a": "b"}'
+        ),
+        param(
+            "with one new line and response",
+            b'\n{"a": "b"}', b'\n', '{"a": "b"}'
+        ),
+        param(
+            "with whitespaces",
+            b'log\ndata\n{"a": "b"}  \n\n\n', b"log\ndata\n", '{"a": "b"}'
+        ),
+        param(
+            "with empty data",
+            b'', b'', ''
+        ),
+        param(
+            "with just new lines",
+            b'\n\n', b'', ''
+        ),
+        param(
+            "with no data but with whitespaces",
+            b'\n   \n   \n', b'\n   \n', ''
+        )
+    ])
+    def test_must_separate_logs_from_response(self, test_case_name, stdout_data, expected_logs, expected_response):
+        # Output arrives in frames of any size
+        for frame_size in (1, 3, len(stdout_data) or 1):
+            log_stream = io.BytesIO()
+            stream = LambdaOutputStream(log_stream=log_stream)
+
+            for index in range(0, len(stdout_data), frame_size):
+                stream.write(stdout_data[index:index + frame_size])
+
+            response, is_customer_error = stream.get_lambda_output()
+            self.assertEquals(log_stream.getvalue(), expected_logs)
+            self.assertEquals(response, expected_response)
+            self.assertFalse(is_customer_error)
+
+    def test_must_write_logs_as_they_arrive(self):
+        log_stream = io.BytesIO()
+        stream = LambdaOutputStream(log_stream=log_stream)
+
+        stream.write(b"first log\nsecond")
+        self.assertEquals(log_stream.getvalue(), b"first log\n")
+
+        stream.write(b" log\n")
+        # The line may still be the response, if nothing follows it
+        self.assertEquals(log_stream.getvalue(), b"first log\n")
+
+        stream.write(b'{"a": "b"}')
+        self.assertEquals(log_stream.getvalue(), b"first log\nsecond log\n")
+        self.assertEquals(stream.get_lambda_output(), ('{"a": "b"}', False))
+
+    def test_must_discard_logs_without_log_stream(self):
+        stream = LambdaOutputStream()
+
+        stream.write(b"log\n")
+        stream.write(b'{"errorMessage": "a", "stackTrace": "b", "errorType": "c"}\n')
+
+        self.assertEquals(stream.get_lambda_output(),
+                          ('{"errorMessage": "a", "stackTrace": "b", "errorType": "c"}', True))
+
+    @patch('samcli.local.services.base_local_service.LambdaOutputParser.is_lambda_error_response')
+    def test_must_return_response_without_checking_for_errors(self, is_lambda_error_response_mock):
+        stream = LambdaOutputStream()
+
+        stream.write(b"log\n  {\"a\": \"b\"}  \n")
+
+        self.assertEquals(stream.get_lambda_response(), '{"a": "b"}')
+        is_lambda_error_response_mock.assert_not_called()
+
+
 class TestLambdaOutputParser(TestCase):
 
     @parameterized.expand([
@@ -129,6 +231,17 @@ class TestLambdaOutputParser(TestCase):
     def test_is_lambda_error_response(self, input, exected_result):
         self.assertEquals(LambdaOutputParser.is_lambda_error_response(input), exected_result)
 
+    @parameterized.expand([
+        param({"errorMessage": "a", "stackTrace": "b", "errorType": "c"}, True),
+        param({"errorMessage": "a", "stackTrace": "b", "errorType": "c", "hello": "world"}, False),
+        param({"hello": "world"}, False),
+        param(["errorMessage", "stackTrace", "errorType"], False),
+        param("errorMessage", False),
+        param(None, False),
+    ])
+    def test_is_lambda_error(self, parsed_response, exected_result):
+        self.assertEquals(LambdaOutputParser.is_lambda_error(parsed_response), exected_result)
+
 
 class CaseInsensiveDict(TestCase):
 
@@ -161,3 +274,75 @@ class CaseInsensiveDict(TestCase):
     def test_keyerror(self):
         with self.assertRaises(KeyError):
             self.data['does-not-exist']
+
+    def test_get_is_case_insensitive(self):
+        self.assertEquals(self.data.get('CONTENT-TYPE'), 'text/html')
+        self.assertEquals(self.data.get('Dog-Food', 'default'), 'default')
+
+    def test_setitem_keeps_original_case(self):
+        self.data['content-type'] = 'application/json'
+
+        self.assertEquals(self.data, {'Content-Type': 'application/json', 'Browser': 'APIGW'})
+        self.assertEquals(self.data['CONTENT-TYPE'], 'application/json')
+
+    def test_delitem(self):
+        del self.data['content-type']
+
+        self.assertFalse('Content-Type' in self.data)
+        self.assertEquals(self.data, {'Browser': 'APIGW'})
+
+        with self.assertRaises(KeyError):
+            del self.data['content-type']
+
+    def test_pop(self):
+        self.assertEquals(self.data.pop('BROWSER'), 'APIGW')
+        self.assertEquals(self.data.pop('browser', 'default'), 'default')
+        self.assertFalse('Browser' in self.data)
+
+        with self.assertRaises(KeyError):
+            self.data.pop('browser')
+
+    def test_update_and_setdefault(self):
+        self.data.update({'content-type': 'application/json'}, Accept='*/*')
+
+        self.assertEquals(self.data.setdefault('BROWSER', 'other'), 'APIGW')
+        self.assertEquals(self.data.setdefault('X-New', 'new'), 'new')
+        self.assertEquals(self.data, {'Content-Type': 'application/json',
+                                      'Browser': 'APIGW',
+                                      'Accept': '*/*',
+                                      'X-New': 'new'})
+
+    def test_multi_value_headers(self):
+        data = CaseInsensitiveDict([('Set-Cookie', 'a=1'), ('set-cookie', 'b=2'), ('Browser', 'APIGW')])
+
+        self.assertEquals(data['SET-COOKIE'], 'a=1')
+        self.assertEquals(data.getlist('set-cookie'), ['a=1', 'b=2'])
+        self.assertEquals(data.getlist('Dog-Food'), [])
+        self.assertEquals(data, {'Set-Cookie': 'a=1', 'Browser': 'APIGW'})
+
+        data.add('SET-COOKIE', 'c=3')
+        self.assertEquals(data.getlist('Set-Cookie'), ['a=1', 'b=2', 'c=3'])
+        self.assertEquals(sorted(data.copy().multi_items()), [('Browser', 'APIGW'),
+                                                              ('Set-Cookie', 'a=1'),
+                                                              ('Set-Cookie', 'b=2'),
+                                                              ('Set-Cookie', 'c=3')])
+
+        data['set-cookie'] = 'd=4'
+        self.assertEquals(data.getlist('Set-Cookie'), ['d=4'])
+
+    def test_keeps_all_values_of_werkzeug_headers(self):
+        headers = Headers([('X-Forwarded-For', '1.1.1.1'), ('X-Forwarded-For', '2.2.2.2')])
+
+        data = CaseInsensitiveDict(headers)
+
+        self.assertEquals(data.getlist('x-forwarded-for'), ['1.1.1.1', '2.2.2.2'])
+
+    def test_clear_and_popitem(self):
+        key, _ = self.data.popitem()
+        self.assertFalse(key in self.data)
+
+        self.data.clear()
+
+        self.assertEquals(len(self.data), 0)
+        self.assertFalse('Browser' in self.data)
+        self.assertEquals(list(self.data.multi_items()), [])
@@ -0,0 +1,127 @@
+import json
+import threading
+from unittest import TestCase
+
+from six.moves import http_client
+
+from samcli.local.services.http_server import PooledWSGIServer
+
+
+class TestPooledWSGIServer(TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.server = None
+        self.connections = []
+
+    def tearDown(self):
+        self.release.set()
+        for connection in self.connections:
+            connection.close()
+        if self.server:
+            self.server.shutdown()
+
+    def test_must_keep_connection_alive(self):
+        self._start_server(self._echo_port_app)
+
+        connection = self._connect()
+        ports = [self._get(connection)[1] for _ in range(3)]
+
+        self.assertEquals(len(set(ports)), 1)
+
+    def test_must_serve_requests_in_parallel(self):
+        self._start_server(self._echo_port_app, max_workers=4)
+
+        results = []
+
+        def request():
+            results.append(self._get(self._connect())[0])
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEquals(results, [200] * 8)
+
+    def test_must_reject_requests_when_queue_is_full(self):
+        self._start_server(self._blocking_app, max_workers=1, max_queued_requests=1)
+        in_flight = self._send_when_started()
+
+        queued = self._connect()
+        queued.request("GET", "/")
+        self._wait_until(lambda: self.server.queued_connections() == 1)
+
+        status, _ = self._get(self._connect())
+        self.assertEquals(status, 429)
+
+        self.release.set()
+        self.assertEquals(in_flight.getresponse().status, 200)
+        self.assertEquals(queued.getresponse().status, 200)
+
+    def test_must_drain_on_shutdown(self):
+        self._start_server(self._blocking_app, max_workers=1, max_queued_requests=1)
+        in_flight = self._send_when_started()
+
+        queued = self._connect()
+        queued.request("GET", "/")
+        self._wait_until(lambda: self.server.queued_connections() == 1)
+
+        server, self.server = self.server, None
+        shutdown = threading.Thread(target=server.shutdown)
+        shutdown.start()
+        self._wait_until(server.is_draining)
+
+        self.release.set()
+        # Request being served completes, the request waiting for a worker is rejected
+        self.assertEquals(in_flight.getresponse().status, 200)
+        self.assertEquals(queued.getresponse().status, 503)
+
+        shutdown.join()
+
+    def _start_server(self, app, **kwargs):
+        self.server = PooledWSGIServer("127.0.0.1", 0, app, **kwargs)
+
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def _connect(self):
+        connection = http_client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=10)
+        self.connections.append(connection)
+        return connection
+
+    def _send_when_started(self):
+        connection = self._connect()
+        connection.request("GET", "/")
+        self.assertTrue(self.started.wait(10))
+        return connection
+
+    @staticmethod
+    def _get(connection):
+        connection.request("GET", "/")
+        response = connection.getresponse()
+        return response.status, response.read()
+
+    @staticmethod
+    def _wait_until(condition):
+        event = threading.Event()
+        for _ in range(1000):
+            if condition():
+                return
+            event.wait(0.01)
+        raise AssertionError("Condition was not met")
+
+    @staticmethod
+    def _echo_port_app(environ, start_response):
+        body = json.dumps(environ["REMOTE_PORT"]).encode("utf-8")
+        start_response("200 OK", [("Content-Length", str(len(body)))])
+        return [body]
+
+    def _blocking_app(self, environ, start_response):
+        self.started.set()
+        self.release.wait(10)
+        start_response("200 OK", [("Content-Length", "2")])
+        return [b"ok"]